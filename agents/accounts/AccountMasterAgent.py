@@ -1,71 +1,58 @@
-import os
 from dotenv import load_dotenv
 from agno.agent import Agent
-from agno.knowledge.json import JSONKnowledgeBase
-from agno.models.azure import AzureOpenAI
 from agno.tools.reasoning import ReasoningTools
-from agno.embedder.azure_openai import AzureOpenAIEmbedder
-from agno.vectordb.chroma import ChromaDb
-from agno.memory.v2.db.sqlite import SqliteMemoryDb
-from agno.memory.v2.memory import Memory
-from agno.storage.sqlite import SqliteStorage
+
+from agents.registry import session_storage
+from agents.shared.bankingData import SEED_CUSTOMER_ID
+from agents.shared.boundedMemory import BoundedMemory, IndexedSqliteMemoryDb
+from agents.shared.indexArtifacts import restore_index
+from agents.shared.lexicalIndex import LexicalIndex
+from agents.shared.models import create_chat_model
+from agents.shared.partitionedKnowledge import CustomerPartitionedKnowledgeBase
+from agents.shared.requestContext import request_scope
+from agents.shared.reranking import create_reranker
+from agents.shared.summaryTools import FinancialSummaryTools
+from agents.shared.vectorStores import create_vector_db
 
 # Load environment variables
 load_dotenv()
 
-# Initialize persistent ChromaDB for knowledge base
+# Persistent vector db for the knowledge base (Chroma or Qdrant, per VECTOR_BACKEND)
 def create_persistent_vector_db(collection_name: str):
-    return ChromaDb(
+    return create_vector_db(
         collection=collection_name,
         path="embeddings/chromadb/accounts",  # Persistent storage path
-        persistent_client=True,
-        embedder=AzureOpenAIEmbedder(
-            api_key=os.getenv("EMBEDDING_API_KEY"),
-            azure_endpoint=os.getenv("EMBEDDING_ENDPOINT"),
-            azure_deployment=os.getenv("EMBEDDING_DEPLOYMENT")
-        )
     )
 
 # Create shared knowledge base with persistent storage
-knowledge_base = JSONKnowledgeBase(
+knowledge_base = CustomerPartitionedKnowledgeBase(
     path="knowledge/CORE_BANKING_DATA.json",
     vector_db=create_persistent_vector_db("banking_knowledge"),
     num_documents=10,
+    lexical_index=LexicalIndex(db_file="embeddings/lexical/accounts.db"),
+    reranker=create_reranker(),
 )
 
 # Initialize persistent memory and storage
-memory_db = SqliteMemoryDb(
+memory_db = IndexedSqliteMemoryDb(
     table_name="user_memories", 
     db_file="tmp/accounts/banking_agent_memory.db"
 )
 
-memory = Memory(
-    model=AzureOpenAI(
-        azure_deployment=os.getenv("DEPLOYMENT"),
-        api_key=os.getenv("AZURE_OPENAI_API_KEY"),
-        azure_endpoint=os.getenv("ENDPOINT"),
-        api_version=os.getenv("API_VERSION")
-    ),
+memory = BoundedMemory(
+    model=create_chat_model("memory"),
     db=memory_db,
     delete_memories=True,
     clear_memories=True,
 )
 
-storage = SqliteStorage(
-    table_name="agent_sessions", 
-    db_file="tmp/accounts/banking_agent_sessions.db"
-)
+storage = session_storage("accounts")
 
 # Create specialized agents
 def create_account_profile_agent():
     return Agent(
         name="AccountProfileSummaryAgent",
-        model=AzureOpenAI(
-            azure_deployment=os.getenv("DEPLOYMENT"),
-            api_key=os.getenv("AZURE_OPENAI_API_KEY"),
-            azure_endpoint=os.getenv("ENDPOINT"),
-            api_version=os.getenv("API_VERSION")
-        ),
+        model=create_chat_model("answer"),
         tools=[ReasoningTools(add_instructions=True)],
         knowledge=knowledge_base,
         search_knowledge=True,
@@ -84,17 +71,13 @@ def create_account_profile_agent():
 def create_balance_overdraft_agent():
     return Agent(
         name="BalanceOverdraftAgent",
-        model=AzureOpenAI(
-            azure_deployment=os.getenv("DEPLOYMENT"),
-            api_key=os.getenv("AZURE_OPENAI_API_KEY"),
-            azure_endpoint=os.getenv("ENDPOINT"),
-            api_version=os.getenv("API_VERSION")
-        ),
-        tools=[ReasoningTools(add_instructions=True)],
+        model=create_chat_model("answer"),
+        tools=[ReasoningTools(add_instructions=True), FinancialSummaryTools()],
         knowledge=knowledge_base,
         search_knowledge=True,
         description="Specialized in providing monetary state information, account balances, overdraft details, and account-level limits.",
         instructions=[
+            "For totals (total balance, 30/90 day cash flow, upcoming EMIs and recurring payments, reward points, insurance cover, net worth) use the financial_summary tools: get_financial_summary, or get_cashflow for other windows. They are computed from the live records; do not quote figures from any stored \"summary\" block.",
             "Search for balance-specific information using account numbers, balance types, or overdraft terms.",
             "Always include timestamps when reporting balances.",
             "Distinguish between available balance and current balance.",
@@ -109,12 +92,7 @@ def create_balance_overdraft_agent():
 def create_fd_interest_agent():
     return Agent(
         name="FDInterestAgent",
-        model=AzureOpenAI(
-            azure_deployment=os.getenv("DEPLOYMENT"),
-            api_key=os.getenv("AZURE_OPENAI_API_KEY"),
-            azure_endpoint=os.getenv("ENDPOINT"),
-            api_version=os.getenv("API_VERSION")
-        ),
+        model=create_chat_model("answer"),
         tools=[ReasoningTools(add_instructions=True)],
         knowledge=knowledge_base,
         search_knowledge=True,
@@ -134,13 +112,9 @@ def create_fd_interest_agent():
 # Create the Account Master Agent
 account_master_agent = Agent(
     name="AccountMasterAgent",
-    model=AzureOpenAI(
-        azure_deployment=os.getenv("DEPLOYMENT"),
-        api_key=os.getenv("AZURE_OPENAI_API_KEY"),
-        azure_endpoint=os.getenv("ENDPOINT"),
-        api_version=os.getenv("API_VERSION")
-    ),
-    tools=[ReasoningTools(add_instructions=True)],
+    role="Handles account profiles, holder details, KYC status, balances, overdrafts and fixed deposits",
+    model=create_chat_model("answer"),
+    tools=[ReasoningTools(add_instructions=True), FinancialSummaryTools()],
     knowledge=knowledge_base,
     search_knowledge=True,
     memory=memory,
@@ -151,6 +125,7 @@ account_master_agent = Agent(
     read_chat_history=True,  # Allow reading full chat history
     description="Master banking agent that intelligently routes user requests to specialized banking agents and provides comprehensive banking assistance.",
     instructions=[
+        "For totals (total balance, 30/90 day cash flow, upcoming EMIs and recurring payments, reward points, insurance cover, net worth) use the financial_summary tools: get_financial_summary, or get_cashflow for other windows. They are computed from the live records; do not quote figures from any stored \"summary\" block.",
         "You are the main interface for banking operations. Analyze user requests and determine the most appropriate response strategy.",
         "For account profile, holder details, KYC status, IFSC codes, or branch information - use AccountProfileSummaryAgent approach.",
         "For balance inquiries, overdraft information, account limits, or monetary state - use BalanceOverdraftAgent approach.",
@@ -171,6 +146,9 @@ account_master_agent = Agent(
 def initialize_knowledge_base():
     """Initialize the knowledge base with persistent storage"""
     try:
+        # A prebuilt index artifact matching the JSON files saves re-embedding on a fresh node
+        if restore_index(knowledge_base, "accounts"):
+            return
         # Check if embeddings already exist
         if not knowledge_base.vector_db.exists():
             print("Creating new embeddings...")
@@ -188,10 +166,11 @@ def initialize_knowledge_base():
 def get_user_context(user_id: str) -> str:
     """Get user context from memory for personalization"""
     try:
-        user_memories = memory.get_user_memories(user_id=user_id)
+        # Only the last 3 memories are read, not the user's whole history
+        user_memories = memory.recent_user_memories(user_id=user_id, limit=3)
         if user_memories:
             context = "User Context:\n"
-            for mem in user_memories[-3:]:  # Last 3 memories
+            for mem in user_memories:
                 context += f"- {mem.memory}\n"
             return context
     except:
@@ -221,11 +200,13 @@ def chat_with_master_agent(user_id: str = "default_user"):
                 continue
                 
             # Get response from master agent with user context
-            response = account_master_agent.run(
-                message=user_input,
-                user_id=user_id,
-                stream=False
-            )
+            # Local chats are served the seed customer's data
+            with request_scope(user_id=user_id, customer_id=SEED_CUSTOMER_ID):
+                response = account_master_agent.run(
+                    message=user_input,
+                    user_id=user_id,
+                    stream=False
+                )
             
             print(f"\n🤖 Banking Agent: {response.content}")
             
@@ -1,52 +1,47 @@
 import os
 from dotenv import load_dotenv
 from agno.agent import Agent
-from agno.knowledge.json import JSONKnowledgeBase
-from agno.models.azure import AzureOpenAI
 from agno.tools.reasoning import ReasoningTools
-from agno.embedder.azure_openai import AzureOpenAIEmbedder
-from agno.vectordb.chroma import ChromaDb
-from agno.memory.v2.memory import Memory
-from agno.memory.v2.db.sqlite import SqliteMemoryDb
-from agno.storage.sqlite import SqliteStorage
+
+from agents.registry import session_storage
+from agents.shared.bankingData import SEED_CUSTOMER_ID
+from agents.shared.boundedMemory import BoundedMemory, IndexedSqliteMemoryDb
+from agents.shared.indexArtifacts import restore_index
+from agents.shared.lexicalIndex import LexicalIndex
+from agents.shared.models import create_chat_model
+from agents.shared.partitionedKnowledge import CustomerPartitionedKnowledgeBase
+from agents.shared.requestContext import request_scope
+from agents.shared.reranking import create_reranker
+from agents.shared.vectorStores import create_vector_db
 
 # Load environment variables from .env file
 load_dotenv()
 
-# Initialize single persistent ChromaDB for shared knowledge base
-shared_vector_db = ChromaDb(
+# Single persistent vector db for the shared knowledge base (Chroma or Qdrant, per VECTOR_BACKEND)
+shared_vector_db = create_vector_db(
     collection="banking_data_info",
     path="embeddings/chromadb/cards",
-    persistent_client=True,
-    embedder=AzureOpenAIEmbedder(
-        api_key=os.getenv("EMBEDDING_API_KEY"),
-        azure_endpoint=os.getenv("EMBEDDING_ENDPOINT"),
-        azure_deployment=os.getenv("EMBEDDING_DEPLOYMENT")
-    )
 )
 
 # Create single shared JSON knowledge base
-shared_knowledge_base = JSONKnowledgeBase(
+shared_knowledge_base = CustomerPartitionedKnowledgeBase(
     path="knowledge/CORE_BANKING_DATA.json",
     vector_db=shared_vector_db,
     num_documents=10,
+    lexical_index=LexicalIndex(db_file="embeddings/lexical/cards.db"),
+    reranker=create_reranker(),
 )
 
 # Initialize persistent memory and storage
-memory_db = SqliteMemoryDb(table_name="card_memories", db_file="tmp/cards/card_agent.db")
-memory = Memory(db=memory_db)
-storage = SqliteStorage(table_name="card_sessions", db_file="tmp/cards/card_agent.db")
+memory_db = IndexedSqliteMemoryDb(table_name="card_memories", db_file="tmp/cards/card_agent.db")
+memory = BoundedMemory(model=create_chat_model("memory"), db=memory_db)
+storage = session_storage("cards")
 
 # Create Card Financial Management Agent (Credit Cards)
 cardFinancialAgent = Agent(
     name="Card Financial Agent",
     role="Handles credit card financial information, limits, statements, rewards, and payments",
-    model=AzureOpenAI(
-        azure_deployment=os.getenv("DEPLOYMENT"),
-        api_key=os.getenv("AZURE_OPENAI_API_KEY"),
-        azure_endpoint=os.getenv("ENDPOINT"),
-        api_version=os.getenv("API_VERSION")
-    ),
+    model=create_chat_model("answer"),
     tools=[ReasoningTools(add_instructions=True)],
     knowledge=shared_knowledge_base,
     search_knowledge=True,
@@ -87,12 +82,7 @@ cardFinancialAgent = Agent(
 cardControlsLimitsAgent = Agent(
     name="Card Controls Agent",
     role="Handles card controls, daily limits, security features, and linked account details",
-    model=AzureOpenAI(
-        azure_deployment=os.getenv("DEPLOYMENT"),
-        api_key=os.getenv("AZURE_OPENAI_API_KEY"),
-        azure_endpoint=os.getenv("ENDPOINT"),
-        api_version=os.getenv("API_VERSION")
-    ),
+    model=create_chat_model("answer"),
     tools=[ReasoningTools(add_instructions=True)],
     knowledge=shared_knowledge_base,
     search_knowledge=True,
@@ -128,12 +118,7 @@ cardControlsLimitsAgent = Agent(
 # Create Master Card Agent that routes to appropriate agents
 CardMasterAgent = Agent(
     name="Card Master Agent",
-    model=AzureOpenAI(
-        azure_deployment=os.getenv("DEPLOYMENT"),
-        api_key=os.getenv("AZURE_OPENAI_API_KEY"),
-        azure_endpoint=os.getenv("ENDPOINT"),
-        api_version=os.getenv("API_VERSION")
-    ),
+    model=create_chat_model("router"),
     team=[cardFinancialAgent, cardControlsLimitsAgent],
     memory=memory,
     storage=storage,
@@ -181,7 +166,9 @@ def initialize_shared_knowledge_base():
             os.makedirs("embeddings/chromadb", exist_ok=True)
         
         print("Loading shared banking knowledge base...")
-        shared_knowledge_base.load(recreate=False)  # Don't recreate if exists
+        # A prebuilt index artifact matching the JSON files saves re-embedding on a fresh node
+        if not restore_index(shared_knowledge_base, "cards"):
+            shared_knowledge_base.load(recreate=False)  # Don't recreate if exists
         print("Shared knowledge base loaded successfully!")
         
     except Exception as e:
@@ -210,13 +197,15 @@ if __name__ == "__main__":
             
             if user_input:
                 print("\nCard Master Agent:")
-                CardMasterAgent.print_response(
-                    user_input, 
-                    stream=True, 
-                    markdown=True,
-                    user_id="demo_user",
-                    session_id="demo_session"
-                )
+                # Local chats are served the seed customer's data
+                with request_scope(user_id="demo_user", customer_id=SEED_CUSTOMER_ID):
+                    CardMasterAgent.print_response(
+                        user_input, 
+                        stream=True, 
+                        markdown=True,
+                        user_id="demo_user",
+                        session_id="demo_session"
+                    )
                 print("\n" + "=" * 50)
         
         except KeyboardInterrupt:
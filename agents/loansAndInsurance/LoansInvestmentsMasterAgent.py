@@ -1,53 +1,50 @@
 import os
 from dotenv import load_dotenv
 from agno.agent import Agent
-from agno.knowledge.json import JSONKnowledgeBase
-from agno.models.azure import AzureOpenAI
 from agno.tools.reasoning import ReasoningTools
-from agno.embedder.azure_openai import AzureOpenAIEmbedder
-from agno.vectordb.chroma import ChromaDb
-from agno.memory.v2.memory import Memory
-from agno.memory.v2.db.sqlite import SqliteMemoryDb
-from agno.storage.sqlite import SqliteStorage
+
+from agents.loansAndInsurance.loanTools import LoanCalculatorTools
+from agents.loansAndInsurance.portfolioTools import PortfolioTools
+from agents.registry import session_storage
+from agents.shared.boundedMemory import BoundedMemory, IndexedSqliteMemoryDb
+from agents.shared.bankingData import SEED_CUSTOMER_ID, core_banking_records
+from agents.shared.indexArtifacts import restore_index
+from agents.shared.lexicalIndex import LexicalIndex
+from agents.shared.models import create_chat_model
+from agents.shared.partitionedKnowledge import CustomerPartitionedKnowledgeBase
+from agents.shared.requestContext import request_scope
+from agents.shared.reranking import create_reranker
+from agents.shared.vectorStores import create_vector_db
 
 # Load environment variables from .env file
 load_dotenv()
 
-# Initialize single persistent ChromaDB for shared knowledge base
-shared_vector_db = ChromaDb(
+# Single persistent vector db for the shared knowledge base (Chroma or Qdrant, per VECTOR_BACKEND)
+shared_vector_db = create_vector_db(
     collection="banking_data_info",
     path="embeddings/chromadb/loansAndInvestment",
-    persistent_client=True,
-    embedder=AzureOpenAIEmbedder(
-        api_key=os.getenv("EMBEDDING_API_KEY"),
-        azure_endpoint=os.getenv("EMBEDDING_ENDPOINT"),
-        azure_deployment=os.getenv("EMBEDDING_DEPLOYMENT")
-    )
 )
 
 # Create single shared JSON knowledge base
-shared_knowledge_base = JSONKnowledgeBase(
+shared_knowledge_base = CustomerPartitionedKnowledgeBase(
     path="knowledge/CORE_BANKING_DATA.json",
     vector_db=shared_vector_db,
     num_documents=10,
+    lexical_index=LexicalIndex(db_file="embeddings/lexical/loansAndInvestment.db"),
+    reranker=create_reranker(),
 )
 
 # Initialize persistent memory and storage for loans & investments
-loans_memory_db = SqliteMemoryDb(table_name="loans_investment_memories", db_file="tmp/loansInvestment/loans_investment_agent.db")
-loans_memory = Memory(db=loans_memory_db)
-loans_storage = SqliteStorage(table_name="loans_investment_sessions", db_file="tmp/loansInvestment/loans_investment_agent.db")
+loans_memory_db = IndexedSqliteMemoryDb(table_name="loans_investment_memories", db_file="tmp/loansInvestment/loans_investment_agent.db")
+loans_memory = BoundedMemory(model=create_chat_model("memory"), db=loans_memory_db)
+loans_storage = session_storage("loans")
 
 # Create Loans Management Agent
 loansManagementAgent = Agent(
     name="Loans Management Agent",
     role="Handles loan information, EMI details, payment schedules, and loan status",
-    model=AzureOpenAI(
-        azure_deployment=os.getenv("DEPLOYMENT"),
-        api_key=os.getenv("AZURE_OPENAI_API_KEY"),
-        azure_endpoint=os.getenv("ENDPOINT"),
-        api_version=os.getenv("API_VERSION")
-    ),
-    tools=[ReasoningTools(add_instructions=True)],
+    model=create_chat_model("answer"),
+    tools=[ReasoningTools(add_instructions=True), LoanCalculatorTools(records=core_banking_records)],
     knowledge=shared_knowledge_base,
     search_knowledge=True,
     description="You are a Loans Management Agent specialized in providing comprehensive information about loans, EMI details, payment schedules, loan status, and financial planning.",
@@ -55,6 +52,11 @@ loansManagementAgent = Agent(
         "CRITICAL: ALL loan information is available in the knowledge base. You MUST search the knowledge base before responding to any query.",
         "NEVER make assumptions or provide loan information not found in the knowledge base.",
         "Always search for loan-specific information using loan IDs, loan types, or loan-related terms.",
+        "NEVER do loan arithmetic yourself. Use the loan_calculator tools for exact figures:",
+        "  - get_loan_schedule for EMI breakdowns, remaining instalments, total interest and payoff date",
+        "  - get_outstanding_principal for the balance on any past or future date",
+        "  - simulate_prepayment for \"what if I prepay\" questions; pass every amount the user mentions in one call",
+        "  - simulate_rate_change for floating-rate resets",
         "When analyzing loans, provide comprehensive insights including:",
         "  - Loan details (ID, type, lender, sanction amount, principal, outstanding principal)",
         "  - Interest rates and rate types (fixed, floating, APR)",
@@ -91,13 +93,8 @@ loansManagementAgent = Agent(
 investmentsInsuranceAgent = Agent(
     name="Investments & Insurance Agent",
     role="Handles investment portfolios, mutual funds, insurance policies, and financial planning",
-    model=AzureOpenAI(
-        azure_deployment=os.getenv("DEPLOYMENT"),
-        api_key=os.getenv("AZURE_OPENAI_API_KEY"),
-        azure_endpoint=os.getenv("ENDPOINT"),
-        api_version=os.getenv("API_VERSION")
-    ),
-    tools=[ReasoningTools(add_instructions=True)],
+    model=create_chat_model("answer"),
+    tools=[ReasoningTools(add_instructions=True), PortfolioTools(records=core_banking_records)],
     knowledge=shared_knowledge_base,
     search_knowledge=True,
     description="You are an Investments & Insurance Agent specialized in providing comprehensive information about investment portfolios, mutual funds, insurance policies, and financial planning.",
@@ -105,6 +102,11 @@ investmentsInsuranceAgent = Agent(
         "CRITICAL: ALL investment and insurance information is available in the knowledge base. You MUST search the knowledge base before responding to any query.",
         "NEVER make assumptions or provide investment/insurance information not found in the knowledge base.",
         "Always search for investment/insurance-specific information using investment IDs, insurance policy numbers, or related terms.",
+        "NEVER compute returns yourself. Use the portfolio tools for exact figures:",
+        "  - get_portfolio_summary for total value, cost, unrealized gain, portfolio XIRR and allocation",
+        "  - get_investment_performance for value, gain and XIRR of one or every investment",
+        "  - get_allocation to split the portfolio by asset type, provider or holding",
+        "If a tool reports no XIRR, say why (e.g. incomplete transaction history) instead of estimating one",
         "When analyzing investments and insurance, provide comprehensive insights including:",
         "  - Investment portfolio details (mutual funds, fixed deposits, other investments)",
         "  - Mutual fund information (provider, folio, holdings, NAV, units, valuation)",
@@ -142,12 +144,7 @@ investmentsInsuranceAgent = Agent(
 # Create Master Loans & Investment Agent that routes to appropriate agents
 LoansAndInvestmentMasterAgent = Agent(
     name="Loans & Investment Master Agent",
-    model=AzureOpenAI(
-        azure_deployment=os.getenv("DEPLOYMENT"),
-        api_key=os.getenv("AZURE_OPENAI_API_KEY"),
-        azure_endpoint=os.getenv("ENDPOINT"),
-        api_version=os.getenv("API_VERSION")
-    ),
+    model=create_chat_model("router"),
     team=[loansManagementAgent, investmentsInsuranceAgent],
     memory=loans_memory,
     storage=loans_storage,
@@ -196,7 +193,9 @@ def initialize_shared_knowledge_base():
             os.makedirs("embeddings/chromadb", exist_ok=True)
         
         print("Loading shared banking knowledge base...")
-        shared_knowledge_base.load(recreate=False)  # Don't recreate if exists
+        # A prebuilt index artifact matching the JSON files saves re-embedding on a fresh node
+        if not restore_index(shared_knowledge_base, "loans"):
+            shared_knowledge_base.load(recreate=False)  # Don't recreate if exists
         print("Shared knowledge base loaded successfully!")
         
     except Exception as e:
@@ -225,13 +224,15 @@ if __name__ == "__main__":
             
             if user_input:
                 print("\nLoans & Investment Master Agent:")
-                LoansAndInvestmentMasterAgent.print_response(
-                    user_input, 
-                    stream=True, 
-                    markdown=True,
-                    user_id="demo_user",
-                    session_id="loans_investment_session"
-                )
+                # Local chats are served the seed customer's data
+                with request_scope(user_id="demo_user", customer_id=SEED_CUSTOMER_ID):
+                    LoansAndInvestmentMasterAgent.print_response(
+                        user_input, 
+                        stream=True, 
+                        markdown=True,
+                        user_id="demo_user",
+                        session_id="loans_investment_session"
+                    )
                 print("\n" + "=" * 50)
         
         except KeyboardInterrupt:
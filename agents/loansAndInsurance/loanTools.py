@@ -0,0 +1,266 @@
+import json
+from collections import OrderedDict
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from agno.tools import Toolkit
+
+from agents.shared.amortization import (
+    Schedule,
+    add_months,
+    amortization_schedule,
+    months_between,
+    months_to_repay,
+    prepayment_scenarios,
+)
+from agents.shared.bankingData import CustomerRecords, parse_amount
+
+
+def _money(value: float) -> str:
+    return f"{value:.2f}"
+
+
+def _months(value: float) -> Optional[int]:
+    return int(value) if np.isfinite(value) else None
+
+
+class LoanCalculatorTools(Toolkit):
+    """Exact EMI, schedule, outstanding principal and prepayment figures for the customer's loans.
+
+    Schedules are computed with the vectorized engine in ``agents.shared.amortization``
+    and memoized per loan version (a hash of the loan record), so repeated questions
+    about the same loan cost a dictionary lookup and any change to the loan data
+    invalidates its entries.
+    """
+
+    def __init__(self, records: CustomerRecords, max_cached_schedules: int = 1024, **kwargs):
+        self.records = records
+        self.max_cached_schedules = max_cached_schedules
+        self._schedules: "OrderedDict[Tuple, Tuple[date, Schedule]]" = OrderedDict()
+        super().__init__(
+            name="loan_calculator",
+            tools=[self.list_loans, self.get_loan_schedule, self.get_outstanding_principal,
+                   self.simulate_prepayment, self.simulate_rate_change],
+            **kwargs,
+        )
+
+    def _loans(self) -> List[Dict[str, Any]]:
+        record = self.records.get() or {}
+        return record.get("loans") or []
+
+    def _loan(self, loan_id: str) -> Dict[str, Any]:
+        for loan in self._loans():
+            if loan.get("id", "").lower() == loan_id.strip().lower():
+                return loan
+        raise ValueError(f"No loan {loan_id} for this customer; available: {[loan.get('id') for loan in self._loans()]}")
+
+    @staticmethod
+    def _resets(loan: Dict[str, Any], first_due: date) -> Tuple[Tuple[int, float], ...]:
+        """Rate resets recorded on the loan (``rateResets``: effectiveDate, rateApr) as instalment indexes"""
+        resets = []
+        for reset in loan.get("rateResets") or []:
+            index = months_between(first_due, date.fromisoformat(reset["effectiveDate"][:10]))
+            if index >= 0:
+                resets.append((index, float(reset["rateApr"])))
+        return tuple(resets)
+
+    def _schedule(self, loan: Dict[str, Any], from_origination: bool = False,
+                  extra_resets: Tuple[Tuple[int, float], ...] = (), keep_emi: bool = True) -> Tuple[date, Schedule]:
+        """(first due date, schedule) from origination or from the next EMI, memoized per loan version"""
+        key = (loan.get("id"), self.records.version_of(loan), from_origination, extra_resets, keep_emi)
+        cached = self._schedules.get(key)
+        if cached is not None:
+            self._schedules.move_to_end(key)
+            return cached
+
+        rate = float(loan["rateApr"])
+        if from_origination or not loan.get("outstandingPrincipal"):
+            first_due = add_months(date.fromisoformat(loan["originationDate"][:10]), 1)
+            resets = self._resets(loan, first_due) + extra_resets
+            schedule = amortization_schedule(parse_amount(loan["principal"]), rate, int(loan["termMonths"]),
+                                             resets=resets, keep_emi=keep_emi)
+        else:
+            first_due = date.fromisoformat(loan["nextEmiDate"][:10])
+            balance, emi = parse_amount(loan["outstandingPrincipal"]), parse_amount(loan.get("emiAmount"))
+            if emi:
+                # The EMI actually being paid decides when the loan ends, whatever the maturity date says
+                remaining = months_to_repay(balance, rate, emi)
+            if not emi or not np.isfinite(remaining):
+                remaining = months_between(first_due, date.fromisoformat(loan["maturityDate"][:10])) + 1
+            remaining = int(remaining)
+            resets = self._resets(loan, first_due) + extra_resets
+            schedule = amortization_schedule(balance, rate, max(remaining, 1), emi=emi or None,
+                                             resets=resets, keep_emi=keep_emi)
+
+        self._schedules[key] = (first_due, schedule)
+        while len(self._schedules) > self.max_cached_schedules:
+            self._schedules.popitem(last=False)
+        return first_due, schedule
+
+    def list_loans(self) -> str:
+        """List the customer's loans with their current position.
+
+        Returns:
+            str: JSON list of loans (id, type, outstanding principal, rate, EMI, next EMI date, remaining instalments).
+        """
+        loans = []
+        for loan in self._loans():
+            summary = {key: loan.get(key) for key in ("id", "type", "lender", "status", "rateApr", "rateType",
+                                                      "emiAmount", "nextEmiDate", "maturityDate")}
+            summary["outstandingPrincipal"] = loan.get("outstandingPrincipal")
+            if loan.get("status") == "active" and loan.get("outstandingPrincipal"):
+                _, schedule = self._schedule(loan)
+                summary["remainingInstallments"] = schedule.months
+                summary["remainingInterest"] = _money(schedule.total_interest)
+            loans.append(summary)
+        return json.dumps(loans)
+
+    def get_loan_schedule(self, loan_id: str, start_date: Optional[str] = None, months: int = 12,
+                          from_origination: bool = False) -> str:
+        """Get the exact amortization schedule of a loan: principal, interest and balance for every EMI.
+
+        Args:
+            loan_id (str): Loan id, e.g. LOAN-HOME-001.
+            start_date (str): First due date to show (YYYY-MM-DD). Defaults to the next EMI.
+            months (int): Number of instalments to show (at most 120).
+            from_origination (bool): Build the schedule from the sanctioned principal, rate and term instead of the current outstanding principal.
+
+        Returns:
+            str: JSON with the schedule rows and totals (instalments left, total interest, payoff date).
+        """
+        try:
+            loan = self._loan(loan_id)
+            first_due, schedule = self._schedule(loan, from_origination=from_origination)
+            start = schedule.index_on_or_after(first_due, date.fromisoformat(start_date)) if start_date else 0
+            return json.dumps({
+                "loanId": loan["id"],
+                "basis": "origination" if from_origination else "current outstanding principal",
+                "installments": schedule.months,
+                "totalInterest": _money(schedule.total_interest),
+                "totalPayable": _money(schedule.total_paid),
+                "payoffDate": add_months(first_due, schedule.months - 1).isoformat() if schedule.months else None,
+                "rows": schedule.rows(first_due, start, max(1, min(months, 120))),
+            })
+        except Exception as e:
+            return json.dumps({"error": str(e)})
+
+    def get_outstanding_principal(self, loan_id: str, as_of_date: str) -> str:
+        """Get the outstanding principal of a loan on a date, assuming every EMI is paid on time.
+
+        Args:
+            loan_id (str): Loan id, e.g. LOAN-HOME-001.
+            as_of_date (str): Date (YYYY-MM-DD), past or future.
+
+        Returns:
+            str: JSON with the outstanding principal, EMIs paid by that date and EMIs remaining.
+        """
+        try:
+            loan = self._loan(loan_id)
+            on = date.fromisoformat(as_of_date)
+            # From the last EMI paid on, the stored outstanding principal is the balance; only earlier dates
+            # need the schedule replayed from origination
+            from_origination = (not loan.get("nextEmiDate") or not loan.get("outstandingPrincipal")
+                                or on < add_months(date.fromisoformat(loan["nextEmiDate"][:10]), -1))
+            first_due, schedule = self._schedule(loan, from_origination=from_origination)
+            paid = min(schedule.months, max(0, months_between(first_due, on) + 1))
+            if paid < schedule.months and add_months(first_due, paid - 1) > on:
+                paid -= 1
+            balance = schedule.closing_balance[paid - 1] if paid else schedule.opening_balance[0]
+            return json.dumps({
+                "loanId": loan["id"],
+                "asOf": on.isoformat(),
+                "basis": "origination schedule" if from_origination else "current outstanding principal",
+                "outstandingPrincipal": _money(float(balance)),
+                "installmentsPaidInPeriod": paid,
+                "installmentsRemaining": schedule.months - paid,
+            })
+        except Exception as e:
+            return json.dumps({"error": str(e)})
+
+    def simulate_prepayment(self, loan_id: str, amounts: List[float], reduce: str = "tenure",
+                            prepayment_fee_percent: float = 0.0) -> str:
+        """Compare part-prepayment amounts on a loan, all computed in one pass.
+
+        Args:
+            loan_id (str): Loan id, e.g. LOAN-HOME-001.
+            amounts (List[float]): Prepayment amounts in rupees, e.g. [100000, 250000, 500000].
+            reduce (str): "tenure" keeps the EMI and shortens the loan; "emi" keeps the tenure and lowers the EMI.
+            prepayment_fee_percent (float): Prepayment charge as a percent of the amount (floating-rate home loans usually have none).
+
+        Returns:
+            str: JSON with, per amount, the new EMI, instalments left, months saved, interest saved and net saving after fees.
+        """
+        try:
+            loan = self._loan(loan_id)
+            _, schedule = self._schedule(loan)
+            balance, emi = parse_amount(loan["outstandingPrincipal"]), parse_amount(loan["emiAmount"])
+            results = prepayment_scenarios(balance, float(loan["rateApr"]), emi, amounts, reduce=reduce,
+                                           remaining_months=schedule.months, fee_percent=prepayment_fee_percent)
+            scenarios = [
+                {
+                    "prepayment": _money(results["amount"][index]),
+                    "newOutstandingPrincipal": _money(results["new_balance"][index]),
+                    "newEmi": _money(results["new_emi"][index]),
+                    "installmentsRemaining": _months(results["months"][index]),
+                    "monthsSaved": _months(results["months_saved"][index]),
+                    "interestSaved": _money(results["interest_saved"][index]),
+                    "fee": _money(results["fee"][index]),
+                    "netSaving": _money(results["net_saving"][index]),
+                }
+                for index in range(len(results["amount"]))
+            ]
+            return json.dumps({
+                "loanId": loan["id"],
+                "reduce": reduce,
+                "current": {
+                    "outstandingPrincipal": _money(balance),
+                    "emi": _money(emi),
+                    "installmentsRemaining": _months(results["baseline_months"][0]) if scenarios else None,
+                    "remainingInterest": _money(results["baseline_interest"][0]) if scenarios else None,
+                },
+                "scenarios": scenarios,
+            })
+        except Exception as e:
+            return json.dumps({"error": str(e)})
+
+    def simulate_rate_change(self, loan_id: str, new_rate_apr: float, effective_date: Optional[str] = None,
+                             keep_emi: bool = True) -> str:
+        """Show the effect of a floating-rate reset on a loan.
+
+        Args:
+            loan_id (str): Loan id, e.g. LOAN-HOME-001.
+            new_rate_apr (float): New annual interest rate in percent, e.g. 8.6.
+            effective_date (str): First EMI date charged at the new rate (YYYY-MM-DD). Defaults to the next EMI.
+            keep_emi (bool): Keep the EMI and change the tenure (true, the usual bank practice) or keep the tenure and change the EMI.
+
+        Returns:
+            str: JSON comparing EMI, instalments left, payoff date and total interest before and after the reset.
+        """
+        try:
+            loan = self._loan(loan_id)
+            first_due, current = self._schedule(loan)
+            index = 0
+            if effective_date:
+                index = current.index_on_or_after(first_due, date.fromisoformat(effective_date))
+            _, changed = self._schedule(loan, extra_resets=((index, new_rate_apr),), keep_emi=keep_emi)
+
+            def describe(schedule: Schedule) -> Dict[str, Any]:
+                return {
+                    "emiFromReset": _money(float(schedule.payment[min(index, schedule.months - 1)])),
+                    "installmentsRemaining": schedule.months,
+                    "payoffDate": add_months(first_due, schedule.months - 1).isoformat(),
+                    "remainingInterest": _money(schedule.total_interest),
+                }
+
+            before, after = describe(current), describe(changed)
+            return json.dumps({
+                "loanId": loan["id"],
+                "effectiveDate": add_months(first_due, index).isoformat(),
+                "rateApr": {"before": float(loan["rateApr"]), "after": new_rate_apr},
+                "before": before,
+                "after": after,
+                "extraInterest": _money(changed.total_interest - current.total_interest),
+            })
+        except Exception as e:
+            return json.dumps({"error": str(e)})
@@ -0,0 +1,159 @@
+import json
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from agno.tools import Toolkit
+
+from agents.shared.bankingData import CustomerRecords
+from agents.shared.portfolio import FolioValuation, allocation, value_investment, xirr_batch
+
+
+def _money(value: float) -> str:
+    return f"{value:.2f}"
+
+
+def _percent(value: Optional[float]) -> Optional[float]:
+    return None if value is None or not np.isfinite(value) else round(value, 2)
+
+
+class PortfolioTools(Toolkit):
+    """Exact valuation, gains, XIRR and allocation of the customer's investments.
+
+    Folio results are cached per data version (a hash of the ``investments[]`` entry);
+    folios missing from the cache have their XIRR solved together in one batch.
+    """
+
+    def __init__(self, records: CustomerRecords, max_cached_folios: int = 4096, **kwargs):
+        self.records = records
+        self.max_cached_folios = max_cached_folios
+        self._folios: "OrderedDict[Tuple[str, str], FolioValuation]" = OrderedDict()
+        # Portfolio level XIRR by the folio versions it was computed from
+        self._portfolio_xirr: "OrderedDict[Tuple, Tuple[List[FolioValuation], Optional[float]]]" = OrderedDict()
+        super().__init__(
+            name="portfolio",
+            tools=[self.get_portfolio_summary, self.get_investment_performance, self.get_allocation],
+            **kwargs,
+        )
+
+    def _valuations(self) -> List[FolioValuation]:
+        investments = (self.records.get() or {}).get("investments") or []
+        keys = [(investment.get("id"), self.records.version_of(investment)) for investment in investments]
+        missing = [(key, investment) for key, investment in zip(keys, investments) if key not in self._folios]
+        if missing:
+            valuations = [value_investment(investment) for _, investment in missing]
+            solvable = [valuation for valuation in valuations if valuation.history_complete]
+            rates = xirr_batch([(valuation.cashflow_amounts, valuation.cashflow_dates) for valuation in solvable])
+            for valuation, rate in zip(solvable, rates):
+                valuation.xirr = None if np.isnan(rate) else float(rate)
+            for (key, _), valuation in zip(missing, valuations):
+                self._folios[key] = valuation
+        result = []
+        for key in keys:
+            self._folios.move_to_end(key)
+            result.append(self._folios[key])
+        while len(self._folios) > self.max_cached_folios:
+            self._folios.popitem(last=False)
+        return result
+
+    def _combined_xirr(self, valuations: List[FolioValuation]) -> Optional[float]:
+        """XIRR of the pooled cash flows of ``valuations``"""
+        if not valuations:
+            return None
+        # Cached valuations are only replaced when their folio changes, so their identities name a data version;
+        # the entry keeps them referenced so the ids cannot be reused
+        key = tuple(id(valuation) for valuation in valuations)
+        if key not in self._portfolio_xirr:
+            amounts = [amount for valuation in valuations for amount in valuation.cashflow_amounts]
+            dates = [day for valuation in valuations for day in valuation.cashflow_dates]
+            rate = xirr_batch([(amounts, dates)])[0]
+            self._portfolio_xirr[key] = (list(valuations), None if np.isnan(rate) else float(rate))
+            while len(self._portfolio_xirr) > self.max_cached_folios:
+                self._portfolio_xirr.popitem(last=False)
+        return self._portfolio_xirr[key][1]
+
+    @staticmethod
+    def _describe(valuation: FolioValuation) -> Dict[str, Any]:
+        description = {
+            "investmentId": valuation.investment_id,
+            "type": valuation.type,
+            "provider": valuation.provider,
+            "asOf": valuation.as_of,
+            "currentValue": _money(valuation.value),
+            "costBasis": _money(valuation.cost),
+            "unrealizedGain": _money(valuation.gain),
+            "unrealizedGainPercent": _percent(valuation.gain_percent),
+            "transactions": valuation.transactions,
+            "xirrPercent": _percent(valuation.xirr * 100) if valuation.xirr is not None else None,
+        }
+        if valuation.holdings:
+            description["holdings"] = [
+                {"name": holding["name"], "isin": holding["isin"], "units": round(holding["units"], 3),
+                 "currentValue": _money(holding["value"]), "costBasis": _money(holding["cost"])}
+                for holding in valuation.holdings
+            ]
+        if valuation.xirr is None:
+            description["xirrNote"] = ("transaction history does not cover all units held" if valuation.transactions
+                                       else "no transaction history")
+        return description
+
+    def get_portfolio_summary(self) -> str:
+        """Get the customer's total investment value, cost, unrealized gain, portfolio XIRR and allocation by type.
+
+        Returns:
+            str: JSON with portfolio totals, portfolio XIRR (over folios with complete history) and allocation by asset type.
+        """
+        try:
+            valuations = self._valuations()
+            value = sum(valuation.value for valuation in valuations)
+            cost = sum(valuation.cost for valuation in valuations)
+            complete = [valuation for valuation in valuations if valuation.history_complete]
+            portfolio_xirr = self._combined_xirr(complete)
+            return json.dumps({
+                "investments": len(valuations),
+                "currentValue": _money(value),
+                "costBasis": _money(cost),
+                "unrealizedGain": _money(value - cost),
+                "unrealizedGainPercent": _percent((value - cost) / cost * 100) if cost else None,
+                "xirrPercent": _percent(portfolio_xirr * 100) if portfolio_xirr is not None else None,
+                "xirrCovers": [valuation.investment_id for valuation in complete],
+                "allocationByType": [dict(row, value=_money(row["value"]), percent=_percent(row["percent"]))
+                                     for row in allocation(valuations, "type")],
+            })
+        except Exception as e:
+            return json.dumps({"error": str(e)})
+
+    def get_investment_performance(self, investment_id: Optional[str] = None) -> str:
+        """Get value, cost basis, unrealized gain and XIRR per investment (mutual fund folio, FD, ...).
+
+        Args:
+            investment_id (str): Investment id, e.g. INV-MF-001. Leave empty for every investment.
+
+        Returns:
+            str: JSON list with current value, cost basis, unrealized gain, XIRR and holdings of each investment.
+        """
+        try:
+            valuations = self._valuations()
+            if investment_id:
+                valuations = [valuation for valuation in valuations
+                              if (valuation.investment_id or "").lower() == investment_id.strip().lower()]
+                if not valuations:
+                    return json.dumps({"error": f"No investment {investment_id} for this customer"})
+            return json.dumps([self._describe(valuation) for valuation in valuations])
+        except Exception as e:
+            return json.dumps({"error": str(e)})
+
+    def get_allocation(self, by: str = "type") -> str:
+        """Get how the portfolio's current value is split.
+
+        Args:
+            by (str): "type" (asset type: mutual_fund, fd, ...), "provider" (AMC or bank) or "holding" (individual fund).
+
+        Returns:
+            str: JSON list of groups with value and percent of the portfolio, largest first.
+        """
+        try:
+            rows = allocation(self._valuations(), by)
+            return json.dumps([dict(row, value=_money(row["value"]), percent=_percent(row["percent"])) for row in rows])
+        except Exception as e:
+            return json.dumps({"error": str(e)})
@@ -2,55 +2,46 @@ import os
 from dotenv import load_dotenv
 from agno.agent import Agent
 from agno.team.team import Team
-from agno.models.azure import AzureOpenAI
-from agno.memory.v2.memory import Memory
-from agno.memory.v2.db.sqlite import SqliteMemoryDb
 from agno.storage.sqlite import SqliteStorage
 
-# Import all specialized master agents
+from agents.registry import session_storage
+from agents.shared.bankingData import SEED_CUSTOMER_ID
+from agents.shared.boundedMemory import BoundedMemory, IndexedSqliteMemoryDb
+from agents.shared.fanOut import FanOutPlan, FanOutTeam, planner_instructions
+from agents.shared.models import create_chat_model
+from agents.shared.requestContext import request_scope
+
+# Import all specialized master agents and their specialists
 from agents.accounts.AccountMasterAgent import account_master_agent, initialize_knowledge_base as init_accounts_kb
-from agents.cards.CardsMasterAgent import CardMasterAgent, initialize_shared_knowledge_base as init_cards_kb
-from agents.transactions.TransactionMasterAgent import TransactionMasterAgent, initialize_shared_knowledge_base as init_transactions_kb
-from agents.loansAndInsurance.LoansInvestmentsMasterAgent import LoansAndInvestmentMasterAgent, initialize_shared_knowledge_base as init_loans_kb
-from agents.payeesRecurringPayments.PayeesRecurringPaymentsMasterAgent import PayeeRecurringPaymentMasterAgent, initialize_shared_knowledge_base as init_payees_kb
-from agents.miscellaneous.MiscellaneousBankingMasterAgent import BankingServicesMasterAgent, initialize_shared_knowledge_base as init_misc_kb
+from agents.cards.CardsMasterAgent import CardMasterAgent, cardFinancialAgent, cardControlsLimitsAgent, initialize_shared_knowledge_base as init_cards_kb
+from agents.transactions.TransactionMasterAgent import TransactionMasterAgent, cardDigitalPaymentsAgent, financialAnalyticsAgent, transactionAnalysisAgent, initialize_shared_knowledge_base as init_transactions_kb
+from agents.loansAndInsurance.LoansInvestmentsMasterAgent import LoansAndInvestmentMasterAgent, loansManagementAgent, investmentsInsuranceAgent, initialize_shared_knowledge_base as init_loans_kb
+from agents.payeesRecurringPayments.PayeesRecurringPaymentsMasterAgent import PayeeRecurringPaymentMasterAgent, payeesManagementAgent, recurringPaymentsAgent, initialize_shared_knowledge_base as init_payees_kb
+from agents.miscellaneous.MiscellaneousBankingMasterAgent import BankingServicesMasterAgent, bankingServicesSupportAgent, financialProfileComplianceAgent, initialize_shared_knowledge_base as init_misc_kb
 
 # Load environment variables
 load_dotenv()
 
 # Initialize persistent memory and storage for the main agent
-main_memory_db = SqliteMemoryDb(
+main_memory_db = IndexedSqliteMemoryDb(
     table_name="main_agent_memories", 
     db_file="tmp/main_banking_agent.db"
 )
 
-main_memory = Memory(
-    model=AzureOpenAI(
-        azure_deployment=os.getenv("DEPLOYMENT"),
-        api_key=os.getenv("AZURE_OPENAI_API_KEY"),
-        azure_endpoint=os.getenv("ENDPOINT"),
-        api_version=os.getenv("API_VERSION")
-    ),
+main_memory = BoundedMemory(
+    model=create_chat_model("memory"),
     db=main_memory_db,
     delete_memories=False,  # Keep memories for better context
     clear_memories=False,   # Don't clear memories on restart
 )
 
-main_storage = SqliteStorage(
-    table_name="main_agent_sessions", 
-    db_file="tmp/main_banking_agent.db"
-)
+main_storage = session_storage("main")
 
 # Create the Main Banking Master Agent Team with routing
 MainBankingMasterAgent = Team(
     name="Main Banking Master Agent",
     mode="route",  # Route mode to direct queries to appropriate agents
-    model=AzureOpenAI(
-        azure_deployment=os.getenv("DEPLOYMENT"),
-        api_key=os.getenv("AZURE_OPENAI_API_KEY"),
-        azure_endpoint=os.getenv("ENDPOINT"),
-        api_version=os.getenv("API_VERSION")
-    ),
+    model=create_chat_model("router"),
     members=[
         account_master_agent,           # Account profiles, balances, deposits
         CardMasterAgent,                # Credit/debit cards, limits, rewards
@@ -120,6 +111,104 @@ MainBankingMasterAgent = Team(
     show_members_responses=True,  # Show which agent responded
 )
 
+# Flattened routing: one routing call straight to the specialist, skipping the domain master agents
+# (each of which spends another model call choosing a specialist and one more relaying its answer)
+FlatBankingMasterAgent = Team(
+    name="Flat Banking Master Agent",
+    mode="route",
+    model=create_chat_model("router"),
+    members=[
+        account_master_agent,             # Accounts has no sub-agents; it answers directly
+        cardFinancialAgent,
+        cardControlsLimitsAgent,
+        cardDigitalPaymentsAgent,
+        financialAnalyticsAgent,
+        transactionAnalysisAgent,
+        loansManagementAgent,
+        investmentsInsuranceAgent,
+        payeesManagementAgent,
+        recurringPaymentsAgent,
+        bankingServicesSupportAgent,
+        financialProfileComplianceAgent,
+    ],
+    memory=main_memory,
+    storage=main_storage,
+    add_history_to_messages=True,
+    num_history_runs=5,
+    show_tool_calls=True,
+    markdown=True,
+    instructions=[
+        "You are the Main Banking Master Agent. Route each banking query directly to the one specialist best able to answer it:",
+        "",
+        "- AccountMasterAgent: account profiles, holder details, KYC, IFSC and branch details, balances, overdrafts, fixed deposits",
+        "- Card Financial Agent: credit card limits, available credit, statements, billing cycles, due dates, card rewards and card payments",
+        "- Card Controls Agent: card controls, daily limits, international usage, security settings, linked accounts",
+        "- Card & Digital Payments Agent: card transactions, UPI/IMPS payments, e-commerce, international transactions and refunds",
+        "- Financial Analytics Agent: periodic reports, trends over time, cash flow forecasts, budgets, financial health",
+        "- Transaction Analysis Agent: transaction history, category-wise spending, income vs expenses, merchants, NEFT/RTGS transfers",
+        "- Loans Management Agent: loans, EMIs, outstanding balances, interest rates, repayment schedules, prepayments",
+        "- Investments & Insurance Agent: mutual funds, SIP portfolios, returns, life/health/motor insurance policies",
+        "- Payees Management Agent: registered payees, beneficiaries, billers and their UPI IDs or account details",
+        "- Recurring Payments Agent: recurring payments, subscriptions, SIP mandates, standing instructions, payment schedules",
+        "- Banking Services & Support Agent: reward programs, documents and statements, consents, disputes, alerts, travel notices",
+        "- Financial Profile & Compliance Agent: credit score and bureau data, tax information, compliance, transaction limits",
+        "",
+        "For complex queries spanning multiple areas, route to the most relevant specialist.",
+        "If the query is unclear, ask clarifying questions to route correctly.",
+    ],
+    show_members_responses=True,
+)
+
+# The synthesizer only sees rewritten questions; FanOutTeam records the customer's exchanges itself
+fanout_storage = session_storage("fanout")
+
+# Fan-out: a planner splits cross-domain questions ("can I afford a prepayment given my card dues and SIPs?")
+# into sub-questions, the specialists answer them concurrently and one call merges the answers
+FanOutBankingMasterAgent = FanOutTeam(
+    name="Fan-out Banking Master Agent",
+    planner=Agent(
+        name="Fan-out Planner",
+        model=create_chat_model("router"),
+        response_model=FanOutPlan,
+        storage=SqliteStorage(table_name="main_fanout_planner_sessions", db_file="tmp/main_banking_agent.db"),
+        add_history_to_messages=True,
+        num_history_runs=5,
+        instructions=planner_instructions(FlatBankingMasterAgent.members),
+    ),
+    synthesizer=Agent(
+        name="Fan-out Synthesizer",
+        model=create_chat_model("answer"),
+        storage=fanout_storage,
+        add_history_to_messages=True,
+        num_history_runs=5,
+        markdown=True,
+        instructions=[
+            "You are the Main Banking Master Agent. Answer the customer's question using only the specialist answers provided.",
+            "Combine them into one answer: reconcile the figures, do the arithmetic the question asks for and state the conclusion first.",
+            "If a specialist reported missing data or an error, say what could not be determined.",
+            "If no specialist answers are provided, ask a clarifying question.",
+        ],
+    ),
+    members=FlatBankingMasterAgent.members,
+    storage=fanout_storage,
+)
+
+# ROUTING_MODE=flat routes /chat with FlatBankingMasterAgent and fanout with FanOutBankingMasterAgent;
+# nested (default) goes through the domain master agents
+ROUTING_MODES = {
+    "nested": MainBankingMasterAgent,
+    "flat": FlatBankingMasterAgent,
+    "fanout": FanOutBankingMasterAgent,
+}
+
+
+def main_agent(mode=None):
+    """Routing team for ``mode`` (default: the ROUTING_MODE environment variable)"""
+    mode = (mode or os.getenv("ROUTING_MODE", "nested")).lower()
+    if mode not in ROUTING_MODES:
+        raise ValueError(f"Unknown routing mode {mode!r}; use one of {', '.join(ROUTING_MODES)}")
+    return ROUTING_MODES[mode]
+
 # Initialize all knowledge bases
 def initialize_all_knowledge_bases():
     """Initialize all knowledge bases for the specialized agents"""
@@ -176,11 +265,13 @@ def chat_with_main_agent(user_id: str = "main_user"):
                 
             # Get response from main agent team
             print(f"\n🤖 Banking Agent Team:")
-            MainBankingMasterAgent.print_response(
-                user_input,
-                user_id=user_id,
-                stream=True
-            )
+            # Local chats are served the seed customer's data
+            with request_scope(user_id=user_id, customer_id=SEED_CUSTOMER_ID):
+                MainBankingMasterAgent.print_response(
+                    user_input,
+                    user_id=user_id,
+                    stream=True
+                )
             
         except KeyboardInterrupt:
             print("\n\nGoodbye!")
@@ -211,11 +302,13 @@ if __name__ == "__main__":
         print(f"\n🔍 Test Query {i}: {query}")
         print("-" * 50)
         try:
-            MainBankingMasterAgent.print_response(
-                query,
-                user_id="demo_user",
-                stream=True
-            )
+            # Local chats are served the seed customer's data
+            with request_scope(user_id="demo_user", customer_id=SEED_CUSTOMER_ID):
+                MainBankingMasterAgent.print_response(
+                    query,
+                    user_id="demo_user",
+                    stream=True
+                )
         except Exception as e:
             print(f"❌ Error: {e}")
         
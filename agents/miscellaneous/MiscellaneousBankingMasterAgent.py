@@ -1,52 +1,48 @@
 import os
 from dotenv import load_dotenv
 from agno.agent import Agent
-from agno.knowledge.json import JSONKnowledgeBase
-from agno.models.azure import AzureOpenAI
 from agno.tools.reasoning import ReasoningTools
-from agno.embedder.azure_openai import AzureOpenAIEmbedder
-from agno.vectordb.chroma import ChromaDb
-from agno.memory.v2.memory import Memory
-from agno.memory.v2.db.sqlite import SqliteMemoryDb
-from agno.storage.sqlite import SqliteStorage
+
+from agents.registry import session_storage
+from agents.shared.bankingData import SEED_CUSTOMER_ID
+from agents.shared.boundedMemory import BoundedMemory, IndexedSqliteMemoryDb
+from agents.shared.indexArtifacts import restore_index
+from agents.shared.lexicalIndex import LexicalIndex
+from agents.shared.models import create_chat_model
+from agents.shared.partitionedKnowledge import CustomerPartitionedKnowledgeBase
+from agents.shared.requestContext import request_scope
+from agents.shared.reranking import create_reranker
+from agents.shared.summaryTools import FinancialSummaryTools
+from agents.shared.vectorStores import create_vector_db
 
 # Load environment variables from .env file
 load_dotenv()
 
-# Initialize single persistent ChromaDB for shared knowledge base
-shared_vector_db = ChromaDb(
+# Single persistent vector db for the shared knowledge base (Chroma or Qdrant, per VECTOR_BACKEND)
+shared_vector_db = create_vector_db(
     collection="banking_data_info",
     path="embeddings/chromadb/miscellaneous",
-    persistent_client=True,
-    embedder=AzureOpenAIEmbedder(
-        api_key=os.getenv("EMBEDDING_API_KEY"),
-        azure_endpoint=os.getenv("EMBEDDING_ENDPOINT"),
-        azure_deployment=os.getenv("EMBEDDING_DEPLOYMENT")
-    )
 )
 
 # Create single shared JSON knowledge base
-shared_knowledge_base = JSONKnowledgeBase(
+shared_knowledge_base = CustomerPartitionedKnowledgeBase(
     path="knowledge/CORE_BANKING_DATA.json",
     vector_db=shared_vector_db,
     num_documents=10,
+    lexical_index=LexicalIndex(db_file="embeddings/lexical/miscellaneous.db"),
+    reranker=create_reranker(),
 )
 
 # Initialize persistent memory and storage for banking services
-banking_memory_db = SqliteMemoryDb(table_name="banking_services_memories", db_file="tmp/miscellaneous/banking_services_agent.db")
-banking_memory = Memory(db=banking_memory_db)
-banking_storage = SqliteStorage(table_name="banking_services_sessions", db_file="tmp/miscellaneous/banking_services_agent.db")
+banking_memory_db = IndexedSqliteMemoryDb(table_name="banking_services_memories", db_file="tmp/miscellaneous/banking_services_agent.db")
+banking_memory = BoundedMemory(model=create_chat_model("memory"), db=banking_memory_db)
+banking_storage = session_storage("miscellaneous")
 
 # Create Banking Services & Support Agent
 bankingServicesSupportAgent = Agent(
     name="Banking Services & Support Agent",
     role="Handles rewards programs, banking documents, consents, disputes, alerts, and travel notices",
-    model=AzureOpenAI(
-        azure_deployment=os.getenv("DEPLOYMENT"),
-        api_key=os.getenv("AZURE_OPENAI_API_KEY"),
-        azure_endpoint=os.getenv("ENDPOINT"),
-        api_version=os.getenv("API_VERSION")
-    ),
+    model=create_chat_model("answer"),
     tools=[ReasoningTools(add_instructions=True)],
     knowledge=shared_knowledge_base,
     search_knowledge=True,
@@ -96,17 +92,13 @@ bankingServicesSupportAgent = Agent(
 financialProfileComplianceAgent = Agent(
     name="Financial Profile & Compliance Agent",
     role="Handles credit profiles, tax information, compliance, regulatory data, and financial health indicators",
-    model=AzureOpenAI(
-        azure_deployment=os.getenv("DEPLOYMENT"),
-        api_key=os.getenv("AZURE_OPENAI_API_KEY"),
-        azure_endpoint=os.getenv("ENDPOINT"),
-        api_version=os.getenv("API_VERSION")
-    ),
-    tools=[ReasoningTools(add_instructions=True)],
+    model=create_chat_model("answer"),
+    tools=[ReasoningTools(add_instructions=True), FinancialSummaryTools()],
     knowledge=shared_knowledge_base,
     search_knowledge=True,
     description="You are a Financial Profile & Compliance Agent specialized in providing comprehensive information about credit profiles, tax information, compliance, regulatory data, and financial health indicators.",
     instructions=[
+        "For totals (total balance, 30/90 day cash flow, upcoming EMIs and recurring payments, reward points, insurance cover, net worth) use the financial_summary tools: get_financial_summary, or get_cashflow for other windows. They are computed from the live records; do not quote figures from any stored \"summary\" block.",
         "CRITICAL: ALL financial profile and compliance information is available in the knowledge base. You MUST search the knowledge base before responding to any query.",
         "NEVER make assumptions or provide financial profile information not found in the knowledge base.",
         "Always search for financial profile-specific information using relevant terms or data categories.",
@@ -148,12 +140,7 @@ financialProfileComplianceAgent = Agent(
 # Create Master Banking Services Agent that routes to appropriate agents
 BankingServicesMasterAgent = Agent(
     name="Banking Services Master Agent",
-    model=AzureOpenAI(
-        azure_deployment=os.getenv("DEPLOYMENT"),
-        api_key=os.getenv("AZURE_OPENAI_API_KEY"),
-        azure_endpoint=os.getenv("ENDPOINT"),
-        api_version=os.getenv("API_VERSION")
-    ),
+    model=create_chat_model("router"),
     team=[bankingServicesSupportAgent, financialProfileComplianceAgent],
     memory=banking_memory,
     storage=banking_storage,
@@ -205,7 +192,9 @@ def initialize_shared_knowledge_base():
             os.makedirs("embeddings/chromadb", exist_ok=True)
         
         print("Loading shared banking knowledge base...")
-        shared_knowledge_base.load(recreate=False)  # Don't recreate if exists
+        # A prebuilt index artifact matching the JSON files saves re-embedding on a fresh node
+        if not restore_index(shared_knowledge_base, "miscellaneous"):
+            shared_knowledge_base.load(recreate=False)  # Don't recreate if exists
         print("Shared knowledge base loaded successfully!")
         
     except Exception as e:
@@ -234,13 +223,15 @@ if __name__ == "__main__":
             
             if user_input:
                 print("\nBanking Services Master Agent:")
-                BankingServicesMasterAgent.print_response(
-                    user_input, 
-                    stream=True, 
-                    markdown=True,
-                    user_id="demo_user",
-                    session_id="banking_services_session"
-                )
+                # Local chats are served the seed customer's data
+                with request_scope(user_id="demo_user", customer_id=SEED_CUSTOMER_ID):
+                    BankingServicesMasterAgent.print_response(
+                        user_input, 
+                        stream=True, 
+                        markdown=True,
+                        user_id="demo_user",
+                        session_id="banking_services_session"
+                    )
                 print("\n" + "=" * 50)
         
         except KeyboardInterrupt:
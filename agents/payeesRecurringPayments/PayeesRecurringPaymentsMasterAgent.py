@@ -1,52 +1,48 @@
 import os
 from dotenv import load_dotenv
 from agno.agent import Agent
-from agno.knowledge.json import JSONKnowledgeBase
-from agno.models.azure import AzureOpenAI
 from agno.tools.reasoning import ReasoningTools
-from agno.embedder.azure_openai import AzureOpenAIEmbedder
-from agno.vectordb.chroma import ChromaDb
-from agno.memory.v2.memory import Memory
-from agno.memory.v2.db.sqlite import SqliteMemoryDb
-from agno.storage.sqlite import SqliteStorage
+
+from agents.registry import session_storage
+from agents.shared.bankingData import SEED_CUSTOMER_ID
+from agents.shared.boundedMemory import BoundedMemory, IndexedSqliteMemoryDb
+from agents.shared.indexArtifacts import restore_index
+from agents.shared.lexicalIndex import LexicalIndex
+from agents.shared.models import create_chat_model
+from agents.shared.partitionedKnowledge import CustomerPartitionedKnowledgeBase
+from agents.shared.requestContext import request_scope
+from agents.shared.reranking import create_reranker
+from agents.shared.summaryTools import FinancialSummaryTools
+from agents.shared.vectorStores import create_vector_db
 
 # Load environment variables from .env file
 load_dotenv()
 
-# Initialize single persistent ChromaDB for shared knowledge base
-shared_vector_db = ChromaDb(
+# Single persistent vector db for the shared knowledge base (Chroma or Qdrant, per VECTOR_BACKEND)
+shared_vector_db = create_vector_db(
     collection="banking_data_info",
     path="embeddings/chromadb/recurrPayees",
-    persistent_client=True,
-    embedder=AzureOpenAIEmbedder(
-        api_key=os.getenv("EMBEDDING_API_KEY"),
-        azure_endpoint=os.getenv("EMBEDDING_ENDPOINT"),
-        azure_deployment=os.getenv("EMBEDDING_DEPLOYMENT")
-    )
 )
 
 # Create single shared JSON knowledge base
-shared_knowledge_base = JSONKnowledgeBase(
+shared_knowledge_base = CustomerPartitionedKnowledgeBase(
     path="knowledge/CORE_BANKING_DATA.json",
     vector_db=shared_vector_db,
     num_documents=10,
+    lexical_index=LexicalIndex(db_file="embeddings/lexical/recurrPayees.db"),
+    reranker=create_reranker(),
 )
 
 # Initialize persistent memory and storage for payees & recurring payments
-payee_memory_db = SqliteMemoryDb(table_name="payee_recurring_memories", db_file="tmp/recurrPayees/payee_recurring_agent.db")
-payee_memory = Memory(db=payee_memory_db)
-payee_storage = SqliteStorage(table_name="payee_recurring_sessions", db_file="tmp/recurrPayees/payee_recurring_agent.db")
+payee_memory_db = IndexedSqliteMemoryDb(table_name="payee_recurring_memories", db_file="tmp/recurrPayees/payee_recurring_agent.db")
+payee_memory = BoundedMemory(model=create_chat_model("memory"), db=payee_memory_db)
+payee_storage = session_storage("payees")
 
 # Create Payees Management Agent
 payeesManagementAgent = Agent(
     name="Payees Management Agent",
     role="Handles payee information, billers, payment relationships, and beneficiary management",
-    model=AzureOpenAI(
-        azure_deployment=os.getenv("DEPLOYMENT"),
-        api_key=os.getenv("AZURE_OPENAI_API_KEY"),
-        azure_endpoint=os.getenv("ENDPOINT"),
-        api_version=os.getenv("API_VERSION")
-    ),
+    model=create_chat_model("answer"),
     tools=[ReasoningTools(add_instructions=True)],
     knowledge=shared_knowledge_base,
     search_knowledge=True,
@@ -89,17 +85,13 @@ payeesManagementAgent = Agent(
 recurringPaymentsAgent = Agent(
     name="Recurring Payments Agent",
     role="Handles recurring payments, subscriptions, SIP investments, and mandate management",
-    model=AzureOpenAI(
-        azure_deployment=os.getenv("DEPLOYMENT"),
-        api_key=os.getenv("AZURE_OPENAI_API_KEY"),
-        azure_endpoint=os.getenv("ENDPOINT"),
-        api_version=os.getenv("API_VERSION")
-    ),
-    tools=[ReasoningTools(add_instructions=True)],
+    model=create_chat_model("answer"),
+    tools=[ReasoningTools(add_instructions=True), FinancialSummaryTools()],
     knowledge=shared_knowledge_base,
     search_knowledge=True,
     description="You are a Recurring Payments & Subscriptions Agent specialized in providing comprehensive information about recurring payments, subscriptions, SIP investments, payment scheduling, and mandate management.",
     instructions=[
+        "For totals (total balance, 30/90 day cash flow, upcoming EMIs and recurring payments, reward points, insurance cover, net worth) use the financial_summary tools: get_financial_summary, or get_cashflow for other windows. They are computed from the live records; do not quote figures from any stored \"summary\" block.",
         "CRITICAL: ALL recurring payment and subscription information is available in the knowledge base. You MUST search the knowledge base before responding to any query.",
         "NEVER make assumptions or provide recurring payment information not found in the knowledge base.",
         "Always search for recurring payment-specific information using recurring payment IDs, names, or payment-related terms.",
@@ -138,12 +130,7 @@ recurringPaymentsAgent = Agent(
 # Create Master Payee & Recurring Payment Agent that routes to appropriate agents
 PayeeRecurringPaymentMasterAgent = Agent(
     name="Payee & Recurring Payment Master Agent",
-    model=AzureOpenAI(
-        azure_deployment=os.getenv("DEPLOYMENT"),
-        api_key=os.getenv("AZURE_OPENAI_API_KEY"),
-        azure_endpoint=os.getenv("ENDPOINT"),
-        api_version=os.getenv("API_VERSION")
-    ),
+    model=create_chat_model("router"),
     team=[payeesManagementAgent, recurringPaymentsAgent],
     memory=payee_memory,
     storage=payee_storage,
@@ -193,7 +180,9 @@ def initialize_shared_knowledge_base():
             os.makedirs("embeddings/chromadb", exist_ok=True)
         
         print("Loading shared banking knowledge base...")
-        shared_knowledge_base.load(recreate=False)  # Don't recreate if exists
+        # A prebuilt index artifact matching the JSON files saves re-embedding on a fresh node
+        if not restore_index(shared_knowledge_base, "payees"):
+            shared_knowledge_base.load(recreate=False)  # Don't recreate if exists
         print("Shared knowledge base loaded successfully!")
         
     except Exception as e:
@@ -222,13 +211,15 @@ if __name__ == "__main__":
             
             if user_input:
                 print("\nPayee & Recurring Payment Master Agent:")
-                PayeeRecurringPaymentMasterAgent.print_response(
-                    user_input, 
-                    stream=True, 
-                    markdown=True,
-                    user_id="demo_user",
-                    session_id="payee_recurring_session"
-                )
+                # Local chats are served the seed customer's data
+                with request_scope(user_id="demo_user", customer_id=SEED_CUSTOMER_ID):
+                    PayeeRecurringPaymentMasterAgent.print_response(
+                        user_input, 
+                        stream=True, 
+                        markdown=True,
+                        user_id="demo_user",
+                        session_id="payee_recurring_session"
+                    )
                 print("\n" + "=" * 50)
         
         except KeyboardInterrupt:
@@ -0,0 +1,131 @@
+import importlib
+import os
+import threading
+from typing import Any, Dict, Optional
+
+# Domain -> (module, master agent, knowledge base, knowledge base initializer). Agent modules build their models,
+# vector dbs and knowledge bases at import, so they are only imported when first needed; the initializer restores
+# the knowledge base from an index artifact or embeds it (most modules call it at import, accounts does not)
+DOMAINS = {
+    "accounts": ("agents.accounts.AccountMasterAgent", "account_master_agent", "knowledge_base",
+                 "initialize_knowledge_base"),
+    "cards": ("agents.cards.CardsMasterAgent", "CardMasterAgent", "shared_knowledge_base",
+              "initialize_shared_knowledge_base"),
+    "transactions": ("agents.transactions.TransactionMasterAgent", "TransactionMasterAgent", "shared_knowledge_base",
+                     "initialize_shared_knowledge_base"),
+    "loans": ("agents.loansAndInsurance.LoansInvestmentsMasterAgent", "LoansAndInvestmentMasterAgent",
+              "shared_knowledge_base", "initialize_shared_knowledge_base"),
+    "payees": ("agents.payeesRecurringPayments.PayeesRecurringPaymentsMasterAgent", "PayeeRecurringPaymentMasterAgent",
+               "shared_knowledge_base", "initialize_shared_knowledge_base"),
+    "miscellaneous": ("agents.miscellaneous.MiscellaneousBankingMasterAgent", "BankingServicesMasterAgent",
+                      "shared_knowledge_base", "initialize_shared_knowledge_base"),
+}
+MAIN_MODULE = "agents.mainMasterAgent"
+
+# Session storage -> (table, db file, record messages): one per domain master agent, plus the main routing team's
+# and the fan-out team's, which records the customer's exchanges itself. Opened here rather than in the agent
+# modules, so the API can read conversation history without importing the agents
+SESSION_STORAGES = {
+    "main": ("main_agent_sessions", "tmp/main_banking_agent.db", True),
+    "fanout": ("main_fanout_sessions", "tmp/main_banking_agent.db", False),
+    "accounts": ("agent_sessions", "tmp/accounts/banking_agent_sessions.db", True),
+    "cards": ("card_sessions", "tmp/cards/card_agent.db", True),
+    "transactions": ("transaction_sessions", "tmp/transactions/transaction_agent.db", True),
+    "loans": ("loans_investment_sessions", "tmp/loansInvestment/loans_investment_agent.db", True),
+    "payees": ("payee_recurring_sessions", "tmp/recurrPayees/payee_recurring_agent.db", True),
+    "miscellaneous": ("banking_services_sessions", "tmp/miscellaneous/banking_services_agent.db", True),
+}
+
+_lock = threading.RLock()
+_ready = threading.Event()
+_watcher = None
+# Separate from _lock, which is held while agent modules import, so reading history never waits on a module build
+_storage_lock = threading.Lock()
+_storages: Dict[str, Any] = {}
+
+
+def _module(name: str):
+    with _lock:
+        return importlib.import_module(name)
+
+
+def agent(domain: Optional[str] = None) -> Any:
+    """Master agent of a domain, or the main routing team (per ROUTING_MODE) when ``domain`` is None, with its
+    models labelled for usage accounting"""
+    from agents.shared.usageLedger import attribute_models
+
+    if domain is None:
+        found = _module(MAIN_MODULE).main_agent()
+    else:
+        module, attribute, _, _ = DOMAINS[domain]
+        found = getattr(_module(module), attribute)
+    attribute_models(found)
+    return found
+
+
+def session_storage(name: Optional[str] = None) -> Any:
+    """Session storage ``name`` (a domain, "main" or "fanout"), shared with the agent that keeps its history there;
+    None is the one /chat records to under ROUTING_MODE. Opening it imports no agent module"""
+    if name is None:
+        name = "fanout" if os.getenv("ROUTING_MODE", "nested").lower() == "fanout" else "main"
+    with _storage_lock:
+        if name not in _storages:
+            from agents.shared.sessionHistory import IndexedSqliteStorage
+
+            table, db_file, record_messages = SESSION_STORAGES[name]
+            _storages[name] = IndexedSqliteStorage(table_name=table, db_file=db_file, record_messages=record_messages)
+        return _storages[name]
+
+
+def knowledge_base(domain: str) -> Any:
+    """Knowledge base of a domain, as its module left it at import (not necessarily loaded)"""
+    module, _, attribute, _ = DOMAINS[domain]
+    return getattr(_module(module), attribute)
+
+
+def initialize_knowledge_base(domain: str) -> Any:
+    """Knowledge base of a domain after running its initializer, so its vectors are restored or built"""
+    module, _, attribute, initializer = DOMAINS[domain]
+    loaded = _module(module)
+    with _lock:
+        getattr(loaded, initializer)()
+    return getattr(loaded, attribute)
+
+
+def knowledge_bases() -> Dict[str, Any]:
+    return {domain: knowledge_base(domain) for domain in DOMAINS}
+
+
+def knowledge_watcher():
+    """Background reindexer over every domain's knowledge base (see agents.shared.knowledgeWatcher)"""
+    global _watcher
+    with _lock:
+        if _watcher is None:
+            from agents.shared.bankingData import core_banking_records, transaction_records
+            from agents.shared.knowledgeWatcher import KnowledgeWatcher
+            from agents.shared.summaryTools import financial_summaries
+
+            _watcher = KnowledgeWatcher(
+                knowledge_bases=knowledge_bases(),
+                interval=float(os.getenv("KNOWLEDGE_WATCH_INTERVAL", "2")),
+                refreshers=[core_banking_records.customer_ids, transaction_records.customer_ids,
+                            financial_summaries.refresh],
+            )
+        return _watcher
+
+
+def watcher_started() -> bool:
+    return _watcher is not None and _watcher.running
+
+
+def load_all() -> None:
+    """Import every agent module and initialize all knowledge bases"""
+    with _lock:
+        if _ready.is_set():
+            return
+        _module(MAIN_MODULE).initialize_all_knowledge_bases()
+        _ready.set()
+
+
+def is_ready() -> bool:
+    return _ready.is_set()
@@ -0,0 +1 @@
+# This file makes the shared directory a Python package
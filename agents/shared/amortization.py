@@ -0,0 +1,214 @@
+from calendar import monthrange
+from dataclasses import dataclass
+from datetime import date
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Longest schedule generated when keeping the EMI after a rate rise stretches the tenure
+MAX_SCHEDULE_MONTHS = 600
+# Balances below half a paisa count as repaid
+_PAID_OFF = 0.005
+
+
+def add_months(start: date, months: int) -> date:
+    """Same day ``months`` later, clamped to the end of shorter months"""
+    month_index = start.month - 1 + months
+    year, month = start.year + month_index // 12, month_index % 12 + 1
+    return date(year, month, min(start.day, monthrange(year, month)[1]))
+
+
+def months_between(start: date, end: date) -> int:
+    """Whole months from ``start`` to ``end`` (negative when ``end`` is earlier)"""
+    months = (end.year - start.year) * 12 + end.month - start.month
+    if end.day < start.day and end.day != monthrange(end.year, end.month)[1]:
+        months -= 1
+    return months
+
+
+def emi_amount(principal, rate_apr, months):
+    """Equated monthly instalment repaying ``principal`` over ``months`` at ``rate_apr`` percent"""
+    principal, months = np.asarray(principal, dtype=float), np.asarray(months, dtype=float)
+    rate = np.asarray(rate_apr, dtype=float) / 1200
+    with np.errstate(divide="ignore", invalid="ignore"):
+        growth = (1 + rate) ** months
+        emi = np.where(rate > 0, principal * rate * growth / (growth - 1), principal / months)
+    return np.where((principal > 0) & (months > 0), emi, 0.0)
+
+
+def months_to_repay(balance, rate_apr, emi):
+    """Instalments of ``emi`` needed to repay ``balance``; inf when the EMI does not cover the interest"""
+    balance, emi = np.asarray(balance, dtype=float), np.asarray(emi, dtype=float)
+    rate = np.asarray(rate_apr, dtype=float) / 1200
+    with np.errstate(divide="ignore", invalid="ignore"):
+        remaining = 1 - rate * balance / emi
+        months = np.where(rate > 0, -np.log(remaining) / np.log1p(rate), balance / emi)
+        months = np.where((rate > 0) & (remaining <= 0), np.inf, months)
+    # Tolerate float noise so an exact fit is not rounded up to an extra instalment
+    months = np.ceil(months - 1e-9)
+    return np.where(balance <= _PAID_OFF, 0.0, months)
+
+
+def balance_after(balance, rate_apr, emi, months):
+    """Outstanding principal after ``months`` instalments of ``emi``"""
+    balance, emi, months = (np.asarray(value, dtype=float) for value in (balance, emi, months))
+    rate = np.asarray(rate_apr, dtype=float) / 1200
+    with np.errstate(divide="ignore", invalid="ignore"):
+        growth = (1 + rate) ** months
+        remaining = np.where(rate > 0, balance * growth - emi * (growth - 1) / rate, balance - emi * months)
+    return np.maximum(remaining, 0.0)
+
+
+def total_interest(balance, rate_apr, emi, months):
+    """Interest paid repaying ``balance`` with ``months`` instalments of ``emi``, the last one reduced to what is owed"""
+    balance, emi, months = (np.asarray(value, dtype=float) for value in (balance, emi, months))
+    rate = np.asarray(rate_apr, dtype=float) / 1200
+    finite = np.isfinite(months) & (months > 0)
+    safe_months = np.where(finite, months, 1.0)
+    last = balance_after(balance, rate_apr, emi, safe_months - 1) * (1 + rate)
+    return np.where(finite, emi * (safe_months - 1) + last - balance, np.where(months == 0, 0.0, np.inf))
+
+
+@dataclass
+class Schedule:
+    """One row per instalment; arrays share the same length. Amounts are rupees, unrounded"""
+    opening_balance: np.ndarray
+    rate_apr: np.ndarray
+    payment: np.ndarray
+    interest: np.ndarray
+    principal: np.ndarray
+    closing_balance: np.ndarray
+
+    @property
+    def months(self) -> int:
+        return len(self.payment)
+
+    @property
+    def total_interest(self) -> float:
+        return float(self.interest.sum())
+
+    @property
+    def total_paid(self) -> float:
+        return float(self.payment.sum())
+
+    def index_on_or_after(self, first_due: date, on: date) -> int:
+        """Index of the first instalment due on or after ``on``"""
+        index = max(0, months_between(first_due, on))
+        if index < self.months and add_months(first_due, index) < on:
+            index += 1
+        return min(index, self.months)
+
+    def rows(self, first_due: date, start: int = 0, count: Optional[int] = None) -> List[Dict[str, str]]:
+        """Instalments as the knowledge JSON lays them out, amounts as decimal strings"""
+        stop = self.months if count is None else min(self.months, start + count)
+        return [
+            {
+                "installment": index + 1,
+                "dueDate": add_months(first_due, index).isoformat(),
+                "openingBalance": f"{self.opening_balance[index]:.2f}",
+                "rateApr": round(float(self.rate_apr[index]), 4),
+                "principalComponent": f"{self.principal[index]:.2f}",
+                "interestComponent": f"{self.interest[index]:.2f}",
+                "totalDue": f"{self.payment[index]:.2f}",
+                "closingBalance": f"{self.closing_balance[index]:.2f}",
+            }
+            for index in range(start, stop)
+        ]
+
+
+def amortization_schedule(principal: float, rate_apr: float, term_months: int, emi: Optional[float] = None,
+                          resets: Sequence[Tuple[int, float]] = (), keep_emi: bool = True) -> Schedule:
+    """Schedule repaying ``principal`` over ``term_months``, with optional floating-rate resets.
+
+    ``resets`` are ``(instalment index, new rate_apr)`` pairs; the new rate applies from
+    that instalment on. With ``keep_emi`` (the usual practice for floating home loans) the
+    EMI stays and the tenure moves, unless the EMI would no longer cover the interest;
+    otherwise the EMI is recomputed to finish within the original term.
+    """
+    changes = sorted((index, rate) for index, rate in resets if 0 <= index < MAX_SCHEDULE_MONTHS)
+    if changes and changes[0][0] == 0:
+        # A reset from the first instalment is simply the starting rate
+        rate_apr = changes.pop(0)[1]
+        if not keep_emi:
+            emi = None
+    if emi is None or emi <= principal * rate_apr / 1200:
+        emi = float(emi_amount(principal, rate_apr, term_months))
+    columns: Dict[str, List[np.ndarray]] = {name: [] for name in
+                                             ("opening", "rate", "payment", "interest", "principal", "closing")}
+    balance, month, rate_now = float(principal), 0, float(rate_apr)
+
+    while balance > _PAID_OFF and month < MAX_SCHEDULE_MONTHS:
+        upcoming = [index for index, _ in changes if index > month]
+        end = upcoming[0] if upcoming else (MAX_SCHEDULE_MONTHS if keep_emi else max(term_months, month + 1))
+        steps = np.arange(1, end - month + 1, dtype=float)
+        rate = rate_now / 1200
+        growth = (1 + rate) ** steps
+        closing = balance * growth - emi * (growth - 1) / rate if rate > 0 else balance - emi * steps
+        opening = np.concatenate(([balance], closing[:-1]))
+        payment = np.full(len(steps), emi)
+
+        repaid = np.nonzero(closing <= _PAID_OFF)[0]
+        if repaid.size:
+            cut = repaid[0] + 1
+            opening, closing, payment = opening[:cut], closing[:cut].copy(), payment[:cut].copy()
+            payment[-1] = opening[-1] * (1 + rate)
+            closing[-1] = 0.0
+        elif not upcoming:
+            # Term reached with a residue from float rounding: settle it with the last instalment
+            payment[-1] += closing[-1]
+            closing = closing.copy()
+            closing[-1] = 0.0
+
+        interest = opening * rate
+        for name, values in (("opening", opening), ("rate", np.full(len(opening), rate_now)), ("payment", payment),
+                             ("interest", interest), ("principal", payment - interest), ("closing", closing)):
+            columns[name].append(values)
+        balance, month = float(closing[-1]), month + len(opening)
+
+        if upcoming and balance > _PAID_OFF:
+            rate_now = next(rate for index, rate in changes if index == upcoming[0])
+            if not keep_emi or emi <= balance * rate_now / 1200:
+                emi = float(emi_amount(balance, rate_now, max(term_months - month, 1)))
+
+    stacked = {name: np.concatenate(values) if values else np.zeros(0) for name, values in columns.items()}
+    return Schedule(stacked["opening"], stacked["rate"], stacked["payment"], stacked["interest"],
+                    stacked["principal"], stacked["closing"])
+
+
+def prepayment_scenarios(balance: float, rate_apr: float, emi: float, amounts: Sequence[float],
+                         reduce: str = "tenure", remaining_months: Optional[int] = None,
+                         fee_percent: float = 0.0) -> Dict[str, np.ndarray]:
+    """Outcome of prepaying each of ``amounts`` now, all evaluated at once.
+
+    ``reduce="tenure"`` keeps the EMI and shortens the loan; ``reduce="emi"`` keeps the
+    remaining tenure (default: what the current EMI needs) and lowers the EMI.
+    """
+    if reduce not in ("tenure", "emi"):
+        raise ValueError(f"reduce must be 'tenure' or 'emi', not {reduce!r}")
+    amounts = np.minimum(np.asarray(amounts, dtype=float), balance)
+    baseline_months = months_to_repay(balance, rate_apr, emi)
+    baseline_interest = total_interest(balance, rate_apr, emi, baseline_months)
+    new_balance = balance - amounts
+
+    if reduce == "tenure":
+        new_emi = np.where(new_balance > _PAID_OFF, emi, 0.0)
+        months = months_to_repay(new_balance, rate_apr, emi)
+    else:
+        tenure = baseline_months if remaining_months is None else remaining_months
+        months = np.where(new_balance > _PAID_OFF, tenure, 0.0)
+        new_emi = emi_amount(new_balance, rate_apr, months)
+    interest = total_interest(new_balance, rate_apr, np.where(new_emi > 0, new_emi, emi), months)
+    fee = amounts * fee_percent / 100
+    return {
+        "amount": amounts,
+        "new_balance": new_balance,
+        "new_emi": new_emi,
+        "months": months,
+        "months_saved": baseline_months - months,
+        "interest": interest,
+        "interest_saved": baseline_interest - interest,
+        "fee": fee,
+        "net_saving": baseline_interest - interest - fee,
+        "baseline_months": np.broadcast_to(baseline_months, amounts.shape),
+        "baseline_interest": np.broadcast_to(baseline_interest, amounts.shape),
+    }
@@ -0,0 +1,45 @@
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from agno.embedder.azure_openai import AzureOpenAIEmbedder
+from openai import AzureOpenAI as AzureOpenAIClient
+
+from agents.shared.rateLimiter import scheduled_http_client
+
+
+@dataclass
+class BatchAzureOpenAIEmbedder(AzureOpenAIEmbedder):
+    """Azure OpenAI embedder that can embed many texts in a single request"""
+
+    # Azure accepts up to 2048 inputs per request; stay well below to keep payloads small
+    max_batch_size: int = 256
+
+    @property
+    def client(self) -> AzureOpenAIClient:
+        """One client for the embedder, queued by the rate limit scheduler behind chat calls"""
+        if self.openai_client is None:
+            self.client_params = {"http_client": scheduled_http_client("embedding"), "max_retries": 0,
+                                  **(self.client_params or {})}
+            self.openai_client = super().client
+        return self.openai_client
+
+    def get_embeddings_batch_and_usage(self, texts: List[str]) -> Tuple[List[List[float]], List[Optional[Dict]]]:
+        """Embed texts in as few requests as possible, preserving input order"""
+        embeddings: List[List[float]] = []
+        usages: List[Optional[Dict]] = []
+        for start in range(0, len(texts), self.max_batch_size):
+            batch = texts[start:start + self.max_batch_size]
+            request_params = {"input": batch, "model": self.id, "encoding_format": self.encoding_format}
+            if self.user is not None:
+                request_params["user"] = self.user
+            if self.id.startswith("text-embedding-3"):
+                request_params["dimensions"] = self.dimensions
+            if self.request_params:
+                request_params.update(self.request_params)
+
+            response = self.client.embeddings.create(**request_params)
+            usage = response.usage.model_dump() if response.usage else None
+            for item in sorted(response.data, key=lambda data: data.index):
+                embeddings.append(item.embedding)
+                usages.append(usage)
+        return embeddings, usages
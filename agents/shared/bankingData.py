@@ -0,0 +1,92 @@
+import json
+import threading
+from hashlib import md5
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from agents.shared.requestContext import current_customer_id
+
+# Customer of the seed files under knowledge/
+SEED_CUSTOMER_ID = "CUST0001"
+
+
+def record_version(record: Any) -> str:
+    """Content hash of a JSON record; changes whenever any of its fields does"""
+    return md5(json.dumps(record, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def parse_amount(value: Any) -> float:
+    """Amounts are stored as decimal strings ("41872.00"); missing amounts count as zero"""
+    if value in (None, ""):
+        return 0.0
+    return float(value)
+
+
+class CustomerRecords:
+    """Customer objects read from JSON files and indexed by customer id.
+
+    Accepts the seed files (one customer object) as well as synthetic shards (arrays of
+    customer objects), for core banking and transaction data alike. The index is rebuilt when a file's size or modification time
+    changes, so tools always compute from the data the knowledge base was built from.
+    """
+
+    def __init__(self, path: Union[str, List[str]] = "knowledge/CORE_BANKING_DATA.json"):
+        self.paths = [path] if isinstance(path, str) else list(path)
+        self._lock = threading.Lock()
+        self._version: Optional[Tuple] = None
+        self._records: Dict[str, Dict[str, Any]] = {}
+        # id(record) -> (record, version); holding the record keeps its id from being reused
+        self._record_versions: Dict[int, Tuple[Any, str]] = {}
+
+    def _files(self) -> Iterator[Path]:
+        for path in map(Path, self.paths):
+            if path.is_dir():
+                yield from sorted(path.glob("**/*.json"))
+            elif path.exists():
+                yield path
+
+    def version(self) -> Tuple:
+        """(file, size, mtime) of every source file"""
+        return tuple((str(_file), _file.stat().st_size, _file.stat().st_mtime_ns) for _file in self._files())
+
+    def _refresh(self) -> None:
+        version = self.version()
+        if version == self._version:
+            return
+        with self._lock:
+            if version == self._version:
+                return
+            records: Dict[str, Dict[str, Any]] = {}
+            for _file, _, _ in version:
+                with open(_file, "r", encoding="utf-8") as fp:
+                    data = json.load(fp)
+                for record in data if isinstance(data, list) else [data]:
+                    # Transaction files carry the customer in their meta block
+                    customer_id = (record.get("customer") or {}).get("id") or (record.get("meta") or {}).get("customerId")
+                    if customer_id:
+                        records[customer_id] = record
+            self._records, self._version = records, version
+            self._record_versions = {}
+
+    def get(self, customer_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Record of ``customer_id`` (default: the customer being served)"""
+        self._refresh()
+        return self._records.get(customer_id or current_customer_id())
+
+    def customer_ids(self) -> List[str]:
+        self._refresh()
+        return sorted(self._records)
+
+    def version_of(self, record: Any) -> str:
+        """``record_version`` of a record read from these files, hashed once per file version"""
+        cached = self._record_versions.get(id(record))
+        if cached is not None and cached[0] is record:
+            return cached[1]
+        version = record_version(record)
+        self._record_versions[id(record)] = (record, version)
+        return version
+
+
+# Shared by every agent module so each file is indexed once per process
+core_banking_records = CustomerRecords(path="knowledge/CORE_BANKING_DATA.json")
+transaction_records = CustomerRecords(path="knowledge/TRANSACTIONS_DATA.json")
@@ -0,0 +1,182 @@
+import ast
+import os
+import threading
+from typing import Dict, List, Optional
+
+from agno.document import Document
+from agno.memory.v2.db.schema import MemoryRow
+from agno.memory.v2.db.sqlite import SqliteMemoryDb
+from agno.memory.v2.memory import Memory
+from agno.memory.v2.schema import UserMemory
+from agno.vectordb.base import VectorDb
+from sqlalchemy import Index, select
+from sqlalchemy.exc import SQLAlchemyError
+
+from agents.shared.requestContext import current_request
+from agents.shared.streamingKnowledge import StreamingJSONKnowledgeBase, document_id
+
+# Where memory vector indexes live; one collection per memory table
+MEMORY_INDEX_PATH = "embeddings/memories"
+
+
+class IndexedSqliteMemoryDb(SqliteMemoryDb):
+    """SqliteMemoryDb indexed on (user_id, updated_at) for bounded reads, with an optional vector index.
+
+    ``recent_memories`` reads a user's newest memories with the LIMIT pushed into SQLite, so it
+    costs the same at ten memories or ten thousand. With ``vector_index`` (default from
+    ``MEMORY_VECTOR_INDEX``) every written memory is also embedded into a per-table collection
+    of the configured vector store, and ``relevant_memories`` returns the user's closest matches.
+    """
+
+    def __init__(self, table_name: str = "memory", db_file: Optional[str] = None,
+                 vector_index: Optional[bool] = None, vector_db: Optional[VectorDb] = None, **kwargs):
+        super().__init__(table_name=table_name, db_file=db_file, **kwargs)
+        if vector_index is None:
+            vector_index = vector_db is not None or os.getenv("MEMORY_VECTOR_INDEX", "false").lower() == "true"
+        self.vector_index = vector_index
+        self._vector_db = vector_db
+        self._vector_ready = False
+        self._vector_lock = threading.Lock()
+        self.user_updated_index = Index(f"ix_{table_name}_user_updated", self.table.c.user_id, self.table.c.updated_at)
+        if self.table_exists():
+            self.user_updated_index.create(self.db_engine, checkfirst=True)
+
+    def create(self) -> None:
+        super().create()
+        self.user_updated_index.create(self.db_engine, checkfirst=True)
+
+    @property
+    def vector_db(self) -> Optional[VectorDb]:
+        """Memory vector collection, created on first use so startup does not load the vector store"""
+        if not self.vector_index:
+            return None
+        with self._vector_lock:
+            if not self._vector_ready:
+                if self._vector_db is None:
+                    from agents.shared.vectorStores import create_vector_db
+
+                    self._vector_db = create_vector_db(collection=self.table_name, path=MEMORY_INDEX_PATH)
+                self._vector_db.create()
+                self._vector_ready = True
+            return self._vector_db
+
+    @staticmethod
+    def _row(row) -> MemoryRow:
+        return MemoryRow(id=row.id, user_id=row.user_id, memory=ast.literal_eval(row.memory),
+                         last_updated=row.updated_at or row.created_at)
+
+    def recent_memories(self, user_id: str, limit: int) -> List[MemoryRow]:
+        """The user's ``limit`` most recently updated memories, newest first"""
+        stmt = (select(self.table).where(self.table.c.user_id == user_id)
+                .order_by(self.table.c.updated_at.desc()).limit(limit))
+        try:
+            with self.Session() as session:
+                return [self._row(row) for row in session.execute(stmt)]
+        except SQLAlchemyError:
+            # No table yet: nothing remembered
+            return []
+
+    def memories_by_id(self, memory_ids: List[str]) -> List[MemoryRow]:
+        """Memories with the given ids, in that order; ids of deleted memories are skipped"""
+        if not memory_ids:
+            return []
+        try:
+            with self.Session() as session:
+                rows = {row.id: self._row(row) for row in
+                        session.execute(select(self.table).where(self.table.c.id.in_(memory_ids)))}
+        except SQLAlchemyError:
+            return []
+        return [rows[memory_id] for memory_id in memory_ids if memory_id in rows]
+
+    def relevant_memories(self, user_id: str, query: str, limit: int) -> List[MemoryRow]:
+        """The user's ``limit`` memories closest to ``query`` in the vector index (empty without one)"""
+        if not self.vector_index or not query:
+            return []
+        try:
+            documents = self.vector_db.search(query, limit=limit, filters={"user_id": user_id})
+        except Exception as e:
+            print(f"Error searching memories of {user_id}: {e}")
+            return []
+        memory_ids = list(dict.fromkeys(doc.meta_data.get("memory_id") for doc in documents if doc.meta_data))
+        return self.memories_by_id([memory_id for memory_id in memory_ids if memory_id])
+
+    @staticmethod
+    def _indexed_content(memory_id: str, text: str) -> str:
+        # Vector dbs id documents by a hash of their content; the memory id keeps equal texts of different
+        # users (or memories) apart, so one never overwrites the other, and lets a memory's vector be found again
+        return f"{text}\n[memory {memory_id}]"
+
+    def _delete_vectors(self, memories: List[MemoryRow]) -> None:
+        ids = [document_id(self._indexed_content(row.id, row.memory["memory"]))
+               for row in memories if row.memory.get("memory")]
+        if ids:
+            StreamingJSONKnowledgeBase._delete_ids(self.vector_db, ids)
+
+    def upsert_memory(self, memory: MemoryRow, create_and_retry: bool = True) -> None:
+        previous = self.memories_by_id([memory.id]) if self.vector_index else []
+        super().upsert_memory(memory, create_and_retry=create_and_retry)
+        if not self.vector_index:
+            return
+        try:
+            # An edited memory's old text would otherwise keep taking top-k slots
+            self._delete_vectors([row for row in previous if row.memory.get("memory") != memory.memory.get("memory")])
+            if memory.memory.get("memory"):
+                self.vector_db.upsert([Document(content=self._indexed_content(memory.id, memory.memory["memory"]),
+                                                meta_data={"user_id": memory.user_id, "memory_id": memory.id})])
+        except Exception as e:
+            print(f"Error indexing memory {memory.id}: {e}")
+
+    def delete_memory(self, memory_id: str) -> None:
+        previous = self.memories_by_id([memory_id]) if self.vector_index else []
+        super().delete_memory(memory_id)
+        try:
+            if previous:
+                self._delete_vectors(previous)
+        except Exception as e:
+            print(f"Error removing memory {memory_id} from the index: {e}")
+
+    def clear(self) -> bool:
+        cleared = super().clear()
+        if self.vector_index:
+            try:
+                self.vector_db.drop()
+            except Exception as e:
+                print(f"Error clearing the memory index: {e}")
+            self._vector_ready = False
+        return cleared
+
+
+class BoundedMemory(Memory):
+    """Memory that only ever loads a bounded slice of a user's memories.
+
+    agno reloads every memory of the user before each run, memory update and system prompt.
+    Here the slice is the ``recent_limit`` newest memories plus the ``relevant_limit`` ones
+    closest to the current request's message when the db has a vector index, so prompt size
+    and read time stay flat however long the user's history grows.
+    """
+
+    def __init__(self, *args, recent_limit: Optional[int] = None, relevant_limit: Optional[int] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.recent_limit = recent_limit or int(os.getenv("MEMORY_RECENT_LIMIT", "10"))
+        self.relevant_limit = relevant_limit or int(os.getenv("MEMORY_RELEVANT_LIMIT", "5"))
+
+    def bounded_rows(self, user_id: str, query: Optional[str] = None) -> List[MemoryRow]:
+        """Memories relevant to ``query`` that are not among the recent ones, then the recent ones oldest first"""
+        recent = self.db.recent_memories(user_id, self.recent_limit)
+        seen = {row.id for row in recent}
+        relevant = self.db.relevant_memories(user_id, query, self.relevant_limit) if query else []
+        return [row for row in relevant if row.id not in seen] + recent[::-1]
+
+    def refresh_from_db(self, user_id: Optional[str] = None):
+        if not isinstance(self.db, IndexedSqliteMemoryDb):
+            return super().refresh_from_db(user_id=user_id)
+        # Reading every user's memories is never needed for a request; keep what is loaded
+        if user_id is None:
+            return
+        memories: Dict[str, UserMemory] = {row.id: UserMemory.from_dict(row.memory)
+                                           for row in self.bounded_rows(user_id, current_request().message)}
+        self.memories = {user_id: memories}
+
+    def recent_user_memories(self, user_id: str, limit: int) -> List[UserMemory]:
+        """The user's ``limit`` newest memories, oldest first"""
+        return [UserMemory.from_dict(row.memory) for row in reversed(self.db.recent_memories(user_id, limit))]
@@ -0,0 +1,113 @@
+import os
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from agno.embedder.base import Embedder
+
+
+# Loaded fastembed models, shared by every embedder with the same settings
+_fastembed_models: Dict[Tuple[str, Optional[int], Optional[str]], Any] = {}
+_fastembed_lock = threading.Lock()
+
+
+@dataclass
+class LocalFastEmbedEmbedder(Embedder):
+    """In-process ONNX embedder (fastembed) with a cached model and batched, multithreaded encoding"""
+
+    id: str = "BAAI/bge-small-en-v1.5"
+    dimensions: int = 384
+    # Texts per ONNX run
+    batch_size: int = 64
+    # ONNX runtime threads (None lets onnxruntime use all cores)
+    threads: Optional[int] = None
+    # Worker processes for large ingest batches (None encodes in-process)
+    parallel: Optional[int] = None
+    cache_dir: Optional[str] = None
+
+    def _model(self):
+        key = (self.id, self.threads, self.cache_dir)
+        model = _fastembed_models.get(key)
+        if model is None:
+            with _fastembed_lock:
+                model = _fastembed_models.get(key)
+                if model is None:
+                    try:
+                        from fastembed import TextEmbedding
+                    except ImportError:
+                        raise ImportError("fastembed not installed, use pip install fastembed")
+                    model = TextEmbedding(model_name=self.id, threads=self.threads, cache_dir=self.cache_dir)
+                    _fastembed_models[key] = model
+        return model
+
+    def get_embedding(self, text: str) -> List[float]:
+        return next(iter(self._model().embed([text]))).tolist()
+
+    def get_embedding_and_usage(self, text: str) -> Tuple[List[float], Optional[Dict]]:
+        # fastembed does not report usage
+        return self.get_embedding(text), None
+
+    def get_embeddings_batch_and_usage(self, texts: List[str]) -> Tuple[List[List[float]], List[Optional[Dict]]]:
+        parallel = self.parallel if len(texts) > self.batch_size else None
+        embeddings = [vector.tolist() for vector in self._model().embed(texts, batch_size=self.batch_size, parallel=parallel)]
+        return embeddings, [None] * len(embeddings)
+
+
+def embedder_backend() -> str:
+    """Embedding backend selected with EMBEDDER_BACKEND: azure (default) or fastembed"""
+    return os.getenv("EMBEDDER_BACKEND", "azure").strip().lower()
+
+
+def create_embedder(backend: Optional[str] = None) -> Embedder:
+    """Embedder for the configured backend"""
+    backend = backend or embedder_backend()
+    if backend == "azure":
+        # Deferred: the OpenAI SDK is the slowest import on the serving path
+        from agents.shared.azureEmbedder import BatchAzureOpenAIEmbedder
+
+        return BatchAzureOpenAIEmbedder(
+            api_key=os.getenv("EMBEDDING_API_KEY"),
+            azure_endpoint=os.getenv("EMBEDDING_ENDPOINT"),
+            azure_deployment=os.getenv("EMBEDDING_DEPLOYMENT")
+        )
+    if backend == "fastembed":
+        threads = os.getenv("FASTEMBED_THREADS")
+        return LocalFastEmbedEmbedder(
+            id=os.getenv("FASTEMBED_MODEL", LocalFastEmbedEmbedder.id),
+            dimensions=int(os.getenv("FASTEMBED_DIMENSIONS", LocalFastEmbedEmbedder.dimensions)),
+            threads=int(threads) if threads else None,
+            cache_dir=os.getenv("FASTEMBED_CACHE_DIR"),
+        )
+    raise ValueError(f"Unknown embedder backend: {backend}")
+
+
+@dataclass
+class PrecomputedEmbedder(Embedder):
+    """Serves embeddings computed ahead of time, falling back to the wrapped embedder.
+
+    Vector dbs embed documents one by one inside ``insert``; swapping this in for the
+    duration of a batch insert lets them reuse embeddings obtained with one batched call.
+    """
+
+    embedder: Optional[Embedder] = None
+    embeddings: Optional[Dict[str, Tuple[List[float], Optional[Dict]]]] = None
+
+    def get_embedding(self, text: str) -> List[float]:
+        return self.get_embedding_and_usage(text)[0]
+
+    def get_embedding_and_usage(self, text: str) -> Tuple[List[float], Optional[Dict]]:
+        if self.embeddings and text in self.embeddings:
+            return self.embeddings[text]
+        return self.embedder.get_embedding_and_usage(text)
+
+
+def embed_texts(embedder: Embedder, texts: List[str]) -> Tuple[List[List[float]], List[Optional[Dict]]]:
+    """Embed texts with the embedder's batch API when it has one"""
+    if hasattr(embedder, "get_embeddings_batch_and_usage"):
+        return embedder.get_embeddings_batch_and_usage(texts)
+    embeddings, usages = [], []
+    for text in texts:
+        embedding, usage = embedder.get_embedding_and_usage(text)
+        embeddings.append(embedding)
+        usages.append(usage)
+    return embeddings, usages
@@ -0,0 +1,158 @@
+import contextvars
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+from pydantic import BaseModel, Field
+
+from agno.agent import Agent
+from agno.run.response import RunResponse
+
+from agents.shared.requestContext import RequestCancelled, cancellation_reason
+
+
+class SubQuestion(BaseModel):
+    agent: str = Field(..., description="Exact name of the specialist that should answer this part")
+    question: str = Field(..., description="Self-contained question for that specialist")
+
+
+class FanOutPlan(BaseModel):
+    sub_questions: List[SubQuestion] = Field(default_factory=list)
+
+
+def planner_instructions(members: Sequence[Agent]) -> List[str]:
+    """Instructions for a planner agent choosing among ``members``"""
+    return [
+        "Split the user's banking question into the parts each specialist must answer. Specialists:",
+        *[f"- {member.name}: {member.role or member.description or ''}" for member in members],
+        "Use one sub-question per specialist that is needed, each self-contained (include amounts, dates, "
+        "account or loan names from the question). Most questions need only one specialist.",
+        "Never answer the question yourself.",
+    ]
+
+
+class FanOutTeam:
+    """Answers cross-domain questions by running the needed specialists concurrently.
+
+    A planner call splits the question into sub-questions for named members, the members
+    run in parallel threads (so wall time follows the slowest branch rather than the sum)
+    and one synthesis call merges their answers. A plan naming a single member is answered
+    by that member directly, without synthesis. With ``storage`` each customer question and
+    final answer is recorded there for the session's history.
+
+    agno mutates a member's memory, session storage and knowledge base during a run, and
+    the specialists of one domain share them, so members sharing any of these run one
+    after another in the same thread; only members with disjoint state run in parallel.
+    """
+
+    def __init__(self, name: str, planner: Agent, synthesizer: Agent, members: Sequence[Agent],
+                 max_workers: Optional[int] = None, storage: Optional[Any] = None):
+        self.name = name
+        self.storage = storage
+        self.planner = planner
+        self.synthesizer = synthesizer
+        self.members: Dict[str, Agent] = {member.name: member for member in members}
+        self.max_workers = max_workers or len(self.members)
+
+    def plan(self, message: str, user_id: Optional[str] = None, session_id: Optional[str] = None) -> Dict[str, str]:
+        """Member name -> sub-question; unknown names are dropped and repeats merged"""
+        response = self.planner.run(message, user_id=user_id, session_id=session_id)
+        plan = response.content if isinstance(response.content, FanOutPlan) else FanOutPlan()
+        branches: Dict[str, str] = {}
+        for sub_question in plan.sub_questions:
+            name = next((name for name in self.members if name.lower() == sub_question.agent.strip().lower()), None)
+            if name is None:
+                print(f"Fan-out plan names unknown agent {sub_question.agent!r}; skipping it")
+                continue
+            branches[name] = f"{branches[name]}\n{sub_question.question}" if name in branches else sub_question.question
+        return branches
+
+    @staticmethod
+    def _shared_state(member: Agent) -> Set[int]:
+        """Ids of the memory, session storage and knowledge base a member runs with"""
+        values = (getattr(member, attribute, None) for attribute in ("memory", "storage", "knowledge"))
+        return {id(value) for value in values if value is not None}
+
+    def _groups(self, names: Sequence[str]) -> List[List[str]]:
+        """Members in groups that share no state with one another, in plan order"""
+        groups: List[Tuple[Set[int], List[str]]] = []
+        for name in names:
+            state, members = self._shared_state(self.members[name]), [name]
+            for group in [group for group in groups if group[0] & state]:
+                groups.remove(group)
+                state, members = state | group[0], group[1] + members
+            groups.append((state, members))
+        return [members for _, members in groups]
+
+    def _run_group(self, names: List[str], branches: Dict[str, str], user_id: Optional[str],
+                   session_id: Optional[str]) -> Dict[str, Any]:
+        return {name: self._run_branch(name, branches[name], user_id, session_id) for name in names}
+
+    def _run_branch(self, name: str, question: str, user_id: Optional[str], session_id: Optional[str]):
+        start = time.perf_counter()
+        try:
+            content = self.members[name].run(question, user_id=user_id, session_id=session_id).content
+        except Exception as e:
+            # A cancelled branch has no answer; other failures are reported to the synthesizer
+            content = None if isinstance(e, RequestCancelled) or cancellation_reason() else f"Error from {name}: {e}"
+        return content, time.perf_counter() - start
+
+    def run_branches(self, branches: Dict[str, str], user_id: Optional[str] = None,
+                     session_id: Optional[str] = None) -> Dict[str, Any]:
+        """Run each member on its sub-question, groups sharing no state concurrently; name -> (answer, seconds)"""
+        groups = self._groups(list(branches))
+        results: Dict[str, Any] = {}
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(groups)))) as pool:
+            # Each group keeps the caller's request context (customer id, session)
+            futures = [pool.submit(contextvars.copy_context().run, self._run_group, names, branches, user_id,
+                                   session_id) for names in groups]
+            for future in futures:
+                results.update(future.result())
+        return {name: results[name] for name in branches}
+
+    @staticmethod
+    def _cancelled(reason: str, results: Dict[str, Any]) -> RequestCancelled:
+        """Cancellation carrying the answers of the branches that finished in time"""
+        answers = [f"**{name}**\n{answer}" for name, (answer, _) in results.items() if answer is not None]
+        return RequestCancelled(reason, partial="\n\n".join(answers) or None)
+
+    def run(self, message: str, user_id: Optional[str] = None, session_id: Optional[str] = None,
+            stream: bool = False, **kwargs) -> RunResponse:
+        if stream:
+            raise ValueError("FanOutTeam does not stream; call run with stream=False")
+        start = time.perf_counter()
+        branches = self.plan(message, user_id=user_id, session_id=session_id)
+        if not branches:
+            # Nothing matched; let the synthesizer answer or ask for clarification
+            content = self.synthesizer.run(message, user_id=user_id, session_id=session_id).content
+            return RunResponse(content=content, session_id=session_id,
+                               metrics={"branches": {}, "wall_seconds": time.perf_counter() - start})
+        if len(branches) == 1:
+            name = next(iter(branches))
+            results = self.run_branches({name: message}, user_id=user_id, session_id=session_id)
+            content = results[name][0]
+            if content is None:
+                raise RequestCancelled(cancellation_reason() or "Request cancelled")
+        else:
+            results = self.run_branches(branches, user_id=user_id, session_id=session_id)
+            reason = cancellation_reason()
+            if reason is not None:
+                raise self._cancelled(reason, results)
+            answers = "\n\n".join(f"<answer agent=\"{name}\">\nQuestion: {branches[name]}\n{answer}\n</answer>"
+                                  for name, (answer, _) in results.items())
+            try:
+                content = self.synthesizer.run(f"Customer question: {message}\n\nSpecialist answers:\n{answers}",
+                                               user_id=user_id, session_id=session_id).content
+            except Exception:
+                reason = cancellation_reason()
+                if reason is None:
+                    raise
+                # Out of time for synthesis: the specialists' answers are still worth returning
+                raise self._cancelled(reason, results)
+        if self.storage is not None and session_id:
+            self.storage.record(session_id, user_id, str(uuid.uuid4()), message, content)
+        return RunResponse(content=content, session_id=session_id, metrics={
+            "branches": {name: seconds for name, (_, seconds) in results.items()},
+            "wall_seconds": time.perf_counter() - start,
+        })
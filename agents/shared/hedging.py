@@ -0,0 +1,230 @@
+import asyncio
+import contextvars
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from agents.shared.rateLimiter import (ATTEMPT_CANCELLED, AsyncScheduledTransport, ScheduledTransport,
+                                       deployment_name, with_deployment)
+
+
+class HedgePolicy:
+    """When to hedge a call and how hedging has gone, per role and primary deployment.
+
+    A call is hedged once it has gone ``percentile`` of recent calls' latency without a response
+    (``initial_delay`` until ``min_samples`` calls were seen), as long as hedges stay under
+    ``max_rate`` of recent calls, so a uniformly slow deployment does not double its own load.
+    """
+
+    def __init__(self, percentile: float = 95.0, min_samples: int = 20, initial_delay: float = 5.0,
+                 max_rate: float = 0.1, window: int = 500):
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.initial_delay = initial_delay
+        self.max_rate = max_rate
+        self.window = window
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, Any]] = {}
+
+    def _get(self, key: str) -> Dict[str, Any]:
+        if key not in self._stats:
+            self._stats[key] = {"latencies": deque(maxlen=self.window), "hedged": deque(maxlen=self.window),
+                                "calls": 0, "hedges": 0, "hedge_wins": 0}
+        return self._stats[key]
+
+    def _threshold(self, stats: Dict[str, Any]) -> float:
+        latencies = sorted(stats["latencies"])
+        if len(latencies) < self.min_samples:
+            return self.initial_delay
+        return latencies[min(len(latencies) - 1, int(len(latencies) * self.percentile / 100))]
+
+    def delay(self, key: str) -> float:
+        """Seconds to wait for the primary before hedging"""
+        with self._lock:
+            return self._threshold(self._get(key))
+
+    def allow(self, key: str) -> bool:
+        """Whether another hedge fits in the hedge budget"""
+        with self._lock:
+            recent = self._get(key)["hedged"]
+            return sum(recent) + 1 <= self.max_rate * max(len(recent), self.min_samples)
+
+    def finish(self, key: str, seconds: float, hedged: bool = False, hedge_won: bool = False) -> None:
+        """Record a call answered after ``seconds``; a primary that lost counts as at least that slow"""
+        with self._lock:
+            stats = self._get(key)
+            stats["calls"] += 1
+            stats["hedges"] += hedged
+            stats["hedge_wins"] += hedge_won
+            stats["latencies"].append(seconds)
+            stats["hedged"].append(hedged)
+
+    def describe(self) -> Dict[str, Any]:
+        with self._lock:
+            described = {}
+            for key, stats in self._stats.items():
+                latencies = sorted(stats["latencies"])
+                described[key] = {
+                    "calls": stats["calls"],
+                    "hedged": stats["hedges"],
+                    "hedge_rate": round(stats["hedges"] / stats["calls"], 4) if stats["calls"] else 0.0,
+                    "hedge_wins": stats["hedge_wins"],
+                    "hedge_after_seconds": round(self._threshold(stats), 3),
+                    "latency_p50": round(latencies[len(latencies) // 2], 3) if latencies else 0.0,
+                    "latency_p99": round(latencies[int(len(latencies) * 0.99)], 3) if latencies else 0.0,
+                }
+            return described
+
+
+# Shared by every hedged model in the process
+policy = HedgePolicy(
+    percentile=float(os.getenv("HEDGE_PERCENTILE", "95")),
+    min_samples=int(os.getenv("HEDGE_MIN_SAMPLES", "20")),
+    initial_delay=float(os.getenv("HEDGE_AFTER_SECONDS", "5")),
+    max_rate=float(os.getenv("HEDGE_MAX_RATE", "0.1")),
+)
+
+
+def _usable(response: Optional[httpx.Response]) -> bool:
+    return response is not None and response.status_code != 429 and response.status_code < 500
+
+
+def _close_response(future: Future) -> None:
+    if future.exception() is None:
+        future.result().close()
+
+
+class _Attempt:
+    """One copy of a hedged call, sent from its own thread with the caller's request context"""
+
+    def __init__(self, transport: httpx.BaseTransport, request: httpx.Request):
+        self.unwanted = threading.Event()
+        request.extensions[ATTEMPT_CANCELLED] = self.unwanted
+        self.future: Future = Future()
+        context = contextvars.copy_context()
+        threading.Thread(target=context.run, args=(self._send, transport, request), daemon=True).start()
+
+    def _send(self, transport: httpx.BaseTransport, request: httpx.Request) -> None:
+        try:
+            self.future.set_result(transport.handle_request(request))
+        except BaseException as e:
+            self.future.set_exception(e)
+
+    def abandon(self) -> None:
+        """Drop the attempt: it leaves the rate limit queue if still waiting, and its response is discarded unread"""
+        self.unwanted.set()
+        self.future.add_done_callback(_close_response)
+
+
+class HedgedTransport(httpx.BaseTransport):
+    """Sends a second copy of a slow Azure OpenAI call to ``hedge_deployment`` and returns whichever answers first.
+
+    The wait is measured to the response headers, which for streamed completions arrive with the
+    first token. A blocking read cannot be interrupted, so a losing attempt already on the wire runs
+    to completion in its thread before its connection is released.
+    """
+
+    def __init__(self, transport: httpx.BaseTransport, hedge_deployment: str, role: str = "answer",
+                 hedge_policy: Optional[HedgePolicy] = None):
+        self.transport = transport
+        self.hedge_deployment = hedge_deployment
+        self.role = role
+        self.policy = hedge_policy or policy
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        deployment = deployment_name(request)
+        if deployment is None:
+            return self.transport.handle_request(request)
+        key = f"{self.role}:{deployment}"
+        start = time.monotonic()
+        primary = _Attempt(self.transport, request)
+        done, _ = wait([primary.future], timeout=self.policy.delay(key))
+        if done or not self.policy.allow(key):
+            response = primary.future.result()
+            self.policy.finish(key, time.monotonic() - start)
+            return response
+
+        hedge = _Attempt(self.transport, with_deployment(request, self.hedge_deployment))
+        attempts: List[_Attempt] = [primary, hedge]
+        pending = {attempt.future for attempt in attempts}
+        winner = None
+        while pending and winner is None:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            winner = next((attempt for attempt in attempts if attempt.future in done and attempt.future.exception()
+                           is None and _usable(attempt.future.result())), None)
+        # Neither answered usably: fall back to the primary's outcome, as without hedging
+        winner = winner or primary
+        for attempt in attempts:
+            if attempt is not winner:
+                attempt.abandon()
+        self.policy.finish(key, time.monotonic() - start, hedged=True, hedge_won=winner is hedge)
+        return winner.future.result()
+
+    def close(self) -> None:
+        self.transport.close()
+
+
+class AsyncHedgedTransport(httpx.AsyncBaseTransport):
+    """Async counterpart of HedgedTransport; the losing attempt is cancelled, closing its connection"""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, hedge_deployment: str, role: str = "answer",
+                 hedge_policy: Optional[HedgePolicy] = None):
+        self.transport = transport
+        self.hedge_deployment = hedge_deployment
+        self.role = role
+        self.policy = hedge_policy or policy
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        deployment = deployment_name(request)
+        if deployment is None:
+            return await self.transport.handle_async_request(request)
+        key = f"{self.role}:{deployment}"
+        start = time.monotonic()
+        primary = asyncio.ensure_future(self.transport.handle_async_request(request))
+        hedge = None
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=self.policy.delay(key))
+            if done or not self.policy.allow(key):
+                response = await primary
+                self.policy.finish(key, time.monotonic() - start)
+                return response
+
+            hedge = asyncio.ensure_future(self.transport.handle_async_request(
+                with_deployment(request, self.hedge_deployment)))
+            pending, winner = {primary, hedge}, None
+            while pending and winner is None:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                winner = next((task for task in (primary, hedge) if task in done and task.exception() is None
+                               and _usable(task.result())), None)
+            winner = winner or primary
+            loser = hedge if winner is primary else primary
+            if loser.done() and loser.exception() is None:
+                await loser.result().aclose()
+            self.policy.finish(key, time.monotonic() - start, hedged=True, hedge_won=winner is hedge)
+            return winner.result()
+        finally:
+            # The loser, or both attempts when the caller itself was cancelled
+            for task in (primary, hedge):
+                if task is not None and not task.done():
+                    task.cancel()
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+
+def hedged_http_client(priority: str, hedge_deployment: str, label: Optional[str] = None) -> httpx.Client:
+    """Scheduled client (see ``scheduled_http_client``) that hedges slow calls to ``hedge_deployment``"""
+    return httpx.Client(transport=HedgedTransport(ScheduledTransport(priority, label=label), hedge_deployment,
+                                                  role=priority),
+                        timeout=httpx.Timeout(600.0, connect=5.0))
+
+
+def hedged_async_http_client(priority: str, hedge_deployment: str, label: Optional[str] = None) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        transport=AsyncHedgedTransport(AsyncScheduledTransport(priority, label=label), hedge_deployment, role=priority),
+        timeout=httpx.Timeout(600.0, connect=5.0))
@@ -0,0 +1,280 @@
+import argparse
+import hashlib
+import io
+import json
+import os
+import re
+import shutil
+import time
+import zipfile
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+from agno.document import Document
+from agno.embedder.base import Embedder
+from agno.vectordb.base import VectorDb
+
+from agents.shared.embedders import PrecomputedEmbedder
+from agents.shared.streamingKnowledge import IngestStats, StreamingJSONKnowledgeBase
+from agents.shared.vectorStores import is_chroma
+
+ARTIFACT_FORMAT = "vaultmate-index"
+ARTIFACT_FORMAT_VERSION = 1
+DEFAULT_ARTIFACT_DIR = "embeddings/artifacts"
+# Partition holding documents without a customer (file level metadata)
+_SHARED_PARTITION = "_shared"
+_PAGE_SIZE = 1024
+
+
+def artifact_dir() -> str:
+    return os.getenv("INDEX_ARTIFACT_DIR", DEFAULT_ARTIFACT_DIR)
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as fp:
+        for chunk in iter(lambda: fp.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def source_fingerprint(knowledge_base: StreamingJSONKnowledgeBase) -> List[Dict[str, Any]]:
+    """Path, size and sha256 of every source file the knowledge base is built from"""
+    return [{"path": _file.as_posix(), "bytes": _file.stat().st_size, "sha256": file_sha256(_file)}
+            for _file, _ in knowledge_base._json_files()]
+
+
+def embedder_fingerprint(embedder: Embedder) -> Dict[str, Any]:
+    """What must match for stored vectors to be comparable with query embeddings"""
+    while isinstance(embedder, PrecomputedEmbedder):
+        embedder = embedder.embedder
+    return {"class": type(embedder).__name__, "id": getattr(embedder, "id", None),
+            "dimensions": getattr(embedder, "dimensions", None)}
+
+
+def _collection_name(vector_db: VectorDb) -> str:
+    return getattr(vector_db, "collection_name", None) or getattr(vector_db, "collection", "")
+
+
+def _dump(vector_db: VectorDb) -> Iterator[Tuple[List[str], List[Optional[str]], List[str], List[Dict], List]]:
+    """Pages of (ids, names, contents, meta data, vectors) stored in a vector db"""
+    if hasattr(vector_db, "dump"):
+        yield from vector_db.dump(_PAGE_SIZE)
+        return
+    if not is_chroma(vector_db):
+        raise ValueError(f"Exporting is not supported for {type(vector_db).__name__}")
+    if not vector_db.exists():
+        return
+    collection = vector_db.client.get_collection(name=vector_db.collection_name)
+    offset = 0
+    while True:
+        page = collection.get(include=["documents", "metadatas", "embeddings"], limit=_PAGE_SIZE, offset=offset)
+        if not page["ids"]:
+            return
+        yield (page["ids"], [None] * len(page["ids"]), page["documents"], page["metadatas"], page["embeddings"])
+        offset += len(page["ids"])
+
+
+def _member_name(partition: Optional[str]) -> str:
+    return re.sub(r"[^a-zA-Z0-9_-]", "-", partition) if partition else _SHARED_PARTITION
+
+
+def _artifact_version(collection: str, sources: List[Dict[str, Any]], embedder: Dict[str, Any]) -> str:
+    """Same data and embedder give the same version, so re-exporting is idempotent"""
+    key = json.dumps({"collection": collection, "sources": [(source["path"], source["sha256"]) for source in sources],
+                      "embedder": embedder}, sort_keys=True)
+    return _sha256(key.encode())[:16]
+
+
+def export_index(knowledge_base: StreamingJSONKnowledgeBase, domain: str, out_dir: Optional[str] = None) -> str:
+    """Write the vectors, documents and meta data of a built knowledge base to a checksummed zip; returns its path"""
+    vector_db = knowledge_base.vector_db
+    sources = source_fingerprint(knowledge_base)
+    embedder = embedder_fingerprint(vector_db.embedder)
+    collection = _collection_name(vector_db)
+    version = _artifact_version(collection, sources, embedder)
+    out_dir = out_dir or artifact_dir()
+    Path(out_dir).mkdir(parents=True, exist_ok=True)
+    path = os.path.join(out_dir, f"{domain}-{version}.zip")
+    partial = f"{path}.partial"
+
+    partitions = []
+    with zipfile.ZipFile(partial, "w") as archive:
+        for partition, partition_db in knowledge_base._target_dbs():
+            ids, names, contents, metas, vectors = [], [], [], [], []
+            for page in _dump(partition_db):
+                for column, values in zip((ids, names, contents, metas, vectors), page):
+                    column.extend(values)
+            if not ids:
+                continue
+            matrix = np.asarray(vectors, dtype=np.float32)
+            buffer = io.BytesIO()
+            np.save(buffer, matrix)
+            vectors_bytes = buffer.getvalue()
+            documents_bytes = "".join(
+                json.dumps({"id": _id, "name": name, "content": content, "meta_data": meta}) + "\n"
+                for _id, name, content, meta in zip(ids, names, contents, metas)
+            ).encode()
+            member = _member_name(partition)
+            archive.writestr(f"vectors/{member}.npy", vectors_bytes, compress_type=zipfile.ZIP_STORED)
+            archive.writestr(f"documents/{member}.jsonl", documents_bytes, compress_type=zipfile.ZIP_DEFLATED)
+            partitions.append({
+                "partition": partition, "member": member, "documents": len(ids), "dimensions": int(matrix.shape[1]),
+                "vectors_sha256": _sha256(vectors_bytes), "documents_sha256": _sha256(documents_bytes),
+            })
+        manifest = {
+            "format": ARTIFACT_FORMAT,
+            "format_version": ARTIFACT_FORMAT_VERSION,
+            "version": version,
+            "domain": domain,
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "collection": collection,
+            "vector_db": type(vector_db).__name__,
+            "embedder": embedder,
+            "sources": sources,
+            "documents": sum(partition["documents"] for partition in partitions),
+            "partitions": partitions,
+        }
+        archive.writestr("manifest.json", json.dumps(manifest, indent=2))
+    os.replace(partial, path)
+    print(f"Exported {manifest['documents']} documents of {domain} in {len(partitions)} partitions to {path}")
+    return path
+
+
+def read_manifest(path: str) -> Dict[str, Any]:
+    with zipfile.ZipFile(path) as archive:
+        manifest = json.loads(archive.read("manifest.json"))
+    if manifest.get("format") != ARTIFACT_FORMAT or manifest.get("format_version") != ARTIFACT_FORMAT_VERSION:
+        raise ValueError(f"{path} is not a version {ARTIFACT_FORMAT_VERSION} {ARTIFACT_FORMAT} artifact")
+    return manifest
+
+
+def find_artifact(domain: str, directory: Optional[str] = None) -> Optional[str]:
+    """Newest artifact exported for ``domain``"""
+    candidates = sorted(Path(directory or artifact_dir()).glob(f"{domain}-*.zip"), key=lambda path: path.stat().st_mtime)
+    return str(candidates[-1]) if candidates else None
+
+
+def mismatch(knowledge_base: StreamingJSONKnowledgeBase, manifest: Dict[str, Any]) -> Optional[str]:
+    """Why an artifact cannot serve this knowledge base, or None when it matches the source JSON and embedder"""
+    embedder = embedder_fingerprint(knowledge_base.vector_db.embedder)
+    if manifest["embedder"] != embedder:
+        return f"embedded with {manifest['embedder']}, this node uses {embedder}"
+    if manifest["collection"] != _collection_name(knowledge_base.vector_db):
+        return f"built for collection {manifest['collection']}"
+    expected = {source["path"]: source for source in manifest["sources"]}
+    current = {_file.as_posix(): _file for _file, _ in knowledge_base._json_files()}
+    if set(expected) != set(current):
+        return f"built from {sorted(expected)}, the knowledge base reads {sorted(current)}"
+    for path, _file in current.items():
+        # Size first, so a changed file is usually caught without hashing it
+        if _file.stat().st_size != expected[path]["bytes"] or file_sha256(_file) != expected[path]["sha256"]:
+            return f"{path} changed since the artifact was built"
+    return None
+
+
+def import_index(knowledge_base: StreamingJSONKnowledgeBase, path: str) -> IngestStats:
+    """Load an artifact's vectors into the knowledge base's vector dbs and lexical index, without embedding calls"""
+    stats = IngestStats()
+    start = time.perf_counter()
+    manifest = read_manifest(path)
+    use_upsert = knowledge_base.vector_db.upsert_available()
+    with zipfile.ZipFile(path) as archive:
+        for entry in manifest["partitions"]:
+            vectors_bytes = archive.read(f"vectors/{entry['member']}.npy")
+            documents_bytes = archive.read(f"documents/{entry['member']}.jsonl")
+            if _sha256(vectors_bytes) != entry["vectors_sha256"] or _sha256(documents_bytes) != entry["documents_sha256"]:
+                raise ValueError(f"Checksum mismatch in {path} for partition {entry['member']}")
+            vectors = np.load(io.BytesIO(vectors_bytes))
+            rows = [json.loads(line) for line in documents_bytes.decode().splitlines()]
+            vector_db = knowledge_base._partition_db(entry["partition"])
+            if not vector_db.exists():
+                vector_db.create()
+            embedder = vector_db.embedder
+            for offset in range(0, len(rows), knowledge_base.batch_size * 8):
+                batch = rows[offset:offset + knowledge_base.batch_size * 8]
+                documents = [Document(id=row["id"], name=row["name"], content=row["content"], meta_data=row["meta_data"])
+                             for row in batch]
+                vector_db.embedder = PrecomputedEmbedder(embedder=embedder, embeddings={
+                    row["content"]: (vector.tolist(), None)
+                    for row, vector in zip(batch, vectors[offset:offset + len(batch)])
+                })
+                try:
+                    if use_upsert:
+                        vector_db.upsert(documents=documents)
+                    else:
+                        vector_db.insert(documents=documents)
+                finally:
+                    vector_db.embedder = embedder
+                if knowledge_base.lexical_index is not None:
+                    knowledge_base.lexical_index.add(documents, partition=entry["partition"])
+                stats.documents_read += len(documents)
+                stats.documents_written += len(documents)
+                stats.batches += 1
+    stats.seconds = time.perf_counter() - start
+    return stats
+
+
+def restore_index(knowledge_base: StreamingJSONKnowledgeBase, domain: str, directory: Optional[str] = None) -> bool:
+    """Serve the knowledge base from a prebuilt artifact matching the source JSON; False means build it as usual"""
+    path = find_artifact(domain, directory)
+    if path is None:
+        return False
+    try:
+        manifest = read_manifest(path)
+        reason = mismatch(knowledge_base, manifest)
+        if reason:
+            print(f"Not using index artifact {path}: {reason}")
+            return False
+        stored = sum(vector_db.get_count() for _, vector_db in knowledge_base._target_dbs() if vector_db.exists())
+        if stored == manifest["documents"]:
+            print(f"Knowledge base {domain} matches index artifact {manifest['version']}")
+            return True
+        stats = import_index(knowledge_base, path)
+        print(f"Imported index artifact {path}: {stats.describe()}")
+        return True
+    except Exception as e:
+        print(f"Error importing index artifact {path}: {e}")
+        return False
+
+
+def main():
+    from agents import registry
+
+    parser = argparse.ArgumentParser(description="Export, import and verify prebuilt embedding index artifacts.")
+    parser.add_argument("command", choices=["export", "import", "verify"])
+    parser.add_argument("domains", nargs="*", default=list(registry.DOMAINS),
+                        help=f"Any of {', '.join(registry.DOMAINS)} (default: all)")
+    parser.add_argument("--dir", default=None, help=f"Artifact directory (default: INDEX_ARTIFACT_DIR or {DEFAULT_ARTIFACT_DIR})")
+    parser.add_argument("--artifact", action="append", default=[], help="Artifact file to import (copied into --dir)")
+    args = parser.parse_args()
+    directory = args.dir or artifact_dir()
+    os.environ["INDEX_ARTIFACT_DIR"] = directory
+
+    if args.command == "import":
+        Path(directory).mkdir(parents=True, exist_ok=True)
+        for artifact in args.artifact:
+            if Path(artifact).resolve().parent != Path(directory).resolve():
+                shutil.copy2(artifact, directory)
+    for domain in args.domains:
+        if domain not in registry.DOMAINS:
+            parser.error(f"Unknown domain {domain}")
+        if args.command == "export":
+            # Run the domain's initializer: importing its module does not always load the knowledge base
+            export_index(registry.initialize_knowledge_base(domain), domain, directory)
+        elif args.command == "import":
+            restored = restore_index(registry.knowledge_base(domain), domain, directory)
+            print(f"{domain}: {'restored from artifact' if restored else 'no matching artifact imported'}")
+        else:
+            path = find_artifact(domain, directory)
+            reason = "no artifact" if path is None else mismatch(registry.knowledge_base(domain), read_manifest(path))
+            print(f"{domain}: {'OK ' + path if reason is None else 'stale, ' + reason}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+import json
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+# Arrays that can grow without bound and are therefore read one element at a time
+DEFAULT_STREAM_PATHS = (
+    "transactions",
+    "loans[].schedule",
+    "investments[].transactions",
+    "rewards.ledger",
+)
+
+# Marker for a path in the stream trie whose array elements are yielded one by one
+_STREAM = object()
+
+_WHITESPACE = " \t\n\r"
+_SKIP_TOKENS = re.compile(r'["\\\[\]{}]')
+# Characters that can continue a number cut off at the end of a chunk
+_NUMBER_CHARS = frozenset("0123456789.eE+-")
+
+
+@dataclass
+class JsonRecord:
+    """A single record read from a knowledge file"""
+    path: Tuple[str, ...]                 # e.g. ("loans", "schedule") for loans[].schedule rows
+    value: Any                            # decoded record (streamed arrays are removed from parents)
+    element: bool = False                 # True when the value is one element of an array
+    parent: Optional[Dict[str, Any]] = None  # fields of the enclosing element read so far
+    root_index: Optional[int] = None      # position in a top-level array (multi-customer files)
+
+
+def compile_stream_paths(paths: Iterable[str]) -> Dict[str, Any]:
+    """Build a lookup trie from paths such as 'transactions' or 'loans[].schedule'"""
+    trie: Dict[str, Any] = {}
+    for path in paths:
+        node = trie
+        segments = path.replace("[]", ".[]").split(".")
+        for segment in segments[:-1]:
+            child = node.setdefault(segment, {})
+            if child is _STREAM:
+                break
+            node = child
+        else:
+            node[segments[-1]] = _STREAM
+    return trie
+
+
+class _BufferedJsonReader:
+    """Bounded look-ahead buffer over a text file with JSON-aware helpers"""
+
+    def __init__(self, fp, chunk_size: int = 1 << 16):
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self, size: Optional[int] = None) -> bool:
+        if self.eof:
+            return False
+        if self.pos:
+            self.buffer = self.buffer[self.pos:]
+            self.pos = 0
+        data = self.fp.read(size or self.chunk_size)
+        if not data:
+            self.eof = True
+            return False
+        self.buffer += data
+        return True
+
+    def peek(self) -> str:
+        """Return the next non-whitespace character without consuming it ('' at EOF)"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected '{char}' in JSON stream but found '{found or 'EOF'}'")
+        self.pos += 1
+
+    def consume_separator(self, closing: str) -> bool:
+        """Consume ',' between items; return False once the closing bracket is consumed"""
+        char = self.peek()
+        if char == ",":
+            self.pos += 1
+            return True
+        self.expect(closing)
+        return False
+
+    def decode(self) -> Any:
+        """Decode the next complete JSON value, reading more input only when needed"""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+                # A number is only complete once a delimiter follows it: the chunk may end inside it
+                number = isinstance(value, (int, float)) and not isinstance(value, bool)
+                if self.eof or (end < len(self.buffer) and not (number and self.buffer[end] in _NUMBER_CHARS)):
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            # Grow geometrically so large values do not cost quadratic re-parsing
+            if not self._fill(max(self.chunk_size, len(self.buffer))):
+                continue
+
+    def skip(self) -> None:
+        """Skip the next JSON value without materializing it"""
+        char = self.peek()
+        if char not in "[{\"":
+            self.decode()
+            return
+        depth = 0
+        in_string = False
+        while True:
+            match = _SKIP_TOKENS.search(self.buffer, self.pos)
+            if match is None:
+                self.pos = len(self.buffer)
+                if not self._fill():
+                    raise ValueError("Unexpected end of JSON stream while skipping a value")
+                continue
+            token = match.group()
+            self.pos = match.end()
+            if in_string:
+                if token == "\\":
+                    if self.pos >= len(self.buffer) and not self._fill():
+                        raise ValueError("Unexpected end of JSON stream inside a string")
+                    self.pos += 1
+                elif token == '"':
+                    in_string = False
+                    if depth == 0:
+                        return
+            elif token == '"':
+                in_string = True
+            elif token in "[{":
+                depth += 1
+            elif token in "]}":
+                depth -= 1
+                if depth == 0:
+                    return
+
+
+def _walk_object(reader: _BufferedJsonReader, node: Dict[str, Any], path: Tuple[str, ...],
+                 root_index: Optional[int], skip: frozenset) -> Iterator[Any]:
+    """Walk an object, yielding streamed records; the final item is the collected remainder"""
+    collected: Dict[str, Any] = {}
+    reader.expect("{")
+    if reader.peek() == "}":
+        reader.pos += 1
+        yield collected
+        return
+    while True:
+        key = reader.decode()
+        reader.expect(":")
+        child = node.get(key)
+        child_path = path + (key,)
+
+        if not path and key in skip:
+            reader.skip()
+        elif child is None:
+            value = reader.decode()
+            if path:
+                collected[key] = value
+            else:
+                yield JsonRecord(path=child_path, value=value, root_index=root_index)
+        elif child is _STREAM and reader.peek() == "[":
+            yield from _walk_stream_array(reader, child_path, collected, root_index)
+        elif isinstance(child, dict) and reader.peek() == "{":
+            remainder = None
+            for item in _walk_object(reader, child, child_path, root_index, skip):
+                if isinstance(item, JsonRecord):
+                    yield item
+                else:
+                    remainder = item
+            if path:
+                collected[key] = remainder
+            else:
+                yield JsonRecord(path=child_path, value=remainder, root_index=root_index)
+        elif isinstance(child, dict) and "[]" in child and reader.peek() == "[":
+            yield from _walk_descended_array(reader, child["[]"], child_path, root_index, skip)
+        else:
+            # The data does not have the expected shape; fall back to a plain decode
+            value = reader.decode()
+            if path:
+                collected[key] = value
+            else:
+                yield JsonRecord(path=child_path, value=value, root_index=root_index)
+
+        if not reader.consume_separator("}"):
+            break
+    yield collected
+
+
+def _walk_stream_array(reader: _BufferedJsonReader, path: Tuple[str, ...], parent: Dict[str, Any],
+                       root_index: Optional[int]) -> Iterator[JsonRecord]:
+    reader.expect("[")
+    if reader.peek() == "]":
+        reader.pos += 1
+        return
+    while True:
+        yield JsonRecord(path=path, value=reader.decode(), element=True,
+                         parent=dict(parent) if parent else None, root_index=root_index)
+        if not reader.consume_separator("]"):
+            return
+
+
+def _walk_descended_array(reader: _BufferedJsonReader, node: Dict[str, Any], path: Tuple[str, ...],
+                          root_index: Optional[int], skip: frozenset) -> Iterator[JsonRecord]:
+    reader.expect("[")
+    if reader.peek() == "]":
+        reader.pos += 1
+        return
+    while True:
+        if reader.peek() == "{":
+            remainder = None
+            for item in _walk_object(reader, node, path, root_index, skip):
+                if isinstance(item, JsonRecord):
+                    yield item
+                else:
+                    remainder = item
+            yield JsonRecord(path=path, value=remainder, element=True, root_index=root_index)
+        else:
+            yield JsonRecord(path=path, value=reader.decode(), element=True, root_index=root_index)
+        if not reader.consume_separator("]"):
+            return
+
+
+def iter_json_records(path: str, stream_paths: Iterable[str] = DEFAULT_STREAM_PATHS,
+                      skip_sections: Iterable[str] = (), chunk_size: int = 1 << 16) -> Iterator[JsonRecord]:
+    """Stream records from a knowledge JSON file with memory bounded by the largest record.
+
+    Top-level sections are yielded whole, except that arrays listed in ``stream_paths``
+    are yielded element by element and removed from their parent record. A file whose
+    root is an array (one element per customer) is walked element by element, with
+    ``root_index`` identifying the element each record came from.
+    """
+    trie = compile_stream_paths(stream_paths)
+    skip = frozenset(skip_sections)
+    with open(path, "r", encoding="utf-8") as fp:
+        reader = _BufferedJsonReader(fp, chunk_size=chunk_size)
+        root = reader.peek()
+        if root == "{":
+            for item in _walk_object(reader, trie, (), None, skip):
+                if isinstance(item, JsonRecord):
+                    yield item
+        elif root == "[":
+            reader.expect("[")
+            if reader.peek() == "]":
+                return
+            index = 0
+            while True:
+                if reader.peek() == "{":
+                    for item in _walk_object(reader, trie, (), index, skip):
+                        if isinstance(item, JsonRecord):
+                            yield item
+                else:
+                    yield JsonRecord(path=(), value=reader.decode(), element=True, root_index=index)
+                index += 1
+                if not reader.consume_separator("]"):
+                    break
+        elif root:
+            yield JsonRecord(path=(), value=reader.decode())
@@ -0,0 +1,139 @@
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from agents.shared.streamingKnowledge import StreamingJSONKnowledgeBase
+
+
+@dataclass
+class ReindexMetrics:
+    """Reindex figures for one knowledge base"""
+    reindexes: int = 0
+    failures: int = 0
+    # A change was seen and is waiting for the files to settle or for the reindex to finish
+    pending: bool = False
+    last_detected_at: Optional[float] = None
+    last_completed_at: Optional[float] = None
+    last_duration_seconds: Optional[float] = None
+    # From the newest source file modification to the change being searchable
+    last_lag_seconds: Optional[float] = None
+    max_lag_seconds: Optional[float] = None
+    last_documents_written: int = 0
+    last_documents_removed: int = 0
+    last_error: Optional[str] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def _newest_mtime(version: Tuple) -> float:
+    return max((mtime_ns for _, _, mtime_ns in version), default=0) / 1e9
+
+
+class KnowledgeWatcher:
+    """Polls the knowledge files and reindexes a knowledge base in the background when they change.
+
+    A change is applied once the files have stayed the same for one more poll (so a file
+    being written is not read half way). Only changed records are embedded; searches keep
+    being served from the existing indexes meanwhile. ``refreshers`` are called after each
+    reindex to warm in-memory caches built from the same files.
+    """
+
+    def __init__(self, knowledge_bases: Dict[str, StreamingJSONKnowledgeBase], interval: float = 2.0,
+                 refreshers: Sequence[Callable[[], Any]] = ()):
+        self.knowledge_bases = knowledge_bases
+        self.interval = interval
+        self.refreshers = list(refreshers)
+        self.metrics: Dict[str, ReindexMetrics] = {name: ReindexMetrics() for name in knowledge_bases}
+        # name -> (indexed version, last version seen)
+        self._versions: Dict[str, Tuple[Optional[Tuple], Optional[Tuple]]] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Take the current files as indexed and start polling"""
+        if self.running:
+            return
+        for name, knowledge_base in self.knowledge_bases.items():
+            version = knowledge_base.source_version()
+            self._versions[name] = (version, version)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="knowledge-watcher", daemon=True)
+        self._thread.start()
+        print(f"Watching {len(self.knowledge_bases)} knowledge bases for changes every {self.interval:g}s")
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.poll()
+
+    def poll(self) -> List[str]:
+        """Check every knowledge base once; returns the names that were reindexed"""
+        reindexed = []
+        for name, knowledge_base in self.knowledge_bases.items():
+            try:
+                version = knowledge_base.source_version()
+            except OSError as e:
+                # A file replaced mid-poll; look again next time
+                print(f"Error reading knowledge files of {name}: {e}")
+                continue
+            indexed, last_seen = self._versions.get(name, (None, None))
+            metrics = self.metrics[name]
+            if version == indexed:
+                self._versions[name] = (indexed, version)
+                continue
+            if not metrics.pending:
+                metrics.pending, metrics.last_detected_at = True, time.time()
+            if version != last_seen:
+                # Still being written
+                self._versions[name] = (indexed, version)
+                continue
+            if self.reindex(name, version):
+                reindexed.append(name)
+        return reindexed
+
+    def reindex(self, name: str, version: Optional[Tuple] = None) -> bool:
+        """Reindex one knowledge base now; returns False if it failed (it is retried on the next poll)"""
+        knowledge_base, metrics = self.knowledge_bases[name], self.metrics[name]
+        version = version or knowledge_base.source_version()
+        metrics.pending = True
+        try:
+            stats = knowledge_base.reindex()
+            for refresh in self.refreshers:
+                refresh()
+        except Exception as e:
+            metrics.failures += 1
+            metrics.last_error = str(e)
+            print(f"Error reindexing {name}: {e}")
+            return False
+        completed = time.time()
+        lag = max(0.0, completed - _newest_mtime(version))
+        metrics.reindexes += 1
+        metrics.pending = False
+        metrics.last_completed_at = completed
+        metrics.last_duration_seconds = stats.seconds
+        metrics.last_lag_seconds = lag
+        metrics.max_lag_seconds = max(metrics.max_lag_seconds or 0.0, lag)
+        metrics.last_documents_written = stats.documents_written
+        metrics.last_documents_removed = stats.documents_removed
+        metrics.last_error = None
+        self._versions[name] = (version, version)
+        print(f"Reindexed {name}: {stats.describe()}")
+        return True
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "interval_seconds": self.interval,
+            "knowledge_bases": {name: metrics.as_dict() for name, metrics in self.metrics.items()},
+        }
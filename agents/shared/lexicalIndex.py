@@ -0,0 +1,201 @@
+import json
+import re
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from agno.document import Document
+
+# Tokens that look like identifiers: TXN-2025-0002, CARD-CR-002, HDFCNEFT1234567, rohitv@okaxis, LI-2019-000123
+_IDENTIFIER_PATTERN = re.compile(r"[A-Za-z0-9][A-Za-z0-9@._/-]{3,}[A-Za-z0-9]")
+_TIMESTAMP_PATTERN = re.compile(r"^\d{4}-\d{2}-\d{2}(t\d*)?$")
+_WORD_PATTERN = re.compile(r"\w+")
+_FILTER_KEY_PATTERN = re.compile(r"^[A-Za-z0-9_]+$")
+STOPWORDS = frozenset(
+    "a an and are as at be by can do does for from have how i in is it me my of on or show tell "
+    "that the this to was what when where which who why with you your".split()
+)
+
+# Rank constant of reciprocal rank fusion; 60 is the usual choice and is not sensitive
+RRF_K = 60
+
+
+def extract_identifiers(text: str) -> List[str]:
+    """Identifier-like tokens in ``text``, lower-cased and de-duplicated in order"""
+    identifiers: Dict[str, None] = {}
+    for token in _IDENTIFIER_PATTERN.findall(text):
+        token = token.lower()
+        has_digit = any(char.isdigit() for char in token)
+        has_alpha = any(char.isalpha() for char in token)
+        if "@" in token or (has_digit and has_alpha and not _TIMESTAMP_PATTERN.match(token)) \
+                or (token.isdigit() and len(token) >= 8):
+            identifiers[token] = None
+    return list(identifiers)
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[Document]], limit: int) -> List[Document]:
+    """Merge ranked lists by summed reciprocal rank, keyed on document id"""
+    scores: Dict[str, float] = {}
+    documents: Dict[str, Document] = {}
+    for ranking in rankings:
+        for rank, document in enumerate(ranking):
+            scores[document.id] = scores.get(document.id, 0.0) + 1.0 / (RRF_K + rank + 1)
+            documents.setdefault(document.id, document)
+    ordered = sorted(scores, key=lambda _id: scores[_id], reverse=True)
+    return [documents[_id] for _id in ordered[:limit]]
+
+
+class LexicalIndex:
+    """SQLite FTS5 (BM25) index over knowledge documents, plus an exact identifier lookup table.
+
+    Built alongside the vector db during ingestion. Documents are keyed by the same
+    content hash the vector dbs use, so lexical and vector hits can be fused by id.
+    """
+
+    def __init__(self, db_file: str):
+        self.db_file = db_file
+        Path(db_file).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(db_file, check_same_thread=False)
+        self._connection.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS documents (
+                rowid INTEGER PRIMARY KEY,
+                id TEXT NOT NULL UNIQUE,
+                partition TEXT NOT NULL,
+                name TEXT,
+                content TEXT NOT NULL,
+                meta_data TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS documents_partition ON documents (partition);
+            CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5(
+                content, content='documents', content_rowid='rowid'
+            );
+            CREATE TABLE IF NOT EXISTS identifiers (
+                partition TEXT NOT NULL,
+                token TEXT NOT NULL,
+                document_rowid INTEGER NOT NULL,
+                is_entity INTEGER NOT NULL,
+                PRIMARY KEY (partition, token, document_rowid)
+            ) WITHOUT ROWID;
+            """
+        )
+
+    def add(self, documents: Iterable[Document], partition: Optional[str] = None) -> int:
+        """Index documents not indexed yet; returns how many were added"""
+        added = 0
+        partition = partition or ""
+        with self._lock, self._connection:
+            for document in documents:
+                cursor = self._connection.execute(
+                    "INSERT OR IGNORE INTO documents (id, partition, name, content, meta_data) VALUES (?, ?, ?, ?, ?)",
+                    (document.id, partition, document.name, document.content, json.dumps(document.meta_data)),
+                )
+                if not cursor.rowcount:
+                    continue
+                rowid = cursor.lastrowid
+                self._connection.execute("INSERT INTO documents_fts (rowid, content) VALUES (?, ?)", (rowid, document.content))
+                entity_id = str(document.meta_data.get("entity_id", "")).lower()
+                self._connection.executemany(
+                    "INSERT OR IGNORE INTO identifiers (partition, token, document_rowid, is_entity) VALUES (?, ?, ?, ?)",
+                    [(partition, token, rowid, int(token == entity_id)) for token in extract_identifiers(document.content)],
+                )
+                added += 1
+        return added
+
+    def ids(self, partition: Optional[str] = None) -> set:
+        """Ids of the documents indexed in one partition"""
+        with self._lock:
+            rows = self._connection.execute("SELECT id FROM documents WHERE partition = ?", (partition or "",)).fetchall()
+        return {row[0] for row in rows}
+
+    def remove(self, ids: Iterable[str], partition: Optional[str] = None) -> int:
+        """Drop documents from the index; returns how many were removed"""
+        removed = 0
+        partition = partition or ""
+        with self._lock, self._connection:
+            for _id in ids:
+                row = self._connection.execute(
+                    "SELECT rowid, content FROM documents WHERE id = ? AND partition = ?", (_id, partition)
+                ).fetchone()
+                if row is None:
+                    continue
+                rowid, content = row
+                self._connection.execute(
+                    "INSERT INTO documents_fts (documents_fts, rowid, content) VALUES ('delete', ?, ?)", (rowid, content)
+                )
+                self._connection.execute("DELETE FROM identifiers WHERE partition = ? AND document_rowid = ?",
+                                         (partition, rowid))
+                self._connection.execute("DELETE FROM documents WHERE rowid = ?", (rowid,))
+                removed += 1
+        return removed
+
+    def clear(self) -> None:
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM identifiers")
+            self._connection.execute("INSERT INTO documents_fts (documents_fts) VALUES ('delete-all')")
+            self._connection.execute("DELETE FROM documents")
+
+    def count(self, partition: Optional[str] = None) -> int:
+        with self._lock:
+            return self._connection.execute(
+                "SELECT COUNT(*) FROM documents WHERE partition = ?", (partition or "",)
+            ).fetchone()[0]
+
+    @staticmethod
+    def _filter_clause(filters: Optional[Dict[str, Any]]) -> Tuple[str, List[Any]]:
+        clause, params = "", []
+        for key, value in (filters or {}).items():
+            if not _FILTER_KEY_PATTERN.match(key):
+                continue
+            clause += f" AND json_extract(d.meta_data, '$.{key}') = ?"
+            params.append(value)
+        return clause, params
+
+    def _rows_to_documents(self, rows: List[Tuple]) -> List[Document]:
+        return [Document(id=_id, name=name, content=content, meta_data=json.loads(meta_data))
+                for _id, name, content, meta_data in rows]
+
+    def lookup_identifiers(self, query: str, limit: int, partition: Optional[str] = None,
+                           filters: Optional[Dict[str, Any]] = None) -> List[Document]:
+        """Documents containing identifiers mentioned in the query, the entity itself first"""
+        tokens = extract_identifiers(query)
+        if not tokens:
+            return []
+        clause, params = self._filter_clause(filters)
+        placeholders = ", ".join("?" for _ in tokens)
+        with self._lock:
+            rows = self._connection.execute(
+                f"""
+                SELECT d.id, d.name, d.content, d.meta_data
+                FROM identifiers i JOIN documents d ON d.rowid = i.document_rowid
+                WHERE i.partition = ? AND i.token IN ({placeholders}){clause}
+                GROUP BY d.rowid
+                ORDER BY MAX(i.is_entity) DESC, COUNT(*) DESC, d.rowid
+                LIMIT ?
+                """,
+                [partition or "", *tokens, *params, limit],
+            ).fetchall()
+        return self._rows_to_documents(rows)
+
+    def search(self, query: str, limit: int, partition: Optional[str] = None,
+               filters: Optional[Dict[str, Any]] = None) -> List[Document]:
+        """BM25 ranked documents matching any query term"""
+        terms = [term for term in _WORD_PATTERN.findall(query.lower()) if term not in STOPWORDS]
+        if not terms:
+            return []
+        match = " OR ".join(f'"{term}"' for term in dict.fromkeys(terms))
+        clause, params = self._filter_clause(filters)
+        with self._lock:
+            rows = self._connection.execute(
+                f"""
+                SELECT d.id, d.name, d.content, d.meta_data
+                FROM documents_fts JOIN documents d ON d.rowid = documents_fts.rowid
+                WHERE documents_fts MATCH ? AND d.partition = ?{clause}
+                ORDER BY bm25(documents_fts)
+                LIMIT ?
+                """,
+                [match, partition or "", *params, limit],
+            ).fetchall()
+        return self._rows_to_documents(rows)
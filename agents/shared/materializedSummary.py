@@ -0,0 +1,305 @@
+import threading
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+from agents.shared.bankingData import CustomerRecords, parse_amount, record_version
+from agents.shared.requestContext import current_customer_id
+
+# Accounts whose available balance counts as deposits (FDs are valued through investments[])
+LIQUID_ACCOUNT_TYPES = frozenset({"savings", "current"})
+# Entities in these states contribute nothing to the summary
+INACTIVE_STATUSES = frozenset({"closed", "cancelled", "lapsed", "expired", "failed", "declined", "reversed"})
+# Cash flow windows of the snapshot, in days
+CASHFLOW_WINDOWS = (30, 90)
+SECTIONS = ("balances", "cashflow", "upcoming", "points", "insuranceCoverage", "netWorth")
+
+# Tables whose values are summed across entities; every other table maps a key to the one entity that owns it
+_ADDITIVE_TABLES = frozenset({"totals", "inflow", "outflow", "coverage"})
+_COVERAGE_FIELDS = {"life": "sumAssured", "health": "sumInsured", "motor": "idv"}
+
+# A contribution is what one entity adds to the view: (table, key, value) entries
+Contribution = Tuple[Tuple[str, str, Any], ...]
+
+
+def _paise(value: Any) -> int:
+    """Amounts are kept in integer paise so repeated add/subtract never drifts"""
+    return round(parse_amount(value) * 100)
+
+
+def _money(paise: int) -> str:
+    sign = "-" if paise < 0 else ""
+    rupees, fraction = divmod(abs(paise), 100)
+    return f"{sign}{rupees}.{fraction:02d}"
+
+
+def _active(entity: Dict[str, Any]) -> bool:
+    return (entity.get("status") or "active").lower() not in INACTIVE_STATUSES
+
+
+def _account(account: Dict[str, Any], key: str) -> Contribution:
+    if not _active(account) or account.get("type") not in LIQUID_ACCOUNT_TYPES:
+        return ()
+    available = _paise((account.get("balance") or {}).get("available"))
+    return (("balances", key, available), ("totals", "available", available))
+
+
+def _loan(loan: Dict[str, Any], key: str) -> Contribution:
+    if not _active(loan):
+        return ()
+    entries = [("totals", "loansOutstanding", _paise(loan.get("outstandingPrincipal")))]
+    if loan.get("nextEmiDate"):
+        entries.append(("emi", key, {"loanId": loan.get("id"), "dueDate": loan["nextEmiDate"],
+                                     "amount": loan.get("emiAmount"), "currency": loan.get("currency", "INR")}))
+    return tuple(entries)
+
+
+def _investment(investment: Dict[str, Any], key: str) -> Contribution:
+    if not _active(investment):
+        return ()
+    return (("totals", "investments", _paise((investment.get("valuation") or {}).get("value"))),)
+
+
+def _recurring_payment(payment: Dict[str, Any], key: str) -> Contribution:
+    if not _active(payment) or not payment.get("nextDate"):
+        return ()
+    return (("recurring", key, {"recurringId": payment.get("id"), "nextDate": payment["nextDate"],
+                                "amount": payment.get("amount"), "currency": payment.get("currency", "INR")}),)
+
+
+def _insurance_policy(policy: Dict[str, Any], key: str) -> Contribution:
+    field = _COVERAGE_FIELDS.get(policy.get("type"))
+    if not _active(policy) or field is None:
+        return ()
+    return (("coverage", policy["type"], _paise(policy.get(field))),)
+
+
+def _reward_program(program: Dict[str, Any], key: str) -> Contribution:
+    points = int(program.get("pointsBalance") or 0)
+    return (("points", key, points), ("totals", "points", points))
+
+
+def _transaction(transaction: Dict[str, Any], key: str) -> Contribution:
+    # Card spends without an account are settled through the card bill, not the account cash flow
+    direction = transaction.get("direction")
+    if not _active(transaction) or not transaction.get("accountId") or direction not in ("inflow", "outflow"):
+        return ()
+    return ((direction, (transaction.get("bookingDate") or "")[:10], _paise(transaction.get("amount"))),)
+
+
+# Contribution of one entity, given the key it is tracked under
+CONTRIBUTIONS: Dict[str, Callable[[Dict[str, Any], str], Contribution]] = {
+    "account": _account,
+    "loan": _loan,
+    "investment": _investment,
+    "recurringPayment": _recurring_payment,
+    "insurancePolicy": _insurance_policy,
+    "rewardProgram": _reward_program,
+    "transaction": _transaction,
+}
+
+
+def iter_entities(core: Optional[Dict[str, Any]], transactions: Optional[Dict[str, Any]] = None
+                  ) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """(kind, entity) pairs of a customer's core banking record and transaction record"""
+    core = core or {}
+    for kind, section in (("account", "accounts"), ("loan", "loans"), ("investment", "investments"),
+                          ("recurringPayment", "recurringPayments"), ("insurancePolicy", "insurancePolicies")):
+        for entity in core.get(section) or []:
+            yield kind, entity
+    for program in (core.get("rewards") or {}).get("programs") or []:
+        yield "rewardProgram", program
+    for transaction in (transactions or {}).get("transactions") or []:
+        yield "transaction", transaction
+
+
+def entity_key(entity: Dict[str, Any]) -> str:
+    """Key an entity is tracked under: its id, or a hash of its content when it has none"""
+    return str(entity.get("id") or f"#{record_version(entity)}")
+
+
+class SummaryView:
+    """Materialized view of one customer's summary figures, maintained entity by entity.
+
+    Each entity's contribution (its balance, outstanding principal, transaction amount in
+    a daily bucket, ...) is remembered; ``upsert`` subtracts the old contribution and adds
+    the new one, so applying one known change costs the same no matter how many records
+    the customer has. ``sync`` is the full-record path: it recomputes every entity's
+    contribution and only re-applies those that differ.
+    """
+
+    def __init__(self):
+        self._contributions: Dict[Tuple[str, str], Contribution] = {}
+        self._tables: Dict[str, Dict[str, Any]] = {table: {} for table in
+                                                   ("totals", "inflow", "outflow", "coverage", "balances", "emi",
+                                                    "recurring", "points")}
+        # Bumped on every change; snapshots are cached against it
+        self.revision = 0
+        self.as_of: Optional[str] = None
+        self._snapshot: Optional[Tuple[int, str, Dict[str, Any]]] = None
+
+    def __len__(self) -> int:
+        return len(self._contributions)
+
+    def _apply(self, contribution: Contribution, sign: int) -> None:
+        for table, key, value in contribution:
+            rows = self._tables[table]
+            if table in _ADDITIVE_TABLES:
+                total = rows.get(key, 0) + sign * value
+                if total:
+                    rows[key] = total
+                else:
+                    rows.pop(key, None)
+            elif sign > 0:
+                rows[key] = value
+            else:
+                rows.pop(key, None)
+
+    def upsert(self, kind: str, entity: Dict[str, Any], key: Optional[str] = None) -> bool:
+        """Add or replace one entity, tracked under ``key`` (default: its id or, without one, a hash of
+        its content); returns False when its contribution is unchanged"""
+        key = (kind, key or entity_key(entity))
+        contribution = CONTRIBUTIONS[kind](entity, key[1])
+        previous = self._contributions.get(key)
+        if previous == contribution:
+            return False
+        if previous is not None:
+            self._apply(previous, -1)
+        self._apply(contribution, 1)
+        self._contributions[key] = contribution
+        self.revision += 1
+        return True
+
+    def delete(self, kind: str, entity_id: str) -> bool:
+        """Remove one entity; returns False when it was not in the view"""
+        previous = self._contributions.pop((kind, entity_id), None)
+        if previous is None:
+            return False
+        self._apply(previous, -1)
+        self.revision += 1
+        return True
+
+    def sync(self, core: Optional[Dict[str, Any]], transactions: Optional[Dict[str, Any]] = None) -> int:
+        """Bring the view in line with full records, re-applying only entities whose contribution changed;
+        returns how many did"""
+        seen, occurrences, changed = set(), Counter(), 0
+        for kind, entity in iter_entities(core, transactions):
+            key = entity_key(entity)
+            if not entity.get("id"):
+                # Identical id-less entities are still separate records: number them in file order
+                occurrences[(kind, key)] += 1
+                key = f"{key}:{occurrences[(kind, key)]}"
+            seen.add((kind, key))
+            changed += self.upsert(kind, entity, key)
+        for key in [key for key in self._contributions if key not in seen]:
+            changed += self.delete(*key)
+        self.as_of = (((core or {}).get("meta") or {}).get("generatedAt") or "")[:10] or self.as_of
+        return changed
+
+    def cashflow(self, days: int, as_of: Optional[str] = None) -> Dict[str, str]:
+        """Account inflow and outflow booked in the ``days`` calendar days up to ``as_of``"""
+        end = date.fromisoformat((as_of or self.as_of or date.today().isoformat())[:10])
+        # Inclusive of both ends: the window starts days - 1 before as_of
+        since = (end - timedelta(days=days - 1)).isoformat()
+        until = end.isoformat()
+        totals = {}
+        for direction in ("inflow", "outflow"):
+            buckets = self._tables[direction]
+            # Daily buckets keep this proportional to the number of days with activity, not of transactions
+            totals[direction] = _money(sum(amount for day, amount in buckets.items() if since <= day <= until))
+        return totals
+
+    def snapshot(self, as_of: Optional[str] = None) -> Dict[str, Any]:
+        """Figures in the shape of the ``summary`` block of CORE_BANKING_DATA.json"""
+        as_of = (as_of or self.as_of or date.today().isoformat())[:10]
+        if self._snapshot is not None and self._snapshot[:2] == (self.revision, as_of):
+            return self._snapshot[2]
+        tables = self._tables
+        totals = tables["totals"]
+        deposits, investments = totals.get("available", 0), totals.get("investments", 0)
+        loans_outstanding = totals.get("loansOutstanding", 0)
+        coverage = tables["coverage"]
+        snapshot = {
+            "asOf": as_of,
+            "balances": {"totalAvailable": _money(deposits),
+                         "byAccountId": {key: _money(value) for key, value in sorted(tables["balances"].items())}},
+            "cashflow": {f"last{days}d": self.cashflow(days, as_of) for days in CASHFLOW_WINDOWS},
+            "upcoming": {
+                "emi": sorted(tables["emi"].values(), key=lambda row: row["dueDate"]),
+                "recurringPayments": sorted(tables["recurring"].values(), key=lambda row: row["nextDate"]),
+            },
+            "points": {"totalPoints": totals.get("points", 0), "byProgram": dict(sorted(tables["points"].items()))},
+            "insuranceCoverage": {"lifeSumAssured": _money(coverage.get("life", 0)),
+                                  "healthSumInsured": _money(coverage.get("health", 0)),
+                                  "motorIdv": _money(coverage.get("motor", 0))},
+            "netWorth": {"assets": {"deposits": _money(deposits), "investments": _money(investments)},
+                         "liabilities": {"loansOutstanding": _money(loans_outstanding)},
+                         "net": _money(deposits + investments - loans_outstanding)},
+        }
+        self._snapshot = (self.revision, as_of, snapshot)
+        return snapshot
+
+
+class SummaryStore:
+    """Live summary views per customer over the core banking and transaction files.
+
+    A view is synced when the records it was built from are reloaded (the files changed).
+    Views are only read and synced under the store lock, so the watcher's ``refresh`` never
+    mutates a view while a request is reading it.
+    """
+
+    def __init__(self, core_records: CustomerRecords, transaction_records: Optional[CustomerRecords] = None,
+                 max_customers: int = 1024):
+        self.core_records = core_records
+        self.transaction_records = transaction_records
+        self.max_customers = max_customers
+        self._lock = threading.Lock()
+        # customer id -> (core record, transaction record, view); the records identify the synced file version
+        self._views: "OrderedDict[str, Tuple[Any, Any, SummaryView]]" = OrderedDict()
+
+    @contextmanager
+    def _view(self, customer_id: Optional[str] = None) -> Iterator[SummaryView]:
+        """The customer's view, synced with the current files, with the store lock held"""
+        customer_id = customer_id or current_customer_id()
+        if customer_id is None:
+            raise ValueError("This user is not linked to a customer")
+        core = self.core_records.get(customer_id)
+        transactions = self.transaction_records.get(customer_id) if self.transaction_records else None
+        with self._lock:
+            cached = self._views.get(customer_id)
+            if cached is None:
+                cached = (None, None, SummaryView())
+            if cached[0] is not core or cached[1] is not transactions:
+                cached[2].sync(core, transactions)
+                cached = (core, transactions, cached[2])
+            self._views[customer_id] = cached
+            self._views.move_to_end(customer_id)
+            while len(self._views) > self.max_customers:
+                self._views.popitem(last=False)
+            yield cached[2]
+
+    def snapshot(self, customer_id: Optional[str] = None, as_of: Optional[str] = None) -> Dict[str, Any]:
+        with self._view(customer_id) as view:
+            return view.snapshot(as_of)
+
+    def cashflow(self, days: int, as_of: Optional[str] = None, customer_id: Optional[str] = None) -> Dict[str, str]:
+        """Inflow and outflow over ``days`` days up to ``as_of`` (default: the data's generation date)"""
+        with self._view(customer_id) as view:
+            return {"asOf": as_of or view.as_of, **view.cashflow(days, as_of)}
+
+    def refresh(self) -> None:
+        """Sync every cached view with the current files ahead of the next read"""
+        with self._lock:
+            customer_ids = list(self._views)
+        for customer_id in customer_ids:
+            with self._view(customer_id):
+                pass
+
+
+def recompute_summary(core: Optional[Dict[str, Any]], transactions: Optional[Dict[str, Any]] = None,
+                      as_of: Optional[str] = None) -> Dict[str, Any]:
+    """Summary computed from scratch (reference for the maintained view)"""
+    view = SummaryView()
+    view.sync(core, transactions)
+    return view.snapshot(as_of)
@@ -0,0 +1,91 @@
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+from agno.models.azure import AzureOpenAI
+from openai import AsyncAzureOpenAI as AsyncAzureOpenAIClient
+
+from agents.shared.hedging import hedged_async_http_client, hedged_http_client
+from agents.shared.rateLimiter import scheduled_async_http_client, scheduled_http_client
+
+
+# Role -> tier. Routing and memory extraction are short classification-style calls that a small
+# model handles as accurately (see benchmarks/tieringBenchmark.py); answers and reports stay large
+MODEL_TIERS = {"router": "small", "memory": "small", "answer": "large", "analytics": "large"}
+
+# USD per million (input, output) tokens, for cost estimates; matched by model name prefix
+PRICES_PER_MILLION = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4.1-nano": (0.10, 0.40),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1": (2.00, 8.00),
+    "text-embedding-3-small": (0.02, 0.0),
+    "text-embedding-3-large": (0.13, 0.0),
+    "text-embedding-ada-002": (0.10, 0.0),
+}
+
+
+def deployment_for(role: str) -> Optional[str]:
+    """Deployment serving ``role``: ``<ROLE>_DEPLOYMENT``, else its tier's ``SMALL_DEPLOYMENT`` /
+    ``LARGE_DEPLOYMENT``, else ``DEPLOYMENT``"""
+    if role not in MODEL_TIERS:
+        raise ValueError(f"Unknown model role {role!r}; use one of {', '.join(MODEL_TIERS)}")
+    return (os.getenv(f"{role.upper()}_DEPLOYMENT") or os.getenv(f"{MODEL_TIERS[role].upper()}_DEPLOYMENT")
+            or os.getenv("DEPLOYMENT"))
+
+
+def hedge_deployment_for(role: str) -> Optional[str]:
+    """Secondary deployment that slow ``role`` calls are hedged to: ``<ROLE>_HEDGE_DEPLOYMENT``, else
+    ``SMALL_HEDGE_DEPLOYMENT`` / ``LARGE_HEDGE_DEPLOYMENT``, else ``HEDGE_DEPLOYMENT``; None disables hedging"""
+    return (os.getenv(f"{role.upper()}_HEDGE_DEPLOYMENT") or os.getenv(f"{MODEL_TIERS[role].upper()}_HEDGE_DEPLOYMENT")
+            or os.getenv("HEDGE_DEPLOYMENT"))
+
+
+def price_per_million(model: str) -> Optional[Tuple[float, float]]:
+    """(input, output) USD per million tokens for a model name such as ``gpt-4o-mini-2024-07-18``"""
+    matches = [name for name in PRICES_PER_MILLION if model.startswith(name)]
+    return PRICES_PER_MILLION[max(matches, key=len)] if matches else None
+
+
+@dataclass
+class ScheduledAzureOpenAI(AzureOpenAI):
+    """AzureOpenAI whose requests go through the process-wide rate limit scheduler at ``priority``,
+    hedged to ``hedge_deployment`` when one is set. ``usage_label`` is the agent its calls are
+    recorded under in the usage ledger (see ``usageLedger.attribute_models``)"""
+
+    priority: str = "answer"
+    hedge_deployment: Optional[str] = None
+    usage_label: Optional[str] = None
+
+    def _get_client_params(self) -> Dict[str, Any]:
+        if self.http_client is None:
+            self.http_client = (hedged_http_client(self.priority, self.hedge_deployment, self.usage_label)
+                                if self.hedge_deployment else scheduled_http_client(self.priority, self.usage_label))
+        client_params = super()._get_client_params()
+        # The scheduler retries 429s itself, pausing the whole deployment
+        client_params.setdefault("max_retries", 0)
+        return client_params
+
+    def get_async_client(self) -> AsyncAzureOpenAIClient:
+        if self.async_client:
+            return self.async_client
+        client_params = self._get_client_params()
+        client_params["http_client"] = (hedged_async_http_client(self.priority, self.hedge_deployment, self.usage_label)
+                                        if self.hedge_deployment
+                                        else scheduled_async_http_client(self.priority, self.usage_label))
+        self.async_client = AsyncAzureOpenAIClient(**client_params)
+        return self.async_client
+
+
+def create_chat_model(role: str = "answer", deployment: Optional[str] = None) -> AzureOpenAI:
+    """Chat model for ``role`` (router, memory, answer, analytics): picks its tier's deployment, hedge deployment
+    and scheduling priority"""
+    return ScheduledAzureOpenAI(
+        azure_deployment=deployment or deployment_for(role),
+        api_key=os.getenv("AZURE_OPENAI_API_KEY"),
+        azure_endpoint=os.getenv("ENDPOINT"),
+        api_version=os.getenv("API_VERSION"),
+        priority=role,
+        hedge_deployment=hedge_deployment_for(role),
+    )
@@ -0,0 +1,127 @@
+import threading
+from collections import Counter, OrderedDict
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from pydantic import PrivateAttr
+
+from agno.document import Document
+from agno.vectordb.base import VectorDb
+
+from agents.shared.requestContext import current_customer_id
+from agents.shared.streamingKnowledge import IngestStats, StreamingJSONKnowledgeBase
+from agents.shared.vectorStores import list_partitions, partition_vector_db
+
+
+class CustomerPartitionedKnowledgeBase(StreamingJSONKnowledgeBase):
+    """Streaming JSON knowledge base with one vector collection per customer.
+
+    Documents carrying a ``customer_id`` are written to that customer's partition; the
+    rest (file level metadata) stay in ``vector_db``. Searches only touch the partition
+    of the customer being served, so their cost depends on that customer's data alone
+    and results never include another customer's records. A request that maps to no
+    customer finds nothing.
+
+    Records outside a file's ``meta`` block that name no customer (the file has neither
+    ``customer.id`` nor ``meta.customerId``) cannot be served to anyone; loads report them.
+    """
+
+    # Partition vector dbs kept open at once
+    max_open_partitions: int = 256
+
+    _partitions: "OrderedDict[str, VectorDb]" = PrivateAttr(default_factory=OrderedDict)
+    # Request, fan-out and watcher threads open partitions concurrently
+    _partitions_lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+    # Sections of the documents routed to no partition during the current ingest
+    _unattributed: Counter = PrivateAttr(default_factory=Counter)
+
+    def partition(self, customer_id: str) -> VectorDb:
+        """The vector db holding one customer's documents"""
+        with self._partitions_lock:
+            vector_db = self._partitions.get(customer_id)
+            if vector_db is None:
+                vector_db = partition_vector_db(self.vector_db, customer_id)
+                self._partitions[customer_id] = vector_db
+                while len(self._partitions) > self.max_open_partitions:
+                    self._partitions.popitem(last=False)
+            else:
+                self._partitions.move_to_end(customer_id)
+            return vector_db
+
+    def customer_ids(self) -> List[str]:
+        """Customers that have a partition"""
+        return list_partitions(self.vector_db)
+
+    def _route_batch(self, documents: List[Document]) -> Iterator[Tuple[VectorDb, List[Document]]]:
+        groups: Dict[Optional[str], List[Document]] = {}
+        for document in documents:
+            groups.setdefault(document.meta_data.get("customer_id"), []).append(document)
+        for customer_id, group in groups.items():
+            if customer_id is None:
+                self._unattributed.update(document.meta_data.get("section") for document in group
+                                          if document.meta_data.get("section") != "meta")
+                yield self.vector_db, group
+                continue
+            vector_db = self.partition(customer_id)
+            if not vector_db.exists():
+                vector_db.create()
+            yield vector_db, group
+
+    def _target_dbs(self) -> Iterator[Tuple[Optional[str], VectorDb]]:
+        yield None, self.vector_db
+        for customer_id in self.customer_ids():
+            yield customer_id, self.partition(customer_id)
+
+    def _partition_db(self, partition: Optional[str]) -> VectorDb:
+        return self.vector_db if partition is None else self.partition(partition)
+
+    def _lexical_partition(self, documents: List[Document]) -> Optional[str]:
+        return documents[0].meta_data.get("customer_id") if documents else None
+
+    def _search_partition(self, filters: Optional[Dict[str, Any]]) -> Optional[str]:
+        return (filters or {}).get("customer_id") or current_customer_id()
+
+    def _search_target(self, filters: Optional[Dict[str, Any]]) -> Tuple[Optional[VectorDb], Optional[Dict[str, Any]]]:
+        filters = dict(filters or {})
+        customer_id = filters.pop("customer_id", None) or current_customer_id()
+        if customer_id is None:
+            return None, None
+        vector_db = self.partition(customer_id)
+        if not vector_db.exists():
+            return None, None
+        return vector_db, filters or None
+
+    def _retrieve(self, query: str, limit: int, filters: Optional[Dict[str, Any]]) -> List[Document]:
+        # Without a customer there is no partition to search, and the shared collection holds no customer data
+        if self._search_partition(filters) is None:
+            return []
+        return super()._retrieve(query, limit, filters)
+
+    def _vector_search(self, query: str, limit: int, filters: Optional[Dict[str, Any]]) -> List[Document]:
+        """Search the partition of the customer being served"""
+        try:
+            vector_db, filters = self._search_target(filters)
+            if vector_db is None:
+                return []
+            return vector_db.search(query=query, limit=limit, filters=filters)
+        except Exception as e:
+            print(f"Error searching knowledge base: {e}")
+            return []
+
+    def _ingest(self, use_upsert: bool, skip_existing: bool,
+                current_ids: Optional[Dict[Optional[str], Set[str]]] = None) -> IngestStats:
+        self._unattributed.clear()
+        stats = super()._ingest(use_upsert, skip_existing, current_ids)
+        if self._unattributed:
+            sections = ", ".join(f"{section} ({count})" for section, count in self._unattributed.most_common())
+            print(f"{sum(self._unattributed.values())} documents name no customer and are never searched; "
+                  f"add customer.id or meta.customerId to their file. Sections: {sections}")
+        return stats
+
+    def load(self, recreate: bool = False, upsert: bool = False, skip_existing: bool = True) -> None:
+        with self._write_lock:
+            if recreate and self.vector_db is not None:
+                for customer_id in self.customer_ids():
+                    self.partition(customer_id).drop()
+                with self._partitions_lock:
+                    self._partitions.clear()
+            super().load(recreate=recreate, upsert=upsert, skip_existing=skip_existing)
@@ -0,0 +1,187 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from agents.shared.bankingData import parse_amount
+
+# Transaction types that put money into a folio; redemptions and dividends take it out
+PURCHASE_TYPES = frozenset({"sip", "purchase", "lumpsum", "switch_in", "stp_in"})
+OUTFLOW_TYPES = frozenset({"redemption", "switch_out", "stp_out", "swp", "dividend_payout"})
+# Transaction units may fall this short of the holdings before the history counts as incomplete
+UNIT_TOLERANCE = 0.001
+
+_XIRR_LOW, _XIRR_HIGH = -0.9999, 100.0
+
+
+def _npv_and_derivative(rates: np.ndarray, amounts: np.ndarray, years: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    discount = (1 + rates[:, None]) ** -years
+    npv = (amounts * discount).sum(axis=1)
+    derivative = (-years * amounts * discount / (1 + rates[:, None])).sum(axis=1)
+    return npv, derivative
+
+
+def xirr_batch(cashflows: Sequence[Tuple[Sequence[float], Sequence[str]]], guess: float = 0.1,
+               tolerance: float = 1e-9, max_iterations: int = 100) -> np.ndarray:
+    """Annualized internal rate of return of many cash flow series at once (NaN where undefined or
+    outside -99.99% to 10000%).
+
+    Series are padded into one matrix and solved with Newton's method on every row
+    together; rows Newton cannot settle fall back to bisection. Amounts are signed
+    (investments negative), dates ISO strings.
+    """
+    if not cashflows:
+        return np.zeros(0)
+    width = max(len(amounts) for amounts, _ in cashflows)
+    amounts = np.zeros((len(cashflows), width))
+    years = np.zeros((len(cashflows), width))
+    for row, (values, dates) in enumerate(cashflows):
+        days = np.array([date[:10] for date in dates], dtype="datetime64[D]")
+        amounts[row, :len(values)] = values
+        years[row, :len(values)] = (days - days.min()).astype(float) / 365.0
+    # A return only exists when money goes both in and out
+    defined = (amounts > 0).any(axis=1) & (amounts < 0).any(axis=1)
+
+    rates = np.full(len(cashflows), guess)
+    converged = ~defined
+    with np.errstate(over="ignore", invalid="ignore", divide="ignore"):
+        for _ in range(max_iterations):
+            active = ~converged
+            if not active.any():
+                break
+            npv, derivative = _npv_and_derivative(rates[active], amounts[active], years[active])
+            step = npv / derivative
+            updated = np.clip(rates[active] - step, _XIRR_LOW, _XIRR_HIGH)
+            settled = np.abs(updated - rates[active]) < tolerance
+            rates[active] = updated
+            converged[np.flatnonzero(active)[settled]] = True
+
+        # Bisection for rows Newton left unsettled (flat or badly scaled NPV curves). A rate pinned at a
+        # bound is the clip, not a root: bisection finds the root inside the range or reports NaN
+        pinned = (rates <= _XIRR_LOW) | (rates >= _XIRR_HIGH)
+        stuck = defined & (~converged | ~np.isfinite(rates) | pinned)
+        if stuck.any():
+            low, high = np.full(stuck.sum(), _XIRR_LOW), np.full(stuck.sum(), _XIRR_HIGH)
+            npv_low = _npv_and_derivative(low, amounts[stuck], years[stuck])[0]
+            bracketed = np.sign(npv_low) != np.sign(_npv_and_derivative(high, amounts[stuck], years[stuck])[0])
+            for _ in range(200):
+                middle = (low + high) / 2
+                npv_middle = _npv_and_derivative(middle, amounts[stuck], years[stuck])[0]
+                same_sign = np.sign(npv_middle) == np.sign(npv_low)
+                low, npv_low = np.where(same_sign, middle, low), np.where(same_sign, npv_middle, npv_low)
+                high = np.where(same_sign, high, middle)
+            rates[stuck] = np.where(bracketed, (low + high) / 2, np.nan)
+    rates[~defined] = np.nan
+    return rates
+
+
+def xirr(amounts: Sequence[float], dates: Sequence[str]) -> Optional[float]:
+    """XIRR of one cash flow series, None when undefined"""
+    rate = xirr_batch([(amounts, dates)])[0]
+    return None if np.isnan(rate) else float(rate)
+
+
+@dataclass
+class FolioValuation:
+    """Valuation of one investment (mutual fund folio, FD, ...) at its valuation date"""
+    investment_id: str
+    type: str
+    provider: Optional[str]
+    value: float
+    cost: float
+    as_of: Optional[str]
+    holdings: List[Dict[str, Any]] = field(default_factory=list)
+    # Signed cash flows (purchases negative) ending with the current value, for XIRR
+    cashflow_amounts: List[float] = field(default_factory=list)
+    cashflow_dates: List[str] = field(default_factory=list)
+    transactions: int = 0
+    history_complete: bool = False
+    xirr: Optional[float] = None
+
+    @property
+    def gain(self) -> float:
+        return self.value - self.cost
+
+    @property
+    def gain_percent(self) -> Optional[float]:
+        return self.gain / self.cost * 100 if self.cost else None
+
+
+def value_investment(investment: Dict[str, Any]) -> FolioValuation:
+    """Current value, cost basis and cash flows of one ``investments[]`` entry (XIRR is filled in separately)"""
+    valuation = investment.get("valuation") or {}
+    holdings = investment.get("holdings") or []
+    as_of = (valuation.get("asOf") or "")[:10] or None
+
+    if holdings:
+        units = np.array([float(holding.get("units") or 0) for holding in holdings])
+        current_nav = np.array([parse_amount(holding.get("currentNav")) for holding in holdings])
+        average_nav = np.array([parse_amount(holding.get("avgNav")) for holding in holdings])
+        values = units * current_nav
+        value, cost = float(values.sum()), float((units * average_nav).sum())
+        rows = [{"id": holding.get("id"), "name": holding.get("name"), "isin": holding.get("isin"),
+                 "units": float(unit), "value": float(amount), "cost": float(unit * avg)}
+                for holding, unit, amount, avg in zip(holdings, units, values, average_nav)]
+    else:
+        value = parse_amount(valuation.get("value"))
+        cost = parse_amount(investment.get("principal")) or value
+        rows = []
+
+    transactions = [txn for txn in investment.get("transactions") or [] if txn.get("status", "completed") == "completed"]
+    amounts, dates, transaction_units = [], [], 0.0
+    for txn in transactions:
+        kind = (txn.get("type") or "").lower()
+        if kind in PURCHASE_TYPES:
+            amounts.append(-parse_amount(txn.get("amount")))
+            transaction_units += float(txn.get("units") or 0)
+        elif kind in OUTFLOW_TYPES:
+            amounts.append(parse_amount(txn.get("amount")))
+            transaction_units -= float(txn.get("units") or 0) if kind != "dividend_payout" else 0.0
+        else:
+            continue
+        dates.append(txn["date"][:10])
+
+    held_units = sum(row["units"] for row in rows)
+    history_complete = bool(amounts) and as_of is not None and abs(transaction_units - held_units) <= max(
+        UNIT_TOLERANCE * held_units, 0.01)
+    if history_complete:
+        # Mark-to-market value is the closing cash flow
+        amounts.append(value)
+        dates.append(as_of)
+
+    return FolioValuation(
+        investment_id=investment.get("id"),
+        type=investment.get("type") or "other",
+        provider=investment.get("provider"),
+        value=value,
+        cost=cost,
+        as_of=as_of,
+        holdings=rows,
+        cashflow_amounts=amounts if history_complete else [],
+        cashflow_dates=dates if history_complete else [],
+        transactions=len(transactions),
+        history_complete=history_complete,
+    )
+
+
+def allocation(valuations: Sequence[FolioValuation], by: str = "type") -> List[Dict[str, Any]]:
+    """Value and share of the portfolio grouped by ``type``, ``provider`` or ``holding``"""
+    if by == "holding":
+        labels, values = [], []
+        for folio in valuations:
+            for holding in folio.holdings or [{"name": folio.investment_id, "value": folio.value}]:
+                labels.append(holding["name"])
+                values.append(holding["value"])
+    elif by in ("type", "provider"):
+        labels = [getattr(folio, by) or "unknown" for folio in valuations]
+        values = [folio.value for folio in valuations]
+    else:
+        raise ValueError(f"Allocation must be by type, provider or holding, not {by!r}")
+    if not labels:
+        return []
+    keys, inverse = np.unique(np.array(labels, dtype=object).astype(str), return_inverse=True)
+    totals = np.bincount(inverse, weights=np.array(values, dtype=float), minlength=len(keys))
+    grand_total = totals.sum()
+    order = np.argsort(-totals)
+    return [{"group": str(keys[index]), "value": float(totals[index]),
+             "percent": float(totals[index] / grand_total * 100) if grand_total else 0.0} for index in order]
@@ -0,0 +1,227 @@
+import asyncio
+import re
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from agno.document import Document
+from agno.vectordb.distance import Distance
+from agno.vectordb.qdrant import Qdrant
+from qdrant_client.http import models
+
+# Separates the collection name from the customer in local mode (same convention as Chroma partitions)
+TENANT_SEPARATOR = "__"
+# Payload fields that knowledge searches filter on
+DEFAULT_PAYLOAD_INDEXES = ("section", "entity_id", "parent_id", "customer_id")
+
+
+class TunedQdrant(Qdrant):
+    """Qdrant collection with explicit HNSW parameters, payload indexes and scalar quantization.
+
+    On a Qdrant server customers share one collection: ``customer_id`` is indexed as the
+    tenant key and a per-customer view (see ``for_tenant``) adds it to every search, write
+    check and delete. Embedded local mode has no HNSW (it scans every point of a
+    collection), so there each customer gets a collection of their own instead.
+    """
+
+    def __init__(
+        self,
+        collection: str,
+        hnsw_m: int = 16,
+        hnsw_ef_construct: int = 128,
+        hnsw_ef: Optional[int] = 64,
+        quantization: Optional[str] = "scalar",
+        quantization_quantile: float = 0.99,
+        quantization_always_ram: bool = True,
+        rescore_oversampling: float = 2.0,
+        on_disk: bool = False,
+        payload_indexes=DEFAULT_PAYLOAD_INDEXES,
+        tenant: Optional[str] = None,
+        **kwargs: Any,
+    ):
+        super().__init__(collection=collection, **kwargs)
+        self.hnsw_m = hnsw_m
+        self.hnsw_ef_construct = hnsw_ef_construct
+        self.hnsw_ef = hnsw_ef
+        self.quantization = quantization
+        self.quantization_quantile = quantization_quantile
+        self.quantization_always_ram = quantization_always_ram
+        self.rescore_oversampling = rescore_oversampling
+        self.on_disk = on_disk
+        self.payload_indexes = tuple(payload_indexes)
+        self.tenant = tenant
+        self._init_kwargs = dict(kwargs, collection=collection, hnsw_m=hnsw_m, hnsw_ef_construct=hnsw_ef_construct,
+                                 hnsw_ef=hnsw_ef, quantization=quantization, quantization_quantile=quantization_quantile,
+                                 quantization_always_ram=quantization_always_ram,
+                                 rescore_oversampling=rescore_oversampling, on_disk=on_disk,
+                                 payload_indexes=payload_indexes)
+
+    @property
+    def is_local(self) -> bool:
+        return self.path is not None or self.location == ":memory:"
+
+    def _tenant_collection(self, tenant: str) -> str:
+        return f"{self.collection}{TENANT_SEPARATOR}{re.sub(r'[^a-zA-Z0-9_-]', '-', tenant)}"
+
+    def for_tenant(self, tenant: str) -> "TunedQdrant":
+        """This collection restricted to one customer, sharing the client"""
+        if self.is_local:
+            view = TunedQdrant(**dict(self._init_kwargs, collection=self._tenant_collection(tenant)))
+        else:
+            view = TunedQdrant(tenant=tenant, **self._init_kwargs)
+        view._client = self.client
+        return view
+
+    def _distance(self) -> "models.Distance":
+        if self.distance == Distance.l2:
+            return models.Distance.EUCLID
+        if self.distance == Distance.max_inner_product:
+            return models.Distance.DOT
+        return models.Distance.COSINE
+
+    def create(self) -> None:
+        if self.exists():
+            return
+        quantization_config = None
+        if self.quantization == "scalar":
+            quantization_config = models.ScalarQuantization(
+                scalar=models.ScalarQuantizationConfig(
+                    type=models.ScalarType.INT8,
+                    quantile=self.quantization_quantile,
+                    always_ram=self.quantization_always_ram,
+                )
+            )
+        self.client.create_collection(
+            collection_name=self.collection,
+            vectors_config=models.VectorParams(size=self.dimensions, distance=self._distance(), on_disk=self.on_disk),
+            hnsw_config=models.HnswConfigDiff(m=self.hnsw_m, ef_construct=self.hnsw_ef_construct),
+            quantization_config=quantization_config,
+        )
+        for field in self.payload_indexes:
+            schema = models.KeywordIndexParams(type=models.KeywordIndexType.KEYWORD, is_tenant=field == "customer_id")
+            self.client.create_payload_index(
+                collection_name=self.collection, field_name=f"meta_data.{field}", field_schema=schema
+            )
+
+    def _distance_from_score(self, score: float) -> float:
+        """Qdrant's score as the distance Chroma reports in the same space (lower is closer)"""
+        metric = self._distance()
+        if metric == models.Distance.EUCLID:
+            # Qdrant scores by L2 distance, Chroma's l2 space reports it squared
+            return score * score
+        # Cosine similarity and dot product: higher is closer
+        return 1 - score
+
+    def _tenant_filters(self, filters: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        filters = dict(filters or {})
+        if self.tenant is not None:
+            filters["customer_id"] = self.tenant
+        return filters
+
+    def _search_params(self) -> "models.SearchParams":
+        quantization = None
+        if self.quantization:
+            quantization = models.QuantizationSearchParams(rescore=True, oversampling=self.rescore_oversampling)
+        return models.SearchParams(hnsw_ef=self.hnsw_ef, quantization=quantization)
+
+    def search(self, query: str, limit: int = 5, filters: Optional[Dict[str, Any]] = None) -> List[Document]:
+        query_embedding = self.embedder.get_embedding(query)
+        response = self.client.query_points(
+            collection_name=self.collection,
+            query=query_embedding,
+            query_filter=self._format_filters(self._tenant_filters(filters)),
+            search_params=self._search_params(),
+            with_payload=True,
+            limit=limit,
+        )
+        documents = []
+        for point in response.points:
+            if point.payload is None:
+                continue
+            meta_data = dict(point.payload["meta_data"], distances=self._distance_from_score(point.score))
+            documents.append(Document(
+                # Point ids are the md5 content hash in UUID form; keep the plain hash like Chroma does
+                id=str(point.id).replace("-", ""),
+                name=point.payload["name"],
+                meta_data=meta_data,
+                content=point.payload["content"],
+                usage=point.payload.get("usage"),
+            ))
+        if self.reranker:
+            documents = self.reranker.rerank(query=query, documents=documents)
+        return documents
+
+    async def async_search(self, query: str, limit: int = 5, filters: Optional[Dict[str, Any]] = None) -> List[Document]:
+        """``search`` off the event loop, with the same tenant filter and search parameters"""
+        return await asyncio.to_thread(self.search, query, limit, filters)
+
+    def existing_ids(self, ids: List[str]) -> set:
+        """Which of the given document ids are stored, in one request"""
+        if not self.exists():
+            return set()
+        points = self.client.retrieve(collection_name=self.collection, ids=list(dict.fromkeys(ids)),
+                                      with_payload=False, with_vectors=False)
+        return {str(point.id).replace("-", "") for point in points}
+
+    def all_ids(self) -> set:
+        """Every document id in this collection (or tenant), scrolled in pages"""
+        if not self.exists():
+            return set()
+        ids, offset = set(), None
+        while True:
+            points, offset = self.client.scroll(
+                collection_name=self.collection, scroll_filter=self._format_filters(self._tenant_filters(None)),
+                limit=1024, offset=offset, with_payload=False, with_vectors=False,
+            )
+            ids.update(str(point.id).replace("-", "") for point in points)
+            if offset is None:
+                return ids
+
+    def dump(self, batch_size: int = 1024) -> Iterator[Tuple[List[str], List[Optional[str]], List[str], List[Dict], List]]:
+        """Pages of (ids, names, contents, meta data, vectors) of every point in this collection (or tenant)"""
+        if not self.exists():
+            return
+        offset = None
+        while True:
+            points, offset = self.client.scroll(
+                collection_name=self.collection, scroll_filter=self._format_filters(self._tenant_filters(None)),
+                limit=batch_size, offset=offset, with_payload=True, with_vectors=True,
+            )
+            points = [point for point in points if point.payload is not None]
+            yield ([str(point.id).replace("-", "") for point in points], [point.payload.get("name") for point in points],
+                   [point.payload["content"] for point in points], [point.payload["meta_data"] for point in points],
+                   [point.vector for point in points])
+            if offset is None:
+                return
+
+    def delete_ids(self, ids: List[str]) -> None:
+        if ids:
+            self.client.delete(collection_name=self.collection, points_selector=models.PointIdsList(points=list(ids)))
+
+    def tenants(self) -> List[str]:
+        """Customers with documents in the collection"""
+        if self.is_local:
+            prefix = f"{self.collection}{TENANT_SEPARATOR}"
+            names = [collection.name for collection in self.client.get_collections().collections]
+            return sorted(name[len(prefix):] for name in names if name.startswith(prefix))
+        if not self.exists():
+            return []
+        response = self.client.facet(collection_name=self.collection, key="meta_data.customer_id", limit=1_000_000)
+        return sorted(str(hit.value) for hit in response.hits)
+
+    def exists(self) -> bool:
+        return self.client.collection_exists(collection_name=self.collection)
+
+    def drop(self) -> None:
+        if not self.exists():
+            return
+        if self.tenant is None:
+            self.client.delete_collection(self.collection)
+            return
+        self.client.delete(
+            collection_name=self.collection,
+            points_selector=models.FilterSelector(filter=self._format_filters(self._tenant_filters(None))),
+        )
+
+    def get_count(self) -> int:
+        return self.client.count(
+            collection_name=self.collection, count_filter=self._format_filters(self._tenant_filters(None)), exact=True
+        ).count
@@ -0,0 +1,391 @@
+import asyncio
+import heapq
+import itertools
+import json
+import os
+import random
+import re
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Optional
+
+import httpx
+
+from agents.shared.requestContext import RequestCancelled, cancellation_reason, remaining_time
+from agents.shared.usageLedger import call_usage, record_call
+
+# Lower runs first: user-facing routing and answers, then memory upkeep, then embedding
+PRIORITIES = {"answer": 0, "analytics": 0, "router": 0, "memory": 1, "embedding": 2}
+
+# How often a queued call re-checks whether its request was cancelled
+CANCEL_POLL_SECONDS = 0.25
+
+# Completion tokens assumed when a request does not set max_tokens
+DEFAULT_COMPLETION_TOKENS = 512
+
+_DEPLOYMENT_PATTERN = re.compile(r"/openai/deployments/([^/]+)/")
+
+# Request extension holding a threading.Event set when the call is no longer wanted (a hedged call
+# whose other attempt answered first); checked like request cancellation while the call is queued
+ATTEMPT_CANCELLED = "vaultmate_attempt_cancelled"
+
+
+class TokenBucket:
+    """Refills ``limit`` units per minute, holding at most a 10 second share (Azure enforces limits per 10s window)"""
+
+    def __init__(self, limit_per_minute: float, clock: Callable[[], float] = time.monotonic):
+        self.rate = limit_per_minute / 60.0
+        self.capacity = max(1.0, limit_per_minute / 6.0)
+        self.level = self.capacity
+        self.updated = clock()
+
+    def _refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, amount: float, now: float) -> float:
+        """Seconds until ``amount`` (capped at capacity) is available"""
+        self._refill(now)
+        missing = min(amount, self.capacity) - self.level
+        return max(0.0, missing / self.rate) if self.rate else 0.0
+
+    def take(self, amount: float) -> None:
+        # May go negative when a request used more than estimated; later requests wait it out
+        self.level -= amount
+
+
+class DeploymentLimiter:
+    """Request and token buckets for one deployment, granting waiting calls in priority order"""
+
+    def __init__(self, name: str, rpm: Optional[float] = None, tpm: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.rpm, self.tpm = rpm, tpm
+        self.clock = clock
+        self.requests = TokenBucket(rpm, clock) if rpm else None
+        self.tokens = TokenBucket(tpm, clock) if tpm else None
+        self.paused_until = 0.0
+        self._condition = threading.Condition()
+        self._waiting = []
+        self._sequence = itertools.count()
+        self.in_flight = 0
+        self.granted = 0
+        self.throttled = 0
+        self.failed = 0
+        self.estimated_tokens = 0
+        self.used_tokens = 0
+        self.waits = deque(maxlen=1000)
+
+    def _delay(self, tokens: float, now: float) -> float:
+        delays = [self.paused_until - now]
+        if self.requests is not None:
+            delays.append(self.requests.delay(1, now))
+        if self.tokens is not None:
+            delays.append(self.tokens.delay(tokens, now))
+        return max(delays)
+
+    def acquire(self, tokens: int, priority: int = 0, cancelled: Optional[Callable[[], Optional[str]]] = None) -> float:
+        """Block until the call may be sent; returns the seconds waited.
+
+        ``cancelled`` is polled while queued; when it returns a reason the call leaves the
+        queue with RequestCancelled.
+        """
+        start = self.clock()
+        poll = CANCEL_POLL_SECONDS if cancelled is not None else None
+        with self._condition:
+            ticket = (priority, next(self._sequence))
+            heapq.heappush(self._waiting, ticket)
+            try:
+                while True:
+                    reason = cancelled() if cancelled is not None else None
+                    if reason is not None:
+                        raise RequestCancelled(f"{reason} while queued for {self.name}")
+                    if self._waiting[0] == ticket:
+                        delay = self._delay(tokens, self.clock())
+                        if delay <= 0:
+                            break
+                        self._condition.wait(timeout=min(delay, poll) if poll else delay)
+                    else:
+                        self._condition.wait(timeout=poll)
+                if self.requests is not None:
+                    self.requests.take(1)
+                if self.tokens is not None:
+                    self.tokens.take(tokens)
+                self.in_flight += 1
+                self.granted += 1
+                self.estimated_tokens += tokens
+            finally:
+                self._waiting.remove(ticket)
+                heapq.heapify(self._waiting)
+                self._condition.notify_all()
+        waited = self.clock() - start
+        self.waits.append(waited)
+        return waited
+
+    def release(self, estimated: int, used: Optional[int] = None) -> None:
+        """Finish a call, charging or refunding the difference between estimated and actual tokens"""
+        with self._condition:
+            self.in_flight -= 1
+            if used is not None:
+                self.used_tokens += used
+                if self.tokens is not None:
+                    self.tokens.take(used - estimated)
+            self._condition.notify_all()
+
+    def throttle(self, seconds: float) -> None:
+        """Hold every call to this deployment for ``seconds`` after a 429"""
+        with self._condition:
+            self.throttled += 1
+            self.paused_until = max(self.paused_until, self.clock() + seconds)
+            self._condition.notify_all()
+
+    def exhausted(self) -> None:
+        """Count a call that was still throttled after its last retry"""
+        with self._condition:
+            self.failed += 1
+
+    def describe(self) -> Dict[str, Any]:
+        waits = sorted(self.waits)
+        queued = {}
+        for priority, _ in list(self._waiting):
+            name = next((name for name, value in PRIORITIES.items() if value == priority), str(priority))
+            queued[name] = queued.get(name, 0) + 1
+        return {
+            "rpm": self.rpm,
+            "tpm": self.tpm,
+            "queue_depth": len(self._waiting),
+            "queued_by_priority": queued,
+            "in_flight": self.in_flight,
+            "requests": self.granted,
+            "throttled_429": self.throttled,
+            "failed_after_retries": self.failed,
+            "paused_for_seconds": round(max(0.0, self.paused_until - self.clock()), 3),
+            "estimated_tokens": self.estimated_tokens,
+            "used_tokens": self.used_tokens,
+            "wait_seconds_p50": round(waits[len(waits) // 2], 3) if waits else 0.0,
+            "wait_seconds_p95": round(waits[int(len(waits) * 0.95)], 3) if waits else 0.0,
+            "wait_seconds_max": round(waits[-1], 3) if waits else 0.0,
+        }
+
+
+def _env_limit(name: str, deployment: str) -> Optional[float]:
+    """``<NAME>_<DEPLOYMENT>`` (deployment upper-cased, non-alphanumerics as _) or ``<NAME>``"""
+    suffix = re.sub(r"[^A-Z0-9]", "_", deployment.upper())
+    value = os.getenv(f"{name}_{suffix}") or os.getenv(name)
+    return float(value) if value else None
+
+
+class RateLimitScheduler:
+    """Process-wide rate limits for Azure OpenAI, one limiter per deployment.
+
+    Limits come from ``AZURE_OPENAI_RPM`` / ``AZURE_OPENAI_TPM``, overridable per deployment
+    (``AZURE_OPENAI_TPM_GPT_4O=...``); without them calls are only counted. A 429 pauses
+    the whole deployment for its retry-after (or exponential backoff) with jitter before
+    the call is retried, so concurrent callers do not retry into the same wall.
+    """
+
+    def __init__(self, max_attempts: int = 5, base_backoff: float = 1.0, max_backoff: float = 30.0):
+        self.max_attempts = max_attempts
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self._limiters: Dict[str, DeploymentLimiter] = {}
+        self._lock = threading.Lock()
+
+    def limiter(self, deployment: str) -> DeploymentLimiter:
+        with self._lock:
+            if deployment not in self._limiters:
+                self._limiters[deployment] = DeploymentLimiter(
+                    deployment, rpm=_env_limit("AZURE_OPENAI_RPM", deployment),
+                    tpm=_env_limit("AZURE_OPENAI_TPM", deployment))
+            return self._limiters[deployment]
+
+    def backoff(self, response: httpx.Response, attempt: int) -> float:
+        """Seconds to pause after a 429: the server's retry-after if given, else exponential; jittered"""
+        delay = None
+        for header, scale in (("retry-after-ms", 0.001), ("retry-after", 1.0)):
+            try:
+                delay = float(response.headers[header]) * scale
+                break
+            except (KeyError, ValueError):
+                continue
+        if delay is None:
+            delay = min(self.max_backoff, self.base_backoff * 2 ** attempt)
+        return delay * random.uniform(1.0, 1.5)
+
+    def describe(self) -> Dict[str, Any]:
+        with self._lock:
+            limiters = dict(self._limiters)
+        return {name: limiter.describe() for name, limiter in limiters.items()}
+
+
+# Shared by every model and embedder in the process
+scheduler = RateLimitScheduler(max_attempts=int(os.getenv("AZURE_OPENAI_MAX_ATTEMPTS", "5")))
+
+
+def estimate_tokens(body: bytes) -> int:
+    """Rough prompt + completion tokens of a chat or embeddings request body (4 characters per token)"""
+    try:
+        payload = json.loads(body or b"{}")
+    except ValueError:
+        return DEFAULT_COMPLETION_TOKENS
+    if "input" in payload:
+        inputs = payload["input"] if isinstance(payload["input"], list) else [payload["input"]]
+        return max(1, sum(len(str(text)) for text in inputs) // 4)
+    prompt = len(json.dumps(payload.get("messages", []))) + len(json.dumps(payload.get("tools", [])))
+    completion = payload.get("max_completion_tokens") or payload.get("max_tokens") or DEFAULT_COMPLETION_TOKENS
+    return prompt // 4 + int(completion)
+
+
+def _bound_timeout(request: httpx.Request) -> None:
+    """Cap the request's timeouts at the time left before the current request's deadline"""
+    remaining = remaining_time()
+    if remaining is None:
+        return
+    timeout = dict(request.extensions.get("timeout") or {})
+    for key in ("connect", "read", "write", "pool"):
+        timeout[key] = max(0.001, min(timeout.get(key) or remaining, remaining))
+    request.extensions["timeout"] = timeout
+
+
+def deployment_name(request: httpx.Request) -> Optional[str]:
+    """Azure OpenAI deployment a request is for, or None for any other URL"""
+    match = _DEPLOYMENT_PATTERN.search(request.url.path)
+    return match.group(1) if match else None
+
+
+def with_deployment(request: httpx.Request, deployment: str) -> httpx.Request:
+    """Copy of an Azure OpenAI request sent to another deployment of the same resource"""
+    path = _DEPLOYMENT_PATTERN.sub(f"/openai/deployments/{deployment}/", request.url.path, count=1)
+    return httpx.Request(request.method, request.url.copy_with(path=path), headers=request.headers,
+                         content=request.content, extensions=dict(request.extensions))
+
+
+def _cancellation(request: httpx.Request) -> Callable[[], Optional[str]]:
+    """Why a queued call should give up: its request was cancelled, or its attempt is no longer wanted"""
+    unwanted = request.extensions.get(ATTEMPT_CANCELLED)
+
+    def reason() -> Optional[str]:
+        if unwanted is not None and unwanted.is_set():
+            return "Hedged call already answered"
+        return cancellation_reason()
+    return reason
+
+
+def _schedule(request: httpx.Request):
+    """(limiter, estimated tokens, streamed) for an Azure OpenAI request, or None for anything else"""
+    deployment = deployment_name(request)
+    if deployment is None:
+        return None
+    # Work for a request that was cancelled or ran out of time is not sent at all
+    reason = _cancellation(request)()
+    if reason is not None:
+        raise RequestCancelled(reason)
+    body = request.content
+    streamed = b'"stream": true' in body or b'"stream":true' in body
+    return scheduler.limiter(deployment), estimate_tokens(body), streamed
+
+
+def _finish(transport, limiter: DeploymentLimiter, estimate: int, response: Optional[httpx.Response],
+            streamed: bool, sent: float, waited: float) -> None:
+    """Release a call's grant, charging the tokens it reported, and record it in the usage ledger"""
+    usage = {} if streamed or response is None else call_usage(response)
+    used = None if usage.get("prompt_tokens") is None else usage["prompt_tokens"] + usage["completion_tokens"]
+    limiter.release(estimate, used)
+    record_call(usage, response.status_code if response is not None else 0, transport.role, transport.label,
+                limiter.name, time.monotonic() - sent, waited)
+
+
+class ScheduledTransport(httpx.BaseTransport):
+    """httpx transport that waits for the scheduler before each Azure OpenAI call and retries 429s.
+
+    ``label`` names the agent the calls are made for in the usage ledger.
+    """
+
+    def __init__(self, priority: str = "answer", transport: Optional[httpx.BaseTransport] = None,
+                 label: Optional[str] = None):
+        self.role = priority
+        self.priority = PRIORITIES[priority]
+        self.label = label
+        self.transport = transport or httpx.HTTPTransport()
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        scheduled = _schedule(request)
+        if scheduled is None:
+            return self.transport.handle_request(request)
+        limiter, estimate, streamed = scheduled
+        waited = 0.0
+        for attempt in range(scheduler.max_attempts):
+            waited += limiter.acquire(estimate, self.priority, _cancellation(request))
+            _bound_timeout(request)
+            sent = time.monotonic()
+            try:
+                response = self.transport.handle_request(request)
+            except Exception:
+                _finish(self, limiter, estimate, None, streamed, sent, waited)
+                raise
+            if response.status_code != 429 or attempt == scheduler.max_attempts - 1:
+                if response.status_code == 429:
+                    limiter.exhausted()
+                if not streamed:
+                    response.read()
+                _finish(self, limiter, estimate, response, streamed, sent, waited)
+                return response
+            response.read()
+            response.close()
+            limiter.release(estimate)
+            limiter.throttle(scheduler.backoff(response, attempt))
+
+    def close(self) -> None:
+        self.transport.close()
+
+
+class AsyncScheduledTransport(httpx.AsyncBaseTransport):
+    """Async counterpart of ScheduledTransport; waiting happens off the event loop"""
+
+    def __init__(self, priority: str = "answer", transport: Optional[httpx.AsyncBaseTransport] = None,
+                 label: Optional[str] = None):
+        self.role = priority
+        self.priority = PRIORITIES[priority]
+        self.label = label
+        self.transport = transport or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        scheduled = _schedule(request)
+        if scheduled is None:
+            return await self.transport.handle_async_request(request)
+        limiter, estimate, streamed = scheduled
+        waited = 0.0
+        for attempt in range(scheduler.max_attempts):
+            # to_thread copies the request context, so cancellation is still seen while queued
+            waited += await asyncio.to_thread(limiter.acquire, estimate, self.priority, _cancellation(request))
+            _bound_timeout(request)
+            sent = time.monotonic()
+            try:
+                response = await self.transport.handle_async_request(request)
+            except Exception:
+                _finish(self, limiter, estimate, None, streamed, sent, waited)
+                raise
+            if response.status_code != 429 or attempt == scheduler.max_attempts - 1:
+                if response.status_code == 429:
+                    limiter.exhausted()
+                if not streamed:
+                    await response.aread()
+                _finish(self, limiter, estimate, response, streamed, sent, waited)
+                return response
+            await response.aread()
+            await response.aclose()
+            limiter.release(estimate)
+            limiter.throttle(scheduler.backoff(response, attempt))
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+
+def scheduled_http_client(priority: str = "answer", label: Optional[str] = None) -> httpx.Client:
+    return httpx.Client(transport=ScheduledTransport(priority, label=label), timeout=httpx.Timeout(600.0, connect=5.0))
+
+
+def scheduled_async_http_client(priority: str = "answer", label: Optional[str] = None) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=AsyncScheduledTransport(priority, label=label),
+                             timeout=httpx.Timeout(600.0, connect=5.0))
@@ -0,0 +1,108 @@
+import itertools
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Dict, Iterator, Optional
+
+_CUSTOMER_ID_PATTERN = re.compile(r"^CUST\d+$")
+
+
+@dataclass(frozen=True)
+class RequestContext:
+    """Who a request is for, visible to knowledge searches and tools running on its behalf"""
+    user_id: Optional[str] = None
+    customer_id: Optional[str] = None
+    session_id: Optional[str] = None
+    endpoint: Optional[str] = None
+    # What the user asked, for recalling the memories relevant to it
+    message: Optional[str] = None
+    # time.monotonic() after which work for the request is abandoned
+    deadline: Optional[float] = None
+    # Set when the client goes away
+    cancelled: Optional[threading.Event] = None
+    # Numbers the request's model and embedding calls 1, 2, ... in the order they are sent (their hop)
+    calls: Optional[Iterator[int]] = None
+
+
+class RequestCancelled(Exception):
+    """The request's deadline passed or its client disconnected; ``partial`` holds any answer produced so far"""
+
+    def __init__(self, reason: str, partial: Optional[str] = None):
+        super().__init__(reason)
+        self.partial = partial
+
+
+_current_request: ContextVar[RequestContext] = ContextVar("vaultmate_request", default=RequestContext())
+
+
+def customer_id_map() -> Dict[str, str]:
+    """User id -> customer id pairs from CUSTOMER_ID_MAP, e.g. ``web_user=CUST0001,api_user=CUST0002``"""
+    pairs = (item.split("=", 1) for item in os.getenv("CUSTOMER_ID_MAP", "").split(",") if "=" in item)
+    return {user.strip(): customer.strip() for user, customer in pairs if user.strip() and customer.strip()}
+
+
+def resolve_customer_id(user_id: Optional[str]) -> Optional[str]:
+    """Map a user id to the customer whose data it may see; None for a user that maps to no customer"""
+    if not user_id:
+        return None
+    if _CUSTOMER_ID_PATTERN.match(user_id):
+        return user_id
+    return customer_id_map().get(user_id)
+
+
+def current_request() -> RequestContext:
+    return _current_request.get()
+
+
+def current_customer_id() -> Optional[str]:
+    """Customer of the request being served; None when its user maps to no customer"""
+    context = _current_request.get()
+    return context.customer_id or resolve_customer_id(context.user_id)
+
+
+def remaining_time() -> Optional[float]:
+    """Seconds left before the current request's deadline, or None without one"""
+    deadline = _current_request.get().deadline
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def cancellation_reason() -> Optional[str]:
+    context = _current_request.get()
+    if context.cancelled is not None and context.cancelled.is_set():
+        return "Client disconnected"
+    if context.deadline is not None and time.monotonic() >= context.deadline:
+        return "Request deadline exceeded"
+    return None
+
+
+def check_cancelled() -> None:
+    """Raise RequestCancelled if the current request should stop; called before model, embedding and search work"""
+    reason = cancellation_reason()
+    if reason is not None:
+        raise RequestCancelled(reason)
+
+
+@contextmanager
+def request_scope(user_id: Optional[str] = None, customer_id: Optional[str] = None,
+                  session_id: Optional[str] = None, endpoint: Optional[str] = None, message: Optional[str] = None,
+                  timeout: Optional[float] = None, cancelled: Optional[threading.Event] = None) -> Iterator[RequestContext]:
+    """Bind a request context for the duration of an agent run, optionally with a deadline ``timeout`` seconds away"""
+    context = RequestContext(
+        user_id=user_id,
+        customer_id=customer_id or resolve_customer_id(user_id),
+        session_id=session_id,
+        endpoint=endpoint,
+        message=message,
+        deadline=None if timeout is None else time.monotonic() + timeout,
+        cancelled=cancelled,
+        calls=itertools.count(1),
+    )
+    token = _current_request.set(context)
+    try:
+        yield context
+    finally:
+        _current_request.reset(token)
@@ -0,0 +1,132 @@
+import math
+import os
+import re
+import threading
+from typing import Any, Dict, List, Optional
+
+from agno.document import Document
+from agno.reranker.base import Reranker
+
+from agents.shared.lexicalIndex import STOPWORDS
+
+_WORD_PATTERN = re.compile(r"[A-Za-z]+|\d+")
+_CAMEL_PATTERN = re.compile(r"([a-z])([A-Z])")
+
+# Loaded fastembed cross-encoders, shared by every reranker with the same settings
+_cross_encoders: Dict[str, Any] = {}
+_cross_encoders_lock = threading.Lock()
+
+
+def _terms(text: str) -> List[str]:
+    """Lower-cased words with camelCase keys split and plural 's' dropped"""
+    terms = []
+    for word in _WORD_PATTERN.findall(_CAMEL_PATTERN.sub(r"\1 \2", text)):
+        word = word.lower()
+        if word in STOPWORDS:
+            continue
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        terms.append(word)
+    return terms
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough prompt token count (about four characters per token for JSON and English)"""
+    return (len(text) + 3) // 4
+
+
+class LexicalOverlapReranker(Reranker):
+    """Scores each candidate by the IDF-weighted share of query terms it contains.
+
+    IDF is taken over the candidate set, so terms every candidate shares (``account`` in
+    the accounts domain) count for little. Scores fall in [0, 1].
+    """
+
+    def rerank(self, query: str, documents: List[Document]) -> List[Document]:
+        query_terms = set(_terms(query))
+        if not documents or not query_terms:
+            return documents
+        document_terms = [set(_terms(document.content)) for document in documents]
+        weights = {}
+        for term in query_terms:
+            frequency = sum(1 for terms in document_terms if term in terms)
+            weights[term] = math.log(1 + len(documents) / (frequency + 0.5))
+        total = sum(weights.values())
+        for document, terms in zip(documents, document_terms):
+            document.reranking_score = sum(weight for term, weight in weights.items() if term in terms) / total
+        return sorted(documents, key=lambda document: document.reranking_score, reverse=True)
+
+
+class CrossEncoderReranker(Reranker):
+    """Local ONNX cross-encoder (fastembed) scoring query/document pairs; scores fall in [0, 1]"""
+
+    model: str = "Xenova/ms-marco-MiniLM-L-6-v2"
+    threads: Optional[int] = None
+    cache_dir: Optional[str] = None
+    batch_size: int = 32
+
+    def _model(self):
+        model = _cross_encoders.get(self.model)
+        if model is None:
+            with _cross_encoders_lock:
+                model = _cross_encoders.get(self.model)
+                if model is None:
+                    try:
+                        from fastembed.rerank.cross_encoder import TextCrossEncoder
+                    except ImportError:
+                        raise ImportError("`fastembed` not installed, please run `pip install fastembed`")
+                    model = TextCrossEncoder(model_name=self.model, threads=self.threads, cache_dir=self.cache_dir)
+                    _cross_encoders[self.model] = model
+        return model
+
+    def rerank(self, query: str, documents: List[Document]) -> List[Document]:
+        if not documents:
+            return documents
+        try:
+            logits = list(self._model().rerank(query, [document.content for document in documents],
+                                               batch_size=self.batch_size))
+        except Exception as e:
+            print(f"Error reranking documents: {e}")
+            return documents
+        for document, logit in zip(documents, logits):
+            document.reranking_score = 1 / (1 + math.exp(-logit))
+        return sorted(documents, key=lambda document: document.reranking_score, reverse=True)
+
+
+def adaptive_top_k(documents: List[Document], max_k: int, min_k: int = 1, score_cutoff: float = 0.3,
+                   relative_cutoff: float = 0.5) -> List[Document]:
+    """Reranked documents scoring at least ``score_cutoff`` and ``relative_cutoff`` x the best.
+
+    Between ``min_k`` and ``max_k`` documents are returned, so a narrow question gets one
+    or two chunks while a broad one still gets up to ``max_k``.
+    """
+    if not documents:
+        return []
+    best = documents[0].reranking_score or 0.0
+    threshold = max(score_cutoff, best * relative_cutoff)
+    selected = [document for document in documents[:max_k] if (document.reranking_score or 0.0) >= threshold]
+    if len(selected) < min_k:
+        selected = documents[:min(min_k, max_k)]
+    return selected
+
+
+def reranker_backend() -> str:
+    """Reranker selected with RERANKER_BACKEND: lexical (default), cross-encoder or none"""
+    return os.getenv("RERANKER_BACKEND", "lexical").strip().lower()
+
+
+def create_reranker(backend: Optional[str] = None) -> Optional[Reranker]:
+    """Reranker for knowledge search, configured from RERANKER_* environment variables"""
+    backend = backend or reranker_backend()
+    if backend == "none":
+        return None
+    if backend == "lexical":
+        return LexicalOverlapReranker()
+    if backend == "cross-encoder":
+        threads = os.getenv("RERANKER_THREADS")
+        return CrossEncoderReranker(
+            model=os.getenv("RERANKER_MODEL", CrossEncoderReranker.model_fields["model"].default),
+            threads=int(threads) if threads else None,
+            cache_dir=os.getenv("FASTEMBED_CACHE_DIR"),
+        )
+    raise ValueError(f"Unknown reranker backend: {backend}")
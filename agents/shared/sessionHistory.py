@@ -0,0 +1,242 @@
+import math
+import os
+import re
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+from agno.storage.session import Session
+from agno.storage.sqlite import SqliteStorage
+from sqlalchemy import Column, Index, Integer, MetaData, String, Table, Text, bindparam, delete, select, text
+from sqlalchemy.dialects import sqlite
+
+_WORD_PATTERN = re.compile(r"\w+")
+
+
+def _text(content: Any) -> Optional[str]:
+    """Message content as display text; multimodal parts are reduced to their text"""
+    if content is None or isinstance(content, str):
+        return content or None
+    if isinstance(content, list):
+        return "\n".join(part.get("text", "") for part in content if isinstance(part, dict)) or None
+    return str(content)
+
+
+def run_question(run: Dict[str, Any]) -> Optional[str]:
+    """The user message a stored run answered (history replayed into the run is skipped)"""
+    for message in run.get("messages") or []:
+        if message.get("role") == "user" and not message.get("from_history"):
+            return _text(message.get("content"))
+    return None
+
+
+def bm25_scores(terms: List[str], contents: List[str], k1: float = 1.2, b: float = 0.75) -> List[float]:
+    """BM25 of each text for ``terms``, with IDF taken over ``contents``; negated like FTS5's bm25()"""
+    counts = [Counter(_WORD_PATTERN.findall(content.lower())) for content in contents]
+    if not counts:
+        return []
+    average = sum(sum(words.values()) for words in counts) / len(counts) or 1.0
+    idf = {}
+    for term in terms:
+        frequency = sum(1 for words in counts if words[term])
+        idf[term] = math.log(1 + (len(counts) - frequency + 0.5) / (frequency + 0.5))
+    scores = []
+    for words in counts:
+        norm = k1 * (1 - b + b * sum(words.values()) / average)
+        scores.append(-sum(idf[term] * words[term] * (k1 + 1) / (words[term] + norm) for term in terms))
+    return scores
+
+
+def match_expression(query: str) -> Optional[str]:
+    """FTS5 query matching messages that contain every word of ``query``; FTS5 syntax in the query is not interpreted"""
+    terms = dict.fromkeys(_WORD_PATTERN.findall(query.lower()))
+    return " ".join(f'"{term}"' for term in terms) or None
+
+
+class IndexedSqliteStorage(SqliteStorage):
+    """SqliteStorage that also keeps every run's question and answer in ``<table>_messages``.
+
+    agno keeps a session's runs in one JSON blob, so reading a conversation means loading and
+    parsing all of it. The messages table is indexed on (session_id, id), so ``messages`` can
+    return one page of a conversation with a keyset cursor at any depth. Rows are written as
+    sessions are saved; ``record_messages=False`` leaves that to the caller (see
+    ``FanOutTeam``, whose synthesizer sees a rewritten question).
+
+    An FTS5 index over the messages, kept in step by triggers on the table, serves ``search``.
+    BM25 is computed for the newest ``search_candidates`` matches only (default from
+    ``SEARCH_CANDIDATES``), so a common word does not mean scoring every message that contains it.
+    """
+
+    def __init__(self, table_name: str, db_file: Optional[str] = None, record_messages: bool = True,
+                 search_candidates: Optional[int] = None, **kwargs):
+        super().__init__(table_name=table_name, db_file=db_file, **kwargs)
+        self.record_messages = record_messages
+        self.search_candidates = search_candidates or int(os.getenv("SEARCH_CANDIDATES", "2000"))
+        messages_name = f"{table_name}_messages"
+        self.messages_table = Table(
+            messages_name,
+            MetaData(),
+            Column("id", Integer, primary_key=True, autoincrement=True),
+            Column("session_id", String, nullable=False),
+            Column("user_id", String),
+            Column("run_id", String),
+            Column("role", String, nullable=False),
+            Column("content", Text),
+            Column("created_at", Integer, default=lambda: int(time.time())),
+            Index(f"ix_{messages_name}_session_id", "session_id", "id"),
+            Index(f"ix_{messages_name}_run_role", "run_id", "role", unique=True),
+            Index(f"ix_{messages_name}_user_id", "user_id", "id"),
+            Index(f"ix_{messages_name}_created_at", "created_at"),
+        )
+        self.messages_table.create(self.db_engine, checkfirst=True)
+        # Tables created before an index was added
+        for index in self.messages_table.indexes:
+            index.create(self.db_engine, checkfirst=True)
+        self.fts_name = f"{messages_name}_fts"
+        self._create_search_index(messages_name)
+
+    def _create_search_index(self, messages_name: str) -> None:
+        fts = self.fts_name
+        with self.db_engine.begin() as conn:
+            exists = conn.exec_driver_sql("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+                                          (fts,)).first()
+            conn.exec_driver_sql(f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(content, content='{messages_name}', "
+                                 f"content_rowid='id', tokenize='unicode61 remove_diacritics 2')")
+            conn.exec_driver_sql(f"CREATE TRIGGER IF NOT EXISTS {fts}_insert AFTER INSERT ON {messages_name} BEGIN "
+                                 f"INSERT INTO {fts} (rowid, content) VALUES (new.id, new.content); END")
+            conn.exec_driver_sql(f"CREATE TRIGGER IF NOT EXISTS {fts}_delete AFTER DELETE ON {messages_name} BEGIN "
+                                 f"INSERT INTO {fts} ({fts}, rowid, content) VALUES ('delete', old.id, old.content); END")
+            conn.exec_driver_sql(f"CREATE TRIGGER IF NOT EXISTS {fts}_update AFTER UPDATE OF content ON {messages_name} "
+                                 f"BEGIN INSERT INTO {fts} ({fts}, rowid, content) VALUES ('delete', old.id, old.content); "
+                                 f"INSERT INTO {fts} (rowid, content) VALUES (new.id, new.content); END")
+            if not exists:
+                # Messages recorded before the index existed
+                conn.exec_driver_sql(f"INSERT INTO {fts} ({fts}) VALUES ('rebuild')")
+
+    def upsert(self, session: Session, create_and_retry: bool = True) -> Optional[Session]:
+        saved = super().upsert(session, create_and_retry=create_and_retry)
+        if saved is not None and self.record_messages:
+            self.record_runs(session.session_id, session.user_id, (getattr(session, "memory", None) or {}).get("runs"))
+        return saved
+
+    def delete_session(self, session_id: Optional[str] = None):
+        super().delete_session(session_id)
+        if session_id is not None:
+            with self.SqlSession() as sess, sess.begin():
+                sess.execute(delete(self.messages_table).where(self.messages_table.c.session_id == session_id))
+
+    def _recorded(self, run_id: str) -> bool:
+        with self.SqlSession() as sess:
+            stmt = select(self.messages_table.c.id).where(self.messages_table.c.run_id == run_id).limit(1)
+            return sess.execute(stmt).first() is not None
+
+    def record_runs(self, session_id: str, user_id: Optional[str], runs: Optional[List[Dict[str, Any]]]) -> None:
+        """Record the runs not yet in the messages table; saved sessions only ever gain runs at the end"""
+        new_runs = []
+        for run in reversed(runs or []):
+            if not run.get("run_id"):
+                continue
+            if self._recorded(run["run_id"]):
+                break
+            new_runs.append(run)
+        for run in reversed(new_runs):
+            self.record(session_id, user_id, run["run_id"], run_question(run), _text(run.get("content")),
+                        run.get("created_at"))
+
+    def record(self, session_id: str, user_id: Optional[str], run_id: str, question: Optional[str],
+               answer: Optional[str], created_at: Optional[int] = None) -> None:
+        """Append one exchange; recording the same run again is a no-op"""
+        created_at = created_at or int(time.time())
+        rows = [{"session_id": session_id, "user_id": user_id, "run_id": run_id, "role": role, "content": content,
+                 "created_at": created_at} for role, content in (("user", question), ("assistant", answer)) if content]
+        if not rows:
+            return
+        with self.SqlSession() as sess, sess.begin():
+            sess.execute(sqlite.insert(self.messages_table).prefix_with("OR IGNORE"), rows)
+
+    def messages(self, session_id: str, limit: int = 20, before: Optional[int] = None) -> Dict[str, Any]:
+        """One page of a conversation, oldest first: the ``limit`` messages preceding cursor ``before``
+        (the newest when None), with ``next_cursor`` for the page before it"""
+        table = self.messages_table
+        stmt = select(table.c.id, table.c.run_id, table.c.role, table.c.content, table.c.created_at).where(
+            table.c.session_id == session_id)
+        if before is not None:
+            stmt = stmt.where(table.c.id < before)
+        with self.SqlSession() as sess:
+            rows = sess.execute(stmt.order_by(table.c.id.desc()).limit(limit + 1)).all()
+        has_more = len(rows) > limit
+        page = [dict(row._mapping) for row in reversed(rows[:limit])]
+        return {"session_id": session_id, "messages": page, "has_more": has_more,
+                "next_cursor": page[0]["id"] if has_more else None}
+
+    def _id_at(self, created_at: int) -> Optional[int]:
+        """Id of the first message recorded at or after ``created_at``"""
+        table = self.messages_table
+        with self.SqlSession() as sess:
+            return sess.execute(select(table.c.id).where(table.c.created_at >= created_at)
+                                .order_by(table.c.created_at).limit(1)).scalar()
+
+    def _ranked(self, params: Dict[str, Any], bounds: List[str]) -> List[Tuple[int, float]]:
+        """(id, BM25) of the newest candidate matches; FTS5 computes each term's IDF once per query"""
+        fts = self.fts_name
+        where = " AND ".join([f"{fts} MATCH :match", *(bound.format(id=f"{fts}.rowid") for bound in bounds)])
+        stmt = text(f"SELECT {fts}.rowid, bm25({fts}) FROM {fts} WHERE {where} ORDER BY {fts}.rowid DESC "
+                    f"LIMIT :candidates")
+        with self.SqlSession() as sess:
+            return [tuple(row) for row in sess.execute(stmt, params)]
+
+    def _ranked_for_user(self, user_id: str, terms: List[str], params: Dict[str, Any],
+                         bounds: List[str]) -> List[Tuple[int, float]]:
+        """(id, BM25) of the user's newest candidate matches. The user's messages are walked through the
+        (user_id, id) index and each is probed in the FTS index; bm25() would recount IDF on every probe, so
+        they are scored here with IDF over the candidates."""
+        fts, messages = self.fts_name, self.messages_table.name
+        where = " AND ".join(["u.user_id = :user_id", f"{fts} MATCH :match",
+                              *(bound.format(id="u.id") for bound in bounds)])
+        stmt = text(f"SELECT u.id, u.content FROM {messages} u CROSS JOIN {fts} ON {fts}.rowid = u.id "
+                    f"WHERE {where} ORDER BY u.id DESC LIMIT :candidates")
+        with self.SqlSession() as sess:
+            rows = sess.execute(stmt, {**params, "user_id": user_id}).all()
+        scores = bm25_scores(terms, [row[1] for row in rows])
+        return [(row[0], score) for row, score in zip(rows, scores)]
+
+    def search(self, query: str, limit: int = 20, offset: int = 0, user_id: Optional[str] = None,
+               since: Optional[int] = None, until: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Messages containing every word of ``query``, best BM25 match first (``score``, lower is better), optionally
+        limited to one user and to ``since <= created_at < until``. Only the newest ``search_candidates`` matches
+        are ranked."""
+        match = match_expression(query)
+        if match is None:
+            return []
+        params = {"match": match, "candidates": max(self.search_candidates, offset + limit)}
+        # The period becomes an id range, applied while reading the indexes; ids follow the order messages were recorded in
+        bounds = []
+        if since is not None:
+            params["first_id"] = self._id_at(since)
+            if params["first_id"] is None:
+                return []
+            bounds.append("{id} >= :first_id")
+        if until is not None:
+            params["end_id"] = self._id_at(until)
+            if params["end_id"] is not None:
+                bounds.append("{id} < :end_id")
+        if user_id is None:
+            ranked = self._ranked(params, bounds)
+        else:
+            ranked = self._ranked_for_user(user_id, list(dict.fromkeys(_WORD_PATTERN.findall(query.lower()))),
+                                           params, bounds)
+        ranked = sorted(ranked, key=lambda hit: hit[1])[offset:offset + limit]
+        if not ranked:
+            return []
+        ids = [message_id for message_id, _ in ranked]
+        table, fts = self.messages_table, self.fts_name
+        # Snippets for the returned page only; they tokenize each message again
+        snippets = text(f"SELECT rowid, snippet({fts}, 0, '<mark>', '</mark>', '…', 16) FROM {fts} "
+                        f"WHERE {fts} MATCH :match AND rowid IN :ids").bindparams(bindparam("ids", expanding=True))
+        with self.SqlSession() as sess:
+            rows = {row.id: dict(row._mapping) for row in sess.execute(
+                select(table.c.id, table.c.session_id, table.c.user_id, table.c.run_id, table.c.role,
+                       table.c.created_at).where(table.c.id.in_(ids)))}
+            highlighted = dict(sess.execute(snippets, {"match": match, "ids": ids}).all())
+        return [{**rows[message_id], "snippet": highlighted.get(message_id), "score": score}
+                for message_id, score in ranked if message_id in rows]
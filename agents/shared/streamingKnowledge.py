@@ -0,0 +1,373 @@
+import asyncio
+import json
+import threading
+import time
+import tracemalloc
+from dataclasses import dataclass
+from hashlib import md5
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Set, Tuple
+
+from pydantic import Field, PrivateAttr
+
+from agno.document import Document
+from agno.knowledge.json import JSONKnowledgeBase
+from agno.reranker.base import Reranker
+from agno.vectordb.base import VectorDb
+
+from agents.shared.embedders import PrecomputedEmbedder, embed_texts
+from agents.shared.jsonStream import DEFAULT_STREAM_PATHS, JsonRecord, iter_json_records
+from agents.shared.lexicalIndex import LexicalIndex, reciprocal_rank_fusion
+from agents.shared.reranking import adaptive_top_k
+from agents.shared.requestContext import check_cancelled
+from agents.shared.vectorStores import is_chroma
+
+
+@dataclass
+class IngestStats:
+    """Throughput and memory figures for one knowledge base load"""
+    documents_read: int = 0
+    documents_written: int = 0
+    documents_removed: int = 0
+    batches: int = 0
+    seconds: float = 0.0
+    peak_memory_bytes: Optional[int] = None
+
+    @property
+    def documents_per_second(self) -> float:
+        return self.documents_read / self.seconds if self.seconds else 0.0
+
+    def describe(self) -> str:
+        text = (f"{self.documents_read} documents read, {self.documents_written} written in "
+                f"{self.batches} batches, {self.seconds:.2f}s ({self.documents_per_second:.1f} docs/s)")
+        if self.documents_removed:
+            text += f", {self.documents_removed} removed"
+        if self.peak_memory_bytes is not None:
+            text += f", peak traced memory {self.peak_memory_bytes / (1024 * 1024):.1f} MiB"
+        return text
+
+
+def document_id(content: str) -> str:
+    """Id the vector dbs derive from document content"""
+    return md5(content.replace("\x00", "\ufffd").encode()).hexdigest()
+
+
+class StreamingJSONKnowledgeBase(JSONKnowledgeBase):
+    """JSON knowledge base that streams records into the vector db in bounded batches.
+
+    Instead of embedding each file as a single document, every entity (account, card,
+    transaction, EMI schedule row, ...) becomes its own document. Large arrays are read
+    incrementally, so memory use depends on ``batch_size`` rather than on the file size.
+    """
+
+    # Arrays read one element at a time, e.g. "transactions" or "loans[].schedule"
+    stream_paths: List[str] = Field(default_factory=lambda: list(DEFAULT_STREAM_PATHS))
+    # Top-level sections that are not worth embedding (derived lookups, paging cursors, and the precomputed
+    # "summary" block, which goes stale; agents read live totals from agents.shared.summaryTools instead)
+    skip_sections: List[str] = Field(default_factory=lambda: ["indexes", "paging", "summary"])
+    # Number of documents embedded and written per vector db call
+    batch_size: int = 64
+    # Track peak Python memory with tracemalloc while loading (slows ingestion down)
+    track_memory: bool = False
+    # Figures from the most recent load
+    last_load_stats: Optional[IngestStats] = None
+    # BM25 + exact identifier index built alongside the vector db; enables hybrid search
+    lexical_index: Optional[LexicalIndex] = None
+    # Second stage over a wider candidate set; with a reranker, num_documents becomes an upper bound
+    reranker: Optional[Reranker] = None
+    # Candidates retrieved for the reranker
+    rerank_candidates: int = 30
+    # Fewest documents returned after reranking, even when none reach the cutoff
+    min_documents: int = 1
+    # Rerank score a document needs to be returned, absolute and as a fraction of the best score
+    score_cutoff: float = 0.3
+    relative_score_cutoff: float = 0.5
+
+    # Held by load and reindex, which run on startup, import and watcher threads: a reindex deletes every stored
+    # document it did not read itself, so it must not interleave with another write
+    _write_lock: threading.RLock = PrivateAttr(default_factory=threading.RLock)
+
+    def _json_files(self) -> Iterator[Tuple[Path, Dict[str, Any]]]:
+        if self.path is None:
+            raise ValueError("Path is not set")
+        if isinstance(self.path, list):
+            for item in self.path:
+                if isinstance(item, dict) and "path" in item:
+                    for _file in self._expand_path(Path(item["path"])):
+                        yield _file, item.get("metadata", {})
+            return
+        for _file in self._expand_path(Path(self.path)):
+            yield _file, {}
+
+    def _expand_path(self, _file_path: Path) -> Iterator[Path]:
+        if _file_path.is_dir():
+            for _file in sorted(_file_path.glob("**/*")):
+                if self._is_valid_json(_file):
+                    yield _file
+        elif self._is_valid_json(_file_path):
+            yield _file_path
+
+    def iter_documents(self) -> Iterator[Document]:
+        """Stream one document per entity across all configured JSON files"""
+        for _file_path, extra_metadata in self._json_files():
+            name = _file_path.name.split(".")[0]
+            customer_id: Optional[str] = None
+            current_root: Optional[int] = None
+            for record in iter_json_records(str(_file_path), self.stream_paths, self.skip_sections):
+                if record.root_index != current_root:
+                    current_root, customer_id = record.root_index, None
+                customer_id = self._customer_from_record(record) or customer_id
+                for document in self._record_documents(record, name, customer_id):
+                    if extra_metadata:
+                        document.meta_data.update(extra_metadata)
+                    yield document
+
+    @staticmethod
+    def _customer_from_record(record: JsonRecord) -> Optional[str]:
+        if record.path == ("customer",) and isinstance(record.value, dict):
+            return record.value.get("id")
+        if record.path == ("meta",) and isinstance(record.value, dict):
+            return record.value.get("customerId")
+        return None
+
+    def _record_documents(self, record: JsonRecord, name: str, customer_id: Optional[str]) -> Iterator[Document]:
+        section = ".".join(record.path) or name
+        parent_id = record.parent.get("id") if record.parent else None
+        if not record.element and isinstance(record.value, list):
+            values = record.value
+        else:
+            values = [record.value]
+        for value in values:
+            payload: Dict[str, Any] = {"section": section}
+            meta_data: Dict[str, Any] = {"section": section}
+            if customer_id:
+                payload["customerId"] = customer_id
+                meta_data["customer_id"] = customer_id
+            if parent_id:
+                payload["parentId"] = parent_id
+                meta_data["parent_id"] = str(parent_id)
+            if isinstance(value, dict) and value.get("id"):
+                meta_data["entity_id"] = str(value["id"])
+            payload["data"] = value
+            content = json.dumps(payload)
+            yield Document(name=name, id=document_id(content), meta_data=meta_data, content=content)
+
+    @property
+    def document_lists(self) -> Iterator[List[Document]]:
+        """Yield documents in lists of at most ``batch_size``"""
+        batch: List[Document] = []
+        for document in self.iter_documents():
+            batch.append(document)
+            if len(batch) >= self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    @property
+    async def async_document_lists(self) -> AsyncIterator[List[Document]]:
+        for document_list in self.document_lists:
+            yield document_list
+
+    def _route_batch(self, documents: List[Document]) -> Iterator[Tuple[VectorDb, List[Document]]]:
+        """Split a batch by the vector db each document is written to"""
+        yield self.vector_db, documents
+
+    def _lexical_partition(self, documents: List[Document]) -> Optional[str]:
+        """Partition of the lexical index a routed group of documents belongs to"""
+        return None
+
+    def _search_partition(self, filters: Optional[Dict[str, Any]]) -> Optional[str]:
+        """Partition of the lexical index searched for a query"""
+        return None
+
+    def _vector_search(self, query: str, limit: int, filters: Optional[Dict[str, Any]]) -> List[Document]:
+        return super().search(query=query, num_documents=limit, filters=filters)
+
+    def search(self, query: str, num_documents: Optional[int] = None,
+               filters: Optional[Dict[str, Any]] = None) -> List[Document]:
+        """Retrieve, then (with a reranker) rerank a wider candidate set and keep what clears the cutoff"""
+        check_cancelled()
+        limit = num_documents or self.num_documents
+        if self.reranker is None:
+            return self._retrieve(query, limit, filters)
+        candidates = self._retrieve(query, max(limit, self.rerank_candidates), filters)
+        check_cancelled()
+        reranked = self.reranker.rerank(query=query, documents=candidates)
+        return adaptive_top_k(reranked, limit, self.min_documents, self.score_cutoff, self.relative_score_cutoff)
+
+    def _retrieve(self, query: str, limit: int, filters: Optional[Dict[str, Any]]) -> List[Document]:
+        """Hybrid search: exact identifier hits short-circuit, otherwise BM25 and vector results are fused"""
+        if self.lexical_index is None:
+            return self._vector_search(query, limit, filters)
+        try:
+            partition = self._search_partition(filters)
+            lexical_filters = {key: value for key, value in (filters or {}).items() if key != "customer_id"}
+            exact = self.lexical_index.lookup_identifiers(query, limit, partition, lexical_filters)
+            if exact:
+                # The query names specific entities: answer from the index without an embedding round trip
+                if len(exact) >= limit:
+                    return exact
+                ranked = self.lexical_index.search(query, limit, partition, lexical_filters)
+                return reciprocal_rank_fusion([exact, exact, ranked], limit)
+            ranked = self.lexical_index.search(query, limit * 2, partition, lexical_filters)
+        except Exception as e:
+            print(f"Error searching lexical index: {e}")
+            return self._vector_search(query, limit, filters)
+        return reciprocal_rank_fusion([self._vector_search(query, limit * 2, filters), ranked], limit)
+
+    async def async_search(self, query: str, num_documents: Optional[int] = None,
+                           filters: Optional[Dict[str, Any]] = None) -> List[Document]:
+        return await asyncio.to_thread(self.search, query, num_documents, filters)
+
+    @staticmethod
+    def _existing_ids(vector_db: VectorDb, documents: List[Document]) -> set:
+        """Ids of documents already stored, checked with one query per batch where supported"""
+        ids = [document_id(doc.content) for doc in documents]
+        if hasattr(vector_db, "existing_ids"):
+            return vector_db.existing_ids(ids)
+        if is_chroma(vector_db):
+            if not vector_db.exists():
+                return set()
+            collection = vector_db.client.get_collection(name=vector_db.collection_name)
+            return set(collection.get(ids=list(dict.fromkeys(ids)), include=[])["ids"])
+        return {_id for _id, doc in zip(ids, documents) if vector_db.doc_exists(doc)}
+
+    @staticmethod
+    def _write_batch(vector_db: VectorDb, documents: List[Document], upsert: bool) -> None:
+        """Embed a batch with one embedder call and write it with one vector db call"""
+        embedder = vector_db.embedder
+        contents = [doc.content for doc in documents]
+        embeddings, usages = embed_texts(embedder, contents)
+        vector_db.embedder = PrecomputedEmbedder(
+            embedder=embedder,
+            embeddings={content: (embedding, usage) for content, embedding, usage in zip(contents, embeddings, usages)},
+        )
+        try:
+            if upsert:
+                vector_db.upsert(documents=documents)
+            else:
+                vector_db.insert(documents=documents)
+        finally:
+            vector_db.embedder = embedder
+
+    def source_version(self) -> Tuple:
+        """(file, size, mtime) of every source file; changes when a file is edited, added or removed"""
+        return tuple((str(_file), _file.stat().st_size, _file.stat().st_mtime_ns) for _file, _ in self._json_files())
+
+    def _target_dbs(self) -> Iterator[Tuple[Optional[str], VectorDb]]:
+        """Every vector db documents can be stored in, with the lexical partition it pairs with"""
+        yield None, self.vector_db
+
+    def _partition_db(self, partition: Optional[str]) -> VectorDb:
+        """The vector db paired with a lexical partition"""
+        return self.vector_db
+
+    @staticmethod
+    def _stored_ids(vector_db: VectorDb) -> Optional[Set[str]]:
+        """All document ids in a vector db, or None when the backend cannot list them"""
+        if hasattr(vector_db, "all_ids"):
+            return vector_db.all_ids()
+        if is_chroma(vector_db):
+            if not vector_db.exists():
+                return set()
+            collection = vector_db.client.get_collection(name=vector_db.collection_name)
+            return set(collection.get(include=[])["ids"])
+        return None
+
+    @staticmethod
+    def _delete_ids(vector_db: VectorDb, ids: List[str]) -> None:
+        if hasattr(vector_db, "delete_ids"):
+            vector_db.delete_ids(ids)
+        elif is_chroma(vector_db):
+            vector_db.client.get_collection(name=vector_db.collection_name).delete(ids=ids)
+
+    def _ingest(self, use_upsert: bool, skip_existing: bool,
+                current_ids: Optional[Dict[Optional[str], Set[str]]] = None) -> IngestStats:
+        """Stream every document through the vector dbs and lexical index, collecting ids per partition if asked"""
+        stats = IngestStats()
+        started_tracing = self.track_memory and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        if self.track_memory:
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            for document_list in self.document_lists:
+                stats.documents_read += len(document_list)
+                for doc in document_list:
+                    self._track_metadata_structure(doc.meta_data)
+
+                for vector_db, documents in self._route_batch(document_list):
+                    partition = self._lexical_partition(documents)
+                    if current_ids is not None:
+                        current_ids.setdefault(partition, set()).update(doc.id for doc in documents)
+                    documents_to_load = documents
+                    if not use_upsert and skip_existing:
+                        existing = self._existing_ids(vector_db, documents)
+                        seen = set()
+                        documents_to_load = []
+                        for doc in documents:
+                            if doc.id not in existing and doc.id not in seen:
+                                seen.add(doc.id)
+                                documents_to_load.append(doc)
+
+                    if documents_to_load:
+                        self._write_batch(vector_db, documents_to_load, upsert=use_upsert)
+                        stats.documents_written += len(documents_to_load)
+                    if self.lexical_index is not None:
+                        self.lexical_index.add(documents, partition=partition)
+                stats.batches += 1
+        finally:
+            stats.seconds = time.perf_counter() - start
+            if self.track_memory:
+                stats.peak_memory_bytes = tracemalloc.get_traced_memory()[1]
+            if started_tracing:
+                tracemalloc.stop()
+            self.last_load_stats = stats
+        return stats
+
+    def load(self, recreate: bool = False, upsert: bool = False, skip_existing: bool = True) -> None:
+        """Stream the JSON files into the vector db, embedding and writing one batch at a time"""
+        if self.vector_db is None:
+            print("No vector db provided, skipping knowledge base load")
+            return
+
+        with self._write_lock:
+            if recreate:
+                self.vector_db.drop()
+                if self.lexical_index is not None:
+                    self.lexical_index.clear()
+            if not self.vector_db.exists():
+                self.vector_db.create()
+
+            stats = self._ingest(use_upsert=upsert and self.vector_db.upsert_available(), skip_existing=skip_existing)
+        print(f"Knowledge base load complete: {stats.describe()}")
+
+    def reindex(self) -> IngestStats:
+        """Bring the indexes in line with the source files while they keep serving searches.
+
+        Documents are keyed by a hash of their content, so only new or changed records are
+        embedded; documents whose record changed or disappeared are deleted afterwards, so a
+        search always finds the old or the new version of a changed record.
+        """
+        if self.vector_db is None:
+            raise ValueError("No vector db provided")
+        with self._write_lock:
+            if not self.vector_db.exists():
+                self.vector_db.create()
+            current_ids: Dict[Optional[str], Set[str]] = {}
+            stats = self._ingest(use_upsert=False, skip_existing=True, current_ids=current_ids)
+            start = time.perf_counter()
+            for partition, vector_db in self._target_dbs():
+                keep = current_ids.get(partition, set())
+                stored = self._stored_ids(vector_db)
+                if stored:
+                    stale = list(stored - keep)
+                    if stale:
+                        self._delete_ids(vector_db, stale)
+                        stats.documents_removed += len(stale)
+                if self.lexical_index is not None:
+                    self.lexical_index.remove(self.lexical_index.ids(partition) - keep, partition)
+            stats.seconds += time.perf_counter() - start
+        return stats
@@ -0,0 +1,56 @@
+import json
+from typing import Optional
+
+from agno.tools import Toolkit
+
+from agents.shared.bankingData import core_banking_records, transaction_records
+from agents.shared.materializedSummary import SECTIONS, SummaryStore
+
+# One view per customer for the whole process, shared by every agent that summarizes
+financial_summaries = SummaryStore(core_banking_records, transaction_records)
+
+
+class FinancialSummaryTools(Toolkit):
+    """Live totals (balances, cash flow, upcoming dues, points, cover, net worth) from the materialized summary view"""
+
+    def __init__(self, store: SummaryStore = financial_summaries, **kwargs):
+        self.store = store
+        super().__init__(name="financial_summary", tools=[self.get_financial_summary, self.get_cashflow], **kwargs)
+
+    def get_financial_summary(self, section: Optional[str] = None, as_of: Optional[str] = None) -> str:
+        """Get the customer's current totals, computed from their accounts, loans, investments and transactions.
+
+        Args:
+            section (str): One of balances, cashflow, upcoming, points, insuranceCoverage, netWorth. Leave empty for all.
+            as_of (str): Date (YYYY-MM-DD) the 30/90 day cash flow windows end on. Defaults to the data's generation date.
+
+        Returns:
+            str: JSON with the requested summary section(s) and the date they are as of.
+        """
+        try:
+            snapshot = self.store.snapshot(as_of=as_of)
+            if not section:
+                return json.dumps(snapshot)
+            matches = [name for name in SECTIONS if name.lower() == section.strip().lower()]
+            if not matches:
+                return json.dumps({"error": f"Unknown section {section!r}; use one of {', '.join(SECTIONS)}"})
+            return json.dumps({"asOf": snapshot["asOf"], matches[0]: snapshot[matches[0]]})
+        except Exception as e:
+            return json.dumps({"error": str(e)})
+
+    def get_cashflow(self, days: int = 30, as_of: Optional[str] = None) -> str:
+        """Get total account inflow and outflow over any number of days.
+
+        Args:
+            days (int): Length of the window in days, e.g. 7, 30, 180.
+            as_of (str): Date (YYYY-MM-DD) the window ends on. Defaults to the data's generation date.
+
+        Returns:
+            str: JSON with inflow, outflow and net for the window.
+        """
+        try:
+            totals = self.store.cashflow(int(days), as_of)
+            net = round(float(totals["inflow"]) - float(totals["outflow"]), 2)
+            return json.dumps({"days": int(days), **totals, "net": f"{net:.2f}"})
+        except Exception as e:
+            return json.dumps({"error": str(e)})
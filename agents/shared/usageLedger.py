@@ -0,0 +1,272 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import httpx
+
+from agents.shared.requestContext import current_request
+
+# Columns a rollup can group and filter by; the text ones are stored as ids into the labels table
+LABEL_COLUMNS = ("user_id", "session_id", "endpoint", "agent", "role", "deployment", "model")
+DIMENSIONS = LABEL_COLUMNS + ("hop", "day")
+
+
+def call_usage(response: httpx.Response) -> Dict[str, Optional[int]]:
+    """Prompt, completion and cached prompt tokens an Azure OpenAI response reports (None when it has no usage,
+    as for streamed responses), and the model that served it"""
+    try:
+        payload = json.loads(response.content)
+        usage = payload.get("usage") or {}
+    except (ValueError, AttributeError, httpx.ResponseNotRead):
+        payload, usage = {}, {}
+    details = usage.get("prompt_tokens_details") or {}
+    return {
+        "model": payload.get("model"),
+        "prompt_tokens": usage.get("prompt_tokens"),
+        "completion_tokens": usage.get("completion_tokens", 0 if usage else None),
+        "cached_tokens": details.get("cached_tokens", 0 if usage else None),
+    }
+
+
+def estimated_cost(model: Optional[str], prompt_tokens: Optional[int], completion_tokens: Optional[int]) -> Optional[float]:
+    """USD at list prices, with cached prompt tokens charged in full; None for an unknown model or no usage"""
+    # Imported here: models imports the transports, which import this module
+    from agents.shared.models import price_per_million
+
+    prices = price_per_million(model or "")
+    if prices is None or prompt_tokens is None:
+        return None
+    return (prompt_tokens * prices[0] + (completion_tokens or 0) * prices[1]) / 1_000_000
+
+
+class UsageLedger:
+    """Token usage and latency of every Azure OpenAI model and embedding call, for cost rollups.
+
+    One narrow row per call: timestamps and token counts are integers, and user, session,
+    endpoint, agent, role, deployment and model are ids into a table of distinct labels.
+    Calls are buffered and written in batches by a background thread, so recording one
+    never waits on SQLite; past ``max_pending`` unwritten calls new ones are dropped and counted.
+    """
+
+    def __init__(self, db_file: str, flush_interval: float = 2.0, max_pending: int = 50000):
+        self.db_file = db_file
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.dropped = 0
+        Path(db_file).parent.mkdir(parents=True, exist_ok=True)
+        self._pending: List[Dict[str, Any]] = []
+        self._pending_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._labels: Dict[str, int] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._connection = sqlite3.connect(db_file, check_same_thread=False)
+        self._connection.executescript(
+            """
+            PRAGMA journal_mode = WAL;
+            CREATE TABLE IF NOT EXISTS labels (
+                id INTEGER PRIMARY KEY,
+                value TEXT NOT NULL UNIQUE
+            );
+            CREATE TABLE IF NOT EXISTS calls (
+                id INTEGER PRIMARY KEY,
+                at INTEGER NOT NULL,
+                user_id INTEGER,
+                session_id INTEGER,
+                endpoint INTEGER,
+                agent INTEGER,
+                role INTEGER,
+                deployment INTEGER,
+                model INTEGER,
+                hop INTEGER,
+                prompt_tokens INTEGER,
+                completion_tokens INTEGER,
+                cached_tokens INTEGER,
+                latency_ms INTEGER NOT NULL,
+                wait_ms INTEGER NOT NULL,
+                status INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS calls_at ON calls (at);
+            """
+        )
+
+    def record(self, call: Dict[str, Any]) -> None:
+        """Queue one call (keys: the columns of ``calls`` except id) for the next batch write"""
+        with self._pending_lock:
+            if len(self._pending) >= self.max_pending:
+                self.dropped += 1
+                return
+            self._pending.append(call)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="usage-ledger", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except sqlite3.Error as e:
+                print(f"Error writing usage: {e}")
+
+    def _label_id(self, value: Any) -> Optional[int]:
+        if value is None:
+            return None
+        value = str(value)
+        if value not in self._labels:
+            self._connection.execute("INSERT OR IGNORE INTO labels (value) VALUES (?)", (value,))
+            self._labels[value] = self._connection.execute("SELECT id FROM labels WHERE value = ?",
+                                                           (value,)).fetchone()[0]
+        return self._labels[value]
+
+    def flush(self) -> int:
+        """Write the queued calls; returns how many"""
+        with self._pending_lock:
+            pending, self._pending = self._pending, []
+        if not pending:
+            return 0
+        with self._lock, self._connection:
+            rows = [(call["at"], *[self._label_id(call.get(column)) for column in LABEL_COLUMNS], call.get("hop"),
+                     call.get("prompt_tokens"), call.get("completion_tokens"), call.get("cached_tokens"),
+                     call["latency_ms"], call["wait_ms"], call["status"]) for call in pending]
+            self._connection.executemany(
+                f"INSERT INTO calls (at, {', '.join(LABEL_COLUMNS)}, hop, prompt_tokens, completion_tokens, "
+                "cached_tokens, latency_ms, wait_ms, status) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        return len(pending)
+
+    def rollup(self, group_by: Sequence[str] = ("agent",), since: Optional[float] = None,
+               until: Optional[float] = None, filters: Optional[Dict[str, Any]] = None,
+               limit: int = 20) -> Dict[str, Any]:
+        """Calls, tokens, latency and estimated cost per ``group_by`` combination between ``since`` and ``until``
+        (unix seconds) where every ``filters`` column equals its value; most expensive first, top ``limit``"""
+        unknown = [name for name in group_by if name not in DIMENSIONS]
+        unknown += [name for name in filters or {} if name not in LABEL_COLUMNS + ("hop",)]
+        if unknown:
+            raise ValueError(f"Unknown usage dimension {unknown[0]!r}; use one of {', '.join(DIMENSIONS)}")
+        self.flush()
+        clauses, params = ["at >= ?", "at < ?"], [since or 0, until or 2 ** 62]
+        with self._lock:
+            for column, value in (filters or {}).items():
+                if column in LABEL_COLUMNS:
+                    found = self._connection.execute("SELECT id FROM labels WHERE value = ?", (str(value),)).fetchone()
+                    value = found[0] if found else -1
+                clauses.append(f"{column} = ?")
+                params.append(value)
+            # Always split by model, which sets the price
+            keys = list(dict.fromkeys([*group_by, "model"]))
+            columns = ["date(at, 'unixepoch', 'localtime')" if key == "day" else key for key in keys]
+            rows = self._connection.execute(
+                f"SELECT {', '.join(columns)}, COUNT(*), SUM(prompt_tokens), SUM(completion_tokens), "
+                "SUM(cached_tokens), SUM(latency_ms), MAX(latency_ms), SUM(prompt_tokens IS NULL), "
+                f"SUM(status >= 400) FROM calls WHERE {' AND '.join(clauses)} GROUP BY {', '.join(columns)}",
+                params).fetchall()
+            label_ids = {row[index] for row in rows for index, key in enumerate(keys)
+                         if key in LABEL_COLUMNS and row[index] is not None}
+            labels = dict(self._connection.execute(
+                f"SELECT id, value FROM labels WHERE id IN ({', '.join('?' * len(label_ids))})",
+                list(label_ids)).fetchall()) if label_ids else {}
+
+        groups: Dict[tuple, Dict[str, Any]] = {}
+        for row in rows:
+            values = {}
+            for index, key in enumerate(keys):
+                value = row[index]
+                values[key] = labels.get(value) if key in LABEL_COLUMNS else value
+            calls, prompt, completion, cached, latency, slowest, unmetered, failed = row[len(keys):]
+            cost = estimated_cost(values["model"], prompt, completion)
+            group = groups.setdefault(tuple(values[key] for key in group_by), {
+                **{key: values[key] for key in group_by}, "calls": 0, "prompt_tokens": 0, "completion_tokens": 0,
+                "cached_tokens": 0, "cost_usd": 0.0, "latency_ms_total": 0, "max_latency_ms": 0,
+                "unmetered_calls": 0, "failed_calls": 0, "unpriced_calls": 0})
+            group["calls"] += calls
+            group["prompt_tokens"] += prompt or 0
+            group["completion_tokens"] += completion or 0
+            group["cached_tokens"] += cached or 0
+            group["cost_usd"] += cost or 0.0
+            group["latency_ms_total"] += latency
+            group["max_latency_ms"] = max(group["max_latency_ms"], slowest)
+            group["unmetered_calls"] += unmetered
+            group["failed_calls"] += failed
+            if cost is None and prompt is not None:
+                group["unpriced_calls"] += calls - unmetered
+
+        ranked = sorted(groups.values(), key=lambda group: (group["cost_usd"], group["prompt_tokens"]
+                                                            + group["completion_tokens"]), reverse=True)
+        totals = {key: sum(group[key] for group in ranked)
+                  for key in ("calls", "prompt_tokens", "completion_tokens", "cached_tokens", "cost_usd")}
+        totals["cost_usd"] = round(totals["cost_usd"], 6)
+        for group in ranked:
+            group["avg_latency_ms"] = round(group.pop("latency_ms_total") / group["calls"], 1)
+            group["cost_usd"] = round(group["cost_usd"], 6)
+        return {"group_by": list(group_by), "groups": len(ranked), "totals": totals, "rows": ranked[:limit]}
+
+    def describe(self) -> Dict[str, Any]:
+        with self._pending_lock:
+            pending = len(self._pending)
+        return {"db_file": self.db_file, "pending": pending, "dropped": self.dropped}
+
+
+_ledger: Optional[UsageLedger] = None
+_ledger_lock = threading.Lock()
+
+
+def usage_ledger() -> Optional[UsageLedger]:
+    """The process's ledger at ``USAGE_DB`` (default tmp/usage.db), or None when ``USAGE_ACCOUNTING=false``"""
+    global _ledger
+    if os.getenv("USAGE_ACCOUNTING", "true").lower() == "false":
+        return None
+    with _ledger_lock:
+        if _ledger is None:
+            _ledger = UsageLedger(os.getenv("USAGE_DB", "tmp/usage.db"),
+                                  flush_interval=float(os.getenv("USAGE_FLUSH_SECONDS", "2")))
+        return _ledger
+
+
+def record_call(usage: Dict[str, Any], status: int, role: str, agent: Optional[str], deployment: str,
+                latency: float, waited: float) -> None:
+    """Record an Azure OpenAI call (``usage`` from ``call_usage``; status 0 when no response came back) against
+    the current request's user, session and endpoint, as its next hop"""
+    ledger = usage_ledger()
+    if ledger is None:
+        return
+    context = current_request()
+    ledger.record({
+        "at": int(time.time()),
+        "user_id": context.user_id,
+        "session_id": context.session_id,
+        "endpoint": context.endpoint,
+        "agent": agent,
+        "role": role,
+        "deployment": deployment,
+        "hop": next(context.calls) if context.calls is not None else None,
+        **usage,
+        "latency_ms": int(latency * 1000),
+        "wait_ms": int(waited * 1000),
+        "status": status,
+    })
+
+
+def _label(model: Any, name: Optional[str]) -> None:
+    if name and hasattr(model, "usage_label") and model.usage_label is None:
+        model.usage_label = name
+
+
+def attribute_models(agent: Any) -> None:
+    """Label every model under ``agent`` (its team members, fan-out planner and synthesizer, and memory managers)
+    with the name of the agent it works for, so its calls are attributed to that agent; labels already set stay"""
+    nodes = [agent]
+    while nodes:
+        node = nodes.pop(0)
+        name = getattr(node, "name", None)
+        _label(getattr(node, "model", None), name)
+        memory = getattr(node, "memory", None)
+        for model in (getattr(memory, "model", None), getattr(getattr(memory, "memory_manager", None), "model", None),
+                      getattr(getattr(memory, "summary_manager", None), "model", None)):
+            _label(model, f"{name} memory" if name else None)
+        members = getattr(node, "members", None) or []
+        nodes.extend(members.values() if isinstance(members, dict) else members)
+        nodes.extend(part for part in (getattr(node, "planner", None), getattr(node, "synthesizer", None))
+                     if part is not None)
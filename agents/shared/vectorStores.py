@@ -0,0 +1,115 @@
+import os
+import re
+import sys
+from typing import List, Optional
+
+from agno.embedder.base import Embedder
+from agno.vectordb.base import VectorDb
+
+from agents.shared.embedders import create_embedder, embedder_backend
+
+# Separates a domain collection name from the partition (customer) it holds
+PARTITION_SEPARATOR = "__"
+
+
+def vector_backend() -> str:
+    """Vector store selected with VECTOR_BACKEND: chroma (default) or qdrant"""
+    return os.getenv("VECTOR_BACKEND", "chroma").strip().lower()
+
+
+def _env_int(name: str, default: Optional[int]) -> Optional[int]:
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+def is_chroma(vector_db: VectorDb) -> bool:
+    """``isinstance(vector_db, ChromaDb)`` without importing chromadb when no Chroma db was ever created"""
+    module = sys.modules.get("agno.vectordb.chroma")
+    return module is not None and isinstance(vector_db, module.ChromaDb)
+
+
+def create_qdrant_db(collection: str, path: str, embedder: Embedder) -> VectorDb:
+    """Qdrant collection configured from QDRANT_* environment variables.
+
+    With QDRANT_URL set the collection lives on that server, otherwise in embedded local
+    mode under QDRANT_PATH (default ``embeddings/qdrant``). Domains share the server, so
+    collection names are prefixed with the domain directory name.
+    """
+    from agents.shared.qdrantStore import TunedQdrant
+
+    domain = os.path.basename(os.path.normpath(path))
+    options = dict(
+        collection=f"{domain}_{collection}",
+        embedder=embedder,
+        hnsw_m=_env_int("QDRANT_HNSW_M", 16),
+        hnsw_ef_construct=_env_int("QDRANT_HNSW_EF_CONSTRUCT", 128),
+        hnsw_ef=_env_int("QDRANT_HNSW_EF", 64),
+        quantization=os.getenv("QDRANT_QUANTIZATION", "scalar").lower() or None,
+        on_disk=os.getenv("QDRANT_ON_DISK", "false").lower() == "true",
+    )
+    if options["quantization"] == "none":
+        options["quantization"] = None
+    url = os.getenv("QDRANT_URL")
+    if url:
+        return TunedQdrant(url=url, api_key=os.getenv("QDRANT_API_KEY"), **options)
+    return TunedQdrant(path=os.path.join(os.getenv("QDRANT_PATH", "embeddings/qdrant"), domain), **options)
+
+
+def create_vector_db(collection: str, path: str, backend: Optional[str] = None,
+                     store: Optional[str] = None, embedder: Optional[Embedder] = None) -> VectorDb:
+    """Persistent vector db for one domain, embedding with the configured backend.
+
+    Embeddings from different backends are not comparable (nor of equal size), so every
+    backend other than Azure gets its own collections, e.g. ``banking_data_info-fastembed``.
+    """
+    backend = backend or embedder_backend()
+    if backend != "azure":
+        collection = f"{collection}-{backend}"
+    embedder = embedder or create_embedder(backend)
+    if (store or vector_backend()) == "qdrant":
+        return create_qdrant_db(collection, path, embedder)
+    from agno.vectordb.chroma import ChromaDb
+
+    return ChromaDb(
+        collection=collection,
+        path=path,
+        persistent_client=True,
+        embedder=embedder,
+    )
+
+
+def partition_collection_name(collection: str, partition: str) -> str:
+    """Collection holding one partition, e.g. ``banking_data_info__CUST0001``"""
+    safe = re.sub(r"[^a-zA-Z0-9_-]", "-", partition)
+    return f"{collection}{PARTITION_SEPARATOR}{safe}"
+
+
+def partition_vector_db(vector_db: VectorDb, partition: str) -> VectorDb:
+    """A vector db like ``vector_db`` (same store, embedder and distance) scoped to one partition.
+
+    Chroma partitions are separate collections; Qdrant partitions are tenant views of one
+    collection on a server and separate collections in embedded mode.
+    """
+    if hasattr(vector_db, "for_tenant"):
+        return vector_db.for_tenant(partition)
+    if is_chroma(vector_db):
+        return type(vector_db)(
+            collection=partition_collection_name(vector_db.collection_name, partition),
+            embedder=vector_db.embedder,
+            distance=vector_db.distance,
+            path=vector_db.path,
+            persistent_client=vector_db.persistent_client,
+            reranker=vector_db.reranker,
+        )
+    raise ValueError(f"Partitioning is not supported for {type(vector_db).__name__}")
+
+
+def list_partitions(vector_db: VectorDb) -> List[str]:
+    """Names of the partition collections that exist for ``vector_db``"""
+    if is_chroma(vector_db):
+        prefix = f"{vector_db.collection_name}{PARTITION_SEPARATOR}"
+        names = [getattr(collection, "name", collection) for collection in vector_db.client.list_collections()]
+        return sorted(name[len(prefix):] for name in names if name.startswith(prefix))
+    if hasattr(vector_db, "tenants"):
+        return vector_db.tenants()
+    return []
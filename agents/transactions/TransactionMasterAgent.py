@@ -1,52 +1,48 @@
 import os
 from dotenv import load_dotenv
 from agno.agent import Agent
-from agno.knowledge.json import JSONKnowledgeBase
-from agno.models.azure import AzureOpenAI
 from agno.tools.reasoning import ReasoningTools
-from agno.embedder.azure_openai import AzureOpenAIEmbedder
-from agno.vectordb.chroma import ChromaDb
-from agno.memory.v2.memory import Memory
-from agno.memory.v2.db.sqlite import SqliteMemoryDb
-from agno.storage.sqlite import SqliteStorage
+
+from agents.registry import session_storage
+from agents.shared.bankingData import SEED_CUSTOMER_ID
+from agents.shared.boundedMemory import BoundedMemory, IndexedSqliteMemoryDb
+from agents.shared.indexArtifacts import restore_index
+from agents.shared.lexicalIndex import LexicalIndex
+from agents.shared.models import create_chat_model
+from agents.shared.partitionedKnowledge import CustomerPartitionedKnowledgeBase
+from agents.shared.requestContext import request_scope
+from agents.shared.reranking import create_reranker
+from agents.shared.summaryTools import FinancialSummaryTools
+from agents.shared.vectorStores import create_vector_db
 
 # Load environment variables from .env file
 load_dotenv()
 
-# Initialize single persistent ChromaDB for shared knowledge base
-shared_vector_db = ChromaDb(
+# Single persistent vector db for the shared knowledge base (Chroma or Qdrant, per VECTOR_BACKEND)
+shared_vector_db = create_vector_db(
     collection="transactions_data_info",
     path="embeddings/chromadb/transactions",
-    persistent_client=True,
-    embedder=AzureOpenAIEmbedder(
-        api_key=os.getenv("EMBEDDING_API_KEY"),
-        azure_endpoint=os.getenv("EMBEDDING_ENDPOINT"),
-        azure_deployment=os.getenv("EMBEDDING_DEPLOYMENT")
-    )
 )
 
 # Create single shared JSON knowledge base
-shared_knowledge_base = JSONKnowledgeBase(
+shared_knowledge_base = CustomerPartitionedKnowledgeBase(
     path="knowledge/TRANSACTIONS_DATA.json",
     vector_db=shared_vector_db,
     num_documents=10,
+    lexical_index=LexicalIndex(db_file="embeddings/lexical/transactions.db"),
+    reranker=create_reranker(),
 )
 
 # Initialize persistent memory and storage for transactions
-transaction_memory_db = SqliteMemoryDb(table_name="transaction_memories", db_file="tmp/transactions/transaction_agent.db")
-transaction_memory = Memory(db=transaction_memory_db)
-transaction_storage = SqliteStorage(table_name="transaction_sessions", db_file="tmp/transactions/transaction_agent.db")
+transaction_memory_db = IndexedSqliteMemoryDb(table_name="transaction_memories", db_file="tmp/transactions/transaction_agent.db")
+transaction_memory = BoundedMemory(model=create_chat_model("memory"), db=transaction_memory_db)
+transaction_storage = session_storage("transactions")
 
 # Create Card & Digital Payments Agent
 cardDigitalPaymentsAgent = Agent(
     name="Card & Digital Payments Agent",
     role="Handles credit card transactions, digital payments, e-commerce activities, and international transactions",
-    model=AzureOpenAI(
-        azure_deployment=os.getenv("DEPLOYMENT"),
-        api_key=os.getenv("AZURE_OPENAI_API_KEY"),
-        azure_endpoint=os.getenv("ENDPOINT"),
-        api_version=os.getenv("API_VERSION")
-    ),
+    model=create_chat_model("answer"),
     tools=[ReasoningTools(add_instructions=True)],
     knowledge=shared_knowledge_base,
     search_knowledge=True,
@@ -83,17 +79,13 @@ cardDigitalPaymentsAgent = Agent(
 financialAnalyticsAgent = Agent(
     name="Financial Analytics Agent",
     role="Handles financial reporting, trend analysis, business intelligence, and predictive insights",
-    model=AzureOpenAI(
-        azure_deployment=os.getenv("DEPLOYMENT"),
-        api_key=os.getenv("AZURE_OPENAI_API_KEY"),
-        azure_endpoint=os.getenv("ENDPOINT"),
-        api_version=os.getenv("API_VERSION")
-    ),
-    tools=[ReasoningTools(add_instructions=True)],
+    model=create_chat_model("analytics"),
+    tools=[ReasoningTools(add_instructions=True), FinancialSummaryTools()],
     knowledge=shared_knowledge_base,
     search_knowledge=True,
     description="You are a Financial Analytics & Reporting Agent specialized in providing comprehensive financial reporting, trend analysis, business intelligence, and predictive insights from transaction data.",
     instructions=[
+        "For totals (total balance, 30/90 day cash flow, upcoming EMIs and recurring payments, reward points, insurance cover, net worth) use the financial_summary tools: get_financial_summary, or get_cashflow for other windows. They are computed from the live records; do not quote figures from any stored \"summary\" block.",
         "CRITICAL: ALL financial and transaction information is available in the knowledge base. You MUST search the knowledge base before responding to any query.",
         "NEVER make assumptions or provide financial information not found in the knowledge base.",
         "Always search for financial data using transaction IDs, dates, categories, or account information.",
@@ -130,12 +122,7 @@ financialAnalyticsAgent = Agent(
 transactionAnalysisAgent = Agent(
     name="Transaction Analysis Agent",
     role="Handles transaction analysis, spending patterns, financial insights, and business intelligence",
-    model=AzureOpenAI(
-        azure_deployment=os.getenv("DEPLOYMENT"),
-        api_key=os.getenv("AZURE_OPENAI_API_KEY"),
-        azure_endpoint=os.getenv("ENDPOINT"),
-        api_version=os.getenv("API_VERSION")
-    ),
+    model=create_chat_model("answer"),
     tools=[ReasoningTools(add_instructions=True)],
     knowledge=shared_knowledge_base,
     search_knowledge=True,
@@ -168,12 +155,7 @@ transactionAnalysisAgent = Agent(
 # Create Master Transaction Agent that routes to appropriate agents
 TransactionMasterAgent = Agent(
     name="Transaction Master Agent",
-    model=AzureOpenAI(
-        azure_deployment=os.getenv("DEPLOYMENT"),
-        api_key=os.getenv("AZURE_OPENAI_API_KEY"),
-        azure_endpoint=os.getenv("ENDPOINT"),
-        api_version=os.getenv("API_VERSION")
-    ),
+    model=create_chat_model("router"),
     team=[cardDigitalPaymentsAgent, financialAnalyticsAgent, transactionAnalysisAgent],
     memory=transaction_memory,
     storage=transaction_storage,
@@ -231,7 +213,9 @@ def initialize_shared_knowledge_base():
             os.makedirs("embeddings/chromadb", exist_ok=True)
         
         print("Loading shared transaction knowledge base...")
-        shared_knowledge_base.load(recreate=False)  # Don't recreate if exists
+        # A prebuilt index artifact matching the JSON files saves re-embedding on a fresh node
+        if not restore_index(shared_knowledge_base, "transactions"):
+            shared_knowledge_base.load(recreate=False)  # Don't recreate if exists
         print("Shared knowledge base loaded successfully!")
         
     except Exception as e:
@@ -260,13 +244,15 @@ if __name__ == "__main__":
             
             if user_input:
                 print("\nTransaction Master Agent:")
-                TransactionMasterAgent.print_response(
-                    user_input, 
-                    stream=True, 
-                    markdown=True,
-                    user_id="demo_user",
-                    session_id="transaction_session"
-                )
+                # Local chats are served the seed customer's data
+                with request_scope(user_id="demo_user", customer_id=SEED_CUSTOMER_ID):
+                    TransactionMasterAgent.print_response(
+                        user_input, 
+                        stream=True, 
+                        markdown=True,
+                        user_id="demo_user",
+                        session_id="transaction_session"
+                    )
                 print("\n" + "=" * 50)
         
         except KeyboardInterrupt:
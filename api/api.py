@@ -1,6 +1,10 @@
+import asyncio
 import os
 import sys
-from fastapi import FastAPI, HTTPException
+import threading
+import time
+from datetime import date, datetime, timedelta
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import Optional
@@ -10,14 +14,10 @@ from dotenv import load_dotenv
 # Add the parent directory to the path to import agents
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-# Import all master agents
-from agents.accounts.AccountMasterAgent import account_master_agent, initialize_knowledge_base as init_accounts_kb
-from agents.cards.CardsMasterAgent import CardMasterAgent, initialize_shared_knowledge_base as init_cards_kb
-from agents.transactions.TransactionMasterAgent import TransactionMasterAgent, initialize_shared_knowledge_base as init_transactions_kb
-from agents.loansAndInsurance.LoansInvestmentsMasterAgent import LoansAndInvestmentMasterAgent, initialize_shared_knowledge_base as init_loans_kb
-from agents.payeesRecurringPayments.PayeesRecurringPaymentsMasterAgent import PayeeRecurringPaymentMasterAgent, initialize_shared_knowledge_base as init_payees_kb
-from agents.miscellaneous.MiscellaneousBankingMasterAgent import BankingServicesMasterAgent, initialize_shared_knowledge_base as init_misc_kb
-from agents.mainMasterAgent import MainBankingMasterAgent, initialize_all_knowledge_bases as init_main_kb
+# Agent modules are imported on first use (agents.registry) so the server starts accepting connections quickly
+from agents import registry
+from agents.shared.requestContext import (RequestCancelled, cancellation_reason, check_cancelled, current_request,
+                                          request_scope)
 
 # Load environment variables
 load_dotenv()
@@ -43,24 +43,117 @@ class ChatRequest(BaseModel):
     message: str
     user_id: Optional[str] = "api_user"
     session_id: Optional[str] = None
+    # Give up after this many seconds (capped by the endpoint's own deadline)
+    timeout_seconds: Optional[float] = None
 
 class ChatResponse(BaseModel):
     response: str
     agent_name: str
     user_id: str
     session_id: Optional[str] = None
+    # The deadline passed and only part of the answer could be produced
+    partial: bool = False
 
-# Initialize all knowledge bases on startup
-@app.on_event("startup")
-async def startup_event():
-    """Initialize all knowledge bases when the API starts"""
+# agno agents keep per-run state on the instance, so runs stay one at a time; they run off the event
+# loop so that a client disconnect or a passed deadline can cancel them
+agent_run_lock = threading.Lock()
+
+# How often a waiting request checks whether its client is still connected
+DISCONNECT_POLL_SECONDS = 0.5
+
+def endpoint_timeout(domain: Optional[str], requested: Optional[float]) -> float:
+    """Deadline for an endpoint: REQUEST_TIMEOUT_<DOMAIN> (REQUEST_TIMEOUT_CHAT for /chat), else
+    REQUEST_TIMEOUT_SECONDS (default 120), shortened to the client's timeout_seconds"""
+    configured = float(os.getenv(f"REQUEST_TIMEOUT_{(domain or 'chat').upper()}")
+                       or os.getenv("REQUEST_TIMEOUT_SECONDS", "120"))
+    return min(configured, requested) if requested else configured
+
+def partial_content(agent) -> Optional[str]:
+    """Whatever the interrupted run produced: its content, else the answers of members that finished"""
+    run_response = getattr(agent, "run_response", None)
+    if run_response is None:
+        return None
+    if run_response.content:
+        return str(run_response.content)
+    answers = [str(member.content) for member in getattr(run_response, "member_responses", None) or [] if member.content]
+    return "\n\n".join(answers) or None
+
+def run_agent(domain: Optional[str], request: ChatRequest):
+    """Run a domain's master agent (main team when domain is None) inside the request scope"""
+    while not agent_run_lock.acquire(timeout=0.25):
+        check_cancelled()
+    try:
+        check_cancelled()
+        agent = registry.agent(domain)
+        try:
+            return agent.run(message=request.message, user_id=request.user_id, session_id=current_request().session_id,
+                             stream=False).content
+        except Exception as e:
+            # Cancellation surfaces wrapped in whatever the model client or agent raises
+            reason = cancellation_reason()
+            if reason is None or (isinstance(e, RequestCancelled) and e.partial):
+                raise
+            raise RequestCancelled(reason, partial=partial_content(agent)) from e
+    finally:
+        agent_run_lock.release()
+
+async def run_chat(request: ChatRequest, http_request: Request, domain: Optional[str], endpoint: str,
+                   session_suffix: str, agent_name: str) -> ChatResponse:
+    """Answer a chat request with a deadline, cancelling the agent run if the client disconnects"""
+    session_id = request.session_id or f"{request.user_id}_{session_suffix}"
+    cancelled = threading.Event()
+
+    def work():
+        with request_scope(user_id=request.user_id, session_id=session_id, endpoint=endpoint, message=request.message,
+                           timeout=endpoint_timeout(domain, request.timeout_seconds), cancelled=cancelled):
+            return run_agent(domain, request)
+
+    started = time.monotonic()
+    task = asyncio.ensure_future(asyncio.to_thread(work))
+    try:
+        while not task.done():
+            await asyncio.wait({task}, timeout=DISCONNECT_POLL_SECONDS)
+            if not task.done() and await http_request.is_disconnected():
+                cancelled.set()
+        content = task.result()
+    except RequestCancelled as e:
+        print(f"{endpoint} cancelled after {time.monotonic() - started:.1f}s: {e}")
+        if cancelled.is_set():
+            # Nobody is listening any more
+            raise HTTPException(status_code=499, detail=str(e))
+        if e.partial:
+            return ChatResponse(response=e.partial, agent_name=agent_name, user_id=request.user_id,
+                                session_id=session_id, partial=True)
+        raise HTTPException(status_code=504, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error processing request: {str(e)}")
+    return ChatResponse(response=content, agent_name=agent_name, user_id=request.user_id, session_id=session_id)
+
+def warm_up():
+    """Import the agents and initialize all knowledge bases, then start the knowledge watcher if enabled"""
     try:
         print("Initializing all knowledge bases...")
-        # Initialize main agent (which initializes all sub-agents)
-        init_main_kb()
+        registry.load_all()
         print("All knowledge bases initialized successfully!")
     except Exception as e:
         print(f"Error initializing knowledge bases: {e}")
+    if os.getenv("KNOWLEDGE_WATCH", "false").lower() == "true":
+        registry.knowledge_watcher().start()
+
+# Warm up on startup: in the background by default so /health answers at once (AGENT_PRELOAD=background),
+# before serving (blocking) or not at all, leaving it to the first chat request (lazy)
+@app.on_event("startup")
+async def startup_event():
+    preload = os.getenv("AGENT_PRELOAD", "background").lower()
+    if preload == "blocking":
+        warm_up()
+    elif preload != "lazy":
+        threading.Thread(target=warm_up, name="agent-warm-up", daemon=True).start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    if registry.watcher_started():
+        registry.knowledge_watcher().stop()
 
 # Health check endpoint
 @app.get("/")
@@ -69,161 +162,188 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy", "message": "All agents are ready"}
+    if registry.is_ready():
+        return {"status": "healthy", "message": "All agents are ready"}
+    return {"status": "healthy", "message": "Agents are loading"}
+
+@app.get("/ready")
+async def readiness_check():
+    """503 until every agent and knowledge base is loaded, for load balancer readiness probes"""
+    if not registry.is_ready():
+        raise HTTPException(status_code=503, detail="Agents are loading")
+    return {"status": "ready"}
+
+@app.get("/knowledge/metrics")
+def knowledge_metrics():
+    """Reindex lag, duration and document counts of the knowledge file watcher, once it is running"""
+    # Building the watcher would import every agent module; never do that for a metrics probe
+    if not registry.watcher_started():
+        return {"running": False}
+    return registry.knowledge_watcher().describe()
+
+@app.get("/llm/metrics")
+async def llm_metrics():
+    """Per-deployment queue depth, 429 throttles, waits and token estimates of the Azure OpenAI rate limit scheduler,
+    and hedge rate and latency per role"""
+    from agents.shared.hedging import policy
+    from agents.shared.rateLimiter import scheduler
+
+    return {**scheduler.describe(), "hedging": policy.describe()}
+
+@app.post("/knowledge/{domain}/export")
+def export_knowledge_index(domain: str):
+    """Export a domain's built index as a checksummed artifact other nodes can import without embedding"""
+    from agents.shared.indexArtifacts import export_index, read_manifest
+
+    if domain not in registry.DOMAINS:
+        raise HTTPException(status_code=404, detail=f"Unknown knowledge base {domain}")
+    try:
+        path = export_index(registry.initialize_knowledge_base(domain), domain)
+        manifest = read_manifest(path)
+        return {"path": path, "version": manifest["version"], "documents": manifest["documents"]}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error exporting index: {str(e)}")
+
+@app.get("/knowledge/artifacts")
+def list_knowledge_artifacts():
+    """Newest index artifact per domain and whether it still matches the knowledge files"""
+    from agents.shared.indexArtifacts import find_artifact, mismatch, read_manifest
+
+    artifacts = {}
+    for domain, knowledge_base in registry.knowledge_bases().items():
+        path = find_artifact(domain)
+        if path is None:
+            artifacts[domain] = None
+            continue
+        manifest = read_manifest(path)
+        artifacts[domain] = {"path": path, "version": manifest["version"], "created_at": manifest["created_at"],
+                             "documents": manifest["documents"], "stale_reason": mismatch(knowledge_base, manifest)}
+    return artifacts
+
+# Default session id suffix of each chat endpoint -> domain whose storage holds the conversation (None: /chat)
+SESSION_DOMAINS = {
+    "main_session": None,
+    "accounts_session": "accounts",
+    "cards_session": "cards",
+    "transactions_session": "transactions",
+    "loans_session": "loans",
+    "payees_session": "payees",
+    "misc_session": "miscellaneous",
+}
+
+@app.get("/sessions/{session_id}/messages")
+def session_messages(session_id: str, domain: Optional[str] = None, limit: int = Query(20, ge=1, le=100),
+                     before: Optional[int] = None):
+    """A page of a session's conversation, oldest first. Pass ``next_cursor`` back as ``before`` for the page before it.
+    ``domain`` (accounts, cards, ..., main) defaults to the one named by the session id's suffix, else main"""
+    if domain is None:
+        domain = next((domain for suffix, domain in SESSION_DOMAINS.items() if session_id.endswith(suffix)), None)
+    elif domain == "main":
+        domain = None
+    elif domain not in registry.DOMAINS:
+        raise HTTPException(status_code=404, detail=f"Unknown domain {domain}")
+    storage = registry.session_storage(domain)
+    if not hasattr(storage, "messages"):
+        raise HTTPException(status_code=404, detail=f"No message history is kept for {domain or 'main'}")
+    return storage.messages(session_id, limit=limit, before=before)
+
+def _day_start(day: date) -> int:
+    return int(datetime(day.year, day.month, day.day).timestamp())
+
+@app.get("/search")
+def search_history(q: str = Query(..., min_length=1), agent: Optional[str] = None, user_id: Optional[str] = None,
+                   since: Optional[date] = None, until: Optional[date] = None,
+                   limit: int = Query(20, ge=1, le=100), offset: int = Query(0, ge=0, le=1000)):
+    """Full-text search over stored conversations, best match first. ``agent`` (accounts, cards, ..., main) limits it
+    to one agent's history and ``since`` / ``until`` (inclusive dates) to a period; page with ``offset``"""
+    if agent is None:
+        domains = [None, *registry.DOMAINS]
+    elif agent == "main":
+        domains = [None]
+    elif agent in registry.DOMAINS:
+        domains = [agent]
+    else:
+        raise HTTPException(status_code=404, detail=f"Unknown agent {agent}")
+    start = _day_start(since) if since else None
+    end = _day_start(until + timedelta(days=1)) if until else None
+    results = []
+    for domain in domains:
+        storage = registry.session_storage(domain)
+        if not hasattr(storage, "search"):
+            continue
+        # Each agent keeps its own index; BM25 scores from different indexes are merged as they are
+        for hit in storage.search(q, limit=offset + limit + 1, user_id=user_id, since=start, until=end):
+            results.append({**hit, "agent": domain or "main"})
+    results.sort(key=lambda hit: hit["score"])
+    page = results[offset:offset + limit]
+    has_more = len(results) > offset + limit
+    return {"query": q, "results": page, "has_more": has_more, "next_offset": offset + limit if has_more else None}
+
+@app.get("/usage")
+def usage_rollup(group_by: str = "agent", since: Optional[date] = None, until: Optional[date] = None,
+                 user_id: Optional[str] = None, session_id: Optional[str] = None, endpoint: Optional[str] = None,
+                 agent: Optional[str] = None, role: Optional[str] = None, deployment: Optional[str] = None,
+                 model: Optional[str] = None, limit: int = Query(20, ge=1, le=500)):
+    """Tokens, latency and estimated cost of model and embedding calls, rolled up by ``group_by`` (comma separated:
+    agent, endpoint, user_id, session_id, role, deployment, model, hop, day), most expensive first. ``since`` /
+    ``until`` (inclusive dates) and the other parameters filter the calls counted"""
+    from agents.shared.usageLedger import usage_ledger
+
+    ledger = usage_ledger()
+    if ledger is None:
+        raise HTTPException(status_code=404, detail="Usage accounting is disabled (USAGE_ACCOUNTING=false)")
+    filters = {name: value for name, value in (("user_id", user_id), ("session_id", session_id),
+                                               ("endpoint", endpoint), ("agent", agent), ("role", role),
+                                               ("deployment", deployment), ("model", model)) if value is not None}
+    try:
+        return ledger.rollup(group_by=[name.strip() for name in group_by.split(",") if name.strip()],
+                             since=_day_start(since) if since else None,
+                             until=_day_start(until + timedelta(days=1)) if until else None,
+                             filters=filters, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 # Main Banking Master Agent endpoint (with intelligent routing)
 @app.post("/chat", response_model=ChatResponse)
-async def chat_with_main_agent(request: ChatRequest):
+async def chat_with_main_agent(request: ChatRequest, http_request: Request):
     """Chat with the Main Banking Master Agent - intelligently routes to appropriate specialized agents"""
-    try:
-        session_id = request.session_id or f"{request.user_id}_main_session"
-        
-        response = MainBankingMasterAgent.run(
-            message=request.message,
-            user_id=request.user_id,
-            stream=False
-        )
-        
-        return ChatResponse(
-            response=response.content,
-            agent_name="MainBankingMasterAgent",
-            user_id=request.user_id,
-            session_id=session_id
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error processing request: {str(e)}")
+    return await run_chat(request, http_request, None, "/chat", "main_session", "MainBankingMasterAgent")
 
 # Account Master Agent endpoints
 @app.post("/accounts/chat", response_model=ChatResponse)
-async def chat_with_accounts_agent(request: ChatRequest):
+async def chat_with_accounts_agent(request: ChatRequest, http_request: Request):
     """Chat with the Account Master Agent for account-related queries"""
-    try:
-        session_id = request.session_id or f"{request.user_id}_accounts_session"
-        
-        response = account_master_agent.run(
-            message=request.message,
-            user_id=request.user_id,
-            stream=False
-        )
-        
-        return ChatResponse(
-            response=response.content,
-            agent_name="AccountMasterAgent",
-            user_id=request.user_id,
-            session_id=session_id
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error processing request: {str(e)}")
+    return await run_chat(request, http_request, "accounts", "/accounts/chat", "accounts_session", "AccountMasterAgent")
 
 # Cards Master Agent endpoints
 @app.post("/cards/chat", response_model=ChatResponse)
-async def chat_with_cards_agent(request: ChatRequest):
+async def chat_with_cards_agent(request: ChatRequest, http_request: Request):
     """Chat with the Cards Master Agent for card-related queries"""
-    try:
-        session_id = request.session_id or f"{request.user_id}_cards_session"
-        
-        response = CardMasterAgent.run(
-            message=request.message,
-            user_id=request.user_id,
-            stream=False
-        )
-        
-        return ChatResponse(
-            response=response.content,
-            agent_name="CardMasterAgent",
-            user_id=request.user_id,
-            session_id=session_id
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error processing request: {str(e)}")
+    return await run_chat(request, http_request, "cards", "/cards/chat", "cards_session", "CardMasterAgent")
 
 # Transaction Master Agent endpoints
 @app.post("/transactions/chat", response_model=ChatResponse)
-async def chat_with_transactions_agent(request: ChatRequest):
+async def chat_with_transactions_agent(request: ChatRequest, http_request: Request):
     """Chat with the Transaction Master Agent for transaction-related queries"""
-    try:
-        session_id = request.session_id or f"{request.user_id}_transactions_session"
-        
-        response = TransactionMasterAgent.run(
-            message=request.message,
-            user_id=request.user_id,
-            stream=False
-        )
-        
-        return ChatResponse(
-            response=response.content,
-            agent_name="TransactionMasterAgent",
-            user_id=request.user_id,
-            session_id=session_id
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error processing request: {str(e)}")
+    return await run_chat(request, http_request, "transactions", "/transactions/chat", "transactions_session", "TransactionMasterAgent")
 
 # Loans & Investments Master Agent endpoints
 @app.post("/loans/chat", response_model=ChatResponse)
-async def chat_with_loans_agent(request: ChatRequest):
+async def chat_with_loans_agent(request: ChatRequest, http_request: Request):
     """Chat with the Loans & Investments Master Agent for loans and investment queries"""
-    try:
-        session_id = request.session_id or f"{request.user_id}_loans_session"
-        
-        response = LoansAndInvestmentMasterAgent.run(
-            message=request.message,
-            user_id=request.user_id,
-            stream=False
-        )
-        
-        return ChatResponse(
-            response=response.content,
-            agent_name="LoansAndInvestmentMasterAgent",
-            user_id=request.user_id,
-            session_id=session_id
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error processing request: {str(e)}")
+    return await run_chat(request, http_request, "loans", "/loans/chat", "loans_session", "LoansAndInvestmentMasterAgent")
 
 # Payees & Recurring Payments Master Agent endpoints
 @app.post("/payees/chat", response_model=ChatResponse)
-async def chat_with_payees_agent(request: ChatRequest):
+async def chat_with_payees_agent(request: ChatRequest, http_request: Request):
     """Chat with the Payees & Recurring Payments Master Agent"""
-    try:
-        session_id = request.session_id or f"{request.user_id}_payees_session"
-        
-        response = PayeeRecurringPaymentMasterAgent.run(
-            message=request.message,
-            user_id=request.user_id,
-            stream=False
-        )
-        
-        return ChatResponse(
-            response=response.content,
-            agent_name="PayeeRecurringPaymentMasterAgent",
-            user_id=request.user_id,
-            session_id=session_id
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error processing request: {str(e)}")
+    return await run_chat(request, http_request, "payees", "/payees/chat", "payees_session", "PayeeRecurringPaymentMasterAgent")
 
 # Miscellaneous Banking Master Agent endpoints
 @app.post("/miscellaneous/chat", response_model=ChatResponse)
-async def chat_with_miscellaneous_agent(request: ChatRequest):
+async def chat_with_miscellaneous_agent(request: ChatRequest, http_request: Request):
     """Chat with the Miscellaneous Banking Master Agent for general banking queries"""
-    try:
-        session_id = request.session_id or f"{request.user_id}_misc_session"
-        
-        response = BankingServicesMasterAgent.run(
-            message=request.message,
-            user_id=request.user_id,
-            stream=False
-        )
-        
-        return ChatResponse(
-            response=response.content,
-            agent_name="BankingServicesMasterAgent",
-            user_id=request.user_id,
-            session_id=session_id
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error processing request: {str(e)}")
+    return await run_chat(request, http_request, "miscellaneous", "/miscellaneous/chat", "misc_session", "BankingServicesMasterAgent")
 
 
 # Get available agents
@@ -0,0 +1,81 @@
+"""Speed of the vectorized amortization engine against a month-by-month loop.
+
+Times full schedule generation (cold, then memoized through the loan tools) and a
+prepayment sweep, where every amount is simulated in one vectorized pass versus one
+loop over the remaining months per amount.
+
+    python -m benchmarks.amortizationBenchmark
+    python -m benchmarks.amortizationBenchmark --amounts 1000 --repeat 50
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from agents.loansAndInsurance.loanTools import LoanCalculatorTools
+from agents.shared.amortization import amortization_schedule, prepayment_scenarios
+from agents.shared.bankingData import CustomerRecords, SEED_CUSTOMER_ID
+from agents.shared.requestContext import request_scope
+
+
+def loop_interest(balance: float, rate_apr: float, emi: float) -> float:
+    """Reference: interest paid keeping the EMI, one month at a time"""
+    rate, interest = rate_apr / 1200, 0.0
+    while balance > 0.005:
+        charged = balance * rate
+        interest += charged
+        balance -= min(emi, balance + charged) - charged
+    return interest
+
+
+def timed(function, repeat: int) -> float:
+    """Median milliseconds per call"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        samples.append(time.perf_counter() - start)
+    return sorted(samples)[len(samples) // 2] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--principal", type=float, default=4321450.75)
+    parser.add_argument("--rate", type=float, default=8.1)
+    parser.add_argument("--emi", type=float, default=41872.0)
+    parser.add_argument("--term", type=int, default=240)
+    parser.add_argument("--amounts", type=int, default=200, help="Prepayment amounts in the sweep")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    amounts = np.linspace(0, args.principal * 0.5, args.amounts)
+    vectorized = prepayment_scenarios(args.principal, args.rate, args.emi, amounts)["interest"]
+    looped = [loop_interest(args.principal - amount, args.rate, args.emi) for amount in amounts]
+    error = float(np.max(np.abs(vectorized - np.array(looped))))
+
+    tools = LoanCalculatorTools(records=CustomerRecords())
+    with request_scope(customer_id=SEED_CUSTOMER_ID):
+        tools.list_loans()
+        results = [
+            ("schedule (vectorized)", timed(lambda: amortization_schedule(args.principal, args.rate, args.term), args.repeat)),
+            ("schedule + 2 rate resets", timed(lambda: amortization_schedule(args.principal, args.rate, args.term,
+                                                                             resets=[(36, 8.6), (72, 7.9)]), args.repeat)),
+            ("schedule (memoized tool)", timed(lambda: tools.get_loan_schedule("LOAN-HOME-001", months=12), args.repeat)),
+            (f"sweep x{args.amounts} (vectorized)", timed(lambda: prepayment_scenarios(
+                args.principal, args.rate, args.emi, amounts), args.repeat)),
+            (f"sweep x{args.amounts} (monthly loop)", timed(lambda: [loop_interest(
+                args.principal - amount, args.rate, args.emi) for amount in amounts], max(1, args.repeat // 10))),
+        ]
+
+    print(f"{'operation':<32}{'median ms':>11}")
+    for label, milliseconds in results:
+        print(f"{label:<32}{milliseconds:>11.3f}")
+    print(f"Largest interest difference between vectorized and loop: {error:.6f} rupees")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Side-by-side comparison of embedding backends: ingest throughput, query latency and retrieval quality.
+
+Each backend ingests the same knowledge files into its own temporary Chroma collection
+and answers the labeled questions in benchmarks/retrievalQueries.json (vector search only).
+
+    python -m benchmarks.embedderBenchmark
+    python -m benchmarks.embedderBenchmark --backends fastembed --path knowledge/synthetic --repeat 3
+
+The azure backend needs EMBEDDING_API_KEY, EMBEDDING_ENDPOINT and EMBEDDING_DEPLOYMENT.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+
+from agents.shared.bankingData import SEED_CUSTOMER_ID
+from agents.shared.partitionedKnowledge import CustomerPartitionedKnowledgeBase
+from agents.shared.requestContext import request_scope
+from agents.shared.vectorStores import create_vector_db
+from benchmarks.retrievalSet import first_relevant_rank, load_labeled_queries, summarize
+
+
+def run_backend(backend: str, paths, k: int, repeat: int, batch_size: int) -> dict:
+    knowledge_base = CustomerPartitionedKnowledgeBase(
+        path=[{"path": path} for path in paths],
+        vector_db=create_vector_db(collection="embedder_benchmark", path=tempfile.mkdtemp(prefix=f"embed_{backend}_"),
+                                   backend=backend),
+        batch_size=batch_size,
+    )
+    knowledge_base.load(recreate=True)
+    ingest = knowledge_base.last_load_stats
+
+    ranks, latencies = [], []
+    with request_scope(customer_id=SEED_CUSTOMER_ID):
+        for query in load_labeled_queries():
+            for attempt in range(repeat):
+                start = time.perf_counter()
+                documents = knowledge_base.search(query["question"], num_documents=k)
+                latencies.append(time.perf_counter() - start)
+                if attempt == 0:
+                    ranks.append(first_relevant_rank(documents, query["sections"]))
+    result = summarize(ranks, latencies, k)
+    result.update(backend=backend, docs_per_second=ingest.documents_per_second, documents=ingest.documents_read)
+    return result
+
+
+def main():
+    load_dotenv()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", default=["azure", "fastembed"])
+    parser.add_argument("--path", nargs="+", default=["knowledge/CORE_BANKING_DATA.json", "knowledge/TRANSACTIONS_DATA.json"])
+    parser.add_argument("-k", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=3, help="Searches per question when timing")
+    parser.add_argument("--batch-size", type=int, default=64)
+    args = parser.parse_args()
+
+    results = [run_backend(backend, args.path, args.k, args.repeat, args.batch_size) for backend in args.backends]
+    print(f"{'backend':<12}{'docs':>8}{'ingest docs/s':>15}{'query p50 ms':>14}{'query p95 ms':>14}"
+          f"{'recall@k':>10}{'MRR':>8}")
+    for result in results:
+        print(f"{result['backend']:<12}{result['documents']:>8}{result['docs_per_second']:>15.1f}"
+              f"{result['p50_ms']:>14.1f}{result['p95_ms']:>14.1f}{result['recall']:>10.3f}{result['mrr']:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
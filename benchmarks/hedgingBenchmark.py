@@ -0,0 +1,112 @@
+"""Tail latency of Azure OpenAI calls with and without hedging to a secondary deployment.
+
+Simulates two deployments whose completions usually take ``--median-ms`` (log-normal) but
+``--slow-rate`` of the time stall for ``--slow-ms``, and sends ``--requests`` calls from
+``--concurrency`` threads through the scheduled transport, first alone and then wrapped in
+``agents.shared.hedging.HedgedTransport``. The first ``--warmup`` calls of the hedged run teach
+the policy its p``--percentile`` threshold and are not reported. No network is used.
+
+    python -m benchmarks.hedgingBenchmark
+    python -m benchmarks.hedgingBenchmark --slow-rate 0.02 --percentile 98 --max-rate 0.05
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Simulated calls are not usage
+os.environ["USAGE_ACCOUNTING"] = "false"
+
+from agents.shared.hedging import HedgedTransport, HedgePolicy
+from agents.shared.rateLimiter import ScheduledTransport
+
+URL = "https://benchmark.openai.azure.com/openai/deployments/primary/chat/completions"
+
+
+class SimulatedDeployments:
+    """Log-normal service time around a median, with an occasional stall; counts calls per deployment"""
+
+    def __init__(self, median: float, slow_rate: float, slow: float, seed: int):
+        self.median, self.slow_rate, self.slow = median, slow_rate, slow
+        self.random = random.Random(seed)
+        self.calls = {}
+        self._lock = threading.Lock()
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        deployment = request.url.path.split("/")[3]
+        with self._lock:
+            self.calls[deployment] = self.calls.get(deployment, 0) + 1
+            stalled = self.random.random() < self.slow_rate
+            seconds = self.slow if stalled else self.median * self.random.lognormvariate(0, 0.3)
+        time.sleep(seconds)
+        return httpx.Response(200, json={"usage": {"total_tokens": 300}})
+
+
+def percentile(values, share: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * share))]
+
+
+def run(label, client: httpx.Client, requests: int, concurrency: int, warmup: int = 0):
+    latencies = []
+
+    def one(index):
+        start = time.perf_counter()
+        client.post(URL, json={"messages": [{"role": "user", "content": "hi"}]}).raise_for_status()
+        if index >= warmup:
+            latencies.append(time.perf_counter() - start)
+
+    if warmup:
+        # Sequential so the threshold is learnt before the measured calls start
+        for index in range(warmup):
+            one(index)
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(warmup, warmup + requests)))
+    latencies.sort()
+    print(f"{label:<10}{statistics.median(latencies):>8.2f}{percentile(latencies, 0.95):>8.2f}"
+          f"{percentile(latencies, 0.99):>8.2f}{latencies[-1]:>8.2f}", end="")
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--median-ms", type=float, default=200)
+    parser.add_argument("--slow-rate", type=float, default=0.04)
+    parser.add_argument("--slow-ms", type=float, default=3000)
+    parser.add_argument("--percentile", type=float, default=95)
+    parser.add_argument("--max-rate", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    print(f"{args.requests} calls from {args.concurrency} threads; {args.slow_rate:.0%} stall for {args.slow_ms:.0f}ms")
+    print(f"{'':<10}{'p50 s':>8}{'p95 s':>8}{'p99 s':>8}{'max s':>8}{'hedged':>9}{'won':>6}{'extra calls':>13}")
+
+    deployments = SimulatedDeployments(args.median_ms / 1000, args.slow_rate, args.slow_ms / 1000, args.seed)
+    client = httpx.Client(transport=ScheduledTransport("answer", transport=httpx.MockTransport(deployments.handle)))
+    baseline = run("primary", client, args.requests, args.concurrency)
+    print()
+
+    deployments = SimulatedDeployments(args.median_ms / 1000, args.slow_rate, args.slow_ms / 1000, args.seed)
+    policy = HedgePolicy(percentile=args.percentile, max_rate=args.max_rate, min_samples=args.warmup,
+                         window=args.warmup + args.requests)
+    transport = HedgedTransport(ScheduledTransport("answer", transport=httpx.MockTransport(deployments.handle)),
+                                "secondary", role="answer", hedge_policy=policy)
+    hedged = run("hedged", httpx.Client(transport=transport), args.requests, args.concurrency, warmup=args.warmup)
+    stats = policy.describe()["answer:primary"]
+    sent = sum(deployments.calls.values())
+    print(f"{stats['hedge_rate']:>9.1%}{stats['hedge_wins']:>6}{sent / stats['calls'] - 1:>13.1%}")
+    print(f"\nHedging after {stats['hedge_after_seconds']:.2f}s: p99 {percentile(baseline, 0.99):.2f}s -> "
+          f"{percentile(hedged, 0.99):.2f}s ({1 - percentile(hedged, 0.99) / percentile(baseline, 0.99):.0%} lower)")
+
+
+if __name__ == "__main__":
+    main()
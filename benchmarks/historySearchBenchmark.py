@@ -0,0 +1,134 @@
+"""Search over stored conversation history: the FTS5 index versus scanning the messages.
+
+For each size in ``--sizes`` a throwaway ``IndexedSqliteStorage`` is filled with that many
+synthetic banking messages spread over many users, sessions and days; the FTS5 index is kept
+up to date by the table's triggers while it fills. Each query is then timed through
+``IndexedSqliteStorage.search`` (ranked, one page) and as a ``LIKE`` scan of every message,
+which is what searching without an index costs however it is done. ``append ms`` is the time
+to record one more exchange at that size, index maintenance included.
+
+    python -m benchmarks.historySearchBenchmark
+    python -m benchmarks.historySearchBenchmark --sizes 100000 --repeats 10
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+
+from agents.shared.sessionHistory import IndexedSqliteStorage
+
+MERCHANTS = ["Swiggy", "Zomato", "Amazon", "Flipkart", "Uber", "BigBasket", "IRCTC", "Myntra", "Tata Play", "Airtel"]
+QUESTIONS = ["Why was my card declined at {merchant}?", "Show my {merchant} spends this month",
+             "Dispute the {merchant} charge of ₹{amount}", "What is the status of {reference}?",
+             "Set up a recurring payment of ₹{amount} to {merchant}", "How much interest did my FD earn?",
+             "Increase my UPI limit", "When is my home loan EMI due?"]
+ANSWERS = ["Your card ending {card} was declined at {merchant} because it crossed the daily limit.",
+           "You spent ₹{amount} at {merchant} across 4 transactions this month.",
+           "I have raised a dispute for ₹{amount} at {merchant}; reference {reference}.",
+           "Transfer {reference} was credited on the 12th.",
+           "Your EMI of ₹{amount} is due on the 5th from the account ending {card}."]
+
+# (label, query, search arguments); string arguments name a value filled in per size
+QUERIES = [
+    ("rare id", "{reference}", {}),
+    ("word", "declined", {}),
+    ("common", "card", {}),
+    ("two words", "dispute swiggy", {}),
+    ("id part", "X0042", {}),
+    ("one user", "card", {"user_id": "user"}),
+    ("last week", "card", {"since": "week_ago"}),
+    ("page 5", "card", {"offset": 80}),
+]
+
+
+def fill(storage: IndexedSqliteStorage, size: int, rng: random.Random) -> str:
+    """``size`` messages over ~size/20 users, in exchanges of two a minute apart up to now; returns a reference
+    mentioned in one exchange only"""
+    users = max(1, size // 20)
+    start = int(time.time()) - size * 30
+    rows = []
+    unique = None
+    for index in range(0, size, 2):
+        values = {"merchant": rng.choice(MERCHANTS), "amount": rng.randint(100, 90000), "card": rng.randint(1000, 9999),
+                  "reference": f"TXN-2025-{rng.randint(0, 10 ** 7):07d}"}
+        templates = (rng.choice(QUESTIONS), rng.choice(ANSWERS))
+        if index == size // 4 * 2:
+            unique = values["reference"] = "TXN-2025-X0042"
+            templates = (QUESTIONS[3], ANSWERS[3])
+        user = f"CUST{rng.randrange(users):06d}"
+        session = f"{user}_{index // 40}_main_session"
+        for role, template in zip(("user", "assistant"), templates):
+            rows.append({"session_id": session, "user_id": user, "run_id": f"run{index}", "role": role,
+                         "content": template.format(**values), "created_at": start + index * 30})
+        if len(rows) >= 50000:
+            insert(storage, rows)
+            rows = []
+    insert(storage, rows)
+    return unique
+
+
+def insert(storage: IndexedSqliteStorage, rows) -> None:
+    if rows:
+        with storage.SqlSession() as sess, sess.begin():
+            sess.execute(storage.messages_table.insert(), rows)
+
+
+def scan(storage: IndexedSqliteStorage, query: str, filters) -> list:
+    """Every message containing every word, filtered the same way, newest first"""
+    clauses = [f"content LIKE :w{i}" for i in range(len(query.split()))]
+    params = {f"w{i}": f"%{word}%" for i, word in enumerate(query.split())}
+    for name, clause in (("user_id", "user_id = :user_id"), ("since", "created_at >= :since")):
+        if filters.get(name) is not None:
+            clauses.append(clause)
+            params[name] = filters[name]
+    stmt = text(f"SELECT id, content FROM {storage.messages_table.name} WHERE {' AND '.join(clauses)} ORDER BY id DESC")
+    with storage.SqlSession() as sess:
+        return sess.execute(stmt, params).all()
+
+
+def timed(run, repeats: int):
+    times, result = [], None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = run()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            storage = IndexedSqliteStorage(f"bench_{size}", db_file=os.path.join(directory, f"history_{size}.db"))
+            started = time.perf_counter()
+            reference = fill(storage, size, rng)
+            fill_seconds = time.perf_counter() - started
+            append_ms, _ = timed(lambda: storage.record("bench_session", "CUST000001", f"extra{rng.random()}",
+                                                        "Block my card", "Your card is blocked."), args.repeats)
+            print(f"\n{size} messages (filled and indexed in {fill_seconds:.1f}s, append {append_ms:.2f}ms)")
+            print(f"{'query':<12}{'matches':>9}{'index ms':>10}{'scan ms':>10}")
+            context = {"reference": reference, "user": "CUST000001", "week_ago": int(time.time()) - 7 * 86400}
+            for label, query, filters in QUERIES:
+                query = query.format(**context)
+                filters = {name: context[value] if isinstance(value, str) else value for name, value in filters.items()}
+                index_ms, _ = timed(lambda: storage.search(query, limit=args.limit, **filters), args.repeats)
+                scan_ms, matches = timed(lambda: scan(storage, query, filters), 1 if size > 100000 else args.repeats)
+                print(f"{label:<12}{len(matches):>9}{index_ms:>10.2f}{scan_ms:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
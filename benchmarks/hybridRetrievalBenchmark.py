@@ -0,0 +1,116 @@
+"""Recall and search-call cost of vector-only versus hybrid (BM25 + exact identifier) retrieval.
+
+Builds a labeled query set from the knowledge files: every entity id, payment reference
+(UTR, VPA, mandate), UPI handle and policy number becomes a question whose answer is the
+document holding it. Both retrievers search the same collections.
+
+    python -m benchmarks.hybridRetrievalBenchmark
+    python -m benchmarks.hybridRetrievalBenchmark --path knowledge/synthetic/transactions --queries 500
+
+Search calls per answer simulate an agent that re-searches with a doubled ``k`` (up to
+``--max-searches`` times) until the answer document shows up.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import Dict, List, Tuple
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.shared.lexicalIndex import LexicalIndex, extract_identifiers
+from agents.shared.partitionedKnowledge import CustomerPartitionedKnowledgeBase
+from agents.shared.requestContext import request_scope
+from agents.shared.vectorStores import create_vector_db
+
+QUESTION_TEMPLATES = [
+    "Show me the details of {token}",
+    "What is the status of {token}?",
+    "Can you find {token} for me",
+]
+
+
+def labeled_queries(knowledge_base: CustomerPartitionedKnowledgeBase, limit: int, seed: int) -> List[Tuple[str, str, str]]:
+    """(question, customer id, expected document id) for identifiers held by one document"""
+    owners: Dict[Tuple[str, str], List[str]] = {}
+    for document in knowledge_base.iter_documents():
+        data = json.loads(document.content).get("data")
+        if not isinstance(data, dict):
+            continue
+        values = [data.get("id"), data.get("policyNumber"), data.get("upi")]
+        if isinstance(data.get("reference"), dict):
+            values += list(data["reference"].values())
+        customer_id = document.meta_data.get("customer_id", "")
+        for value in values:
+            if isinstance(value, str) and extract_identifiers(value) == [value.lower()]:
+                owners.setdefault((customer_id, value), []).append(document.id)
+    rng = random.Random(seed)
+    unique = sorted((key, ids[0]) for key, ids in owners.items() if len(set(ids)) == 1)
+    rng.shuffle(unique)
+    return [(rng.choice(QUESTION_TEMPLATES).format(token=token), customer_id, document_id)
+            for (customer_id, token), document_id in unique[:limit]]
+
+
+def evaluate(knowledge_base: CustomerPartitionedKnowledgeBase, queries: List[Tuple[str, str, str]],
+             k: int, max_searches: int) -> Dict[str, float]:
+    hits, calls, latencies = 0, 0, []
+    for question, customer_id, expected in queries:
+        with request_scope(customer_id=customer_id):
+            limit = k
+            for attempt in range(1, max_searches + 1):
+                start = time.perf_counter()
+                results = knowledge_base.search(question, num_documents=limit)
+                latencies.append(time.perf_counter() - start)
+                found = expected in [document.id for document in results]
+                if attempt == 1 and found:
+                    hits += 1
+                if found or attempt == max_searches:
+                    calls += attempt
+                    break
+                limit *= 2
+    latencies.sort()
+    return {
+        "recall": hits / len(queries) if queries else 0.0,
+        "searches": calls / len(queries) if queries else 0.0,
+        "p50_ms": latencies[len(latencies) // 2] * 1000 if latencies else 0.0,
+        "p95_ms": latencies[int(len(latencies) * 0.95)] * 1000 if latencies else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--path", nargs="+", default=["knowledge/CORE_BANKING_DATA.json", "knowledge/TRANSACTIONS_DATA.json"])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("-k", type=int, default=5, help="Documents per search")
+    parser.add_argument("--max-searches", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="hybrid_benchmark_")
+    paths = [{"path": path} for path in args.path]
+    vector_only = CustomerPartitionedKnowledgeBase(
+        path=paths,
+        vector_db=create_vector_db(collection="hybrid_benchmark", path=workdir),
+    )
+    vector_only.load(recreate=True)
+    hybrid = CustomerPartitionedKnowledgeBase(
+        path=paths,
+        vector_db=vector_only.vector_db,
+        lexical_index=LexicalIndex(db_file=os.path.join(workdir, "lexical.db")),
+    )
+    hybrid.load(recreate=False)
+
+    queries = labeled_queries(hybrid, args.queries, args.seed)
+    print(f"{len(queries)} labeled identifier queries, k={args.k}")
+    print(f"{'retriever':<14}{'recall@k':>10}{'searches/answer':>17}{'p50 ms':>9}{'p95 ms':>9}")
+    for label, knowledge_base in (("vector", vector_only), ("hybrid", hybrid)):
+        result = evaluate(knowledge_base, queries, args.k, args.max_searches)
+        print(f"{label:<14}{result['recall']:>10.3f}{result['searches']:>17.2f}"
+              f"{result['p50_ms']:>9.1f}{result['p95_ms']:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Peak memory and throughput of knowledge ingestion.
+
+Compares agno's stock JSONReader (whole file parsed in memory) with the streaming
+document pipeline of StreamingJSONKnowledgeBase over a scaled-up transactions file.
+
+    python -m benchmarks.ingestBenchmark --copies 2000
+    python -m benchmarks.ingestBenchmark --path knowledge/synthetic/TRANSACTIONS_DATA.json --embed
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agno.document.reader.json_reader import JSONReader
+
+from agents.shared.streamingKnowledge import StreamingJSONKnowledgeBase
+
+
+def write_scaled_transactions(source: str, target: str, copies: int) -> None:
+    """Write a copy of the transactions fixture with its rows repeated ``copies`` times"""
+    with open(source, "r", encoding="utf-8") as fp:
+        data = json.load(fp)
+    rows = data["transactions"]
+    with open(target, "w", encoding="utf-8") as out:
+        out.write('{"meta": ' + json.dumps(data["meta"]) + ', "transactions": [')
+        for copy in range(copies):
+            for index, row in enumerate(rows):
+                row = dict(row, id=f"{row['id']}-{copy:06d}")
+                out.write(("," if copy or index else "") + json.dumps(row))
+        out.write('], "paging": {"cursor": null, "hasMore": false}}')
+
+
+def measure(label: str, fn) -> dict:
+    tracemalloc.start()
+    start = time.perf_counter()
+    documents = fn()
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        "label": label,
+        "documents": documents,
+        "seconds": seconds,
+        "docs_per_second": documents / seconds if seconds else 0.0,
+        "peak_mib": peak / (1024 * 1024),
+    }
+
+
+def run_baseline(path: str) -> int:
+    return len(JSONReader().read(Path(path)))
+
+
+def run_streaming(path: str, batch_size: int) -> int:
+    knowledge_base = StreamingJSONKnowledgeBase(path=path, batch_size=batch_size)
+    return sum(len(document_list) for document_list in knowledge_base.document_lists)
+
+
+def run_embedded(path: str, batch_size: int) -> int:
+    from agno.vectordb.chroma import ChromaDb
+
+    from agents.shared.azureEmbedder import BatchAzureOpenAIEmbedder
+
+    vector_db = ChromaDb(
+        collection="ingest_benchmark",
+        path=tempfile.mkdtemp(prefix="ingest_benchmark_"),
+        persistent_client=True,
+        embedder=BatchAzureOpenAIEmbedder(
+            api_key=os.getenv("EMBEDDING_API_KEY"),
+            azure_endpoint=os.getenv("EMBEDDING_ENDPOINT"),
+            azure_deployment=os.getenv("EMBEDDING_DEPLOYMENT")
+        )
+    )
+    knowledge_base = StreamingJSONKnowledgeBase(path=path, vector_db=vector_db, batch_size=batch_size)
+    knowledge_base.load(recreate=True)
+    return knowledge_base.last_load_stats.documents_read
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--path", help="Knowledge JSON file to ingest (defaults to a scaled transactions fixture)")
+    parser.add_argument("--copies", type=int, default=1000, help="How many times to repeat the fixture rows")
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--embed", action="store_true", help="Also embed and write into a temporary Chroma collection")
+    args = parser.parse_args()
+
+    path = args.path
+    if path is None:
+        path = os.path.join(tempfile.mkdtemp(prefix="ingest_benchmark_"), "TRANSACTIONS_DATA.json")
+        write_scaled_transactions("knowledge/TRANSACTIONS_DATA.json", path, args.copies)
+    print(f"Input: {path} ({os.path.getsize(path) / (1024 * 1024):.1f} MiB)")
+
+    results = [
+        measure("agno JSONReader (whole file)", lambda: run_baseline(path)),
+        measure("streaming documents", lambda: run_streaming(path, args.batch_size)),
+    ]
+    if args.embed:
+        results.append(measure("streaming embed + write", lambda: run_embedded(path, args.batch_size)))
+
+    print(f"{'pipeline':<32}{'documents':>12}{'seconds':>10}{'docs/s':>12}{'peak MiB':>10}")
+    for result in results:
+        print(f"{result['label']:<32}{result['documents']:>12}{result['seconds']:>10.2f}"
+              f"{result['docs_per_second']:>12.1f}{result['peak_mib']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
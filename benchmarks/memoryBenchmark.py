@@ -0,0 +1,103 @@
+"""User-memory retrieval time and prompt size as a user's history grows: agno's full load versus bounded reads.
+
+For each size in ``--sizes`` a throwaway SQLite memory table is filled with that many memories
+for one user (plus as many for other users), then ``get_user_memories`` is timed on agno's
+Memory, which reads and parses every memory of the user, and on
+``agents.shared.boundedMemory.BoundedMemory``, which reads the newest ``--recent`` through the
+(user_id, updated_at) index. ``--vector`` also indexes the memories with the configured
+embedder and vector store and adds ``--relevant`` semantic matches for a query (slow to build
+at large sizes, and needs the embedding backend configured).
+
+    python -m benchmarks.memoryBenchmark
+    python -m benchmarks.memoryBenchmark --sizes 100 1000 --vector
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from dotenv import load_dotenv
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agno.document import Document
+from agno.memory.v2.memory import Memory
+from agno.memory.v2.schema import UserMemory
+
+from agents.shared.boundedMemory import BoundedMemory, IndexedSqliteMemoryDb
+from agents.shared.requestContext import request_scope
+
+TOPICS = ["prefers UPI for rent", "travels to Singapore in March", "wants alerts above 10,000 INR",
+          "is saving for a home loan down payment", "pays the credit card bill on the 5th",
+          "asked about fixed deposit rates", "disputed a Swiggy charge", "has an SIP in an index fund"]
+
+USER = "CUST0001"
+
+
+def fill(db: IndexedSqliteMemoryDb, size: int, rng: random.Random) -> None:
+    """``size`` memories for USER and as many spread over other users, with increasing timestamps"""
+    db.create()
+    start = datetime(2024, 1, 1)
+    rows = []
+    for index in range(2 * size):
+        user_id = USER if index % 2 == 0 else f"CUST{1000 + index % 97:04d}"
+        text = f"User {rng.choice(TOPICS)} (note {index})"
+        stamp = start + timedelta(minutes=index)
+        rows.append({"id": f"m{index}", "user_id": user_id, "created_at": stamp, "updated_at": stamp,
+                     "memory": str(UserMemory(memory=text, memory_id=f"m{index}").to_dict())})
+    with db.Session() as session:
+        session.execute(db.table.insert(), rows)
+        session.commit()
+
+
+def index_vectors(db: IndexedSqliteMemoryDb) -> None:
+    """Embed USER's memories into the db's vector index in one upsert"""
+    with db.Session() as session:
+        rows = [db._row(row) for row in session.execute(db.table.select().where(db.table.c.user_id == USER))]
+    db.vector_db.upsert([Document(content=row.memory["memory"], meta_data={"user_id": USER, "memory_id": row.id})
+                         for row in rows])
+
+
+def timed(memory, repeats: int):
+    times, memories = [], []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        memories = memory.get_user_memories(user_id=USER)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), memories
+
+
+def main():
+    load_dotenv()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000, 30000])
+    parser.add_argument("--recent", type=int, default=10)
+    parser.add_argument("--relevant", type=int, default=5)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--vector", action="store_true", help="Also recall memories through a vector index")
+    parser.add_argument("--query", default="When is my card bill due?")
+    args = parser.parse_args()
+
+    print(f"{'memories':>9}{'full ms':>10}{'full chars':>12}{'bounded ms':>12}{'bounded chars':>15}{'returned':>10}")
+    rng = random.Random(7)
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            db = IndexedSqliteMemoryDb(table_name=f"memories_{size}", db_file=os.path.join(directory, "memory.db"),
+                                       vector_index=args.vector)
+            fill(db, size, rng)
+            if args.vector:
+                index_vectors(db)
+            full_ms, full = timed(Memory(db=db), args.repeats)
+            with request_scope(user_id=USER, message=args.query if args.vector else None):
+                bounded_ms, bounded = timed(BoundedMemory(db=db, recent_limit=args.recent,
+                                                          relevant_limit=args.relevant), args.repeats)
+            print(f"{size:>9}{full_ms * 1000:>10.1f}{sum(len(m.memory) for m in full):>12}"
+                  f"{bounded_ms * 1000:>12.2f}{sum(len(m.memory) for m in bounded):>15}{len(bounded):>10}")
+
+
+if __name__ == "__main__":
+    main()
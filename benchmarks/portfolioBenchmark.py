@@ -0,0 +1,108 @@
+"""XIRR and valuation cost at scale: batched vectorized Newton versus a per-folio scalar solver.
+
+Builds random SIP histories (``--folios`` folios with ``--sips`` monthly instalments each),
+then times the batched solver, a plain Python Newton loop per folio, and the portfolio
+tools cold and warm (results cached per folio data version).
+
+    python -m benchmarks.portfolioBenchmark
+    python -m benchmarks.portfolioBenchmark --folios 200 --sips 120
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from agents.loansAndInsurance.portfolioTools import PortfolioTools
+from agents.shared.bankingData import CustomerRecords
+from agents.shared.portfolio import value_investment, xirr_batch
+
+
+class StaticRecords(CustomerRecords):
+    """CustomerRecords serving one generated customer instead of reading files"""
+
+    def __init__(self, record):
+        super().__init__(path=[])
+        self.record = record
+
+    def get(self, customer_id=None):
+        return self.record
+
+
+def synthetic_folio(index: int, sips: int, rng: random.Random) -> dict:
+    start = date(2025, 8, 1) - timedelta(days=30 * sips)
+    nav, units, cost, transactions = rng.uniform(20, 400), 0.0, 0.0, []
+    for month in range(sips):
+        nav *= 1 + rng.gauss(0.008, 0.04)
+        bought = round(5000 / nav, 3)
+        units, cost = units + bought, cost + 5000
+        transactions.append({"id": f"TXN-{index}-{month}", "type": "sip", "units": bought, "nav": f"{nav:.2f}",
+                             "date": (start + timedelta(days=30 * month)).isoformat(), "amount": "5000.00"})
+    return {
+        "id": f"INV-MF-{index:04d}", "type": "mutual_fund", "provider": rng.choice(["Axis MF", "HDFC MF", "SBI MF"]),
+        "valuation": {"asOf": "2025-08-08T00:00:00Z"},
+        "holdings": [{"id": f"HOLD-{index}", "name": f"Fund {index}", "units": round(units, 3),
+                      "avgNav": f"{cost / units:.2f}", "currentNav": f"{nav * (1 + rng.gauss(0.005, 0.02)):.2f}"}],
+        "transactions": transactions,
+    }
+
+
+def scalar_xirr(amounts, dates, guess=0.1):
+    """Reference: Newton iteration one folio at a time in plain Python"""
+    days = [(date.fromisoformat(day) - date.fromisoformat(min(dates))).days / 365.0 for day in dates]
+    rate = guess
+    for _ in range(100):
+        npv = sum(amount * (1 + rate) ** -years for amount, years in zip(amounts, days))
+        derivative = sum(-years * amount * (1 + rate) ** (-years - 1) for amount, years in zip(amounts, days))
+        if not derivative:
+            return float("nan")
+        updated = max(-0.9999, rate - npv / derivative)
+        if abs(updated - rate) < 1e-9:
+            return updated
+        rate = updated
+    return rate
+
+
+def timed(function) -> float:
+    start = time.perf_counter()
+    function()
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--folios", type=int, default=50)
+    parser.add_argument("--sips", type=int, default=240, help="SIP instalments per folio")
+    parser.add_argument("--seed", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    investments = [synthetic_folio(index, args.sips, rng) for index in range(args.folios)]
+    valuations = [value_investment(investment) for investment in investments]
+    series = [(valuation.cashflow_amounts, valuation.cashflow_dates) for valuation in valuations]
+
+    batched = xirr_batch(series)
+    scalar = [scalar_xirr(amounts, dates) for amounts, dates in series]
+    tools = PortfolioTools(records=StaticRecords({"investments": investments}))
+    results = [
+        ("xirr, batched Newton", timed(lambda: xirr_batch(series))),
+        ("xirr, scalar Newton per folio", timed(lambda: [scalar_xirr(amounts, dates) for amounts, dates in series])),
+        ("portfolio summary, cold", timed(tools.get_portfolio_summary)),
+        ("portfolio summary, cached", timed(tools.get_portfolio_summary)),
+    ]
+
+    print(f"{args.folios} folios x {args.sips} SIPs ({args.folios * args.sips} transactions)")
+    print(f"{'operation':<34}{'ms':>10}")
+    for label, milliseconds in results:
+        print(f"{label:<34}{milliseconds:>10.2f}")
+    difference = np.abs(batched - np.array(scalar))
+    print(f"Largest XIRR difference between solvers: {np.nanmax(difference) if np.isfinite(difference).any() else 0:.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""429s and latency under load: scheduled Azure OpenAI calls versus independent clients.
+
+Simulates a deployment with ``--rpm`` requests per minute (enforced per 10 second window,
+answering 429 with retry-after like Azure) and sends ``--requests`` chat calls from
+``--concurrency`` threads, a third of them low-priority embedding calls. The baseline uses
+openai-style independent retries (exponential backoff per client); the scheduled run goes
+through ``agents.shared.rateLimiter`` with the same limit configured. No network is used.
+
+    python -m benchmarks.rateLimitBenchmark
+    python -m benchmarks.rateLimitBenchmark --rpm 120 --requests 60 --concurrency 20
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Simulated calls are not usage
+os.environ["USAGE_ACCOUNTING"] = "false"
+
+from agents.shared import rateLimiter
+
+URL = "https://benchmark.openai.azure.com/openai/deployments/benchmark/chat/completions"
+
+
+class SimulatedDeployment:
+    """Fixed-window quota of rpm / 6 requests per 10 seconds, with a per-request service time"""
+
+    def __init__(self, rpm: int, service_seconds: float):
+        self.window_limit = max(1, rpm // 6)
+        self.service_seconds = service_seconds
+        self.window, self.count, self.rejected = 0, 0, 0
+        self._lock = threading.Lock()
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        with self._lock:
+            window = int(time.monotonic() // 10)
+            if window != self.window:
+                self.window, self.count = window, 0
+            if self.count >= self.window_limit:
+                self.rejected += 1
+                retry_after = 10 - time.monotonic() % 10
+                return httpx.Response(429, headers={"retry-after-ms": str(int(retry_after * 1000))})
+            self.count += 1
+        time.sleep(self.service_seconds)
+        return httpx.Response(200, json={"usage": {"total_tokens": 300}})
+
+
+def unscheduled_call(client: httpx.Client, attempts: int = 3):
+    # Each client backs off on its own, as the openai SDK does (0.5s doubling, jittered)
+    for attempt in range(attempts):
+        response = client.post(URL, json={"messages": [{"role": "user", "content": "hi"}]})
+        if response.status_code != 429:
+            return response
+        time.sleep(min(8.0, 0.5 * 2 ** attempt) * random.uniform(0.75, 1.0))
+    return response
+
+
+def run(label, call, requests: int, concurrency: int, deployment: SimulatedDeployment):
+    latencies = {"answer": [], "embedding": []}
+    failures = []
+
+    def one(index):
+        priority = "embedding" if index % 3 == 2 else "answer"
+        start = time.perf_counter()
+        response = call(priority)
+        latencies[priority].append(time.perf_counter() - start)
+        if response.status_code != 200:
+            failures.append(index)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(requests)))
+    elapsed = time.perf_counter() - start
+    answers = sorted(latencies["answer"])
+    print(f"{label:<12}{deployment.rejected:>6}{len(failures):>8}{statistics.median(answers):>11.2f}"
+          f"{answers[int(len(answers) * 0.95) - 1]:>9.2f}{statistics.median(latencies['embedding']):>13.2f}"
+          f"{elapsed:>9.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rpm", type=int, default=120)
+    parser.add_argument("--requests", type=int, default=45)
+    parser.add_argument("--concurrency", type=int, default=15)
+    parser.add_argument("--service-ms", type=float, default=200)
+    args = parser.parse_args()
+
+    print(f"{args.requests} calls from {args.concurrency} threads against {args.rpm} RPM")
+    print(f"{'':<12}{'429s':>6}{'failed':>8}{'answer p50':>11}{'p95 s':>9}{'embed p50 s':>13}{'total s':>9}")
+
+    deployment = SimulatedDeployment(args.rpm, args.service_ms / 1000)
+    client = httpx.Client(transport=httpx.MockTransport(deployment.handle))
+    run("independent", lambda priority: unscheduled_call(client), args.requests, args.concurrency, deployment)
+
+    os.environ["AZURE_OPENAI_RPM"] = str(args.rpm)
+    # Start in a fresh quota window so both runs see the same budget
+    time.sleep(10 - time.monotonic() % 10)
+    deployment = SimulatedDeployment(args.rpm, args.service_ms / 1000)
+    clients = {priority: httpx.Client(transport=rateLimiter.ScheduledTransport(
+        priority, transport=httpx.MockTransport(deployment.handle))) for priority in ("answer", "embedding")}
+    run("scheduled", lambda priority: clients[priority].post(URL, json={"messages": [{"role": "user", "content": "hi"}]}),
+        args.requests, args.concurrency, deployment)
+    print(rateLimiter.scheduler.describe()["benchmark"])
+
+
+if __name__ == "__main__":
+    main()
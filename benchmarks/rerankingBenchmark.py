@@ -0,0 +1,108 @@
+"""Prompt tokens and retrieval quality of fixed top-k versus reranked adaptive top-k.
+
+Both retrievers share the same collections and lexical index and answer the labeled
+questions in benchmarks/retrievalQueries.json (from agents/QUESTIONS.md). The fixed
+retriever injects ``-k`` documents per search, as the agents did; the reranked one
+reranks ``--candidates`` documents and keeps those above the score cutoff (at most ``-k``).
+
+    python -m benchmarks.rerankingBenchmark
+    python -m benchmarks.rerankingBenchmark --reranker cross-encoder --embedder fastembed
+
+Answer quality is measured on what the model would see: recall (an answering section is
+among the injected documents), MRR and precision (share of injected documents that come
+from an answering section). Tokens are estimated at four characters per token.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from typing import Dict
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+
+from agents.shared.bankingData import SEED_CUSTOMER_ID
+from agents.shared.lexicalIndex import LexicalIndex
+from agents.shared.partitionedKnowledge import CustomerPartitionedKnowledgeBase
+from agents.shared.requestContext import request_scope
+from agents.shared.reranking import create_reranker, estimate_tokens
+from agents.shared.vectorStores import create_vector_db
+from benchmarks.retrievalSet import first_relevant_rank, load_labeled_queries, summarize
+
+
+def evaluate(knowledge_base: CustomerPartitionedKnowledgeBase, k: int) -> Dict[str, float]:
+    ranks, latencies, documents_injected, tokens_injected, relevant_injected = [], [], 0, 0, 0
+    queries = load_labeled_queries()
+    with request_scope(customer_id=SEED_CUSTOMER_ID):
+        for query in queries:
+            start = time.perf_counter()
+            documents = knowledge_base.search(query["question"], num_documents=k)
+            latencies.append(time.perf_counter() - start)
+            ranks.append(first_relevant_rank(documents, query["sections"]))
+            documents_injected += len(documents)
+            tokens_injected += sum(estimate_tokens(document.content) for document in documents)
+            relevant_injected += sum(1 for document in documents if document.meta_data.get("section") in query["sections"])
+    result = summarize(ranks, latencies, k)
+    result.update(
+        documents=documents_injected / len(queries),
+        tokens=tokens_injected / len(queries),
+        precision=relevant_injected / documents_injected if documents_injected else 0.0,
+    )
+    return result
+
+
+def main():
+    load_dotenv()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--path", nargs="+", default=["knowledge/CORE_BANKING_DATA.json", "knowledge/TRANSACTIONS_DATA.json"])
+    parser.add_argument("--reranker", default="lexical", choices=["lexical", "cross-encoder"])
+    parser.add_argument("--embedder", default=None, choices=["azure", "fastembed", "hashing"],
+                        help="Embedding backend (default: EMBEDDER_BACKEND); hashing needs no model or network")
+    parser.add_argument("-k", type=int, default=10, help="Fixed k, and the upper bound of the adaptive k")
+    parser.add_argument("--candidates", type=int, default=30)
+    parser.add_argument("--score-cutoff", type=float, default=0.3)
+    parser.add_argument("--relative-cutoff", type=float, default=0.5)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="reranking_benchmark_")
+    embedder = None
+    if args.embedder == "hashing":
+        from benchmarks.vectorBackendBenchmark import HashingEmbedder
+
+        embedder = HashingEmbedder()
+    paths = [{"path": path} for path in args.path]
+    fixed = CustomerPartitionedKnowledgeBase(
+        path=paths,
+        vector_db=create_vector_db(collection="reranking_benchmark", path=workdir,
+                                   backend=args.embedder, embedder=embedder),
+        lexical_index=LexicalIndex(db_file=os.path.join(workdir, "lexical.db")),
+    )
+    fixed.load(recreate=True)
+    reranked = CustomerPartitionedKnowledgeBase(
+        path=paths,
+        vector_db=fixed.vector_db,
+        lexical_index=fixed.lexical_index,
+        reranker=create_reranker(args.reranker),
+        rerank_candidates=args.candidates,
+        score_cutoff=args.score_cutoff,
+        relative_score_cutoff=args.relative_cutoff,
+    )
+
+    results = [("fixed", evaluate(fixed, args.k)), (f"reranked ({args.reranker})", evaluate(reranked, args.k))]
+    print(f"{len(load_labeled_queries())} labeled questions, k={args.k}, {args.candidates} rerank candidates")
+    print(f"{'retriever':<26}{'docs/query':>11}{'tokens/query':>14}{'recall':>8}{'MRR':>7}{'precision':>11}"
+          f"{'p50 ms':>9}{'p95 ms':>9}")
+    for label, result in results:
+        print(f"{label:<26}{result['documents']:>11.1f}{result['tokens']:>14.0f}{result['recall']:>8.3f}"
+              f"{result['mrr']:>7.3f}{result['precision']:>11.3f}{result['p50_ms']:>9.1f}{result['p95_ms']:>9.1f}")
+    baseline, adaptive = results[0][1], results[1][1]
+    if baseline["tokens"]:
+        print(f"Token savings: {1 - adaptive['tokens'] / baseline['tokens']:.1%}; "
+              f"recall delta {adaptive['recall'] - baseline['recall']:+.3f}, "
+              f"MRR delta {adaptive['mrr'] - baseline['mrr']:+.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+"""Retrieval quality, latency and prompt cost of each domain's knowledge base.
+
+Every question in benchmarks/retrievalQueries.json (from agents/QUESTIONS.md) lists the JSON
+entities its answer needs: entity ids, ``<section>:<parent id>`` for id-less rows such as loan
+schedule entries, or the section of a singleton such as ``creditProfile``. Each question is
+searched in its domain's knowledge base the way the agents search it (``num_documents`` results,
+lexical index and reranker) and scored on the documents that come back:
+
+  recall@k   share of the needed entities among the top k documents, for each ``-k``
+  MRR        reciprocal rank of the first document holding a needed entity
+  sections   share of questions with a document from an answering section
+  p50/p95/p99 search latency over ``--repeats`` searches per question
+  docs, tokens  documents and tokens (4 characters each) injected per search
+
+By default every domain's knowledge base is built in a temporary directory from its source
+file, so the embedder, vector store and reranker can be switched from the command line and the
+current chunking is what gets measured. ``--live`` searches the indexes the agents use under
+embeddings/ instead. ``--save`` writes the results as JSON and ``--baseline`` prints the change
+against a saved run:
+
+    python -m benchmarks.retrievalBenchmark --embedder hashing --save before.json
+    python -m benchmarks.retrievalBenchmark --embedder hashing --baseline before.json
+    python -m benchmarks.retrievalBenchmark --embedder fastembed --store qdrant --reranker none
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Sequence
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+
+from agents.shared.bankingData import SEED_CUSTOMER_ID
+from agents.shared.lexicalIndex import LexicalIndex
+from agents.shared.partitionedKnowledge import CustomerPartitionedKnowledgeBase
+from agents.shared.requestContext import request_scope
+from agents.shared.reranking import create_reranker, estimate_tokens
+from agents.shared.vectorStores import create_vector_db
+from benchmarks.retrievalSet import (entity_recall, first_entity_rank, first_relevant_rank, load_labeled_queries,
+                                     percentile)
+
+# Source file of each domain's knowledge base, as in its agent module
+DOMAIN_SOURCES = {
+    "accounts": "knowledge/CORE_BANKING_DATA.json",
+    "cards": "knowledge/CORE_BANKING_DATA.json",
+    "transactions": "knowledge/TRANSACTIONS_DATA.json",
+    "loans": "knowledge/CORE_BANKING_DATA.json",
+    "payees": "knowledge/CORE_BANKING_DATA.json",
+    "miscellaneous": "knowledge/CORE_BANKING_DATA.json",
+}
+
+# Metrics compared against a baseline run: (name, higher is better)
+COMPARED = [("mrr", True), ("p95_ms", False), ("tokens", False)]
+
+
+def build_knowledge_bases(args, workdir: str) -> Dict[str, Any]:
+    """Domain -> freshly built knowledge base; domains reading the same file share one"""
+    embedder = None
+    if args.embedder == "hashing":
+        from benchmarks.vectorBackendBenchmark import HashingEmbedder
+
+        embedder = HashingEmbedder()
+    bases = {}
+    for source in sorted({DOMAIN_SOURCES[domain] for domain in args.domains}):
+        name = os.path.splitext(os.path.basename(source))[0].lower()
+        knowledge_base = CustomerPartitionedKnowledgeBase(
+            path=source,
+            vector_db=create_vector_db(collection=f"retrieval_{name}", path=workdir, backend=args.embedder,
+                                       store=args.store, embedder=embedder),
+            num_documents=args.num_documents,
+            lexical_index=None if args.no_lexical else LexicalIndex(db_file=os.path.join(workdir, f"{name}.db")),
+            reranker=create_reranker(args.reranker),
+        )
+        started = time.perf_counter()
+        knowledge_base.load(recreate=True)
+        print(f"Indexed {source} in {time.perf_counter() - started:.1f}s")
+        bases.update({domain: knowledge_base for domain in args.domains if DOMAIN_SOURCES[domain] == source})
+    return bases
+
+
+def live_knowledge_bases(domains: Sequence[str]) -> Dict[str, Any]:
+    """The knowledge bases the agents search (imports the agent modules, loading their indexes)"""
+    from agents import registry
+
+    return {domain: registry.knowledge_base(domain) for domain in domains}
+
+
+def evaluate(knowledge_base: Any, queries: List[Dict], ks: Sequence[int], repeats: int) -> List[Dict]:
+    """Scores of each question's search"""
+    scores = []
+    with request_scope(customer_id=SEED_CUSTOMER_ID):
+        for query in queries:
+            latencies = []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                documents = knowledge_base.search(query["question"])
+                latencies.append(time.perf_counter() - start)
+            scores.append({
+                "recall": {k: entity_recall(documents, query["entities"], k) for k in ks},
+                "rank": first_entity_rank(documents, query["entities"]),
+                "section_rank": first_relevant_rank(documents, query["sections"]),
+                "latencies": latencies,
+                "documents": len(documents),
+                "tokens": sum(estimate_tokens(document.content) for document in documents),
+            })
+    return scores
+
+
+def summarize(scores: List[Dict], ks: Sequence[int]) -> Dict[str, float]:
+    count = len(scores) or 1
+    latencies = [latency for score in scores for latency in score["latencies"]]
+    return {
+        "queries": len(scores),
+        **{f"recall@{k}": sum(score["recall"][k] for score in scores) / count for k in ks},
+        "mrr": sum(1.0 / score["rank"] for score in scores if score["rank"]) / count,
+        "sections": sum(1 for score in scores if score["section_rank"]) / count,
+        "p50_ms": percentile(latencies, 0.5) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "documents": sum(score["documents"] for score in scores) / count,
+        "tokens": sum(score["tokens"] for score in scores) / count,
+    }
+
+
+def print_results(results: Dict[str, Dict[str, float]], ks: Sequence[int]) -> None:
+    recalls = [f"recall@{k}" for k in ks]
+    print(f"{'domain':<15}{'queries':>8}" + "".join(f"{name:>11}" for name in recalls)
+          + f"{'MRR':>7}{'sections':>10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'docs':>7}{'tokens':>8}")
+    for domain, result in results.items():
+        print(f"{domain:<15}{result['queries']:>8}" + "".join(f"{result[name]:>11.3f}" for name in recalls)
+              + f"{result['mrr']:>7.3f}{result['sections']:>10.3f}{result['p50_ms']:>9.1f}{result['p95_ms']:>9.1f}"
+              f"{result['p99_ms']:>9.1f}{result['documents']:>7.1f}{result['tokens']:>8.0f}")
+
+
+def print_comparison(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+                     ks: Sequence[int]) -> None:
+    """Change of each domain's metrics against a saved run; ``*`` marks a regression"""
+    compared = [(f"recall@{max(ks)}", True), *COMPARED]
+    print("\nChange against the baseline")
+    print(f"{'domain':<15}" + "".join(f"{name:>14}" for name, _ in compared))
+    for domain, result in results.items():
+        before = baseline.get(domain)
+        if before is None:
+            print(f"{domain:<15}  (not in baseline)")
+            continue
+        cells = []
+        for name, higher_is_better in compared:
+            if name not in before:
+                cells.append(f"{'-':>14}")
+                continue
+            delta = result[name] - before[name]
+            worse = delta < 0 if higher_is_better else delta > 0
+            cells.append(f"{delta:>+13.3f}{'*' if worse and abs(delta) > 1e-9 else ' '}")
+        print(f"{domain:<15}" + "".join(cells))
+
+
+def main():
+    load_dotenv()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--domains", nargs="+", default=list(DOMAIN_SOURCES), choices=list(DOMAIN_SOURCES))
+    parser.add_argument("-k", type=int, nargs="+", default=[1, 3, 5, 10], help="Cutoffs of recall@k")
+    parser.add_argument("--num-documents", type=int, default=10, help="Documents per search, as the agents use")
+    parser.add_argument("--repeats", type=int, default=3, help="Timed searches per question")
+    parser.add_argument("--embedder", default=None, choices=["azure", "fastembed", "hashing"],
+                        help="Embedding backend (default: EMBEDDER_BACKEND); hashing needs no model or network")
+    parser.add_argument("--store", default=None, choices=["chroma", "qdrant"],
+                        help="Vector store (default: VECTOR_BACKEND)")
+    parser.add_argument("--reranker", default=None, choices=["lexical", "cross-encoder", "none"],
+                        help="Reranker (default: RERANKER_BACKEND)")
+    parser.add_argument("--no-lexical", action="store_true", help="Vector search only, without the BM25 index")
+    parser.add_argument("--live", action="store_true", help="Search the agents' own indexes under embeddings/")
+    parser.add_argument("--save", help="Write the results to this JSON file")
+    parser.add_argument("--baseline", help="JSON file of an earlier run to compare against")
+    args = parser.parse_args()
+
+    if args.live:
+        bases = live_knowledge_bases(args.domains)
+    else:
+        bases = build_knowledge_bases(args, tempfile.mkdtemp(prefix="retrieval_benchmark_"))
+    queries = [query for query in load_labeled_queries() if query["domain"] in args.domains]
+    ks = sorted(set(args.k))
+
+    all_scores, results = [], {}
+    for domain in args.domains:
+        scores = evaluate(bases[domain], [query for query in queries if query["domain"] == domain], ks, args.repeats)
+        all_scores.extend(scores)
+        results[domain] = summarize(scores, ks)
+    results["all"] = summarize(all_scores, ks)
+
+    print(f"\n{len(queries)} labeled questions, {args.num_documents} documents per search, "
+          f"{args.repeats} timed searches each")
+    print_results(results, ks)
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as fp:
+            print_comparison(results, json.load(fp)["results"], ks)
+    if args.save:
+        config = {name: getattr(args, name) for name in ("embedder", "store", "reranker", "no_lexical", "live",
+                                                         "num_documents")}
+        with open(args.save, "w", encoding="utf-8") as fp:
+            json.dump({"config": config, "results": results}, fp, indent=2)
+        print(f"\nSaved to {args.save}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Labeled retrieval questions (from agents/QUESTIONS.md) and the metrics computed over them."""
+import json
+import os
+from typing import Dict, List, Sequence
+
+from agno.document import Document
+
+QUERIES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "retrievalQueries.json")
+
+
+def load_labeled_queries(path: str = QUERIES_FILE) -> List[Dict]:
+    """Questions with the knowledge sections and entities that answer them"""
+    with open(path, "r", encoding="utf-8") as fp:
+        return json.load(fp)
+
+
+def first_relevant_rank(documents: Sequence[Document], sections: Sequence[str]) -> int:
+    """1-based rank of the first document from an answering section, 0 if none"""
+    for rank, document in enumerate(documents, start=1):
+        if document.meta_data.get("section") in sections:
+            return rank
+    return 0
+
+
+def entity_key(document: Document) -> str:
+    """Ground-truth key of the JSON entity a document holds: its id, else ``<section>:<parent id>`` for id-less
+    rows such as loan schedule entries, else its section (singletons such as ``creditProfile``)"""
+    meta_data = document.meta_data
+    if meta_data.get("entity_id"):
+        return meta_data["entity_id"]
+    if meta_data.get("parent_id"):
+        return f"{meta_data.get('section')}:{meta_data['parent_id']}"
+    return meta_data.get("section", "")
+
+
+def entity_recall(documents: Sequence[Document], entities: Sequence[str], k: int) -> float:
+    """Share of the entities a question needs that are held by its top ``k`` documents"""
+    found = {entity_key(document) for document in documents[:k]}
+    return sum(1 for entity in entities if entity in found) / len(entities) if entities else 0.0
+
+
+def first_entity_rank(documents: Sequence[Document], entities: Sequence[str]) -> int:
+    """1-based rank of the first document holding a needed entity, 0 if none"""
+    for rank, document in enumerate(documents, start=1):
+        if entity_key(document) in entities:
+            return rank
+    return 0
+
+
+def percentile(values: Sequence[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def summarize(ranks: Sequence[int], latencies: Sequence[float], k: int) -> Dict[str, float]:
+    """recall@k, MRR and latency percentiles (ms) for one retriever"""
+    count = len(ranks) or 1
+    return {
+        "recall": sum(1 for rank in ranks if 0 < rank <= k) / count,
+        "mrr": sum(1.0 / rank for rank in ranks if rank) / count,
+        "p50_ms": percentile(latencies, 0.5) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+    }
@@ -0,0 +1,179 @@
+"""Model calls and latency per /chat request: nested routing versus flattened routing.
+
+Nested routing goes main team -> domain master agent -> specialist; flattened routing
+(``ROUTING_MODE=flat``) lets the main team pick the specialist directly. By default every
+model in both trees is replaced with a scripted model that routes each question to its
+expected specialist after ``--latency-ms`` of simulated model time, so the figures show
+the routing overhead alone, without credentials. ``--live`` calls the configured Azure
+OpenAI deployment instead and only counts the calls.
+
+    python -m benchmarks.routingBenchmark
+    python -m benchmarks.routingBenchmark --latency-ms 1200
+    python -m benchmarks.routingBenchmark --live --modes flat
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from openai.types.chat import ChatCompletion
+
+from agno.agent import Agent
+from agno.models.azure import AzureOpenAI
+from agno.team.team import Team
+
+# Question -> name of the specialist expected to answer it
+QUESTIONS = [
+    ("What is the IFSC code and KYC status of my savings account?", "AccountMasterAgent"),
+    ("When is my credit card bill due and what is the minimum amount?", "Card Financial Agent"),
+    ("Is international usage enabled on my debit card?", "Card Controls Agent"),
+    ("Show my UPI payments to online merchants last month", "Card & Digital Payments Agent"),
+    ("Give me a monthly spending trend report for this year", "Financial Analytics Agent"),
+    ("Break down my spending by category", "Transaction Analysis Agent"),
+    ("How much is outstanding on my home loan and when is the next EMI?", "Loans Management Agent"),
+    ("What is the current value of my mutual fund portfolio?", "Investments & Insurance Agent"),
+    ("List my registered payees", "Payees Management Agent"),
+    ("Which subscriptions renew this month?", "Recurring Payments Agent"),
+    ("I want to raise a dispute for a failed transaction", "Banking Services & Support Agent"),
+    ("What is my credit score?", "Financial Profile & Compliance Agent"),
+]
+
+
+class CallCounter:
+    calls = 0
+
+
+def leaves(member) -> List[Agent]:
+    """Specialists reachable from a team member"""
+    if isinstance(member, Team):
+        return [leaf for child in member.members for leaf in leaves(child)]
+    if member.team:
+        return [leaf for child in member.team for leaf in leaves(child)]
+    return [member]
+
+
+def transfer_function_name(agent: Agent) -> str:
+    # Same naming as agno's Agent.get_transfer_function
+    name = "".join(c for c in agent.name if c.isalnum() or c in "_- ").strip()
+    return f"transfer_task_to_{name.lower().replace(' ', '_')}"
+
+
+class ScriptedModel(AzureOpenAI):
+    """Answers without a network call after a fixed delay, routing toward ``target``"""
+
+    target: Optional[str] = None
+    latency: float = 0.0
+
+    def __init__(self, owner=None, **kwargs):
+        super().__init__(id="scripted", api_key="scripted", azure_endpoint="http://scripted", **kwargs)
+        self.owner = owner
+
+    def _route(self, tools: Optional[List[Dict]], question: str) -> Optional[Tuple[str, Dict]]:
+        names = {tool.get("function", {}).get("name") for tool in tools or []}
+        if isinstance(self.owner, Team) and "forward_task_to_member" in names:
+            for member in self.owner.members:
+                if any(leaf.name == ScriptedModel.target for leaf in leaves(member)):
+                    return "forward_task_to_member", {"member_id": self.owner._get_member_id(member)}
+        if isinstance(self.owner, Agent) and self.owner.team:
+            for member in self.owner.team:
+                if any(leaf.name == ScriptedModel.target for leaf in leaves(member)) \
+                        and transfer_function_name(member) in names:
+                    return transfer_function_name(member), {"task_description": question, "expected_output": "",
+                                                            "additional_information": ""}
+        return None
+
+    def invoke(self, messages, response_format=None, tools=None, tool_choice=None) -> ChatCompletion:
+        CallCounter.calls += 1
+        time.sleep(ScriptedModel.latency)
+        question = next((m.get_content_string() for m in reversed(messages) if m.role == "user"), "")
+        route = None if messages[-1].role == "tool" else self._route(tools, question)
+        if route is None:
+            message = {"role": "assistant", "content": f"Answer from {getattr(self.owner, 'name', 'memory')}"}
+        else:
+            message = {"role": "assistant", "content": None, "tool_calls": [{
+                "id": f"call_{uuid.uuid4().hex[:8]}", "type": "function",
+                "function": {"name": route[0], "arguments": json.dumps(route[1])},
+            }]}
+        return ChatCompletion.model_validate({
+            "id": "scripted", "object": "chat.completion", "created": int(time.time()), "model": "scripted",
+            "choices": [{"index": 0, "finish_reason": "tool_calls" if route else "stop", "message": message}],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        })
+
+
+def tree(router) -> List:
+    """Every team and agent under ``router``, including it"""
+    children = router.members if isinstance(router, Team) else (router.team or [])
+    nodes = [router]
+    for child in children:
+        nodes.extend(node for node in tree(child) if all(node is not seen for seen in nodes))
+    return nodes
+
+
+def script_models(router) -> None:
+    for node in tree(router):
+        node.model = ScriptedModel(owner=node)
+        if node.memory is not None and getattr(node.memory, "model", None) is not None:
+            node.memory.model = ScriptedModel()
+
+
+def count_models(router) -> None:
+    """Count the calls of the configured models"""
+    for node in tree(router):
+        for model in (node.model, getattr(node.memory, "model", None)):
+            if model is None or getattr(model, "_counted", False):
+                continue
+            invoke = model.invoke
+
+            def counted(*args, _invoke=invoke, **kwargs):
+                CallCounter.calls += 1
+                return _invoke(*args, **kwargs)
+
+            model.invoke, model._counted = counted, True
+
+
+def measure(router, questions, user_id: str = "routing_benchmark") -> List[Tuple[int, float]]:
+    """(model calls, seconds) per question, each in a fresh session"""
+    results = []
+    for question, target in questions:
+        ScriptedModel.target = target
+        CallCounter.calls = 0
+        start = time.perf_counter()
+        router.run(question, user_id=user_id, session_id=f"bench-{uuid.uuid4().hex}")
+        results.append((CallCounter.calls, time.perf_counter() - start))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modes", nargs="*", default=["nested", "flat"])
+    parser.add_argument("--latency-ms", type=float, default=800, help="Simulated time per model call")
+    parser.add_argument("--live", action="store_true", help="Call the configured models instead of scripted ones")
+    args = parser.parse_args()
+
+    from agents.mainMasterAgent import main_agent
+
+    ScriptedModel.latency = args.latency_ms / 1000
+    print(f"{len(QUESTIONS)} questions, {'live models' if args.live else f'{args.latency_ms:g} ms per model call'}")
+    print(f"{'routing':<10}{'calls/request':>15}{'max calls':>11}{'median s':>10}{'p95 s':>8}")
+    for mode in args.modes:
+        router = main_agent(mode)
+        if args.live:
+            count_models(router)
+        else:
+            script_models(router)
+        results = measure(router, QUESTIONS)
+        calls = [count for count, _ in results]
+        seconds = sorted(elapsed for _, elapsed in results)
+        p95 = seconds[min(len(seconds) - 1, int(len(seconds) * 0.95))]
+        print(f"{mode:<10}{statistics.mean(calls):>15.2f}{max(calls):>11}{statistics.median(seconds):>10.2f}{p95:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Import cost and time to first response of the API.
+
+Runs ``python -X importtime -c "import <module>"`` in a fresh interpreter for each module
+and reports the cumulative import time and the heaviest top-level packages. Then starts
+``uvicorn api.api:app`` and measures the time until ``GET /health`` answers and until
+``GET /ready`` reports every agent and knowledge base loaded.
+
+    python -m benchmarks.startupBenchmark
+    python -m benchmarks.startupBenchmark --modules api.api agents.mainMasterAgent --skip-server
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+import requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_MODULES = [
+    "api.api",
+    "agents.registry",
+    "agents.shared.partitionedKnowledge",
+    "agents.accounts.AccountMasterAgent",
+    "agents.mainMasterAgent",
+]
+
+
+def import_profile(module: str):
+    """(cumulative seconds, {top-level package: self seconds}) for a cold import of ``module``"""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], cwd=ROOT,
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "import failed")
+    total, packages = 0, defaultdict(int)
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = [part.strip() for part in line[len("import time:"):].split("|")]
+        packages[name.split(".")[0]] += int(self_us)
+        # The requested module is imported last and at the top level
+        if name == module:
+            total = int(cumulative_us)
+    return total / 1e6, {name: us / 1e6 for name, us in packages.items()}
+
+
+def wait_for(url: str, deadline: float, status: int = 200) -> float:
+    """Seconds until ``url`` answers with ``status``, or raises TimeoutError"""
+    while time.time() < deadline:
+        try:
+            if requests.get(url, timeout=1).status_code == status:
+                return time.time()
+        except requests.RequestException:
+            pass
+        time.sleep(0.05)
+    raise TimeoutError(url)
+
+
+def server_timings(port: int, timeout: float, preload: str):
+    env = dict(os.environ, AGENT_PRELOAD=preload)
+    start = time.time()
+    server = subprocess.Popen([sys.executable, "-m", "uvicorn", "api.api:app", "--port", str(port)], cwd=ROOT,
+                              env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        deadline = start + timeout
+        healthy = wait_for(f"http://127.0.0.1:{port}/health", deadline) - start
+        try:
+            ready = wait_for(f"http://127.0.0.1:{port}/ready", deadline) - start
+        except TimeoutError:
+            ready = None
+        return healthy, ready
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument("--top", type=int, default=8, help="Heaviest packages to list per module")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--timeout", type=float, default=300)
+    parser.add_argument("--preload", default="background", choices=["background", "blocking", "lazy"])
+    parser.add_argument("--skip-server", action="store_true")
+    args = parser.parse_args()
+
+    print(f"{'module':<42}{'import s':>10}")
+    profiles = {}
+    for module in args.modules:
+        try:
+            profiles[module] = import_profile(module)
+        except RuntimeError as e:
+            print(f"{module:<42}{'error':>10}  {e}")
+            continue
+        print(f"{module:<42}{profiles[module][0]:>10.3f}")
+    for module, (_, packages) in profiles.items():
+        heaviest = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:args.top]
+        print(f"\n{module} heaviest packages (self time, s): "
+              + ", ".join(f"{name} {seconds:.3f}" for name, seconds in heaviest))
+
+    if args.skip_server:
+        return
+    try:
+        healthy, ready = server_timings(args.port, args.timeout, args.preload)
+    except TimeoutError:
+        print(f"\nAPI did not answer /health within {args.timeout:g}s")
+        return
+    print(f"\nAGENT_PRELOAD={args.preload}")
+    print(f"First /health response: {healthy:.2f}s")
+    print(f"Agents ready (/ready):  {f'{ready:.2f}s' if ready is not None else 'not within timeout'}")
+
+
+if __name__ == "__main__":
+    main()
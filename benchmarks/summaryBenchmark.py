@@ -0,0 +1,79 @@
+"""Cost of keeping the customer summary live: incremental view updates versus full recomputation.
+
+Inflates the seed customer's transactions to ``--transactions`` entries, then times a
+from-scratch summary, a single transaction change applied to the materialized view, a
+resync after the files were reloaded (diffing every entity, re-applying only changed
+ones) and a cached snapshot read. Both paths are checked to agree.
+
+    python -m benchmarks.summaryBenchmark
+    python -m benchmarks.summaryBenchmark --transactions 200000
+"""
+import argparse
+import copy
+import json
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.shared.materializedSummary import SummaryView, recompute_summary
+
+
+def timed(function, repeat: int) -> float:
+    """Median milliseconds per call"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        samples.append(time.perf_counter() - start)
+    return sorted(samples)[len(samples) // 2] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--core", default="knowledge/CORE_BANKING_DATA.json")
+    parser.add_argument("--transactions-file", default="knowledge/TRANSACTIONS_DATA.json")
+    parser.add_argument("--transactions", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with open(args.core, "r", encoding="utf-8") as fp:
+        core = json.load(fp)
+    with open(args.transactions_file, "r", encoding="utf-8") as fp:
+        transactions = json.load(fp)
+    seed = transactions["transactions"]
+    inflated = [dict(seed[index % len(seed)], id=f"TXN-BENCH-{index:07d}") for index in range(args.transactions)]
+    transactions = dict(transactions, transactions=inflated)
+
+    view = SummaryView()
+    view.sync(core, transactions)
+    changed = dict(inflated[0], amount="99999.00")
+
+    def update():
+        view.upsert("transaction", changed)
+        view.snapshot()
+        view.upsert("transaction", inflated[0])
+
+    # A reload hands over new objects with the same content plus one edit
+    reloaded = copy.deepcopy(transactions)
+    reloaded["transactions"][-1]["amount"] = "1.00"
+    results = [
+        ("full recompute", timed(lambda: recompute_summary(core, transactions), max(1, args.repeat // 4))),
+        ("incremental upsert + snapshot", timed(update, args.repeat)),
+        ("resync after reload (1 change)", timed(lambda: (view.sync(core, reloaded), view.sync(core, transactions)),
+                                                 max(1, args.repeat // 4)) / 2),
+        ("cached snapshot", timed(view.snapshot, args.repeat)),
+    ]
+
+    print(f"{args.transactions} transactions")
+    print(f"{'operation':<34}{'median ms':>11}")
+    for label, milliseconds in results:
+        print(f"{label:<34}{milliseconds:>11.3f}")
+    view.upsert("transaction", changed)
+    agrees = view.snapshot() == recompute_summary(core, dict(transactions, transactions=[changed] + inflated[1:]))
+    print(f"Incremental view matches full recomputation: {agrees}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,810 @@
+"""Seeded generator of synthetic banking datasets for scale testing.
+
+Every customer is emitted with exactly the schema of knowledge/CORE_BANKING_DATA.json
+and knowledge/TRANSACTIONS_DATA.json: accounts, cards, loans with full EMI schedules,
+investments with SIP history, recurring payments, disputes, rewards and a transaction
+history with realistic merchants and MCCs. Files hold a JSON array with one element per
+customer and are written incrementally, so millions of transactions never sit in memory.
+
+    python -m benchmarks.syntheticBankingData --customers 1000 --out knowledge/synthetic
+    python -m benchmarks.syntheticBankingData --customers 1000000 --shards 100 --transactions-per-customer 40
+
+Output layout (shard numbers are zero padded):
+
+    <out>/core/CORE_BANKING_DATA-00000.json
+    <out>/transactions/TRANSACTIONS_DATA-00000.json
+
+The same seed always produces the same data, shard by shard.
+"""
+import argparse
+import json
+import os
+import random
+import string
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+FIRST_NAMES = [
+    "Aarav", "Vivaan", "Aditya", "Vihaan", "Arjun", "Sai", "Reyansh", "Ayaan", "Krishna", "Ishaan",
+    "Ananya", "Diya", "Aadhya", "Saanvi", "Pari", "Myra", "Anika", "Navya", "Kiara", "Meera",
+    "Rohan", "Kabir", "Nikhil", "Priya", "Sneha", "Rahul", "Pooja", "Vikram", "Neha", "Karan",
+]
+LAST_NAMES = [
+    "Sharma", "Verma", "Iyer", "Reddy", "Nair", "Gupta", "Patel", "Mehta", "Rao", "Kulkarni",
+    "Joshi", "Menon", "Bose", "Chatterjee", "Singh", "Das", "Pillai", "Agarwal", "Kapoor", "Shetty",
+]
+CITIES = [
+    ("Bengaluru", "KA", "560"), ("Mumbai", "MH", "400"), ("Delhi", "DL", "110"), ("Chennai", "TN", "600"),
+    ("Hyderabad", "TG", "500"), ("Pune", "MH", "411"), ("Kolkata", "WB", "700"), ("Ahmedabad", "GJ", "380"),
+]
+BRANCHES = ["HSR Layout", "Koramangala", "Indiranagar", "Andheri West", "Connaught Place", "T Nagar", "Banjara Hills"]
+EMPLOYERS = ["Innotech Pvt Ltd", "Zenith Software", "Bluepeak Analytics", "Orbit Retail", "Nimbus Health", "Kestrel Motors"]
+BANKS = ["HDFC", "ICIC", "SBIN", "UTIB", "KKBK"]
+VPA_HANDLES = ["okaxis", "okhdfcbank", "oksbi", "ybl", "paytm"]
+
+# (name, mcc, category, subcategory, channel, typical amount range in INR)
+MERCHANTS = [
+    ("AMAZON SELLER SERVICES", "5311", "Shopping", "E-commerce", "ecom", (299, 8999)),
+    ("FLIPKART INTERNET", "5311", "Shopping", "E-commerce", "ecom", (199, 12999)),
+    ("MYNTRA DESIGNS", "5651", "Shopping", "Apparel", "ecom", (499, 4999)),
+    ("RELIANCE DIGITAL", "5732", "Shopping", "Electronics", "pos", (999, 45999)),
+    ("BIG BAZAAR", "5411", "Groceries", "Supermarket", "pos", (250, 6500)),
+    ("DMART", "5411", "Groceries", "Supermarket", "pos", (300, 5500)),
+    ("SWIGGY", "5812", "Food & Drink", "Food Delivery", "upi", (150, 1800)),
+    ("ZOMATO", "5812", "Food & Drink", "Food Delivery", "upi", (150, 1600)),
+    ("CAFE COFFEE DAY", "5814", "Food & Drink", "Cafe", "pos", (180, 900)),
+    ("STARBUCKS", "5814", "Food & Drink", "Cafe", "pos", (250, 1200)),
+    ("UBER INDIA", "4121", "Travel", "Cab", "upi", (120, 950)),
+    ("OLA CABS", "4121", "Travel", "Cab", "upi", (100, 850)),
+    ("INDIAN OIL", "5541", "Fuel", "Petrol", "pos", (500, 4000)),
+    ("IRCTC", "4112", "Travel", "Rail", "ecom", (300, 4500)),
+    ("INDIGO AIRLINES", "3000", "Travel", "Flights", "ecom", (3500, 18000)),
+    ("APOLLO PHARMACY", "5912", "Health", "Pharmacy", "pos", (120, 2500)),
+    ("BOOKMYSHOW", "7832", "Entertainment", "Movies", "ecom", (250, 1500)),
+    ("AIRTEL PAYMENTS", "4814", "Bills", "Mobile", "upi", (299, 999)),
+    ("TATA POWER", "4900", "Bills", "Electricity", "upi", (800, 4500)),
+    ("DECATHLON", "5941", "Shopping", "Sports", "pos", (499, 7999)),
+]
+INTERNATIONAL_MERCHANTS = [
+    ("APPLE.COM/BILL", "5732", "Shopping", "Digital", "Cupertino", "US", "USD", 83.2),
+    ("SPOTIFY AB", "5815", "Entertainment", "Streaming", "Stockholm", "SE", "EUR", 90.4),
+    ("AIRBNB PAYMENTS", "7011", "Travel", "Stay", "Dublin", "IE", "EUR", 90.4),
+    ("CHANGI DUTY FREE", "5309", "Shopping", "Duty Free", "Singapore", "SG", "SGD", 64.1),
+]
+SUBSCRIPTIONS = [("Netflix", "649.00"), ("Spotify", "119.00"), ("Amazon Prime", "299.00"), ("Disney+ Hotstar", "299.00")]
+FUNDS = [
+    ("Axis MF", "Axis Bluechip Fund - Direct Plan - Growth", "INF846K01DQ0", 360.0),
+    ("HDFC MF", "HDFC Index Fund - Nifty 50 Plan - Direct Growth", "INF179K01WA6", 210.0),
+    ("Parag Parikh MF", "Parag Parikh Flexi Cap Fund - Direct Growth", "INF879O01027", 70.0),
+    ("SBI MF", "SBI Small Cap Fund - Direct Growth", "INF200K01T51", 160.0),
+]
+INSURERS = {"life": ["HDFC Life", "LIC", "ICICI Prudential"], "health": ["Star Health", "Niva Bupa"],
+            "motor": ["ICICI Lombard", "Bajaj Allianz"]}
+DISPUTE_REASONS = ["Goods not received", "Duplicate charge", "Amount mismatch", "Unrecognised transaction"]
+
+
+def _money(paise: int) -> str:
+    sign = "-" if paise < 0 else ""
+    paise = abs(paise)
+    return f"{sign}{paise // 100}.{paise % 100:02d}"
+
+
+def _paise(rng: random.Random, low: float, high: float) -> int:
+    return int(rng.uniform(low, high) * 100)
+
+
+def _timestamp(moment: datetime) -> str:
+    return moment.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _add_months(day: date, months: int) -> date:
+    month_index = day.month - 1 + months
+    year = day.year + month_index // 12
+    month = month_index % 12 + 1
+    return date(year, month, min(day.day, 28))
+
+
+def _code(rng: random.Random, length: int = 6) -> str:
+    return "".join(rng.choice(string.ascii_uppercase + string.digits) for _ in range(length))
+
+
+def amortization_schedule(principal_paise: int, rate_apr: float, term_months: int,
+                          first_due: date) -> Tuple[int, List[Dict[str, Any]]]:
+    """Return the EMI (in paise) and a full reducing-balance schedule"""
+    monthly_rate = rate_apr / 1200
+    factor = (1 + monthly_rate) ** term_months
+    emi = int(round(principal_paise * monthly_rate * factor / (factor - 1)))
+    balance = principal_paise
+    rows = []
+    for month in range(term_months):
+        interest = int(round(balance * monthly_rate))
+        principal_part = emi - interest if month < term_months - 1 else balance
+        balance -= principal_part
+        rows.append({
+            "dueDate": _add_months(first_due, month).isoformat(),
+            "principalComponent": _money(principal_part),
+            "interestComponent": _money(interest),
+            "feesComponent": "0.00",
+            "totalDue": _money(principal_part + interest),
+            "status": "upcoming",
+            "_balanceAfter": balance,
+        })
+    return emi, rows
+
+
+class CustomerGenerator:
+    """Builds one customer's core banking record and transaction history"""
+
+    def __init__(self, number: int, seed: int, as_of: datetime, history_days: int, transactions_per_customer: int):
+        self.number = number
+        self.rng = random.Random(f"{seed}-{number}")
+        self.as_of = as_of
+        self.today = as_of.date()
+        self.history_days = history_days
+        self.transactions_per_customer = transactions_per_customer
+        self.customer_id = f"CUST{number:07d}"
+        self.tag = f"{number:07d}"
+        self.transactions: List[Dict[str, Any]] = []
+        self.balances: Dict[str, int] = {}
+        self.card_outstanding = 0
+
+    # Identifiers -----------------------------------------------------------
+
+    def _id(self, prefix: str, index: int) -> str:
+        return f"{prefix}-{self.tag}-{index:03d}"
+
+    def _txn_id(self) -> str:
+        return f"TXN-{self.today.year}-{self.tag}-{len(self.transactions) + 1:05d}"
+
+    # Builders --------------------------------------------------------------
+
+    def customer(self) -> Dict[str, Any]:
+        rng = self.rng
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        city, state, pin_prefix = rng.choice(CITIES)
+        self.name = f"{first} {last}"
+        self.city = city
+        self.spouse = f"{rng.choice(FIRST_NAMES)} {last}" if rng.random() < 0.6 else None
+        pan = "".join(rng.choice(string.ascii_uppercase) for _ in range(5)) + f"{rng.randint(1000, 9999)}" + rng.choice(string.ascii_uppercase)
+        self.pan = pan
+        birth = date(rng.randint(1960, 2002), rng.randint(1, 12), rng.randint(1, 28))
+        return {
+            "id": self.customer_id,
+            "name": self.name,
+            "dob": birth.isoformat(),
+            "email": f"{first.lower()}.{last.lower()}{self.number}@example.com",
+            "phone": f"+91-9{rng.randint(100000000, 999999999)}",
+            "kyc": {"status": "verified" if rng.random() < 0.97 else "pending", "pan": pan,
+                    "aadhaarMasked": f"XXXX-XXXX-{rng.randint(1000, 9999)}"},
+            "addresses": [{"type": "residential", "line1": f"{rng.randint(1, 999)}, {rng.choice(LAST_NAMES)} Residency",
+                           "city": city, "state": state, "postalCode": f"{pin_prefix}{rng.randint(1, 99):03d}",
+                           "country": "IN"}],
+        }
+
+    def _holders(self, joint: bool) -> List[Dict[str, Any]]:
+        holders = [{"id": self.customer_id, "name": self.name, "role": "primary", "kycStatus": "verified"}]
+        if joint and self.spouse:
+            holders.append({"id": f"{self.customer_id}-J1", "name": self.spouse, "role": "joint",
+                            "relation": "spouse", "kycStatus": "verified"})
+        return holders
+
+    def accounts(self) -> List[Dict[str, Any]]:
+        rng = self.rng
+        branch = f"{rng.choice(BRANCHES)}, {self.city}"
+        self.savings_id = self._id("ACCT-SAV", 1)
+        self.current_id = self._id("ACCT-CUR", 2)
+        self.fd_id = self._id("ACCT-FD", 3) if rng.random() < 0.5 else None
+        self.balances[self.savings_id] = _paise(rng, 20000, 400000)
+        self.balances[self.current_id] = _paise(rng, 5000, 150000)
+        self.overdraft_limit = rng.choice([0, 25000, 50000, 100000]) * 100
+        accounts = [
+            {"id": self.savings_id, "name": "Savings Account", "type": "savings",
+             "numberMasked": f"XXXXXXXX{rng.randint(1000, 9999)}", "currency": "INR",
+             "ifsc": f"KRES0000{rng.randint(100, 999)}", "branch": branch,
+             "openedAt": date(rng.randint(2010, 2022), rng.randint(1, 12), rng.randint(1, 28)).isoformat(),
+             "status": "active", "interestRateApr": 3.5, "overdraftEnabled": False,
+             "holders": self._holders(joint=True)},
+            {"id": self.current_id, "name": "Salary Account", "type": "current",
+             "numberMasked": f"XXXXXXXX{rng.randint(1000, 9999)}", "currency": "INR",
+             "ifsc": f"KRES0000{rng.randint(100, 999)}", "branch": branch,
+             "openedAt": date(rng.randint(2015, 2024), rng.randint(1, 12), rng.randint(1, 28)).isoformat(),
+             "status": "active", "overdraftEnabled": self.overdraft_limit > 0,
+             **({"overdraftLimit": _money(self.overdraft_limit)} if self.overdraft_limit else {}),
+             "holders": self._holders(joint=False)},
+        ]
+        if self.fd_id:
+            opened = self.today - timedelta(days=rng.randint(30, 700))
+            tenure = rng.choice([12, 24, 36, 60])
+            self.fd_principal = rng.choice([100000, 200000, 300000, 500000]) * 100
+            accounts.append({
+                "id": self.fd_id, "name": "Fixed Deposit", "type": "deposit_fd",
+                "numberMasked": f"FD-XXXX{rng.randint(1000, 9999)}", "currency": "INR",
+                "principal": _money(self.fd_principal), "interestRateApr": rng.choice([6.5, 6.8, 7.1, 7.25]),
+                "tenureMonths": tenure, "openedAt": opened.isoformat(),
+                "maturityDate": _add_months(opened, tenure).isoformat(),
+                "payoutFrequency": rng.choice(["monthly", "quarterly", "on_maturity"]),
+                "autoRenew": rng.random() < 0.5, "status": "active", "holders": self._holders(joint=True),
+            })
+        return accounts
+
+    def cards(self) -> List[Dict[str, Any]]:
+        rng = self.rng
+        self.debit_card_id = self._id("CARD-DB", 1)
+        self.credit_card_id = self._id("CARD-CR", 2) if rng.random() < 0.8 else None
+        cards = [{
+            "id": self.debit_card_id, "type": "debit", "network": rng.choice(["visa", "rupay", "mastercard"]),
+            "last4": f"{rng.randint(1000, 9999)}", "expiry": {"month": rng.randint(1, 12), "year": rng.randint(2026, 2031)},
+            "status": "active", "linkedAccountId": self.savings_id,
+            "controls": {"internationalEnabled": rng.random() < 0.4, "contactlessEnabled": rng.random() < 0.8},
+            "limits": {"atmDaily": "25000.00", "posDaily": "100000.00"},
+        }]
+        if self.credit_card_id:
+            self.credit_limit = rng.choice([50000, 100000, 200000, 500000]) * 100
+            cards.append({
+                "id": self.credit_card_id, "type": "credit", "network": rng.choice(["visa", "mastercard", "amex"]),
+                "last4": f"{rng.randint(1000, 9999)}", "expiry": {"month": rng.randint(1, 12), "year": rng.randint(2026, 2031)},
+                "status": "active", "creditLimit": _money(self.credit_limit), "availableCredit": None,
+                "cashLimit": _money(self.credit_limit // 5), "statementCycle": {"billDate": 3, "dueDate": 23},
+                "lastStatement": None, "rewards": {"program": "EdgeRewards", "points": 0},
+            })
+        return cards
+
+    def payees(self) -> List[Dict[str, Any]]:
+        rng = self.rng
+        payees = []
+        for index in range(1, rng.randint(2, 6)):
+            name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+            payees.append({
+                "id": self._id("PAYEE", index), "name": name, "type": "person",
+                "upi": f"{name.split()[0].lower()}{rng.randint(1, 99)}@{rng.choice(VPA_HANDLES)}",
+                "account": {"name": name, "numberMasked": f"XXXXXX{rng.randint(1000, 9999)}",
+                            "ifsc": f"{rng.choice(BANKS)}000{rng.randint(1000, 9999)}"},
+                "status": "active",
+            })
+        payees.append({"id": self._id("PAYEE", len(payees) + 1), "name": "Electricity Board", "type": "billpay",
+                       "account": {"name": "Electricity Board", "numberMasked": None, "ifsc": None},
+                       "billerCode": f"ELEC-{rng.randint(100000, 999999)}", "status": "active"})
+        self.payee_list = payees
+        return payees
+
+    def loans(self) -> List[Dict[str, Any]]:
+        rng = self.rng
+        loans = []
+        specs = []
+        if rng.random() < 0.45:
+            specs.append(("home", "LOAN-HOME", rng.choice([2500000, 4000000, 5000000, 7500000]), rng.choice([7.9, 8.1, 8.5, 8.75]),
+                          rng.choice([180, 240, 300]), "floating"))
+        if rng.random() < 0.35:
+            specs.append(("personal", "LOAN-PL", rng.choice([150000, 300000, 500000]), rng.choice([11.5, 13.0, 14.5]),
+                          rng.choice([24, 36, 48, 60]), "fixed"))
+        if rng.random() < 0.25:
+            specs.append(("vehicle", "LOAN-VEH", rng.choice([600000, 900000, 1200000]), rng.choice([8.9, 9.4]),
+                          rng.choice([48, 60, 84]), "fixed"))
+        self.loan_emis: List[Tuple[str, date, int]] = []
+        for index, (loan_type, prefix, amount, rate, term, rate_type) in enumerate(specs, start=1):
+            principal = amount * 100
+            elapsed = rng.randint(3, max(4, term - 6))
+            origination = _add_months(self.today, -elapsed)
+            first_due = _add_months(origination, 1)
+            emi, schedule = amortization_schedule(principal, rate, term, first_due)
+            outstanding = principal
+            next_emi: Optional[str] = None
+            for row in schedule:
+                due = date.fromisoformat(row["dueDate"])
+                if due < self.today:
+                    row["status"] = "paid"
+                    outstanding = row["_balanceAfter"]
+                elif next_emi is None:
+                    row["status"] = "due"
+                    next_emi = row["dueDate"]
+                del row["_balanceAfter"]
+            loan_id = self._id(prefix, index)
+            self.loan_emis.append((loan_id, date.fromisoformat(next_emi or schedule[-1]["dueDate"]), emi))
+            loan = {
+                "id": loan_id, "type": loan_type, "lender": "Kreesalis Bank", "accountId": None,
+                "sanctionAmount": _money(principal), "principal": _money(principal),
+                "outstandingPrincipal": _money(outstanding), "rateApr": rate, "rateType": rate_type,
+                "termMonths": term, "originationDate": origination.isoformat(),
+                "maturityDate": _add_months(origination, term).isoformat(), "emiAmount": _money(emi),
+                "nextEmiDate": next_emi, "status": "active",
+            }
+            if loan_type == "home":
+                loan["collateral"] = {"type": "property", "description": f"{rng.choice(['1BHK', '2BHK', '3BHK'])}, {self.city}"}
+            loan["schedule"] = schedule
+            loans.append(loan)
+        return loans
+
+    def recurring_and_investments(self) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        rng = self.rng
+        recurring, investments = [], []
+        self.sips: List[Tuple[str, int, int]] = []
+        for index, (provider, fund, isin, base_nav) in enumerate(rng.sample(FUNDS, rng.randint(0, 2)), start=1):
+            amount = rng.choice([1000, 2500, 5000, 10000]) * 100
+            day = rng.choice([1, 5, 10, 15])
+            rec_id = self._id("REC", len(recurring) + 1)
+            mandate = f"NACH-SIP-{isin[-6:]}-{self.tag}"
+            recurring.append({"id": rec_id, "name": f"SIP - {fund.split(' - ')[0]}", "fromAccountId": self.savings_id,
+                              "toPayeeId": None, "amount": _money(amount), "currency": "INR", "frequency": "monthly",
+                              "dayOfMonth": day, "nextDate": self._next_day_of_month(day).isoformat(), "status": "active",
+                              "mandate": {"type": "nach", "reference": mandate}})
+            self.sips.append((mandate, amount, day))
+
+            months = rng.randint(6, 60)
+            nav = base_nav * rng.uniform(0.7, 0.9)
+            units_total, cost_total = 0.0, 0
+            sip_transactions = []
+            for month in range(months, 0, -1):
+                sip_date = _add_months(self.today.replace(day=day), -month)
+                nav *= 1 + rng.gauss(0.01, 0.04)
+                units = round(amount / 100 / nav, 3)
+                units_total += units
+                cost_total += amount
+                sip_transactions.append({"id": f"INV-TXN-{self.tag}-{index}{month:04d}", "type": "sip",
+                                         "date": sip_date.isoformat(), "units": units, "nav": f"{nav:.2f}",
+                                         "amount": _money(amount), "status": "completed"})
+            current_nav = nav * (1 + rng.gauss(0.005, 0.02))
+            valuation = int(units_total * current_nav * 100)
+            investments.append({
+                "id": self._id("INV-MF", index), "type": "mutual_fund", "provider": provider,
+                "folio": f"{rng.randint(1000000, 9999999)}/{rng.randint(10, 99)}",
+                "holders": [{"id": self.customer_id, "name": self.name, "role": "primary"}],
+                "valuation": {"value": _money(valuation), "currency": "INR", "asOf": _timestamp(self.as_of)},
+                "holdings": [{"id": f"HOLD-{isin[-6:]}", "name": fund, "isin": isin, "units": round(units_total, 3),
+                              "avgNav": f"{cost_total / 100 / units_total:.2f}", "currentNav": f"{current_nav:.2f}",
+                              "valuation": _money(valuation)}],
+                "transactions": sip_transactions,
+            })
+        if self.fd_id:
+            investments.append({
+                "id": self._id("INV-FD", len(investments) + 1), "type": "fd", "provider": "Kreesalis Bank",
+                "accountRef": self.fd_id, "holders": [{"id": self.customer_id, "name": self.name, "role": "primary"}],
+                "valuation": {"value": _money(self.fd_principal), "currency": "INR", "asOf": _timestamp(self.as_of)},
+            })
+        if self.credit_card_id:
+            for name, amount in rng.sample(SUBSCRIPTIONS, rng.randint(0, 2)):
+                day = rng.randint(1, 28)
+                recurring.append({"id": self._id("REC", len(recurring) + 1), "name": name, "fromAccountId": None,
+                                  "fromCardId": self.credit_card_id, "toPayeeId": None, "amount": amount,
+                                  "currency": "INR", "frequency": "monthly", "dayOfMonth": day,
+                                  "nextDate": self._next_day_of_month(day).isoformat(), "status": "active",
+                                  "mandate": {"type": "card_on_file", "reference": f"{name.upper().replace(' ', '')[:8]}-COF-{self.tag}"}})
+        self.recurring_list = recurring
+        self.investment_list = investments
+        return recurring, investments
+
+    def _next_day_of_month(self, day: int) -> date:
+        candidate = self.today.replace(day=day) if day <= 28 else self.today.replace(day=28)
+        return candidate if candidate > self.today else _add_months(candidate, 1)
+
+    # Transactions ----------------------------------------------------------
+
+    def _add_transaction(self, moment: datetime, method: str, direction: str, amount: int, description: str,
+                         category: str, subcategory: str, account_id: Optional[str] = None,
+                         card_id: Optional[str] = None, merchant: Optional[Dict[str, Any]] = None,
+                         reference: Optional[Dict[str, Any]] = None, tags: Optional[List[str]] = None,
+                         discretionary: bool = False, **extra: Any) -> Optional[Dict[str, Any]]:
+        balance_after = None
+        if account_id and discretionary and direction == "outflow":
+            # Discretionary spends are declined rather than pushing the account into the red
+            floor = -self.overdraft_limit if account_id == self.current_id else 0
+            if self.balances[account_id] - amount < floor:
+                return None
+        if account_id:
+            self.balances[account_id] += amount if direction == "inflow" else -amount
+            balance_after = _money(self.balances[account_id])
+        elif card_id:
+            self.card_outstanding += -amount if direction == "inflow" else amount
+        booking = _timestamp(moment)
+        transaction = {
+            "id": self._txn_id(), "accountId": account_id, "cardId": card_id, "method": method,
+            "direction": direction, "amount": _money(amount), "currency": "INR", "description": description,
+            "merchant": merchant, "category": category, "subcategory": subcategory, "tags": tags or [],
+            **{key: value for key, value in extra.items() if key == "fx"},
+            "reference": reference, "bookingDate": booking, "valueDate": booking if account_id else None,
+            "status": "posted",
+            **{key: value for key, value in extra.items() if key != "fx"},
+            "balanceAfter": balance_after,
+        }
+        self.transactions.append(transaction)
+        return transaction
+
+    def generate_transactions(self) -> None:
+        rng = self.rng
+        start = self.as_of - timedelta(days=self.history_days)
+        events: List[Tuple[datetime, str, Any]] = []
+        salary = rng.choice([80000, 145000, 220000, 350000]) * 100
+        employer = rng.choice(EMPLOYERS)
+        day = start.date()
+        while day <= self.today:
+            moment = datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+            if day.day == 1:
+                events.append((moment + timedelta(hours=8, minutes=15), "salary", None))
+            for mandate, amount, sip_day in self.sips:
+                if day.day == sip_day:
+                    events.append((moment + timedelta(hours=6), "sip", (mandate, amount)))
+            for loan_id, next_due, emi in self.loan_emis:
+                if day.day == next_due.day and day < next_due:
+                    events.append((moment + timedelta(hours=7), "emi", (loan_id, emi)))
+            # Savings interest is credited on the last day of each quarter
+            if (day + timedelta(days=1)).day == 1 and day.month % 3 == 0:
+                events.append((moment + timedelta(hours=23, minutes=59, seconds=59), "interest", None))
+            day += timedelta(days=1)
+
+        span_seconds = int((self.as_of - start).total_seconds())
+        for _ in range(max(0, int(rng.gauss(self.transactions_per_customer, self.transactions_per_customer * 0.2)) - len(events))):
+            events.append((start + timedelta(seconds=rng.randint(0, span_seconds)), "spend", None))
+        events.sort(key=lambda event: event[0])
+
+        card_spends: List[Dict[str, Any]] = []
+        for moment, kind, payload in events:
+            if moment > self.as_of:
+                continue
+            if kind == "salary":
+                self._add_transaction(moment, "neft", "inflow", salary, f"{moment:%B} Salary - {employer}", "Income", "Salary",
+                                      account_id=self.savings_id, reference={"utr": f"{rng.choice(BANKS)}NEFT{rng.randint(10**6, 10**7 - 1)}"},
+                                      tags=["salary"])
+                # Move the month's EMIs over to the account the loan mandates debit
+                emi_total = sum(emi for _, _, emi in self.loan_emis)
+                if emi_total:
+                    reference = {"utr": f"{rng.randint(10**11, 10**12 - 1)}"}
+                    sweep = moment + timedelta(minutes=30)
+                    self._add_transaction(sweep, "imps", "outflow", emi_total, "Transfer to Salary Account", "Transfers", "Self",
+                                          account_id=self.savings_id, reference=reference, tags=["self-transfer"])
+                    self._add_transaction(sweep, "imps", "inflow", emi_total, "Transfer from Savings Account", "Transfers", "Self",
+                                          account_id=self.current_id, reference=reference, tags=["self-transfer"])
+            elif kind == "sip":
+                mandate, amount = payload
+                self._add_transaction(moment, "standing_instruction", "outflow", amount, "SIP - Mutual Fund", "Investments",
+                                      "SIP", account_id=self.savings_id, reference={"mandate": mandate}, tags=["recurring"])
+            elif kind == "emi":
+                loan_id, emi = payload
+                self._add_transaction(moment, "standing_instruction", "outflow", emi, f"EMI - {loan_id}", "Loans", "EMI",
+                                      account_id=self.current_id, reference={"mandate": f"NACH-{loan_id}"}, tags=["emi"])
+            elif kind == "interest":
+                interest = max(100, int(self.balances[self.savings_id] * 0.035 / 4))
+                self._add_transaction(moment, "interest", "inflow", interest, "Savings Interest Credit", "Interest", "Savings",
+                                      account_id=self.savings_id)
+            else:
+                spend = self._spend(moment)
+                if spend is not None and spend.get("cardId") and spend["direction"] == "outflow":
+                    card_spends.append(spend)
+
+        # A few refunds and disputes against card purchases
+        self.dispute_list = []
+        for spend in rng.sample(card_spends, min(len(card_spends), rng.randint(0, 2))):
+            refund = int(float(spend["amount"]) * 100 * rng.choice([0.25, 0.5, 1.0]))
+            moment = datetime.strptime(spend["bookingDate"], "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc) + timedelta(days=rng.randint(1, 6))
+            if moment <= self.as_of:
+                self._add_transaction(moment, "card_refund", "inflow", refund, f"{spend['description']} Refund", "Refund", "Card",
+                                      account_id=spend["accountId"], card_id=spend["cardId"], merchant=spend["merchant"],
+                                      reference={"authCode": _code(rng)},
+                                      relatedTransactionIds=[spend["id"]])
+        for index, spend in enumerate(rng.sample(card_spends, min(len(card_spends), 1 if rng.random() < 0.2 else 0)), start=1):
+            opened = datetime.strptime(spend["bookingDate"], "%Y-%m-%dT%H:%M:%SZ") + timedelta(days=1)
+            self.dispute_list.append({"id": self._id("DISP-CR", index), "transactionId": spend["id"], "cardId": spend["cardId"],
+                                      "reason": rng.choice(DISPUTE_REASONS), "status": rng.choice(["open", "in_review", "resolved"]),
+                                      "openedAt": _timestamp(opened), "updatedAt": _timestamp(opened + timedelta(days=1))})
+        self.card_spends = card_spends
+
+    def _spend(self, moment: datetime) -> Optional[Dict[str, Any]]:
+        rng = self.rng
+        roll = rng.random()
+        if roll < 0.04:
+            amount = rng.choice([2000, 5000, 10000]) * 100
+            return self._add_transaction(moment, "atm", "outflow", amount, "ATM CASH WD", "Cash", "ATM", account_id=self.savings_id, discretionary=True,
+                                         merchant={"name": "KREESALIS ATM", "mcc": "6011", "location": {"city": self.city, "country": "IN"}},
+                                         reference={"rrn": f"{moment:%Y%m%d}{rng.randint(1000, 9999)}"}, tags=["cash"])
+        if roll < 0.12 and self.payee_list:
+            payee = rng.choice([p for p in self.payee_list if p.get("upi")] or self.payee_list)
+            amount = _paise(rng, 200, 15000)
+            if payee.get("upi"):
+                transaction = self._add_transaction(moment, "upi", "outflow", amount, f"UPI to {payee['upi']}", "Transfers", "UPI",
+                                                    account_id=self.savings_id, discretionary=True, reference={"utr": f"{rng.randint(10**11, 10**12 - 1)}", "vpa": payee["upi"]},
+                                                    tags=rng.choice([["friends"], ["family"], ["split"], []]))
+                if transaction is not None and rng.random() < 0.3:
+                    self._add_transaction(moment, "fee", "outflow", 1180, "IMPS Charges", "Fees", "Transfer Fee", account_id=self.savings_id)
+                return transaction
+            return self._add_transaction(moment, "billpay", "outflow", amount, payee["name"], "Bills", "Utilities",
+                                         account_id=self.savings_id, discretionary=True, reference={"billerCode": payee.get("billerCode")})
+        if roll < 0.15 and self.credit_card_id:
+            name, mcc, category, subcategory, city, country, currency, rate = rng.choice(INTERNATIONAL_MERCHANTS)
+            original = _paise(rng, 5, 250)
+            fee = int(original * rate * 0.035)
+            return self._add_transaction(moment, "card_ecom_international", "outflow", int(original * rate) + fee, f"{name.split('/')[0].title()} {currency}",
+                                         category, subcategory, card_id=self.credit_card_id,
+                                         merchant={"name": name, "mcc": mcc, "location": {"city": city, "country": country}},
+                                         reference={"authCode": _code(rng)}, tags=["cross-currency"],
+                                         fx={"originalAmount": {"value": _money(original), "currency": currency}, "rate": rate, "fee": _money(fee)})
+        name, mcc, category, subcategory, channel, (low, high) = rng.choice(MERCHANTS)
+        amount = _paise(rng, low, high)
+        merchant = {"name": name, "mcc": mcc, "location": {"city": self.city, "country": "IN"}}
+        if channel == "upi" or not self.credit_card_id and channel == "ecom":
+            return self._add_transaction(moment, "upi", "outflow", amount, name.title(), category, subcategory,
+                                         account_id=self.savings_id, discretionary=True, merchant=merchant,
+                                         reference={"utr": f"{rng.randint(10**11, 10**12 - 1)}", "vpa": f"{name.split()[0].lower()}@{rng.choice(VPA_HANDLES)}"})
+        card_id = self.credit_card_id if self.credit_card_id and rng.random() < 0.7 else self.debit_card_id
+        method = "card_ecom" if channel == "ecom" else "card_pos"
+        if card_id == self.debit_card_id:
+            # Debit card spends settle straight from the linked savings account
+            return self._add_transaction(moment, method, "outflow", amount, name.title(), category, subcategory,
+                                         account_id=self.savings_id, discretionary=True, card_id=card_id, merchant=merchant,
+                                         reference={"authCode": _code(rng)})
+        return self._add_transaction(moment, method, "outflow", amount, name.title(), category, subcategory,
+                                     card_id=card_id, merchant=merchant, reference={"authCode": _code(rng)})
+
+    # Derived sections ------------------------------------------------------
+
+    def _finish_cards(self, cards: List[Dict[str, Any]], rewards_ledger: List[Dict[str, Any]], points: int) -> None:
+        for card in cards:
+            if card["type"] == "debit":
+                continue
+            period_end = self.today.replace(day=3) if self.today.day > 3 else _add_months(self.today.replace(day=3), -1)
+            period_start = _add_months(period_end, -1) + timedelta(days=1)
+            purchases = sum(int(float(t["amount"]) * 100) for t in self.card_spends
+                            if period_start.isoformat() <= t["bookingDate"][:10] <= period_end.isoformat())
+            previous = _paise(self.rng, 0, 30000)
+            outstanding = max(0, self.card_outstanding)
+            card["availableCredit"] = _money(max(0, self.credit_limit - outstanding))
+            card["lastStatement"] = {
+                "period": {"from": period_start.isoformat(), "to": period_end.isoformat()},
+                "previousBalance": _money(previous), "purchases": _money(purchases), "fees": "0.00", "interest": "0.00",
+                "payments": _money(previous), "totalDue": _money(purchases), "minDue": _money(purchases // 10),
+                "dueDate": period_end.replace(day=23).isoformat(),
+            }
+            card["rewards"]["points"] = points
+
+    def build(self) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        rng = self.rng
+        generated_at = _timestamp(self.as_of)
+        meta = {"generatedAt": generated_at, "currency": "INR", "locale": "en-IN"}
+        customer = self.customer()
+        accounts = self.accounts()
+        cards = self.cards()
+        payees = self.payees()
+        loans = self.loans()
+        recurring, investments = self.recurring_and_investments()
+        self.generate_transactions()
+
+        # Rewards accrue on credit card purchases: 1 point per INR 100
+        ledger, points = [], 0
+        if self.credit_card_id:
+            for spend in self.card_spends:
+                earned = int(float(spend["amount"]) // 100)
+                if earned:
+                    points += earned
+                    ledger.append({"id": f"REW-L-{self.tag}-{len(ledger) + 1:05d}", "programId": "REW-EDGE",
+                                   "date": spend["bookingDate"][:10], "type": "accrual", "points": earned,
+                                   "reason": f"Purchase at {spend['description']}", "transactionId": spend["id"]})
+            if points > 2000 and rng.random() < 0.5:
+                redeemed = rng.choice([500, 1000, 1500])
+                points -= redeemed
+                ledger.append({"id": f"REW-L-{self.tag}-{len(ledger) + 1:05d}", "programId": "REW-EDGE",
+                               "date": (self.today - timedelta(days=rng.randint(1, 20))).isoformat(), "type": "redemption",
+                               "points": -redeemed, "reason": "Voucher - Amazon", "reference": f"VCHR-AMZ-{redeemed}"})
+        self._finish_cards(cards, ledger, points)
+
+        for account in accounts:
+            if account["id"] in self.balances:
+                current = self.balances[account["id"]]
+                hold = _paise(rng, 0, 1500) if rng.random() < 0.3 else 0
+                available = current - hold + (self.overdraft_limit if account["id"] == self.current_id else 0)
+                account["balance"] = {"available": _money(available), "current": _money(current), "asOf": generated_at}
+
+        policies = self._insurance_policies()
+        core = {
+            "meta": meta,
+            "customer": customer,
+            "accounts": accounts,
+            "cards": cards,
+            "payees": payees,
+            "recurringPayments": recurring,
+            "loans": loans,
+            "investments": investments,
+            "beneficiaries": [{"id": self._id("BEN", 1), "name": self.spouse or self.name, "type": "nominee",
+                               "relationship": "spouse" if self.spouse else "self", "sharePercent": 100,
+                               "linkedEntity": {"entity": "account", "entityId": self.savings_id}}],
+            "limits": [{"id": "LIM-UPI", "channel": "upi", "dailyLimit": "100000.00", "perTxnLimit": "100000.00",
+                        "remainingToday": _money(10000000 - sum(int(float(t["amount"]) * 100) for t in self.transactions
+                                                                 if t["method"] == "upi" and t["bookingDate"][:10] == self.today.isoformat())),
+                        "asOf": generated_at}],
+            "documents": [{"id": f"DOC-STMT-SAV-{_add_months(self.today, -1):%Y-%m}-{self.tag}", "type": "statement",
+                           "accountId": self.savings_id,
+                           "period": {"from": _add_months(self.today.replace(day=1), -1).isoformat(),
+                                      "to": (self.today.replace(day=1) - timedelta(days=1)).isoformat()},
+                           "uri": f"https://files.example.com/statements/{self.savings_id}-{_add_months(self.today, -1):%Y-%m}.pdf",
+                           "createdAt": _timestamp(datetime.combine(self.today.replace(day=1), datetime.min.time()) + timedelta(hours=5))}],
+            "consents": [{"id": self._id("CONSENT-AA", 1), "provider": "AccountAggregator", "purpose": "Personal finance management",
+                          "scopes": ["accounts", "transactions"], "status": "active",
+                          "grantedAt": _timestamp(self.as_of - timedelta(days=rng.randint(10, 300))),
+                          "expiresAt": _timestamp(self.as_of + timedelta(days=rng.randint(30, 365)))}],
+            "disputes": self.dispute_list,
+            "alerts": self._alerts(generated_at),
+            "creditProfile": self._credit_profile(loans, cards),
+            "insurancePolicies": policies,
+            "tax": {"form26AS": {"assessmentYear": f"{self.today.year}-{(self.today.year + 1) % 100:02d}", "pan": self.pan,
+                                 "parts": {"partA": {"tdsSalary": _money(rng.randint(0, 500000) * 100), "tdsOther": _money(rng.randint(0, 10000) * 100)},
+                                           "partB": {"tcs": "0.00"}, "partC": {"advanceTax": "0.00", "selfAssessmentTax": "0.00"},
+                                           "partE": {"sft": []}},
+                                 "grossTotalIncomeEstimate": _money(rng.randint(500000, 4000000) * 100),
+                                 "taxPaidTotal": _money(rng.randint(0, 600000) * 100), "updatedAt": self.today.replace(day=1).isoformat()}},
+            "rewards": {"programs": [{"id": "REW-EDGE", "name": "EdgeRewards", "ownerType": "card", "ownerId": self.credit_card_id,
+                                      "currency": "points", "pointsBalance": points}] if self.credit_card_id else [],
+                        "ledger": ledger},
+            "travelNotices": [{"id": self._id("TRAVEL", 1), "cardId": self.credit_card_id, "country": rng.choice(["SG", "AE", "TH", "US"]),
+                               "from": (self.today + timedelta(days=20)).isoformat(), "to": (self.today + timedelta(days=28)).isoformat(),
+                               "status": "active"}] if self.credit_card_id and rng.random() < 0.15 else [],
+        }
+        core["summary"] = self._summary(core)
+
+        transactions = sorted(self.transactions, key=lambda t: t["bookingDate"], reverse=True)
+        by_account: Dict[str, List[str]] = {}
+        by_card: Dict[str, List[str]] = {}
+        for transaction in transactions:
+            if transaction["accountId"]:
+                by_account.setdefault(transaction["accountId"], []).append(transaction["id"])
+            if transaction["cardId"]:
+                by_card.setdefault(transaction["cardId"], []).append(transaction["id"])
+        history = {
+            "meta": dict(meta, customerId=self.customer_id),
+            "transactions": transactions,
+            "indexes": {"transactionsByAccountId": by_account, "transactionsByCardId": by_card},
+            "paging": {"cursor": None, "hasMore": False},
+        }
+        return core, history
+
+    def _insurance_policies(self) -> List[Dict[str, Any]]:
+        rng = self.rng
+        policies = []
+        holder = [{"id": self.customer_id, "name": self.name, "role": "primary"}]
+        if rng.random() < 0.6:
+            start = date(rng.randint(2012, 2024), rng.randint(1, 12), 1)
+            policies.append({"id": self._id("INS-LIFE", 1), "type": "life", "insurer": rng.choice(INSURERS["life"]),
+                             "policyNumber": f"LI-{start.year}-{self.tag}", "holders": holder,
+                             "sumAssured": _money(rng.choice([5000000, 10000000, 20000000]) * 100),
+                             "premium": _money(rng.randint(8000, 40000) * 100), "frequency": "yearly",
+                             "startDate": start.isoformat(), "endDate": start.replace(year=start.year + 25).isoformat(), "status": "active",
+                             "nominees": [{"name": self.spouse or "Parent", "relation": "spouse" if self.spouse else "parent", "sharePercent": 100}]})
+        if rng.random() < 0.7:
+            start = self.today - timedelta(days=rng.randint(10, 330))
+            policies.append({"id": self._id("INS-HEALTH", 1), "type": "health", "insurer": rng.choice(INSURERS["health"]),
+                             "policyNumber": f"HE-{start.year}-{self.tag}", "holders": holder,
+                             "sumInsured": _money(rng.choice([500000, 1000000, 2500000]) * 100),
+                             "premium": _money(rng.randint(9000, 35000) * 100), "frequency": "yearly",
+                             "startDate": start.isoformat(), "endDate": (start + timedelta(days=364)).isoformat(), "status": "active"})
+        if rng.random() < 0.5:
+            start = self.today - timedelta(days=rng.randint(10, 330))
+            policies.append({"id": self._id("INS-MOTOR", 1), "type": "motor", "insurer": rng.choice(INSURERS["motor"]),
+                             "policyNumber": f"MO-{start.year}-{self.tag}", "holders": holder,
+                             "vehicle": {"type": "car", "registration": f"KA{rng.randint(1, 60):02d}{rng.choice(string.ascii_uppercase)}{rng.choice(string.ascii_uppercase)}{rng.randint(1000, 9999)}",
+                                         "make": "Hyundai", "model": rng.choice(["Creta", "i20", "Venue"]), "year": rng.randint(2015, 2024)},
+                             "idv": _money(rng.randint(300000, 1500000) * 100), "premium": _money(rng.randint(6000, 25000) * 100),
+                             "frequency": "yearly", "startDate": start.isoformat(), "endDate": (start + timedelta(days=364)).isoformat(),
+                             "status": "active"})
+        return policies
+
+    def _alerts(self, generated_at: str) -> List[Dict[str, Any]]:
+        alerts = []
+        for account_id in (self.savings_id, self.current_id):
+            if self.balances[account_id] < 1000000:
+                alerts.append({"id": self._id("ALERT", len(alerts) + 1), "type": "low_balance", "accountId": account_id,
+                               "message": "Your account balance fell below INR 10,000.", "createdAt": generated_at, "read": False})
+        return alerts
+
+    def _credit_profile(self, loans: List[Dict[str, Any]], cards: List[Dict[str, Any]]) -> Dict[str, Any]:
+        rng = self.rng
+        score = int(rng.gauss(740, 50))
+        grade = "A" if score >= 750 else "B" if score >= 680 else "C"
+        tradelines = [{"type": f"{loan['type']}_loan", "openDate": loan["originationDate"], "institution": loan["lender"],
+                       "limitOrSanction": loan["sanctionAmount"], "currentBalance": loan["outstandingPrincipal"], "status": "active"}
+                      for loan in loans]
+        tradelines += [{"type": "credit_card", "openDate": "2022-11-01", "institution": "Kreesalis Bank",
+                        "limitOrSanction": card["creditLimit"], "currentBalance": _money(max(0, self.card_outstanding)), "status": "active"}
+                       for card in cards if card["type"] == "credit"]
+        return {
+            "bureauScores": [{"bureau": "CIBIL", "score": score, "riskGrade": grade, "updatedAt": self.today.replace(day=1).isoformat()},
+                             {"bureau": "Experian", "score": score - rng.randint(0, 15), "riskGrade": grade,
+                              "updatedAt": (self.today - timedelta(days=14)).isoformat()}],
+            "enquiries": [],
+            "tradelines": tradelines,
+        }
+
+    def _summary(self, core: Dict[str, Any]) -> Dict[str, Any]:
+        liquid = [a for a in core["accounts"] if a["type"] in ("savings", "current")]
+        available = {a["id"]: int(float(a["balance"]["available"]) * 100) for a in liquid}
+        total_available = sum(available.values())
+
+        def cashflow(days: int) -> Dict[str, str]:
+            since = _timestamp(self.as_of - timedelta(days=days))
+            inflow = sum(int(float(t["amount"]) * 100) for t in self.transactions
+                         if t["accountId"] and t["direction"] == "inflow" and t["bookingDate"] >= since)
+            outflow = sum(int(float(t["amount"]) * 100) for t in self.transactions
+                          if t["accountId"] and t["direction"] == "outflow" and t["bookingDate"] >= since)
+            return {"inflow": _money(inflow), "outflow": _money(outflow)}
+
+        investments = sum(int(float(i["valuation"]["value"]) * 100) for i in core["investments"])
+        loans_outstanding = sum(int(float(loan["outstandingPrincipal"]) * 100) for loan in core["loans"])
+        coverage = {"lifeSumAssured": "0.00", "healthSumInsured": "0.00", "motorIdv": "0.00"}
+        for policy in core["insurancePolicies"]:
+            if policy["type"] == "life":
+                coverage["lifeSumAssured"] = policy["sumAssured"]
+            elif policy["type"] == "health":
+                coverage["healthSumInsured"] = policy["sumInsured"]
+            elif policy["type"] == "motor":
+                coverage["motorIdv"] = policy["idv"]
+        points = {p["id"]: p["pointsBalance"] for p in core["rewards"]["programs"]}
+        return {
+            "balances": {"totalAvailable": _money(total_available), "byAccountId": {k: _money(v) for k, v in available.items()}},
+            "cashflow": {"last30d": cashflow(30), "last90d": cashflow(90)},
+            "upcoming": {
+                "emi": [{"loanId": loan["id"], "dueDate": loan["nextEmiDate"], "amount": loan["emiAmount"], "currency": "INR"}
+                        for loan in core["loans"] if loan["nextEmiDate"]],
+                "recurringPayments": sorted([{"recurringId": r["id"], "nextDate": r["nextDate"], "amount": r["amount"], "currency": "INR"}
+                                             for r in core["recurringPayments"]], key=lambda r: r["nextDate"]),
+            },
+            "points": {"totalPoints": sum(points.values()), "byProgram": points},
+            "insuranceCoverage": coverage,
+            "netWorth": {"assets": {"deposits": _money(total_available), "investments": _money(investments)},
+                         "liabilities": {"loansOutstanding": _money(loans_outstanding)},
+                         "net": _money(total_available + investments - loans_outstanding)},
+        }
+
+
+def generate(out_dir: str, customers: int, seed: int = 42, shards: int = 1, transactions_per_customer: int = 120,
+             history_days: int = 180, as_of: str = "2025-08-08T11:05:00Z") -> Dict[str, Any]:
+    """Write ``customers`` synthetic customers to ``out_dir`` and return generation statistics"""
+    as_of_moment = datetime.strptime(as_of, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc)
+    core_dir = os.path.join(out_dir, "core")
+    transactions_dir = os.path.join(out_dir, "transactions")
+    os.makedirs(core_dir, exist_ok=True)
+    os.makedirs(transactions_dir, exist_ok=True)
+
+    stats = {"customers": 0, "transactions": 0, "schedule_rows": 0, "seconds": 0.0, "files": []}
+    start = time.perf_counter()
+    per_shard = -(-customers // shards)
+    for shard in range(shards):
+        first, last = shard * per_shard, min(customers, (shard + 1) * per_shard)
+        if first >= last:
+            break
+        core_path = os.path.join(core_dir, f"CORE_BANKING_DATA-{shard:05d}.json")
+        transactions_path = os.path.join(transactions_dir, f"TRANSACTIONS_DATA-{shard:05d}.json")
+        with open(core_path, "w", encoding="utf-8") as core_file, open(transactions_path, "w", encoding="utf-8") as txn_file:
+            core_file.write("[\n")
+            txn_file.write("[\n")
+            for number in range(first + 1, last + 1):
+                core, history = CustomerGenerator(number, seed, as_of_moment, history_days, transactions_per_customer).build()
+                separator = ",\n" if number > first + 1 else ""
+                core_file.write(separator + json.dumps(core))
+                txn_file.write(separator + json.dumps(history))
+                stats["customers"] += 1
+                stats["transactions"] += len(history["transactions"])
+                stats["schedule_rows"] += sum(len(loan["schedule"]) for loan in core["loans"])
+            core_file.write("\n]\n")
+            txn_file.write("\n]\n")
+        stats["files"] += [core_path, transactions_path]
+    stats["seconds"] = time.perf_counter() - start
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--customers", type=int, default=1000)
+    parser.add_argument("--out", default="knowledge/synthetic")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--shards", type=int, default=1, help="Split customers across this many file pairs")
+    parser.add_argument("--transactions-per-customer", type=int, default=120, help="Mean transactions per customer")
+    parser.add_argument("--history-days", type=int, default=180)
+    parser.add_argument("--as-of", default="2025-08-08T11:05:00Z", help="Generation timestamp (UTC)")
+    args = parser.parse_args()
+
+    stats = generate(args.out, args.customers, seed=args.seed, shards=args.shards,
+                     transactions_per_customer=args.transactions_per_customer,
+                     history_days=args.history_days, as_of=args.as_of)
+    size = sum(os.path.getsize(path) for path in stats["files"])
+    print(f"Generated {stats['customers']} customers, {stats['transactions']} transactions and "
+          f"{stats['schedule_rows']} EMI schedule rows in {stats['seconds']:.1f}s")
+    print(f"Wrote {len(stats['files'])} files ({size / (1024 * 1024):.1f} MiB) under {args.out}")
+
+
+if __name__ == "__main__":
+    main()
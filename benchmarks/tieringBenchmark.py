@@ -0,0 +1,117 @@
+"""Routing accuracy, latency and cost per deployment, to choose the model tier of each role.
+
+Asks each deployment in ``--deployments`` to route every question of
+benchmarks/retrievalQueries.json (the agents/QUESTIONS.md set, labelled with its domain)
+to one of the six domain agents, as the main team's routing call does, and reports the
+accuracy, median/p95 latency, tokens and cost per call. The last section projects the
+cost of a nested /chat request (two routing calls, one memory extraction, one answer)
+with every role on the first deployment versus routing and memory on the cheapest
+deployment whose accuracy is within ``--tolerance`` of the best.
+
+Needs the Azure OpenAI settings in .env (ENDPOINT, AZURE_OPENAI_API_KEY, API_VERSION).
+
+    python -m benchmarks.tieringBenchmark --deployments gpt-4o gpt-4o-mini
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+from dotenv import load_dotenv
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.shared.models import create_chat_model, price_per_million
+
+DOMAIN_ROLES = {
+    "accounts": "Account profiles, balances, overdrafts, fixed deposits, KYC",
+    "cards": "Credit and debit cards, limits, statements, rewards points, card controls",
+    "transactions": "Transaction history, UPI/NEFT/RTGS transfers, spending analysis, merchants",
+    "loans": "Loans, EMIs, mutual funds, SIP portfolios, insurance policies",
+    "payees": "Registered payees, beneficiaries, recurring payments, mandates, subscriptions, bills",
+    "miscellaneous": "Credit score, alerts, limits, disputes, documents, general banking services",
+}
+
+ROUTER_PROMPT = ("Route the banking question to exactly one agent. Agents:\n"
+                 + "\n".join(f"- {name}: {role}" for name, role in DOMAIN_ROLES.items())
+                 + '\nReply with JSON: {"agent": "<name>"}')
+
+# Typical tokens of the other calls of a nested request, for the projection
+MEMORY_TOKENS = (900, 120)
+ANSWER_TOKENS = (3500, 450)
+
+
+def call_cost(model: str, prompt_tokens: int, completion_tokens: int):
+    prices = price_per_million(model)
+    if prices is None:
+        return None
+    return (prompt_tokens * prices[0] + completion_tokens * prices[1]) / 1e6
+
+
+def route(client, deployment: str, question: str):
+    start = time.perf_counter()
+    response = client.chat.completions.create(
+        model=deployment,
+        messages=[{"role": "system", "content": ROUTER_PROMPT}, {"role": "user", "content": question}],
+        response_format={"type": "json_object"},
+        max_tokens=20,
+        temperature=0,
+    )
+    elapsed = time.perf_counter() - start
+    try:
+        agent = json.loads(response.choices[0].message.content).get("agent", "").strip().lower()
+    except (ValueError, AttributeError):
+        agent = ""
+    return agent, elapsed, response.model, response.usage.prompt_tokens, response.usage.completion_tokens
+
+
+def main():
+    load_dotenv()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--deployments", nargs="+", required=True, help="First is the current (large) deployment")
+    parser.add_argument("--queries", default=os.path.join(os.path.dirname(__file__), "retrievalQueries.json"))
+    parser.add_argument("--tolerance", type=float, default=0.0, help="Accuracy loss allowed for a cheaper tier")
+    args = parser.parse_args()
+
+    with open(args.queries, "r", encoding="utf-8") as fp:
+        queries = json.load(fp)
+
+    print(f"{len(queries)} questions")
+    print(f"{'deployment':<24}{'model':<26}{'accuracy':>9}{'p50 s':>8}{'p95 s':>8}{'tokens':>8}{'$/call':>11}")
+    results = {}
+    for deployment in args.deployments:
+        client = create_chat_model("router", deployment=deployment).get_client()
+        rows = [route(client, deployment, query["question"]) for query in queries]
+        accuracy = sum(agent == query["domain"] for (agent, *_), query in zip(rows, queries)) / len(queries)
+        latencies = sorted(row[1] for row in rows)
+        model = rows[0][2]
+        prompt = statistics.mean(row[3] for row in rows)
+        completion = statistics.mean(row[4] for row in rows)
+        cost = call_cost(model, prompt, completion)
+        results[deployment] = {"model": model, "accuracy": accuracy, "p50": statistics.median(latencies), "cost": cost}
+        print(f"{deployment:<24}{model:<26}{accuracy:>9.1%}{statistics.median(latencies):>8.2f}"
+              f"{latencies[int(len(latencies) * 0.95) - 1]:>8.2f}{prompt + completion:>8.0f}"
+              f"{f'{cost:.6f}' if cost is not None else 'n/a':>11}")
+
+    large = args.deployments[0]
+    best = max(result["accuracy"] for result in results.values())
+    eligible = [deployment for deployment, result in results.items()
+                if result["accuracy"] >= best - args.tolerance and result["cost"] is not None]
+    if results[large]["cost"] is None or not eligible:
+        print("\nNo price known for these models; add them to PRICES_PER_MILLION in agents/shared/models.py")
+        return
+    small = min(eligible, key=lambda deployment: results[deployment]["cost"])
+    large_model, small_model = results[large]["model"], results[small]["model"]
+    untiered = 2 * results[large]["cost"] + call_cost(large_model, *MEMORY_TOKENS) + call_cost(large_model, *ANSWER_TOKENS)
+    tiered = 2 * results[small]["cost"] + call_cost(small_model, *MEMORY_TOKENS) + call_cost(large_model, *ANSWER_TOKENS)
+    saved_latency = 2 * (results[large]["p50"] - results[small]["p50"])
+    print(f"\nRouting and memory on {small} ({results[small]['accuracy']:.1%} routing accuracy vs "
+          f"{results[large]['accuracy']:.1%}): SMALL_DEPLOYMENT={small}")
+    print(f"Projected nested /chat request: ${untiered:.5f} -> ${tiered:.5f} "
+          f"({1 - tiered / untiered:.0%} less), routing latency {saved_latency:+.2f}s saved")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""Retrieval latency, ingest throughput and memory of the Chroma and Qdrant backends at synthetic scale.
+
+Generates synthetic customers (benchmarks.syntheticBankingData), ingests them into each
+backend through the per-customer partitioned knowledge base and times filtered searches
+for random customers. Each backend runs in its own process so peak RSS is comparable.
+
+    python -m benchmarks.vectorBackendBenchmark --customers 200
+    QDRANT_URL=http://localhost:6333 python -m benchmarks.vectorBackendBenchmark --customers 2000 --embedder fastembed
+
+The default ``hashing`` embedder (feature hashing of tokens, no model, no network) keeps
+the comparison about the vector stores; pass ``--embedder azure`` or ``fastembed`` to use
+a real model.
+"""
+import argparse
+import json
+import math
+import os
+import random
+import re
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from hashlib import md5
+from typing import Dict, List, Optional, Tuple
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agno.embedder.base import Embedder
+
+QUESTIONS = [
+    "What is my savings account balance?",
+    "Show my recent UPI transactions",
+    "When is my next home loan EMI due?",
+    "What is my credit card limit?",
+    "List my insurance policies",
+    "How many reward points do I have?",
+    "Show my mutual fund SIP history",
+    "Which payees have I registered?",
+]
+
+
+@dataclass
+class HashingEmbedder(Embedder):
+    """Feature-hashed bag of words; deterministic and free, good enough to exercise a vector store"""
+
+    dimensions: int = 384
+
+    def get_embedding(self, text: str) -> List[float]:
+        vector = [0.0] * self.dimensions
+        for token in re.findall(r"\w+", text.lower()):
+            digest = int(md5(token.encode()).hexdigest()[:8], 16)
+            vector[digest % self.dimensions] += 1.0 if digest & 1 << 31 else -1.0
+        norm = math.sqrt(sum(value * value for value in vector)) or 1.0
+        return [value / norm for value in vector]
+
+    def get_embedding_and_usage(self, text: str) -> Tuple[List[float], Optional[Dict]]:
+        return self.get_embedding(text), None
+
+
+def directory_size(path: str) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        total += sum(os.path.getsize(os.path.join(root, name)) for name in files)
+    return total
+
+
+def run_single(store: str, data_dir: str, embedder_name: str, queries: int, k: int, seed: int) -> Dict:
+    """Ingest and query one backend in this process"""
+    from agents.shared.embedders import create_embedder
+    from agents.shared.partitionedKnowledge import CustomerPartitionedKnowledgeBase
+    from agents.shared.requestContext import request_scope
+    from agents.shared.vectorStores import create_vector_db
+
+    storage = tempfile.mkdtemp(prefix=f"vector_{store}_")
+    os.environ["QDRANT_PATH"] = storage
+    embedder = HashingEmbedder() if embedder_name == "hashing" else create_embedder(embedder_name)
+    vector_db = create_vector_db(collection="vector_benchmark", path=os.path.join(storage, "bench"),
+                                 backend=embedder_name, store=store, embedder=embedder)
+    knowledge_base = CustomerPartitionedKnowledgeBase(path=data_dir, vector_db=vector_db, batch_size=256)
+    knowledge_base.load(recreate=True)
+    ingest = knowledge_base.last_load_stats
+
+    customers = knowledge_base.customer_ids()
+    rng = random.Random(seed)
+    latencies = []
+    for _ in range(queries):
+        with request_scope(customer_id=rng.choice(customers)):
+            start = time.perf_counter()
+            knowledge_base.search(rng.choice(QUESTIONS), num_documents=k)
+            latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    return {
+        "store": store,
+        "documents": ingest.documents_written,
+        "docs_per_second": ingest.documents_per_second,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95)] * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99)] * 1000,
+        "disk_mib": directory_size(storage) / (1024 * 1024),
+        # ru_maxrss is KiB on Linux
+        "peak_rss_mib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stores", nargs="+", default=["chroma", "qdrant"])
+    parser.add_argument("--customers", type=int, default=200)
+    parser.add_argument("--transactions-per-customer", type=int, default=60)
+    parser.add_argument("--embedder", default="hashing", choices=["hashing", "azure", "fastembed"])
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=11)
+    parser.add_argument("--data", help="Existing synthetic dataset directory (skips generation)")
+    parser.add_argument("--single", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    data_dir = args.data
+    if data_dir is None:
+        from benchmarks.syntheticBankingData import generate
+
+        data_dir = tempfile.mkdtemp(prefix="vector_benchmark_data_")
+        generate(data_dir, args.customers, seed=args.seed, transactions_per_customer=args.transactions_per_customer)
+
+    if args.single:
+        result = run_single(args.single, data_dir, args.embedder, args.queries, args.k, args.seed)
+        print("RESULT " + json.dumps(result))
+        return
+
+    results = []
+    for store in args.stores:
+        command = [sys.executable, "-m", "benchmarks.vectorBackendBenchmark", "--single", store, "--data", data_dir,
+                   "--embedder", args.embedder, "--queries", str(args.queries), "-k", str(args.k), "--seed", str(args.seed)]
+        output = subprocess.run(command, capture_output=True, text=True, check=True).stdout
+        results.append(json.loads(output.split("RESULT ", 1)[1]))
+
+    print(f"{'store':<8}{'docs':>9}{'ingest docs/s':>15}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+          f"{'disk MiB':>10}{'peak RSS MiB':>14}")
+    for result in results:
+        print(f"{result['store']:<8}{result['documents']:>9}{result['docs_per_second']:>15.1f}{result['p50_ms']:>9.2f}"
+              f"{result['p95_ms']:>9.2f}{result['p99_ms']:>9.2f}{result['disk_mib']:>10.1f}{result['peak_rss_mib']:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
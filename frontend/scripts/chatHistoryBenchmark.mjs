@@ -0,0 +1,121 @@
+// Cost of saving and rendering the main chat as its history grows: the old localStorage history
+// versus the append-only IndexedDB store and the virtualized message list.
+//
+// Saving: the old hook ran JSON.stringify over every message and rewrote the localStorage key
+// on each new message; now one record is added, which IndexedDB serializes with the structured
+// clone algorithm (timed here with structuredClone; the disk write itself is the browser's).
+// Rendering: the old list mounted a bubble per message; the virtualized one mounts the rows
+// src/utils/virtualWindow.js picks for the viewport, recomputed on every measurement and scroll.
+//
+//     npm run benchmark:history
+//     node scripts/chatHistoryBenchmark.mjs --sizes 1000 5000 10000 --viewport 600
+import { performance } from 'node:perf_hooks';
+import { rowOffsets, visibleRange } from '../src/utils/virtualWindow.js';
+
+// Chrome and Firefox give an origin about 5M UTF-16 characters of localStorage
+const LOCAL_STORAGE_QUOTA = 5 * 1024 * 1024;
+
+const option = (name, fallback) => {
+    const at = process.argv.indexOf(`--${name}`);
+    if (at < 0) return fallback;
+    const values = [];
+    for (let i = at + 1; i < process.argv.length && !process.argv[i].startsWith('--'); i++) {
+        values.push(Number(process.argv[i]));
+    }
+    return Array.isArray(fallback) ? values : values[0];
+};
+
+const sizes = option('sizes', [100, 1000, 2500, 5000]);
+const viewport = option('viewport', 800);
+const repeats = option('repeats', 5);
+
+// Deterministic pseudo-random numbers so runs are comparable
+let seed = 7;
+const random = () => {
+    seed = (seed * 1103515245 + 12345) % 2147483648;
+    return seed / 2147483648;
+};
+
+const QUESTIONS = ['What did I spend on dining last month?', 'Block my credit card ending 4421',
+    'Compare my home loan options', 'When is my SIP debited?', 'Add Priya as a payee for rent'];
+
+const answer = (index) => [
+    `### Summary for request ${index}`,
+    'Here is what I found across your accounts:',
+    '| Date | Merchant | Amount |',
+    '| --- | --- | --- |',
+    ...Array.from({ length: 3 + Math.floor(random() * 8) }, (_, row) =>
+        `| 2024-0${1 + (row % 9)}-1${row % 10} | Merchant ${row} | ₹${(random() * 20000).toFixed(2)} |`),
+    '**Tip:** set an alert for anything above ₹10,000 so unusual charges show up right away.'
+].join('\n');
+
+const makeMessage = (index) => (index % 2 === 0
+    ? { type: 'user', content: QUESTIONS[index % QUESTIONS.length], timestamp: new Date(), key: `k${index}` }
+    : {
+        type: 'agent',
+        content: answer(index),
+        timestamp: new Date(),
+        agentName: 'TransactionMasterAgent',
+        routedTo: { icon: '💸', name: 'Transaction Specialist', color: '#ffc107' },
+        key: `k${index}`
+    });
+
+// Rendered bubble heights: short user messages, taller answers with tables
+const bubbleHeight = (message) => (message.type === 'user' ? 96 : 180 + message.content.split('\n').length * 28);
+
+const median = (run) => {
+    const times = [];
+    for (let i = 0; i < repeats; i++) {
+        const start = performance.now();
+        run();
+        times.push(performance.now() - start);
+    }
+    return times.sort((a, b) => a - b)[Math.floor(times.length / 2)];
+};
+
+const largest = Math.max(...sizes);
+const messages = Array.from({ length: largest }, (_, index) => makeMessage(index));
+const messageChars = messages.map(message => JSON.stringify(message).length);
+
+console.log(`Saving the newest message and rendering the list (${viewport}px viewport, median of ${repeats})`);
+console.log(
+    'messages'.padStart(9) + 'rewrite ms'.padStart(12) + 'rewrite KB'.padStart(12) + 'total MB'.padStart(10)
+    + 'append ms'.padStart(11) + 'append KB'.padStart(11) + 'total MB'.padStart(10)
+    + 'bubbles'.padStart(9) + 'virtual'.padStart(9) + 'window ms'.padStart(11)
+);
+
+for (const size of sizes) {
+    const history = messages.slice(0, size);
+    const newest = history[size - 1];
+
+    const rewriteMs = median(() => JSON.stringify(history));
+    const rewriteChars = JSON.stringify(history).length;
+    // Characters written over the whole conversation: message n rewrites all n messages
+    let rewriteTotal = 0;
+    let prefix = 0;
+    for (let i = 0; i < size; i++) {
+        prefix += messageChars[i];
+        rewriteTotal += prefix;
+    }
+    const appendMs = median(() => structuredClone(newest));
+    const appendTotal = messageChars.slice(0, size).reduce((sum, chars) => sum + chars, 0);
+
+    const heights = history.map(bubbleHeight);
+    let mounted = 0;
+    const windowMs = median(() => {
+        const offsets = rowOffsets(size, index => heights[index]);
+        const { start, end } = visibleRange(offsets, offsets[size] - viewport, viewport);
+        mounted = end - start;
+    });
+
+    const quota = rewriteChars > LOCAL_STORAGE_QUOTA ? '!' : ' ';
+    console.log(
+        String(size).padStart(9) + rewriteMs.toFixed(2).padStart(12)
+        + ((rewriteChars * 2) / 1024).toFixed(0).padStart(11) + quota
+        + ((rewriteTotal * 2) / 1024 / 1024).toFixed(1).padStart(10)
+        + appendMs.toFixed(3).padStart(11) + ((messageChars[size - 1] * 2) / 1024).toFixed(1).padStart(11)
+        + ((appendTotal * 2) / 1024 / 1024).toFixed(1).padStart(10)
+        + String(size).padStart(9) + String(mounted).padStart(9) + windowMs.toFixed(3).padStart(11)
+    );
+}
+console.log('\nKB/MB count UTF-16 bytes; ! marks a history past the ~5M character localStorage quota.');
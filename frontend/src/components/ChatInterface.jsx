@@ -1,5 +1,5 @@
 import React, { useState, useRef, useEffect } from 'react';
-import { sendMessage } from '../services/api';
+import { sendMessage, isCancelled } from '../services/api';
 import ReactMarkdown from 'react-markdown';
 import remarkGfm from 'remark-gfm';
 
@@ -10,6 +10,10 @@ const ChatInterface = ({ agent, onBack }) => {
     const [error, setError] = useState(null);
     const [sessionId] = useState(`web_session_${Date.now()}`);
     const messagesEndRef = useRef(null);
+    // Aborted when the chat is closed, so the server stops working on an answer nobody will read
+    const requestRef = useRef(null);
+
+    useEffect(() => () => requestRef.current?.abort(), []);
 
     const scrollToBottom = () => {
         messagesEndRef.current?.scrollIntoView({ behavior: 'smooth' });
@@ -60,11 +64,13 @@ const ChatInterface = ({ agent, onBack }) => {
         setError(null);
 
         try {
+            requestRef.current = new AbortController();
             const response = await sendMessage(
                 agent.endpoint,
                 userMessage.content,
                 'web_user',
-                sessionId
+                sessionId,
+                requestRef.current.signal
             );
 
             const agentMessage = {
@@ -76,6 +82,7 @@ const ChatInterface = ({ agent, onBack }) => {
 
             setMessages(prev => [...prev, agentMessage]);
         } catch (err) {
+            if (isCancelled(err)) return;
             setError('Failed to send message. Please try again.');
             console.error('Error sending message:', err);
         } finally {
@@ -1,7 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import { motion, AnimatePresence } from 'framer-motion';
 
-const ChatSearch = ({ messages, onSearchResults, isOpen, onClose }) => {
+const ChatSearch = ({ messages, onSearchResults, onNavigate, isOpen, onClose }) => {
     const [searchTerm, setSearchTerm] = useState('');
     const [searchResults, setSearchResults] = useState([]);
     const [currentResultIndex, setCurrentResultIndex] = useState(0);
@@ -33,8 +33,13 @@ const ChatSearch = ({ messages, onSearchResults, isOpen, onClose }) => {
         }
         setCurrentResultIndex(newIndex);
 
-        // Scroll to the result
-        const messageElement = document.querySelector(`[data-message-index="${searchResults[newIndex].originalIndex}"]`);
+        // Scroll to the result; a virtualized list may not have it mounted, so let it scroll itself
+        const { originalIndex } = searchResults[newIndex];
+        if (onNavigate) {
+            onNavigate(originalIndex);
+            return;
+        }
+        const messageElement = document.querySelector(`[data-message-index="${originalIndex}"]`);
         if (messageElement) {
             messageElement.scrollIntoView({ behavior: 'smooth', block: 'center' });
         }
@@ -1,13 +1,18 @@
 import React, { useState, useRef, useEffect } from 'react';
-import { sendMessage } from '../services/api';
+import { sendMessage, isCancelled } from '../services/api';
 import { useChatHistory } from '../hooks/useChatHistory';
 import TypingIndicator from './TypingIndicator';
 import MessageBubble from './MessageBubble';
+import VirtualMessageList from './VirtualMessageList';
 import ChatSearch from './ChatSearch';
 import WelcomeScreen from './WelcomeScreen';
 import { AnimatePresence, motion } from 'framer-motion';
 import './ModernChat.css';
 
+const messageKey = (message) => message.key;
+
+const renderMessage = (message) => <MessageBubble message={message} />;
+
 const MainChatInterface = () => {
     const [inputMessage, setInputMessage] = useState('');
     const [isLoading, setIsLoading] = useState(false);
@@ -15,14 +20,18 @@ const MainChatInterface = () => {
     const [sessionId] = useState(`main_session_${Date.now()}`);
     const [isSearchOpen, setIsSearchOpen] = useState(false);
     const [searchResults, setSearchResults] = useState([]);
-    const messagesEndRef = useRef(null);
+    const listRef = useRef(null);
     const inputRef = useRef(null);
+    // Aborted when the chat is closed, so the server stops working on an answer nobody will read
+    const requestRef = useRef(null);
+
+    useEffect(() => () => requestRef.current?.abort(), []);
 
     // Use the chat history hook
     const { messages, setMessages, addMessage, clearMessages, exportChat } = useChatHistory(sessionId);
 
     const scrollToBottom = () => {
-        messagesEndRef.current?.scrollIntoView({ behavior: 'smooth' });
+        listRef.current?.scrollToBottom();
     };
 
     useEffect(() => {
@@ -83,11 +92,13 @@ const MainChatInterface = () => {
 
         try {
             // Send to main agent endpoint which handles routing
+            requestRef.current = new AbortController();
             const response = await sendMessage(
                 '/chat', // Main agent endpoint
                 userMessage.content,
                 'web_user',
-                sessionId
+                sessionId,
+                requestRef.current.signal
             );
 
             const agentMessage = {
@@ -100,6 +111,7 @@ const MainChatInterface = () => {
 
             addMessage(agentMessage);
         } catch (err) {
+            if (isCancelled(err)) return;
             setError('Failed to send message. Please try again.');
             console.error('Error sending message:', err);
 
@@ -150,17 +162,13 @@ const MainChatInterface = () => {
                 {messages.length === 0 ? (
                     <WelcomeScreen onSuggestedQuestion={handleSuggestedQuestion} />
                 ) : (
-                    <div className="messages-container">
-                        <AnimatePresence mode="popLayout">
-                            {messages.map((message, index) => (
-                                <MessageBubble
-                                    key={`${message.timestamp}-${index}`}
-                                    message={message}
-                                    index={index}
-                                />
-                            ))}
-                        </AnimatePresence>
-
+                    <VirtualMessageList
+                        ref={listRef}
+                        className="messages-container"
+                        items={messages}
+                        getKey={messageKey}
+                        renderItem={renderMessage}
+                    >
                         <AnimatePresence>
                             {isLoading && (
                                 <TypingIndicator
@@ -191,9 +199,7 @@ const MainChatInterface = () => {
                                 </motion.div>
                             )}
                         </AnimatePresence>
-
-                        <div ref={messagesEndRef} />
-                    </div>
+                    </VirtualMessageList>
                 )}
             </div>
 
@@ -266,6 +272,7 @@ const MainChatInterface = () => {
             <ChatSearch
                 messages={messages}
                 onSearchResults={setSearchResults}
+                onNavigate={(index) => listRef.current?.scrollToIndex(index)}
                 isOpen={isSearchOpen}
                 onClose={() => setIsSearchOpen(false)}
             />
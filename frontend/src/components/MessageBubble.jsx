@@ -1,10 +1,18 @@
-import React, { useState } from 'react';
+import React, { memo, useEffect, useState } from 'react';
 import { motion } from 'framer-motion';
 import ReactMarkdown from 'react-markdown';
 import remarkGfm from 'remark-gfm';
 
-const MessageBubble = ({ message, index }) => {
+// Messages that have been on screen; a bubble remounted by scrolling back to it does not animate in again
+const shown = new WeakSet();
+
+const MessageBubble = ({ message }) => {
     const [isHovered, setIsHovered] = useState(false);
+    const [animateIn] = useState(() => !message.restored && !shown.has(message));
+
+    useEffect(() => {
+        shown.add(message);
+    }, [message]);
 
     const messageVariants = {
         hidden: {
@@ -19,16 +27,7 @@ const MessageBubble = ({ message, index }) => {
             transition: {
                 type: "spring",
                 stiffness: 300,
-                damping: 30,
-                delay: index * 0.05
-            }
-        },
-        exit: {
-            opacity: 0,
-            y: -20,
-            scale: 0.9,
-            transition: {
-                duration: 0.2
+                damping: 30
             }
         }
     };
@@ -66,10 +65,8 @@ const MessageBubble = ({ message, index }) => {
         <motion.div
             className={`modern-message ${message.type}`}
             variants={messageVariants}
-            initial="hidden"
+            initial={animateIn ? "hidden" : false}
             animate="visible"
-            exit="exit"
-            layout
             onHoverStart={() => setIsHovered(true)}
             onHoverEnd={() => setIsHovered(false)}
         >
@@ -177,7 +174,7 @@ const MessageBubble = ({ message, index }) => {
                     {routedInfo && message.agentName !== 'MainBankingMasterAgent' && (
                         <motion.div
                             className="routing-info-modern"
-                            initial={{ opacity: 0, y: 10 }}
+                            initial={animateIn ? { opacity: 0, y: 10 } : false}
                             animate={{ opacity: 1, y: 0 }}
                             transition={{ delay: 0.3 }}
                         >
@@ -200,4 +197,5 @@ const MessageBubble = ({ message, index }) => {
     );
 };
 
-export default MessageBubble;
\ No newline at end of file
+// Only the new bubble renders when a message is added; the others keep their parsed markdown
+export default memo(MessageBubble);
\ No newline at end of file
@@ -0,0 +1,152 @@
+import React, { forwardRef, useCallback, useEffect, useImperativeHandle, useLayoutEffect, useMemo, useRef, useState } from 'react';
+import { rowAt, rowOffsets, visibleRange } from '../utils/virtualWindow';
+
+// Within this many pixels of the bottom the list keeps following new messages
+const STICK_THRESHOLD = 80;
+
+const Row = ({ index, itemKey, gap, observer, children }) => {
+    const rowRef = useRef(null);
+
+    useLayoutEffect(() => {
+        const element = rowRef.current;
+        observer.observe(element);
+        return () => observer.unobserve(element);
+    }, [observer]);
+
+    return (
+        <div ref={rowRef} data-key={itemKey} data-message-index={index} style={{ paddingTop: index > 0 ? gap : 0 }}>
+            {children}
+        </div>
+    );
+};
+
+// Scrolling list that only mounts the rows in (or near) the viewport. Row heights are measured
+// as rows render and estimated until then; `children` are rendered after the last row.
+const VirtualMessageList = forwardRef(({
+    items,
+    getKey,
+    renderItem,
+    estimatedHeight = 160,
+    gap = 20,
+    overscan = 4,
+    className,
+    children
+}, ref) => {
+    const containerRef = useRef(null);
+    const heightsRef = useRef(new Map());
+    const offsetsRef = useRef(null);
+    const atBottomRef = useRef(true);
+    const firstVisibleRef = useRef(0);
+    const onResizeRef = useRef(null);
+    const [measured, setMeasured] = useState(0);
+    const [range, setRange] = useState({ start: 0, end: 0 });
+    const [observer] = useState(() => new ResizeObserver(entries => onResizeRef.current(entries)));
+
+    const estimate = useCallback((index) => estimatedHeight + (index > 0 ? gap : 0), [estimatedHeight, gap]);
+
+    const offsets = useMemo(
+        () => rowOffsets(items.length, index => heightsRef.current.get(getKey(items[index])) ?? estimate(index)),
+        // `measured` changes whenever heightsRef does
+        // eslint-disable-next-line react-hooks/exhaustive-deps
+        [items, getKey, estimate, measured]
+    );
+    offsetsRef.current = offsets;
+
+    const updateRange = useCallback(() => {
+        const container = containerRef.current;
+        if (!container) return;
+        const next = visibleRange(offsetsRef.current, container.scrollTop, container.clientHeight, overscan);
+        firstVisibleRef.current = rowAt(offsetsRef.current, container.scrollTop);
+        setRange(prev => (prev.start === next.start && prev.end === next.end ? prev : next));
+    }, [overscan]);
+
+    onResizeRef.current = (entries) => {
+        const container = containerRef.current;
+        let changed = false;
+        entries.forEach(({ target }) => {
+            if (target === container) return;
+            // Unmounted rows report a zero size
+            if (!target.isConnected) return;
+            const index = Number(target.dataset.messageIndex);
+            const previous = heightsRef.current.get(target.dataset.key) ?? estimate(index);
+            const height = target.offsetHeight;
+            if (height === previous) return;
+            heightsRef.current.set(target.dataset.key, height);
+            changed = true;
+            // Keep what is on screen still when a row above it settles to its real height
+            if (!atBottomRef.current && index < firstVisibleRef.current) {
+                container.scrollTop += height - previous;
+            }
+        });
+        if (changed) {
+            setMeasured(count => count + 1);
+        } else {
+            updateRange();
+        }
+    };
+
+    useEffect(() => {
+        const container = containerRef.current;
+        observer.observe(container);
+        return () => observer.unobserve(container);
+    }, [observer]);
+
+    useLayoutEffect(() => {
+        const container = containerRef.current;
+        if (atBottomRef.current) {
+            container.scrollTop = container.scrollHeight;
+        }
+        updateRange();
+    }, [offsets, updateRange]);
+
+    const handleScroll = () => {
+        const container = containerRef.current;
+        atBottomRef.current = container.scrollHeight - container.scrollTop - container.clientHeight < STICK_THRESHOLD;
+        updateRange();
+    };
+
+    useImperativeHandle(ref, () => ({
+        scrollToBottom: (behavior = 'smooth') => {
+            const container = containerRef.current;
+            container?.scrollTo({ top: container.scrollHeight, behavior });
+        },
+        scrollToIndex: (index, behavior = 'smooth') => {
+            const container = containerRef.current;
+            const rows = offsetsRef.current;
+            if (!container || index < 0 || index >= rows.length - 1) return;
+            const middle = (rows[index] + rows[index + 1]) / 2;
+            container.scrollTo({ top: middle - container.clientHeight / 2, behavior });
+        }
+    }), []);
+
+    const start = Math.min(range.start, items.length);
+    const end = Math.min(range.end, items.length);
+    const total = offsets[items.length];
+
+    // Scroll position is managed here; the browser's anchoring and smooth scrolling would fight it
+    return (
+        <div
+            ref={containerRef}
+            className={className}
+            onScroll={handleScroll}
+            style={{ overflowAnchor: 'none', scrollBehavior: 'auto' }}
+        >
+            <div style={{ flexShrink: 0, paddingTop: offsets[start], paddingBottom: total - offsets[end] }}>
+                {items.slice(start, end).map((item, offset) => (
+                    <Row
+                        key={getKey(item)}
+                        index={start + offset}
+                        itemKey={getKey(item)}
+                        gap={gap}
+                        observer={observer}
+                    >
+                        {renderItem(item, start + offset)}
+                    </Row>
+                ))}
+            </div>
+            {children}
+        </div>
+    );
+});
+
+export default VirtualMessageList;
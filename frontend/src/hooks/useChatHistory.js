@@ -1,36 +1,42 @@
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useCallback } from 'react';
+import { appendMessage, clearSession, loadMessages, migrateLegacyHistory } from '../services/chatStore';
+
+let keyCounter = 0;
+
+// Stable identity for a message, kept in storage so a reloaded bubble keeps its key
+const makeKey = () => `${Date.now().toString(36)}-${(keyCounter++).toString(36)}`;
 
 export const useChatHistory = (sessionId) => {
     const [messages, setMessages] = useState([]);
 
-    // Load messages from localStorage on mount
+    // Load the session's messages from IndexedDB on mount
     useEffect(() => {
-        const savedMessages = localStorage.getItem(`chat-history-${sessionId}`);
-        if (savedMessages) {
-            try {
-                const parsed = JSON.parse(savedMessages);
-                setMessages(parsed);
-            } catch (error) {
-                console.error('Error loading chat history:', error);
-            }
-        }
+        let active = true;
+        migrateLegacyHistory(sessionId, makeKey)
+            .then(() => loadMessages(sessionId))
+            .then(saved => {
+                if (!active || saved.length === 0) return;
+                // Messages sent while loading are already in state, and may be in `saved` too
+                setMessages(prev => {
+                    const current = new Set(prev.map(msg => msg.key));
+                    return [...saved.filter(msg => !current.has(msg.key)), ...prev];
+                });
+            })
+            .catch(error => console.error('Error loading chat history:', error));
+        return () => { active = false; };
     }, [sessionId]);
 
-    // Save messages to localStorage whenever messages change
-    useEffect(() => {
-        if (messages.length > 0) {
-            localStorage.setItem(`chat-history-${sessionId}`, JSON.stringify(messages));
-        }
-    }, [messages, sessionId]);
-
-    const addMessage = (message) => {
-        setMessages(prev => [...prev, message]);
-    };
+    // Persist only the new message; earlier ones are never rewritten
+    const addMessage = useCallback((message) => {
+        const entry = { ...message, key: makeKey() };
+        setMessages(prev => [...prev, entry]);
+        appendMessage(sessionId, entry).catch(error => console.error('Error saving chat message:', error));
+    }, [sessionId]);
 
-    const clearMessages = () => {
+    const clearMessages = useCallback(() => {
         setMessages([]);
-        localStorage.removeItem(`chat-history-${sessionId}`);
-    };
+        clearSession(sessionId).catch(error => console.error('Error clearing chat history:', error));
+    }, [sessionId]);
 
     const exportChat = () => {
         const chatData = {
@@ -63,4 +69,4 @@ export const useChatHistory = (sessionId) => {
         clearMessages,
         exportChat
     };
-};
\ No newline at end of file
+};
@@ -2,6 +2,9 @@ import axios from 'axios';
 
 const API_BASE_URL = process.env.REACT_APP_API_URL || 'http://localhost:8000';
 
+// The API stops working on a chat request after this many seconds and returns what it has
+const CHAT_TIMEOUT_SECONDS = Number(process.env.REACT_APP_CHAT_TIMEOUT_SECONDS || 120);
+
 const api = axios.create({
     baseURL: API_BASE_URL,
     headers: {
@@ -19,16 +22,54 @@ export const getAvailableAgents = async () => {
     }
 };
 
-export const sendMessage = async (endpoint, message, userId = 'web_user', sessionId = null) => {
+// Aborting `signal` closes the connection, which cancels the agent run on the server
+export const sendMessage = async (endpoint, message, userId = 'web_user', sessionId = null, signal = undefined) => {
     try {
         const response = await api.post(endpoint, {
             message,
             user_id: userId,
             session_id: sessionId,
+            timeout_seconds: CHAT_TIMEOUT_SECONDS,
+        }, {
+            signal,
+            // A little longer than the server deadline so a partial answer can still arrive
+            timeout: (CHAT_TIMEOUT_SECONDS + 10) * 1000,
+        });
+        return response.data;
+    } catch (error) {
+        if (!axios.isCancel(error)) {
+            console.error('Error sending message:', error);
+        }
+        throw error;
+    }
+};
+
+export const isCancelled = (error) => axios.isCancel(error);
+
+// One page of a session's server-side history, oldest first; pass the returned next_cursor as `before`
+// to load the page before it
+export const getSessionMessages = async (sessionId, { domain, limit = 20, before } = {}) => {
+    try {
+        const response = await api.get(`/sessions/${encodeURIComponent(sessionId)}/messages`, {
+            params: { domain, limit, before },
+        });
+        return response.data;
+    } catch (error) {
+        console.error('Error fetching session messages:', error);
+        throw error;
+    }
+};
+
+// Full-text search over stored conversations, best match first. `agent` is a domain (accounts, cards, ...) or
+// 'main'; `since` / `until` are YYYY-MM-DD dates; pass the returned next_offset as `offset` for the next page
+export const searchHistory = async (query, { agent, userId, since, until, limit = 20, offset = 0 } = {}) => {
+    try {
+        const response = await api.get('/search', {
+            params: { q: query, agent, user_id: userId, since, until, limit, offset },
         });
         return response.data;
     } catch (error) {
-        console.error('Error sending message:', error);
+        console.error('Error searching history:', error);
         throw error;
     }
 };
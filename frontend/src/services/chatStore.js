@@ -0,0 +1,89 @@
+// Chat history in IndexedDB, one record per message. Saving a message adds a single record,
+// so it costs the same at the 10th message as at the 10,000th (localStorage would rewrite the
+// whole conversation as one string each time).
+const DB_NAME = 'vaultmate-chat';
+const DB_VERSION = 1;
+const STORE = 'messages';
+const LEGACY_PREFIX = 'chat-history-';
+
+let dbPromise = null;
+
+const completed = (request) => new Promise((resolve, reject) => {
+    request.onsuccess = () => resolve(request.result);
+    request.onerror = () => reject(request.error);
+});
+
+const committed = (transaction) => new Promise((resolve, reject) => {
+    transaction.oncomplete = () => resolve();
+    transaction.onerror = () => reject(transaction.error);
+    transaction.onabort = () => reject(transaction.error);
+});
+
+const openDb = () => {
+    if (!dbPromise) {
+        dbPromise = new Promise((resolve, reject) => {
+            if (typeof indexedDB === 'undefined') {
+                reject(new Error('IndexedDB is not available'));
+                return;
+            }
+            const request = indexedDB.open(DB_NAME, DB_VERSION);
+            request.onupgradeneeded = () => {
+                const store = request.result.createObjectStore(STORE, { keyPath: 'id', autoIncrement: true });
+                // A session's messages in the order they were added
+                store.createIndex('session', ['sessionId', 'id']);
+            };
+            request.onsuccess = () => resolve(request.result);
+            request.onerror = () => reject(request.error);
+        });
+        dbPromise.catch(() => { dbPromise = null; });
+    }
+    return dbPromise;
+};
+
+const sessionRange = (sessionId) => IDBKeyRange.bound([sessionId, -Infinity], [sessionId, Infinity]);
+
+const fromRecord = ({ id, sessionId, ...message }) => ({ ...message, restored: true });
+
+export const appendMessage = async (sessionId, message) => {
+    const db = await openDb();
+    const { restored, ...record } = message;
+    return completed(db.transaction(STORE, 'readwrite').objectStore(STORE).add({ ...record, sessionId }));
+};
+
+export const loadMessages = async (sessionId) => {
+    const db = await openDb();
+    const records = await completed(db.transaction(STORE).objectStore(STORE).index('session').getAll(sessionRange(sessionId)));
+    return records.map(fromRecord);
+};
+
+export const clearSession = async (sessionId) => {
+    const db = await openDb();
+    const transaction = db.transaction(STORE, 'readwrite');
+    const store = transaction.objectStore(STORE);
+    const request = store.index('session').openKeyCursor(sessionRange(sessionId));
+    request.onsuccess = () => {
+        const cursor = request.result;
+        if (cursor) {
+            store.delete(cursor.primaryKey);
+            cursor.continue();
+        }
+    };
+    return committed(transaction);
+};
+
+// Moves a conversation saved by earlier versions (one JSON string in localStorage) into IndexedDB
+export const migrateLegacyHistory = async (sessionId, makeKey) => {
+    const saved = localStorage.getItem(`${LEGACY_PREFIX}${sessionId}`);
+    if (!saved) return;
+    const db = await openDb();
+    const transaction = db.transaction(STORE, 'readwrite');
+    const store = transaction.objectStore(STORE);
+    JSON.parse(saved).forEach(message => store.add({
+        ...message,
+        key: makeKey(),
+        timestamp: new Date(message.timestamp),
+        sessionId
+    }));
+    await committed(transaction);
+    localStorage.removeItem(`${LEGACY_PREFIX}${sessionId}`);
+};
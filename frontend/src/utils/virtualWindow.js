@@ -0,0 +1,35 @@
+// Windowing math for lists of variable-height rows. No React or DOM, so the benchmark in
+// scripts/ can run it under plain node.
+
+// offsets[i] is the top of row i and offsets[count] the list's total height
+export const rowOffsets = (count, heightOf) => {
+    const offsets = new Float64Array(count + 1);
+    for (let i = 0; i < count; i++) {
+        offsets[i + 1] = offsets[i] + heightOf(i);
+    }
+    return offsets;
+};
+
+// The row containing `position` (binary search over the offsets)
+export const rowAt = (offsets, position) => {
+    let low = 0;
+    let high = offsets.length - 2;
+    while (low < high) {
+        const mid = (low + high) >> 1;
+        if (offsets[mid + 1] <= position) {
+            low = mid + 1;
+        } else {
+            high = mid;
+        }
+    }
+    return low;
+};
+
+// Rows [start, end) to render for a viewport, with `overscan` extra rows on each side
+export const visibleRange = (offsets, scrollTop, viewportHeight, overscan = 4) => {
+    const count = offsets.length - 1;
+    if (count <= 0) return { start: 0, end: 0 };
+    const first = rowAt(offsets, Math.max(0, scrollTop));
+    const last = rowAt(offsets, scrollTop + viewportHeight);
+    return { start: Math.max(0, first - overscan), end: Math.min(count, last + 1 + overscan) };
+};
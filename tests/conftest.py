@@ -0,0 +1,29 @@
+import math
+import re
+from hashlib import md5
+from typing import Dict, List, Optional, Tuple
+
+import pytest
+from agno.embedder.base import Embedder
+
+
+class HashingEmbedder(Embedder):
+    """Feature-hashed bag of words: deterministic and offline, enough to exercise a vector store"""
+
+    dimensions: int = 384
+
+    def get_embedding(self, text: str) -> List[float]:
+        vector = [0.0] * self.dimensions
+        for token in re.findall(r"\w+", text.lower()):
+            digest = int(md5(token.encode()).hexdigest()[:8], 16)
+            vector[digest % self.dimensions] += 1.0 if digest & 1 << 31 else -1.0
+        norm = math.sqrt(sum(value * value for value in vector)) or 1.0
+        return [value / norm for value in vector]
+
+    def get_embedding_and_usage(self, text: str) -> Tuple[List[float], Optional[Dict]]:
+        return self.get_embedding(text), None
+
+
+@pytest.fixture
+def embedder() -> HashingEmbedder:
+    return HashingEmbedder()
@@ -0,0 +1,66 @@
+from datetime import date
+
+import numpy as np
+import pytest
+
+from agents.shared.amortization import (add_months, amortization_schedule, balance_after, emi_amount,
+                                        months_between, months_to_repay, prepayment_scenarios, total_interest)
+
+
+def test_add_months_clamps_to_month_end_and_goes_back():
+    assert add_months(date(2025, 1, 31), 1) == date(2025, 2, 28)
+    assert add_months(date(2025, 8, 15), -1) == date(2025, 7, 15)
+    assert add_months(date(2025, 1, 15), -1) == date(2024, 12, 15)
+    assert months_between(date(2025, 1, 31), date(2025, 2, 28)) == 1
+    assert months_between(date(2025, 3, 15), date(2025, 4, 14)) == 0
+
+
+def test_emi_and_schedule_repay_the_principal_exactly():
+    emi = float(emi_amount(100000, 12, 12))
+    assert emi == pytest.approx(8884.88, abs=0.01)
+    schedule = amortization_schedule(100000, 12, 12)
+    assert schedule.months == 12
+    assert schedule.principal.sum() == pytest.approx(100000)
+    assert schedule.closing_balance[-1] == 0
+    assert schedule.total_interest == pytest.approx(emi * 12 - 100000, abs=0.01)
+    assert schedule.closing_balance[5] == pytest.approx(float(balance_after(100000, 12, emi, 6)))
+
+
+def test_closed_forms_agree_with_the_schedule():
+    emi = float(emi_amount(500000, 9, 60))
+    assert months_to_repay(500000, 9, emi) == 60
+    assert float(total_interest(500000, 9, emi, 60)) == pytest.approx(amortization_schedule(500000, 9, 60).total_interest)
+    # An EMI below the monthly interest never repays the loan
+    assert np.isinf(months_to_repay(500000, 9, 3000))
+    assert months_to_repay(0, 9, emi) == 0
+
+
+def test_rate_reset_moves_tenure_or_emi():
+    base = amortization_schedule(1000000, 8, 120)
+    stretched = amortization_schedule(1000000, 8, 120, resets=[(24, 9)], keep_emi=True)
+    repriced = amortization_schedule(1000000, 8, 120, resets=[(24, 9)], keep_emi=False)
+    assert stretched.months > base.months
+    assert stretched.payment[24] == pytest.approx(base.payment[24])
+    assert repriced.months == 120
+    assert repriced.payment[24] > base.payment[24]
+    assert repriced.rate_apr[23] == 8 and repriced.rate_apr[24] == 9
+
+
+def test_prepayment_scenarios():
+    emi = float(emi_amount(1000000, 8, 120))
+    tenure = prepayment_scenarios(1000000, 8, emi, [0, 100000, 2000000], reduce="tenure")
+    assert tenure["months"][0] == 120 and tenure["interest_saved"][0] == pytest.approx(0, abs=1e-6)
+    assert tenure["new_emi"][1] == emi and tenure["months"][1] < 120
+    # A prepayment beyond the balance closes the loan
+    assert tenure["amount"][2] == 1000000 and tenure["months"][2] == 0 and tenure["new_emi"][2] == 0
+
+    lower_emi = prepayment_scenarios(1000000, 8, emi, [100000], reduce="emi", fee_percent=2)
+    assert lower_emi["months"][0] == 120
+    assert lower_emi["new_emi"][0] == pytest.approx(emi * 0.9)
+    assert lower_emi["fee"][0] == pytest.approx(2000)
+    assert lower_emi["net_saving"][0] == pytest.approx(lower_emi["interest_saved"][0] - 2000)
+    # Shortening the loan saves more interest than lowering the EMI
+    assert tenure["interest_saved"][1] > lower_emi["interest_saved"][0]
+
+    with pytest.raises(ValueError):
+        prepayment_scenarios(1000000, 8, emi, [100000], reduce="rate")
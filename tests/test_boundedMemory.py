@@ -0,0 +1,40 @@
+from agno.memory.v2.db.schema import MemoryRow
+
+from agents.shared.boundedMemory import IndexedSqliteMemoryDb
+from agents.shared.vectorStores import create_vector_db
+
+
+def memory_db(tmp_path, embedder) -> IndexedSqliteMemoryDb:
+    vector_db = create_vector_db(collection="memories", path=str(tmp_path / "vectors"), backend="hashing",
+                                 store="chroma", embedder=embedder)
+    return IndexedSqliteMemoryDb(table_name="memories", db_file=str(tmp_path / "memory.db"), vector_db=vector_db)
+
+
+def remember(db: IndexedSqliteMemoryDb, memory_id: str, user_id: str, text: str) -> None:
+    db.upsert_memory(MemoryRow(id=memory_id, user_id=user_id, memory={"memory_id": memory_id, "memory": text}))
+
+
+def indexed(db: IndexedSqliteMemoryDb) -> int:
+    return db.vector_db.get_count()
+
+
+def test_same_text_for_two_users_is_indexed_for_both(tmp_path, embedder):
+    db = memory_db(tmp_path, embedder)
+    remember(db, "a1", "CUST0001", "User prefers email alerts")
+    remember(db, "b1", "CUST0002", "User prefers email alerts")
+
+    assert [row.id for row in db.relevant_memories("CUST0001", "email alerts", 5)] == ["a1"]
+    assert [row.id for row in db.relevant_memories("CUST0002", "email alerts", 5)] == ["b1"]
+    assert indexed(db) == 2
+
+
+def test_edit_and_delete_remove_stale_vectors(tmp_path, embedder):
+    db = memory_db(tmp_path, embedder)
+    remember(db, "a1", "CUST0001", "User prefers email alerts")
+    remember(db, "a2", "CUST0001", "User travels to Singapore in September")
+    remember(db, "a1", "CUST0001", "User prefers SMS alerts")
+    assert indexed(db) == 2
+
+    db.delete_memory("a2")
+    assert indexed(db) == 1
+    assert [row.id for row in db.relevant_memories("CUST0001", "alerts", 5)] == ["a1"]
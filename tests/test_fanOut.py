@@ -0,0 +1,85 @@
+import time
+
+from agno.run.response import RunResponse
+
+from agents.shared.fanOut import FanOutPlan, FanOutTeam, SubQuestion
+
+
+class StubAgent:
+    def __init__(self, name, answer=None, memory=None, latency=0.0, log=None):
+        self.name, self.role, self.description = name, f"{name} questions", None
+        self.memory, self.storage, self.knowledge = memory, None, None
+        self.answer, self.latency, self.log = answer, latency, log
+        self.questions = []
+
+    def run(self, message, user_id=None, session_id=None, **kwargs):
+        self.questions.append(message)
+        start = time.monotonic()
+        time.sleep(self.latency)
+        if self.log is not None:
+            self.log.append((self.name, start, time.monotonic()))
+        return RunResponse(content=self.answer(message) if callable(self.answer) else self.answer)
+
+
+class StubStorage:
+    def __init__(self):
+        self.records = []
+
+    def record(self, session_id, user_id, run_id, question, answer):
+        self.records.append((session_id, user_id, question, answer))
+
+
+def _overlap(first, second) -> bool:
+    return first[1] < second[2] and second[1] < first[2]
+
+
+def test_plan_parallel_answers_and_synthesis():
+    log, card_memory = [], object()
+    members = [StubAgent("Card Financial Agent", "Card dues 12000", memory=card_memory, latency=0.1, log=log),
+               StubAgent("Card Controls Agent", "Daily limit 50000", memory=card_memory, latency=0.1, log=log),
+               StubAgent("Loans Management Agent", "Prepayment saves 3 EMIs", memory=object(), latency=0.1, log=log)]
+    planner = StubAgent("planner", FanOutPlan(sub_questions=[
+        SubQuestion(agent="card financial agent", question="What are my card dues?"),
+        SubQuestion(agent="Loans Management Agent", question="What does a 1 lakh prepayment save?"),
+        SubQuestion(agent="Card Controls Agent", question="What is my daily limit?"),
+        SubQuestion(agent="Unknown Agent", question="Ignored"),
+    ]))
+    synthesizer = StubAgent("synthesizer", lambda message: f"Merged: {message.count('<answer')} answers")
+    storage = StubStorage()
+    team = FanOutTeam("fan-out", planner=planner, synthesizer=synthesizer, members=members, storage=storage)
+
+    response = team.run("Can I afford a prepayment given my card dues?", user_id="u1", session_id="s1")
+
+    assert response.content == "Merged: 3 answers"
+    prompt = synthesizer.questions[0]
+    assert "Customer question: Can I afford a prepayment given my card dues?" in prompt
+    assert "Question: What are my card dues?\nCard dues 12000" in prompt and "Prepayment saves 3 EMIs" in prompt
+    assert list(response.metrics["branches"]) == ["Card Financial Agent", "Loans Management Agent",
+                                                  "Card Controls Agent"]
+    assert storage.records == [("s1", "u1", "Can I afford a prepayment given my card dues?", "Merged: 3 answers")]
+
+    runs = {name: (name, start, end) for name, start, end in log}
+    # The card agents share a memory and run one after another; the loans agent runs alongside them
+    assert not _overlap(runs["Card Financial Agent"], runs["Card Controls Agent"])
+    assert _overlap(runs["Loans Management Agent"], runs["Card Financial Agent"])
+
+
+def test_single_branch_is_answered_without_synthesis():
+    member = StubAgent("Loans Management Agent", "Outstanding 2500000")
+    planner = StubAgent("planner", FanOutPlan(sub_questions=[SubQuestion(agent=member.name, question="Balance?")]))
+    synthesizer = StubAgent("synthesizer", "unused")
+    team = FanOutTeam("fan-out", planner=planner, synthesizer=synthesizer, members=[member])
+
+    assert team.run("What is my home loan balance?").content == "Outstanding 2500000"
+    # The member gets the customer's own question, not the rewritten one
+    assert member.questions == ["What is my home loan balance?"]
+    assert synthesizer.questions == []
+
+
+def test_groups_merge_members_sharing_any_state():
+    shared_storage, shared_knowledge = object(), object()
+    members = [StubAgent("a"), StubAgent("b"), StubAgent("c"), StubAgent("d")]
+    members[0].storage = members[2].storage = shared_storage
+    members[2].knowledge = members[3].knowledge = shared_knowledge
+    team = FanOutTeam("fan-out", planner=None, synthesizer=None, members=members)
+    assert team._groups(["a", "b", "c", "d"]) == [["b"], ["a", "c", "d"]]
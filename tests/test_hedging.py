@@ -0,0 +1,146 @@
+import asyncio
+import threading
+import time
+
+import httpx
+
+from agents.shared.hedging import AsyncHedgedTransport, HedgedTransport, HedgePolicy
+from agents.shared.rateLimiter import deployment_name
+
+
+class TrackedStream(httpx.SyncByteStream):
+    def __init__(self, body: bytes = b"{}"):
+        self.body = body
+        self.closed = threading.Event()
+
+    def __iter__(self):
+        yield self.body
+
+    def close(self) -> None:
+        self.closed.set()
+
+
+class Deployments:
+    """Mock Azure OpenAI: each deployment answers with a given status, optionally only once released"""
+
+    def __init__(self, **statuses):
+        self.statuses = statuses
+        self.released = {name: threading.Event() for name in statuses}
+        self.streams = {name: [] for name in statuses}
+        self.sent = []
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        deployment = deployment_name(request)
+        self.sent.append(deployment)
+        assert self.released[deployment].wait(timeout=5)
+        stream = TrackedStream()
+        self.streams[deployment].append(stream)
+        return httpx.Response(self.statuses[deployment], stream=stream, extensions={"deployment": deployment})
+
+
+def _request(deployment: str = "primary") -> httpx.Request:
+    return httpx.Request("POST", f"https://example.openai.azure.com/openai/deployments/{deployment}/chat/completions",
+                         json={"messages": []})
+
+
+def _wait_for_stream(deployments: Deployments, deployment: str) -> None:
+    deadline = time.monotonic() + 5
+    while not deployments.streams[deployment]:
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+def _policy(**kwargs) -> HedgePolicy:
+    return HedgePolicy(**{"initial_delay": 0.05, "min_samples": 1, "max_rate": 1.0, **kwargs})
+
+
+def test_slow_primary_is_hedged_and_the_hedge_wins():
+    deployments = Deployments(primary=200, hedge=200)
+    deployments.released["hedge"].set()
+    policy = _policy()
+    transport = HedgedTransport(httpx.MockTransport(deployments.handle), "hedge", hedge_policy=policy)
+
+    response = transport.handle_request(_request())
+    assert response.extensions["deployment"] == "hedge"
+    assert policy.describe()["answer:primary"]["hedge_wins"] == 1
+
+    # The primary answers after losing; its response is closed unread
+    deployments.released["primary"].set()
+    _wait_for_stream(deployments, "primary")
+    assert deployments.streams["primary"][0].closed.wait(timeout=5)
+    assert not deployments.streams["hedge"][0].closed.is_set()
+
+
+def test_fast_primary_is_not_hedged():
+    deployments = Deployments(primary=200, hedge=200)
+    deployments.released["primary"].set()
+    transport = HedgedTransport(httpx.MockTransport(deployments.handle), "hedge", hedge_policy=_policy(initial_delay=5))
+
+    assert transport.handle_request(_request()).extensions["deployment"] == "primary"
+    assert deployments.sent == ["primary"]
+
+
+def test_hedge_rate_is_capped():
+    deployments = Deployments(primary=200, hedge=200)
+    deployments.released["hedge"].set()
+    # At most one hedge per two recent calls
+    policy = _policy(max_rate=0.5, min_samples=2)
+    transport = HedgedTransport(httpx.MockTransport(deployments.handle), "hedge", hedge_policy=policy)
+
+    assert transport.handle_request(_request()).extensions["deployment"] == "hedge"
+    assert not policy.allow("answer:primary")
+    threading.Timer(0.1, deployments.released["primary"].set).start()
+    # Over budget: the second slow call waits for the primary instead of hedging
+    assert transport.handle_request(_request()).extensions["deployment"] == "primary"
+    assert deployments.sent.count("hedge") == 1
+    assert policy.describe()["answer:primary"]["hedged"] == 1
+
+
+def test_error_from_one_attempt_falls_through_to_the_other():
+    for failing in (503, 429):
+        deployments = Deployments(primary=200, hedge=failing)
+        deployments.released["hedge"].set()
+        threading.Timer(0.1, deployments.released["primary"].set).start()
+        policy = _policy()
+        transport = HedgedTransport(httpx.MockTransport(deployments.handle), "hedge", hedge_policy=policy)
+
+        response = transport.handle_request(_request())
+        assert response.status_code == 200 and response.extensions["deployment"] == "primary"
+        assert deployments.streams["hedge"][0].closed.wait(timeout=5)
+        assert policy.describe()["answer:primary"]["hedge_wins"] == 0
+
+
+def test_both_attempts_failing_returns_the_primary_outcome():
+    deployments = Deployments(primary=500, hedge=503)
+    deployments.released["hedge"].set()
+    threading.Timer(0.1, deployments.released["primary"].set).start()
+    transport = HedgedTransport(httpx.MockTransport(deployments.handle), "hedge", hedge_policy=_policy())
+
+    assert transport.handle_request(_request()).status_code == 500
+
+
+def test_async_slow_primary_is_cancelled_when_the_hedge_wins():
+    cancelled = []
+
+    async def handle(request: httpx.Request) -> httpx.Response:
+        deployment = deployment_name(request)
+        if deployment == "primary":
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.append(deployment)
+                raise
+        return httpx.Response(200, extensions={"deployment": deployment})
+
+    policy = _policy()
+    transport = AsyncHedgedTransport(httpx.MockTransport(handle), "hedge", hedge_policy=policy)
+
+    async def run() -> httpx.Response:
+        response = await transport.handle_async_request(_request())
+        await asyncio.sleep(0)
+        return response
+
+    response = asyncio.run(run())
+    assert response.extensions["deployment"] == "hedge"
+    assert cancelled == ["primary"]
+    assert policy.describe()["answer:primary"]["hedge_wins"] == 1
@@ -0,0 +1,110 @@
+import ast
+import hashlib
+import io
+import json
+import shutil
+import zipfile
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from agents import registry
+from agents.shared.indexArtifacts import export_index, import_index, mismatch, read_manifest, restore_index
+from agents.shared.lexicalIndex import LexicalIndex
+from agents.shared.partitionedKnowledge import CustomerPartitionedKnowledgeBase
+from agents.shared.requestContext import request_scope
+from agents.shared.vectorStores import create_vector_db
+
+
+def knowledge_base(source, workdir, embedder) -> CustomerPartitionedKnowledgeBase:
+    return CustomerPartitionedKnowledgeBase(
+        path=str(source),
+        vector_db=create_vector_db(collection="banking_data_info", path=str(workdir / "vectors"), backend="hashing",
+                                   store="chroma", embedder=embedder),
+        lexical_index=LexicalIndex(str(workdir / "lexical.db")),
+        num_documents=5,
+    )
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "CORE_BANKING_DATA.json"
+    shutil.copy("knowledge/CORE_BANKING_DATA.json", path)
+    return path
+
+
+def _stored(kb):
+    return {partition: vector_db.get_count() for partition, vector_db in kb._target_dbs()}
+
+
+def _vectors(path):
+    """Document id -> vector of every partition in an artifact"""
+    vectors = {}
+    with zipfile.ZipFile(path) as archive:
+        for entry in read_manifest(path)["partitions"]:
+            matrix = np.load(io.BytesIO(archive.read(f"vectors/{entry['member']}.npy")))
+            rows = archive.read(f"documents/{entry['member']}.jsonl").decode().splitlines()
+            vectors.update({json.loads(row)["id"]: vector for row, vector in zip(rows, matrix)})
+    return vectors
+
+
+def test_export_import_round_trip(tmp_path, source, embedder):
+    built = knowledge_base(source, tmp_path / "built", embedder)
+    built.load(recreate=True)
+    path = export_index(built, "accounts", str(tmp_path / "artifacts"))
+
+    # Every member matches the sha256 its manifest records
+    manifest = read_manifest(path)
+    with zipfile.ZipFile(path) as archive:
+        for entry in manifest["partitions"]:
+            assert hashlib.sha256(archive.read(f"vectors/{entry['member']}.npy")).hexdigest() == entry["vectors_sha256"]
+            assert hashlib.sha256(archive.read(f"documents/{entry['member']}.jsonl")).hexdigest() \
+                == entry["documents_sha256"]
+    assert manifest["documents"] == sum(_stored(built).values()) > 0
+
+    # A fresh node restores the same index without embedding anything
+    fresh = knowledge_base(source, tmp_path / "fresh", embedder)
+    assert mismatch(fresh, manifest) is None
+    assert restore_index(fresh, "accounts", str(tmp_path / "artifacts"))
+    assert _stored(fresh) == _stored(built)
+    with request_scope(customer_id="CUST0001"):
+        query = "home loan EMI LOAN-HOME-001"
+        assert [document.id for document in fresh.search(query)] == [document.id for document in built.search(query)]
+
+    # Exporting the restored index gives the same vectors, up to float32 rounding in the store
+    again = export_index(fresh, "accounts", str(tmp_path / "again"))
+    assert read_manifest(again)["version"] == manifest["version"]
+    exported, reexported = _vectors(path), _vectors(again)
+    assert exported.keys() == reexported.keys()
+    assert all(np.allclose(exported[_id], reexported[_id], atol=1e-6) for _id in exported)
+
+
+def test_changed_source_or_corrupt_artifact_is_refused(tmp_path, source, embedder):
+    built = knowledge_base(source, tmp_path / "built", embedder)
+    built.load(recreate=True)
+    path = export_index(built, "accounts", str(tmp_path / "artifacts"))
+
+    corrupt = tmp_path / "corrupt.zip"
+    with zipfile.ZipFile(path) as archive, zipfile.ZipFile(corrupt, "w") as copy:
+        for item in archive.infolist():
+            data = archive.read(item)
+            copy.writestr(item, data + b"\n" if item.filename.startswith("documents/") else data)
+    with pytest.raises(ValueError, match="Checksum mismatch"):
+        import_index(knowledge_base(source, tmp_path / "fresh", embedder), str(corrupt))
+
+    data = json.loads(source.read_text())
+    data["loans"][0]["outstandingPrincipal"] = "1.00"
+    source.write_text(json.dumps(data))
+    fresh = knowledge_base(source, tmp_path / "stale", embedder)
+    assert "changed since the artifact was built" in mismatch(fresh, read_manifest(path))
+    assert not restore_index(fresh, "accounts", str(tmp_path / "artifacts"))
+
+
+def test_every_domain_names_an_initializer_its_module_defines():
+    for module, _, attribute, initializer in registry.DOMAINS.values():
+        tree = ast.parse(Path(module.replace(".", "/") + ".py").read_text())
+        functions = {node.name for node in tree.body if isinstance(node, ast.FunctionDef)}
+        assigned = {target.id for node in tree.body if isinstance(node, ast.Assign)
+                    for target in node.targets if isinstance(target, ast.Name)}
+        assert initializer in functions and attribute in assigned, module
@@ -0,0 +1,31 @@
+import io
+import json
+import os
+
+import pytest
+
+from agents.shared.jsonStream import _BufferedJsonReader, iter_json_records
+
+SEED_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "knowledge",
+                         "CORE_BANKING_DATA.json")
+
+
+def test_number_split_across_chunks_is_read_whole():
+    reader = _BufferedJsonReader(io.StringIO("8.25, 1"), chunk_size=2)
+    assert reader.decode() == 8.25
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64, 257, 4099])
+def test_seed_file_reads_the_same_at_any_chunk_size(chunk_size):
+    expected = [(record.path, record.value) for record in iter_json_records(SEED_FILE)]
+    records = [(record.path, record.value) for record in iter_json_records(SEED_FILE, chunk_size=chunk_size)]
+    assert records == expected
+
+
+def test_float_fields_survive_small_chunks(tmp_path):
+    loans = [{"id": f"LOAN-{index}", "rateApr": 8.25 + index / 1000, "emi": 41872.5} for index in range(300)]
+    path = tmp_path / "loans.json"
+    path.write_text(json.dumps({"loans": loans}))
+    for chunk_size in range(40, 60):
+        records = list(iter_json_records(str(path), chunk_size=chunk_size))
+        assert [record.value for record in records if record.path == ("loans",)] == loans
@@ -0,0 +1,57 @@
+import json
+import os
+
+from agents.shared.knowledgeWatcher import KnowledgeWatcher
+from agents.shared.lexicalIndex import LexicalIndex
+from agents.shared.streamingKnowledge import StreamingJSONKnowledgeBase
+from agents.shared.vectorStores import create_vector_db
+
+
+def _write(path, transactions, mtime_offset=0):
+    path.write_text(json.dumps({"meta": {"generatedAt": "2025-08-08T11:05:00Z"}, "transactions": [
+        {"id": transaction_id, "description": description, "amount": "100.00"}
+        for transaction_id, description in transactions]}))
+    # Edits within one mtime tick would otherwise look unchanged
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + mtime_offset * 10 ** 9))
+
+
+def test_changed_file_is_reindexed_once_and_stale_documents_removed(tmp_path, embedder):
+    source = tmp_path / "knowledge" / "transactions.json"
+    source.parent.mkdir()
+    _write(source, [("TXN-0001", "UPI payment to grocer"), ("TXN-0002", "NEFT salary credit")])
+    kb = StreamingJSONKnowledgeBase(
+        path=str(source.parent),
+        vector_db=create_vector_db(collection="transactions", path=str(tmp_path / "vectors"), backend="hashing",
+                                   store="chroma", embedder=embedder),
+        lexical_index=LexicalIndex(str(tmp_path / "lexical.db")),
+        num_documents=5,
+    )
+    kb.load(recreate=True)
+    before = kb._stored_ids(kb.vector_db)
+
+    refreshes = []
+    watcher = KnowledgeWatcher({"transactions": kb}, interval=3600, refreshers=[lambda: refreshes.append(1)])
+    watcher.start()
+    try:
+        assert watcher.poll() == []
+        # One record edited, one removed
+        _write(source, [("TXN-0001", "UPI payment to pharmacy")], mtime_offset=1)
+        # The first poll only notices the change; the files must hold still for one more
+        assert watcher.poll() == []
+        assert watcher.metrics["transactions"].pending
+        assert watcher.poll() == ["transactions"]
+        assert watcher.poll() == []
+    finally:
+        watcher.stop()
+
+    metrics = watcher.metrics["transactions"]
+    assert (metrics.reindexes, metrics.failures, metrics.pending) == (1, 0, False)
+    assert refreshes == [1]
+    after = kb._stored_ids(kb.vector_db)
+    assert len(after) == len(before) - 1
+    assert metrics.last_documents_removed == len(before - after) == 2
+    assert kb.lexical_index.ids() == after
+    assert [document.content for document in kb.search("pharmacy") if "TXN-0001" in document.content]
+    assert not [document for document in kb.search("grocer salary") if "grocer" in document.content
+                or "salary" in document.content]
@@ -0,0 +1,52 @@
+from agno.document import Document
+
+from agents.shared.lexicalIndex import LexicalIndex, extract_identifiers, reciprocal_rank_fusion
+
+
+def _document(_id, content, entity_id=None) -> Document:
+    return Document(id=_id, name="transactions", content=content, meta_data={"entity_id": entity_id} if entity_id else {})
+
+
+def test_identifiers_are_extracted_without_dates_or_plain_words():
+    assert extract_identifiers("Refund for TXN-2025-0002 to rohitv@okaxis on 2025-08-01, card CARD-CR-002") == [
+        "txn-2025-0002", "rohitv@okaxis", "card-cr-002"]
+    assert extract_identifiers("what did I spend on groceries") == []
+
+
+def test_identifier_query_matches_exactly(tmp_path):
+    index = LexicalIndex(str(tmp_path / "lexical.db"))
+    index.add([
+        _document("statement", "August statement lists TXN-2025-0002 and TXN-2025-0003"),
+        _document("near", "UPI payment TXN-2025-0020 to grocer 2025 0002", entity_id="TXN-2025-0020"),
+        _document("entity", "UPI payment TXN-2025-0002 to pharmacy", entity_id="TXN-2025-0002"),
+    ], partition="CUST0001")
+
+    # The record of the entity first, then documents mentioning it; a similar id is not a match
+    assert [document.id for document in index.lookup_identifiers("Details of txn-2025-0002?", 5, "CUST0001")] == [
+        "entity", "statement"]
+    assert index.lookup_identifiers("Details of TXN-2025-0002", 5, "CUST0002") == []
+    assert index.lookup_identifiers("my grocery spend", 5, "CUST0001") == []
+
+    index.remove(["entity"], partition="CUST0001")
+    assert [document.id for document in index.lookup_identifiers("TXN-2025-0002", 5, "CUST0001")] == ["statement"]
+    assert index.ids("CUST0001") == {"statement", "near"}
+
+
+def test_bm25_search_ranks_by_term_weight(tmp_path):
+    index = LexicalIndex(str(tmp_path / "lexical.db"))
+    index.add([
+        _document("a", "home loan EMI schedule"),
+        _document("b", "home insurance policy"),
+        _document("c", "credit card statement"),
+    ])
+    assert [document.id for document in index.search("home loan", 5)] == ["a", "b"]
+    assert [document.id for document in index.search("what is my loan", 5)] == ["a"]
+    assert index.search("what is the", 5) == []
+
+
+def test_reciprocal_rank_fusion_order():
+    a, b, c, d = (_document(_id, _id) for _id in "abcd")
+    # a: 1/61 + 1/62, c: 1/63 + 1/61, b: 1/62, d: 1/63
+    assert [document.id for document in reciprocal_rank_fusion([[a, b, c], [c, a, d]], 4)] == ["a", "c", "b", "d"]
+    assert [document.id for document in reciprocal_rank_fusion([[a, b, c], [c, a, d]], 2)] == ["a", "c"]
+    assert [document.id for document in reciprocal_rank_fusion([[], [d, b]], 5)] == ["d", "b"]
@@ -0,0 +1,76 @@
+import json
+
+import pytest
+
+from agents.loansAndInsurance.loanTools import LoanCalculatorTools
+from agents.shared.bankingData import CustomerRecords
+from agents.shared.requestContext import request_scope
+
+# LOAN-HOME-001 in the seed file: 4321450.75 outstanding at 8.1%, EMI 41872.00, next EMI on 2025-08-15
+LOAN = "LOAN-HOME-001"
+OUTSTANDING = 4321450.75
+
+
+@pytest.fixture
+def tools():
+    with request_scope(customer_id="CUST0001"):
+        yield LoanCalculatorTools(records=CustomerRecords("knowledge/CORE_BANKING_DATA.json"))
+
+
+def _outstanding(tools, on):
+    return json.loads(tools.get_outstanding_principal(LOAN, on))
+
+
+def test_outstanding_principal_now_is_the_stored_balance(tools):
+    for on in ("2025-07-15", "2025-08-01", "2025-08-14"):
+        result = _outstanding(tools, on)
+        assert float(result["outstandingPrincipal"]) == OUTSTANDING
+        assert result["basis"] == "current outstanding principal"
+
+
+def test_outstanding_principal_after_the_next_emi(tools):
+    result = _outstanding(tools, "2025-08-15")
+    # The next EMI repays its principal component on top of the stored balance
+    interest = OUTSTANDING * 8.1 / 1200
+    assert float(result["outstandingPrincipal"]) == pytest.approx(OUTSTANDING - (41872.00 - interest), abs=0.01)
+    assert result["installmentsPaidInPeriod"] == 1
+    assert float(_outstanding(tools, "2025-10-20")["outstandingPrincipal"]) < float(result["outstandingPrincipal"])
+
+
+def test_outstanding_principal_before_the_last_emi_replays_origination(tools):
+    result = _outstanding(tools, "2025-06-01")
+    assert result["basis"] == "origination schedule"
+    assert OUTSTANDING < float(result["outstandingPrincipal"]) < 5000000
+    assert float(_outstanding(tools, "2021-05-10")["outstandingPrincipal"]) == 5000000
+
+
+def test_prepayment_reduce_tenure_and_emi(tools):
+    tenure = json.loads(tools.simulate_prepayment(LOAN, [100000, 500000], reduce="tenure"))
+    assert tenure["current"]["outstandingPrincipal"] == "4321450.75"
+    small, large = tenure["scenarios"]
+    assert small["newEmi"] == large["newEmi"] == "41872.00"
+    assert 0 < small["monthsSaved"] < large["monthsSaved"]
+    assert 0 < float(small["interestSaved"]) < float(large["interestSaved"])
+
+    emi = json.loads(tools.simulate_prepayment(LOAN, [100000], reduce="emi"))
+    scenario = emi["scenarios"][0]
+    assert scenario["monthsSaved"] == 0
+    assert scenario["installmentsRemaining"] == emi["current"]["installmentsRemaining"]
+    assert float(scenario["newEmi"]) < 41872.00
+    assert "error" in json.loads(tools.simulate_prepayment(LOAN, [100000], reduce="rate"))
+
+
+def test_rate_change_keep_emi_or_tenure(tools):
+    keep_emi = json.loads(tools.simulate_rate_change(LOAN, 8.6))
+    assert keep_emi["after"]["emiFromReset"] == keep_emi["before"]["emiFromReset"] == "41872.00"
+    assert keep_emi["after"]["installmentsRemaining"] > keep_emi["before"]["installmentsRemaining"]
+    assert float(keep_emi["extraInterest"]) > 0
+
+    keep_tenure = json.loads(tools.simulate_rate_change(LOAN, 8.6, effective_date="2025-09-15", keep_emi=False))
+    assert keep_tenure["effectiveDate"] == "2025-09-15"
+    assert keep_tenure["after"]["installmentsRemaining"] == keep_tenure["before"]["installmentsRemaining"]
+    assert float(keep_tenure["after"]["emiFromReset"]) > 41872.00
+
+
+def test_unknown_loan_is_an_error(tools):
+    assert "error" in json.loads(tools.get_outstanding_principal("LOAN-NONE", "2025-08-14"))
@@ -0,0 +1,92 @@
+import json
+import threading
+from datetime import date, timedelta
+
+from agents.shared.materializedSummary import SummaryStore, SummaryView
+
+
+def _credit(transaction_id: str, booking_date: date) -> dict:
+    return {"id": transaction_id, "accountId": "ACC1", "direction": "inflow", "amount": "1.00",
+            "bookingDate": booking_date.isoformat()}
+
+
+def test_cashflow_window_covers_exactly_its_days():
+    view = SummaryView()
+    as_of = date(2025, 6, 30)
+    # One rupee a day from 100 days before as_of up to as_of, plus one the day after
+    for offset in range(-1, 101):
+        view.upsert("transaction", _credit(f"TX{offset}", as_of - timedelta(days=offset)))
+
+    assert view.cashflow(30, as_of.isoformat()) == {"inflow": "30.00", "outflow": "0.00"}
+    assert view.cashflow(1, as_of.isoformat()) == {"inflow": "1.00", "outflow": "0.00"}
+    cashflow = view.snapshot(as_of.isoformat())["cashflow"]
+    assert cashflow["last30d"]["inflow"] == "30.00"
+    assert cashflow["last90d"]["inflow"] == "90.00"
+
+
+def test_entities_without_ids_are_tracked_separately():
+    view = SummaryView()
+    as_of = date(2025, 6, 30)
+    core = {"rewards": {"programs": [{"name": "Dining", "pointsBalance": 100},
+                                     {"name": "Travel", "pointsBalance": 250}]}}
+    # Two identical id-less credits are still two transactions
+    transactions = {"transactions": [{key: value for key, value in _credit("", as_of).items() if key != "id"}] * 2}
+    view.sync(core, transactions)
+
+    snapshot = view.snapshot(as_of.isoformat())
+    assert snapshot["points"]["totalPoints"] == 350
+    assert len(snapshot["points"]["byProgram"]) == 2
+    assert snapshot["cashflow"]["last30d"]["inflow"] == "2.00"
+
+    # Dropping one of the duplicates removes exactly one contribution
+    transactions["transactions"] = transactions["transactions"][:1]
+    assert view.sync(core, transactions) == 1
+    assert view.cashflow(30, as_of.isoformat())["inflow"] == "1.00"
+
+
+class _AlternatingRecords:
+    """Returns a fresh copy of one of two records on every read, so each read forces a sync"""
+
+    def __init__(self, *records):
+        self.records, self.reads = records, 0
+
+    def get(self, customer_id=None):
+        self.reads += 1
+        return json.loads(json.dumps(self.records[self.reads % len(self.records)]))
+
+
+def test_store_reads_do_not_race_refresh():
+    as_of = date(2025, 6, 30)
+    small = {"meta": {"generatedAt": as_of.isoformat()},
+             "accounts": [{"id": "ACC1", "type": "savings", "status": "active", "balance": {"available": "10.00"}}]}
+    large = {"meta": {"generatedAt": as_of.isoformat()},
+             "accounts": [{"id": f"ACC{index}", "type": "savings", "status": "active",
+                           "balance": {"available": "10.00"}} for index in range(500)]}
+    store = SummaryStore(_AlternatingRecords(small, large))
+    store.snapshot("CUST1")
+    errors = []
+
+    def refresh():
+        try:
+            for _ in range(200):
+                store.refresh()
+        except Exception as e:
+            errors.append(e)
+
+    def read():
+        try:
+            for _ in range(200):
+                snapshot = store.snapshot("CUST1")
+                # Every snapshot reflects one whole version of the records
+                assert snapshot["balances"]["totalAvailable"] in ("10.00", "5000.00")
+                assert len(snapshot["balances"]["byAccountId"]) in (1, 500)
+                assert store.cashflow(30, customer_id="CUST1")["asOf"] == as_of.isoformat()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=refresh)] + [threading.Thread(target=read) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
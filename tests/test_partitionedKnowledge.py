@@ -0,0 +1,78 @@
+import json
+import threading
+
+from agents.shared.lexicalIndex import LexicalIndex
+from agents.shared.partitionedKnowledge import CustomerPartitionedKnowledgeBase
+from agents.shared.requestContext import request_scope
+from agents.shared.vectorStores import create_vector_db
+
+
+def _write(path, customer_id, transaction_id):
+    meta = {"generatedAt": "2025-08-08T11:05:00Z"}
+    if customer_id:
+        meta["customerId"] = customer_id
+    path.write_text(json.dumps({"meta": meta, "transactions": [
+        {"id": transaction_id, "description": f"UPI payment {transaction_id}", "amount": "100.00"}]}))
+
+
+def knowledge_base(source, workdir, embedder, lexical=True) -> CustomerPartitionedKnowledgeBase:
+    return CustomerPartitionedKnowledgeBase(
+        path=str(source),
+        vector_db=create_vector_db(collection="transactions", path=str(workdir / "vectors"), backend="hashing",
+                                   store="chroma", embedder=embedder),
+        lexical_index=LexicalIndex(str(workdir / "lexical.db")) if lexical else None,
+        num_documents=5,
+    )
+
+
+def _entities(documents):
+    return sorted(document.meta_data.get("entity_id") for document in documents if document.meta_data.get("entity_id"))
+
+
+def test_searches_only_see_the_callers_partition(tmp_path, embedder):
+    (tmp_path / "knowledge").mkdir()
+    _write(tmp_path / "knowledge" / "a.json", "CUST0001", "TXN-A-0001")
+    _write(tmp_path / "knowledge" / "b.json", "CUST0002", "TXN-B-0001")
+    for lexical in (True, False):
+        kb = knowledge_base(tmp_path / "knowledge", tmp_path / f"lexical-{lexical}", embedder, lexical)
+        kb.load(recreate=True)
+
+        with request_scope(customer_id="CUST0001"):
+            assert _entities(kb.search("UPI payment TXN-B-0001")) == ["TXN-A-0001"]
+        with request_scope(user_id="CUST0002"):
+            assert _entities(kb.search("UPI payment")) == ["TXN-B-0001"]
+        # A user that maps to no customer gets nothing, not some customer's data
+        with request_scope(user_id="api_user"):
+            assert kb.search("UPI payment TXN-A-0001") == []
+        assert kb.search("UPI payment") == []
+
+
+def test_documents_without_a_customer_are_reported(tmp_path, embedder, capsys):
+    (tmp_path / "knowledge").mkdir()
+    _write(tmp_path / "knowledge" / "a.json", None, "TXN-A-0001")
+    kb = knowledge_base(tmp_path / "knowledge", tmp_path, embedder)
+    kb.load(recreate=True)
+
+    output = capsys.readouterr().out
+    assert "1 documents name no customer" in output and "transactions (1)" in output
+    with request_scope(customer_id="CUST0001"):
+        assert kb.search("UPI payment") == []
+
+
+def test_concurrent_callers_share_one_partition_db(tmp_path, embedder):
+    kb = knowledge_base(tmp_path, tmp_path, embedder, lexical=False)
+    kb.max_open_partitions = 4
+    opened, barrier = [], threading.Barrier(8)
+
+    def open_partitions(worker: int) -> None:
+        barrier.wait()
+        for index in range(200):
+            opened.append((index % 6, kb.partition(f"CUST{index % 6:04d}")))
+
+    threads = [threading.Thread(target=open_partitions, args=(worker,)) for worker in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(opened) == 1600
+    assert len(kb._partitions) == 4
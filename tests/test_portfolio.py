@@ -0,0 +1,31 @@
+import math
+
+import numpy as np
+
+from agents.shared.portfolio import xirr, xirr_batch
+
+
+def test_two_cash_flows():
+    # 10% over 2021, a 365-day year
+    assert math.isclose(xirr([-1000.0, 1100.0], ["2021-01-01", "2022-01-01"]), 0.1, rel_tol=1e-9)
+    rate = xirr([-1000.0, 500.0], ["2021-01-01", "2023-01-01"])
+    assert math.isclose(rate, 0.5 ** (365 / 730) - 1, rel_tol=1e-9)
+
+
+def test_no_sign_change_is_undefined():
+    rates = xirr_batch([([-1000.0, -500.0], ["2021-01-01", "2022-01-01"]),
+                        ([1000.0, 500.0], ["2021-01-01", "2022-01-01"])])
+    assert np.isnan(rates).all()
+    assert xirr([-1000.0, -500.0], ["2021-01-01", "2022-01-01"]) is None
+
+
+def test_rates_beyond_the_search_range_are_not_reported():
+    rates = xirr_batch([
+        # A million-fold gain in a year is far above the 10000% bound
+        ([-1.0, 1e6], ["2021-01-01", "2022-01-01"]),
+        # Losing all but a millionth is below -99.99%
+        ([-1000.0, 0.001], ["2021-01-01", "2022-01-01"]),
+        ([-1000.0, 1100.0], ["2021-01-01", "2022-01-01"]),
+    ])
+    assert np.isnan(rates[:2]).all()
+    assert math.isclose(rates[2], 0.1, rel_tol=1e-9)
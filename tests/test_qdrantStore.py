@@ -0,0 +1,41 @@
+import asyncio
+
+import pytest
+from agno.document import Document
+from agno.vectordb.distance import Distance
+
+from agents.shared.qdrantStore import TunedQdrant
+from agents.shared.streamingKnowledge import document_id
+
+
+def _document(content: str, customer_id: str) -> Document:
+    document = Document(content=content, meta_data={"customer_id": customer_id, "section": "cards"})
+    document.id = document_id(content)
+    return document
+
+
+def test_async_search_matches_search_within_the_tenant(tmp_path, embedder):
+    store = TunedQdrant(collection="knowledge", path=str(tmp_path), embedder=embedder)
+    for customer, content in (("CUST0001", "credit card limit two lakh"), ("CUST0002", "credit card limit one lakh")):
+        tenant = store.for_tenant(customer)
+        tenant.create()
+        tenant.insert([_document(content, customer)])
+
+    tenant = store.for_tenant("CUST0002")
+    found = asyncio.run(tenant.async_search("credit card limit", limit=5))
+    assert [document.content for document in found] == ["credit card limit one lakh"]
+    assert [document.content for document in found] == [document.content for document in
+                                                          tenant.search("credit card limit", limit=5)]
+
+
+@pytest.mark.parametrize("distance, unrelated", [(Distance.cosine, 1.0), (Distance.l2, 2.0),
+                                                 (Distance.max_inner_product, 1.0)])
+def test_distances_follow_the_collection_metric(tmp_path, embedder, distance, unrelated):
+    store = TunedQdrant(collection="knowledge", path=str(tmp_path), embedder=embedder, distance=distance)
+    store.create()
+    store.insert([_document("credit card limit", "CUST0001"), _document("home loan emi", "CUST0001")])
+
+    # The hashing embedder gives unit vectors with no shared tokens orthogonal
+    found = {document.content: document.meta_data["distances"] for document in store.search("credit card limit")}
+    assert found["credit card limit"] == pytest.approx(0.0, abs=1e-5)
+    assert found["home loan emi"] == pytest.approx(unrelated, abs=1e-5)
@@ -0,0 +1,157 @@
+import threading
+import time
+
+import httpx
+import pytest
+
+from agents.shared import rateLimiter
+from agents.shared.rateLimiter import DeploymentLimiter, RateLimitScheduler, ScheduledTransport
+from agents.shared.requestContext import RequestCancelled, request_scope
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture(autouse=True)
+def no_usage_ledger(monkeypatch):
+    monkeypatch.setenv("USAGE_ACCOUNTING", "false")
+
+
+def _wait_for(condition, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+def _chat_request(deployment: str) -> httpx.Request:
+    return httpx.Request("POST", f"https://example.openai.azure.com/openai/deployments/{deployment}/chat/completions",
+                         json={"messages": [{"role": "user", "content": "hi"}], "max_tokens": 10})
+
+
+def test_waiting_calls_are_granted_in_priority_order():
+    clock = FakeClock()
+    # 6 requests a minute: a bucket of one request, refilled every 10 seconds
+    limiter = DeploymentLimiter("ordering", rpm=6, clock=clock)
+    limiter.acquire(1)
+    granted = []
+
+    def call(priority: int) -> None:
+        limiter.acquire(1, priority)
+        granted.append(priority)
+
+    threads = []
+    for priority in (2, 1, 0):
+        threads.append(threading.Thread(target=call, args=(priority,)))
+        threads[-1].start()
+        _wait_for(lambda: len(limiter._waiting) == len(threads))
+
+    for count in range(1, 4):
+        clock.now += 10
+        # Releasing the previous call wakes the queue, which now sees a refilled bucket
+        limiter.release(1)
+        _wait_for(lambda: len(granted) == count)
+    for thread in threads:
+        thread.join()
+    assert granted == [0, 1, 2]
+
+
+def test_release_refunds_unused_estimate():
+    clock = FakeClock()
+    # 600 tokens a minute: a 100 token bucket
+    limiter = DeploymentLimiter("refund", tpm=600, clock=clock)
+    limiter.acquire(80)
+    assert limiter.tokens.level == 20
+    limiter.release(80, used=30)
+    assert limiter.tokens.level == 70
+    assert (limiter.in_flight, limiter.used_tokens, limiter.estimated_tokens) == (0, 30, 80)
+
+    # A call that used more than estimated leaves the bucket in debt
+    limiter.acquire(50)
+    limiter.release(50, used=150)
+    assert limiter.tokens.level == -80
+    assert limiter.tokens.delay(10, clock.now) == pytest.approx(9.0)
+
+
+def test_backoff_prefers_retry_after_and_caps_exponential(monkeypatch):
+    monkeypatch.setattr(rateLimiter.random, "uniform", lambda low, high: low)
+    scheduler = RateLimitScheduler(base_backoff=1.0, max_backoff=30.0)
+    assert scheduler.backoff(httpx.Response(429, headers={"retry-after-ms": "250"}), 0) == 0.25
+    assert scheduler.backoff(httpx.Response(429, headers={"retry-after": "3"}), 0) == 3.0
+    assert scheduler.backoff(httpx.Response(429), 2) == 4.0
+    assert scheduler.backoff(httpx.Response(429), 10) == 30.0
+
+
+def test_429_is_retried_after_pausing_the_deployment(monkeypatch):
+    monkeypatch.setattr(rateLimiter, "scheduler", RateLimitScheduler(max_attempts=3))
+    responses = [httpx.Response(429, headers={"retry-after-ms": "0"}),
+                 httpx.Response(200, json={"usage": {"prompt_tokens": 5, "completion_tokens": 2}})]
+    sent = []
+
+    def handle(request: httpx.Request) -> httpx.Response:
+        sent.append(request)
+        return responses.pop(0)
+
+    transport = ScheduledTransport("answer", transport=httpx.MockTransport(handle))
+    response = transport.handle_request(_chat_request("retry"))
+
+    limiter = rateLimiter.scheduler.limiter("retry")
+    assert response.status_code == 200 and len(sent) == 2
+    assert (limiter.granted, limiter.throttled, limiter.failed, limiter.in_flight) == (2, 1, 0, 0)
+    assert limiter.used_tokens == 7
+
+
+def test_429_after_the_last_attempt_is_returned_and_counted(monkeypatch):
+    monkeypatch.setattr(rateLimiter, "scheduler", RateLimitScheduler(max_attempts=2))
+    transport = ScheduledTransport("answer", transport=httpx.MockTransport(
+        lambda request: httpx.Response(429, headers={"retry-after-ms": "0"})))
+    response = transport.handle_request(_chat_request("exhausted"))
+
+    limiter = rateLimiter.scheduler.limiter("exhausted")
+    assert response.status_code == 429
+    assert (limiter.granted, limiter.throttled, limiter.failed, limiter.in_flight) == (2, 1, 1, 0)
+
+
+def test_cancelled_call_leaves_the_queue(monkeypatch):
+    monkeypatch.setattr(rateLimiter, "CANCEL_POLL_SECONDS", 0.01)
+    clock = FakeClock()
+    limiter = DeploymentLimiter("cancel", rpm=6, clock=clock)
+    limiter.acquire(1)
+    cancelled = threading.Event()
+    errors = []
+
+    def call() -> None:
+        try:
+            limiter.acquire(1, cancelled=lambda: "Client disconnected" if cancelled.is_set() else None)
+        except RequestCancelled as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=call)
+    thread.start()
+    _wait_for(lambda: len(limiter._waiting) == 1)
+    cancelled.set()
+    thread.join(timeout=5)
+    assert len(errors) == 1 and "while queued for cancel" in str(errors[0])
+    assert limiter._waiting == [] and limiter.granted == 1
+
+
+def test_request_past_its_deadline_is_not_sent(monkeypatch):
+    monkeypatch.setattr(rateLimiter, "scheduler", RateLimitScheduler())
+    sent = []
+    transport = ScheduledTransport("answer", transport=httpx.MockTransport(
+        lambda request: sent.append(request) or httpx.Response(200, json={})))
+    with request_scope(user_id="u1", customer_id="CUST0001", timeout=0):
+        with pytest.raises(RequestCancelled, match="deadline"):
+            transport.handle_request(_chat_request("deadline"))
+
+    request = _chat_request("unwanted")
+    request.extensions[rateLimiter.ATTEMPT_CANCELLED] = threading.Event()
+    request.extensions[rateLimiter.ATTEMPT_CANCELLED].set()
+    with pytest.raises(RequestCancelled, match="Hedged"):
+        transport.handle_request(request)
+    assert sent == []
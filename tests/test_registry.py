@@ -0,0 +1,24 @@
+import sys
+
+from agents import registry
+
+
+def test_session_storage_does_not_import_agents(tmp_path, monkeypatch):
+    monkeypatch.setattr(registry, "SESSION_STORAGES", {
+        name: (table, str(tmp_path / f"{name}.db"), record_messages)
+        for name, (table, _, record_messages) in registry.SESSION_STORAGES.items()})
+    monkeypatch.setattr(registry, "_storages", {})
+    agent_modules = [module for module, _, _, _ in registry.DOMAINS.values()] + [registry.MAIN_MODULE]
+    imported = {module for module in agent_modules if module in sys.modules}
+
+    storage = registry.session_storage("cards")
+    storage.record("s1", "u1", "run-1", "card limit?", "Your limit is 50000.")
+    assert registry.session_storage("cards") is storage
+    assert storage.messages("s1")["messages"][0]["content"] == "card limit?"
+    assert {module for module in agent_modules if module in sys.modules} == imported
+
+    monkeypatch.setenv("ROUTING_MODE", "fanout")
+    assert registry.session_storage() is registry.session_storage("fanout")
+    assert not registry.session_storage().record_messages
+    monkeypatch.setenv("ROUTING_MODE", "nested")
+    assert registry.session_storage() is registry.session_storage("main")
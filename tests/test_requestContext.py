@@ -0,0 +1,23 @@
+from agents.shared.requestContext import current_customer_id, request_scope, resolve_customer_id
+
+
+def test_customer_ids_are_used_as_is():
+    assert resolve_customer_id("CUST0042") == "CUST0042"
+
+
+def test_unknown_users_map_to_no_customer(monkeypatch):
+    monkeypatch.delenv("CUSTOMER_ID_MAP", raising=False)
+    for user_id in ("api_user", "web_user", "cust0001", "CUST0001x", "", None):
+        assert resolve_customer_id(user_id) is None
+    with request_scope(user_id="api_user"):
+        assert current_customer_id() is None
+    assert current_customer_id() is None
+
+
+def test_explicit_mapping(monkeypatch):
+    monkeypatch.setenv("CUSTOMER_ID_MAP", "web_user=CUST0001, api_user = CUST0002,broken")
+    assert resolve_customer_id("web_user") == "CUST0001"
+    assert resolve_customer_id("api_user") == "CUST0002"
+    assert resolve_customer_id("someone_else") is None
+    with request_scope(user_id="api_user"):
+        assert current_customer_id() == "CUST0002"
@@ -0,0 +1,45 @@
+from agno.document import Document
+
+from agents.shared.reranking import LexicalOverlapReranker, adaptive_top_k
+
+
+def _scored(*scores):
+    documents = []
+    for index, score in enumerate(scores):
+        document = Document(id=str(index), content=str(index))
+        document.reranking_score = score
+        documents.append(document)
+    return documents
+
+
+def _ids(documents):
+    return [document.id for document in documents]
+
+
+def test_adaptive_top_k_keeps_documents_near_the_best():
+    documents = _scored(0.9, 0.8, 0.4, 0.2)
+    # Threshold: max(0.3, 0.9 * 0.5)
+    assert _ids(adaptive_top_k(documents, max_k=5)) == ["0", "1"]
+    assert _ids(adaptive_top_k(documents, max_k=5, relative_cutoff=0.0)) == ["0", "1", "2"]
+
+
+def test_adaptive_top_k_respects_min_and_max():
+    documents = _scored(0.9, 0.85, 0.8, 0.75)
+    assert _ids(adaptive_top_k(documents, max_k=2)) == ["0", "1"]
+    weak = _scored(0.2, 0.1, 0.05)
+    # Nothing reaches the cutoff: the best min_k are still returned
+    assert _ids(adaptive_top_k(weak, max_k=5)) == ["0"]
+    assert _ids(adaptive_top_k(weak, max_k=5, min_k=2)) == ["0", "1"]
+    # max_k wins over min_k
+    assert _ids(adaptive_top_k(weak, max_k=1, min_k=3)) == ["0"]
+    assert adaptive_top_k([], max_k=5) == []
+
+
+def test_lexical_overlap_ranks_documents_with_the_rarer_terms_first():
+    documents = [Document(id="card", content='{"type": "creditCard", "dueDate": "2025-08-20"}'),
+                 Document(id="loan", content='{"type": "homeLoan", "emiAmount": "41872.00", "nextEmiDate": "2025-09-05"}'),
+                 Document(id="loans", content='{"loans": [], "note": "home loans summary"}')]
+    ranked = LexicalOverlapReranker().rerank("When is my next home loan EMI?", documents)
+    assert _ids(ranked) == ["loan", "loans", "card"]
+    assert all(0.0 <= document.reranking_score <= 1.0 for document in ranked)
+    assert ranked[-1].reranking_score == 0.0
@@ -0,0 +1,60 @@
+import pytest
+
+from agents.shared.sessionHistory import IndexedSqliteStorage
+
+
+@pytest.fixture
+def storage(tmp_path) -> IndexedSqliteStorage:
+    storage = IndexedSqliteStorage(table_name="sessions", db_file=str(tmp_path / "sessions.db"))
+    messages = [
+        ("u1", "What is my home loan EMI?", 1000),
+        ("u2", "Loan loan loan: prepay the loan or keep the loan?", 2000),
+        ("u1", "Card limit for my travel card", 3000),
+        ("u1", "Is the loan EMI due before the card bill?", 4000),
+        ("u2", "Home loan statement please", 5000),
+    ]
+    for number, (user_id, question, created_at) in enumerate(messages):
+        storage.record(f"session-{user_id}", user_id, f"run-{number}", question, None, created_at)
+    return storage
+
+
+def _questions(hits):
+    return [hit["snippet"].replace("<mark>", "").replace("</mark>", "") for hit in hits]
+
+
+def test_best_match_first(storage):
+    hits = storage.search("loan")
+    assert _questions(hits)[0] == "Loan loan loan: prepay the loan or keep the loan?"
+    assert len(hits) == 4
+    assert [hit["score"] for hit in hits] == sorted(hit["score"] for hit in hits)
+    # Every word of the query must appear
+    assert _questions(storage.search("loan emi")) == sorted(
+        ["What is my home loan EMI?", "Is the loan EMI due before the card bill?"], key=len)
+
+
+def test_period_bounds(storage):
+    assert {hit["created_at"] for hit in storage.search("loan", since=2000, until=5000)} == {2000, 4000}
+    assert {hit["created_at"] for hit in storage.search("loan", since=4001)} == {5000}
+    # An end after the last message bounds nothing; a start after it matches nothing
+    assert len(storage.search("loan", until=9000)) == 4
+    assert storage.search("loan", since=9000) == []
+
+
+def test_user_filter(storage):
+    hits = storage.search("loan", user_id="u1")
+    assert {hit["user_id"] for hit in hits} == {"u1"}
+    assert {hit["created_at"] for hit in hits} == {1000, 4000}
+    assert [hit["score"] for hit in hits] == sorted(hit["score"] for hit in hits)
+    assert {hit["created_at"] for hit in storage.search("loan", user_id="u2", until=5000)} == {2000}
+
+
+def test_offset_paging(storage):
+    everything = [hit["id"] for hit in storage.search("loan")]
+    pages = [[hit["id"] for hit in storage.search("loan", limit=2, offset=offset)] for offset in (0, 2, 4)]
+    assert pages[0] + pages[1] == everything
+    assert pages[2] == []
+
+
+def test_search_syntax_is_not_interpreted(storage):
+    assert storage.search("loan OR card") == []
+    assert storage.search("***") == []
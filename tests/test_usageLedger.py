@@ -0,0 +1,66 @@
+import pytest
+
+from agents.shared.usageLedger import UsageLedger
+
+
+def _call(at, agent, user_id, model, prompt, completion, latency_ms, status=200, cached=None, hop=1):
+    return {"at": at, "user_id": user_id, "session_id": f"{user_id}-session", "endpoint": "/chat", "agent": agent,
+            "role": "answer", "deployment": "chat", "model": model, "hop": hop, "prompt_tokens": prompt,
+            "completion_tokens": completion, "cached_tokens": cached, "latency_ms": latency_ms, "wait_ms": 0,
+            "status": status}
+
+
+@pytest.fixture
+def ledger(tmp_path) -> UsageLedger:
+    ledger = UsageLedger(str(tmp_path / "usage.db"), flush_interval=3600)
+    for call in [
+        _call(1000, "accounts", "u1", "gpt-4o-mini-2024-07-18", 1000, 200, 500, cached=100),
+        _call(2000, "accounts", "u2", "gpt-4o-2024-08-06", 2000, 500, 1500, hop=2),
+        _call(3000, "cards", "u1", "in-house-model", 300, 30, 300),
+        # Streamed: no usage reported
+        _call(4000, "cards", "u1", None, None, None, 800),
+        _call(5000, "cards", "u1", None, None, None, 100, status=429),
+    ]:
+        ledger.record(call)
+    return ledger
+
+
+def test_rollup_by_agent(ledger):
+    rollup = ledger.rollup(("agent",))
+    assert rollup["groups"] == 2
+    accounts, cards = rollup["rows"]
+    # Priced per model: 1000 x 0.15 + 200 x 0.60 and 2000 x 2.50 + 500 x 10.00, per million
+    assert accounts == {"agent": "accounts", "calls": 2, "prompt_tokens": 3000, "completion_tokens": 700,
+                        "cached_tokens": 100, "cost_usd": 0.01027, "max_latency_ms": 1500, "unmetered_calls": 0,
+                        "failed_calls": 0, "unpriced_calls": 0, "avg_latency_ms": 1000.0}
+    assert (cards["calls"], cards["prompt_tokens"], cards["cost_usd"]) == (3, 300, 0.0)
+    assert (cards["unmetered_calls"], cards["unpriced_calls"], cards["failed_calls"]) == (2, 1, 1)
+    assert rollup["totals"] == {"calls": 5, "prompt_tokens": 3300, "completion_tokens": 730, "cached_tokens": 100,
+                                "cost_usd": 0.01027}
+
+
+def test_rollup_groups_and_filters_by_label(ledger):
+    rows = ledger.rollup(("agent", "user_id"), filters={"user_id": "u1"})["rows"]
+    assert [(row["agent"], row["user_id"], row["calls"]) for row in rows] == [("accounts", "u1", 1), ("cards", "u1", 3)]
+    assert ledger.rollup(("model",), filters={"agent": "cards"})["totals"]["calls"] == 3
+    assert [(row["hop"], row["calls"]) for row in ledger.rollup(("hop",), filters={"hop": 2})["rows"]] == [(2, 1)]
+    # A label never recorded matches nothing rather than everything
+    assert ledger.rollup(("agent",), filters={"agent": "nobody"})["groups"] == 0
+
+
+def test_rollup_period_and_validation(ledger):
+    assert ledger.rollup(("agent",), since=1500, until=4000)["totals"]["calls"] == 2
+    assert ledger.rollup(("endpoint",), limit=1)["rows"][0]["calls"] == 5
+    with pytest.raises(ValueError, match="Unknown usage dimension"):
+        ledger.rollup(("customer",))
+    with pytest.raises(ValueError, match="Unknown usage dimension"):
+        ledger.rollup(("agent",), filters={"day": "2025-01-01"})
+
+
+def test_calls_past_the_pending_limit_are_dropped(tmp_path):
+    ledger = UsageLedger(str(tmp_path / "usage.db"), flush_interval=3600, max_pending=1)
+    ledger.record(_call(1000, "accounts", "u1", "gpt-4o", 10, 1, 5))
+    ledger.record(_call(1001, "accounts", "u1", "gpt-4o", 10, 1, 5))
+    assert ledger.describe()["dropped"] == 1
+    assert ledger.flush() == 1
+    assert ledger.rollup()["totals"]["calls"] == 1